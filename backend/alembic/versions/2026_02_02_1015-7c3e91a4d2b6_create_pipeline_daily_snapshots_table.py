@@ -0,0 +1,61 @@
+"""create_pipeline_daily_snapshots_table
+
+Revision ID: 7c3e91a4d2b6
+Revises: 23f6b72d48a4
+Create Date: 2026-02-02 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e91a4d2b6'
+down_revision = '23f6b72d48a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Cria a tabela pipeline_daily_snapshots (consolidado diário dos relatórios)"""
+    op.create_table(
+        'pipeline_daily_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('board_id', sa.Integer(), nullable=False),
+        sa.Column('list_id', sa.Integer(), nullable=False),
+        sa.Column('assigned_to_id', sa.Integer(), nullable=True),
+        sa.Column('created_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_value', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('won_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('won_value', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('won_cycle_days', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('lost_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lost_value', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('open_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_value', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['board_id'], ['boards.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['list_id'], ['lists.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['assigned_to_id'], ['users.id'], ondelete='SET NULL')
+    )
+
+    # Cria índices para as consultas dos relatórios e para a atualização incremental
+    op.create_index('ix_pipeline_daily_snapshots_id', 'pipeline_daily_snapshots', ['id'])
+    op.create_index('ix_pipeline_daily_snapshots_snapshot_date', 'pipeline_daily_snapshots', ['snapshot_date'])
+    op.create_index('ix_pipeline_daily_snapshots_list_id', 'pipeline_daily_snapshots', ['list_id'])
+    op.create_index('ix_pipeline_daily_snapshots_assigned_to_id', 'pipeline_daily_snapshots', ['assigned_to_id'])
+    op.create_index('ix_pipeline_daily_snapshots_refreshed_at', 'pipeline_daily_snapshots', ['refreshed_at'])
+    op.create_index('ix_pipeline_daily_snapshots_board_date', 'pipeline_daily_snapshots', ['board_id', 'snapshot_date'])
+
+
+def downgrade() -> None:
+    """Remove a tabela pipeline_daily_snapshots"""
+    op.drop_index('ix_pipeline_daily_snapshots_board_date', table_name='pipeline_daily_snapshots')
+    op.drop_index('ix_pipeline_daily_snapshots_refreshed_at', table_name='pipeline_daily_snapshots')
+    op.drop_index('ix_pipeline_daily_snapshots_assigned_to_id', table_name='pipeline_daily_snapshots')
+    op.drop_index('ix_pipeline_daily_snapshots_list_id', table_name='pipeline_daily_snapshots')
+    op.drop_index('ix_pipeline_daily_snapshots_snapshot_date', table_name='pipeline_daily_snapshots')
+    op.drop_index('ix_pipeline_daily_snapshots_id', table_name='pipeline_daily_snapshots')
+    op.drop_table('pipeline_daily_snapshots')
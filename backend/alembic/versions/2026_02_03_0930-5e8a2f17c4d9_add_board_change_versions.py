@@ -0,0 +1,54 @@
+"""add_board_change_versions
+
+Revision ID: 5e8a2f17c4d9
+Revises: 7c3e91a4d2b6
+Create Date: 2026-02-03 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a2f17c4d9'
+down_revision = '7c3e91a4d2b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Adiciona versões de alteração (boards, lists, cards) e a tabela board_tombstones"""
+    op.add_column('boards', sa.Column('change_version', sa.BigInteger(), nullable=False, server_default='1'))
+    op.add_column('lists', sa.Column('change_version', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('cards', sa.Column('change_version', sa.BigInteger(), nullable=False, server_default='0'))
+
+    op.create_index('ix_lists_board_id_change_version', 'lists', ['board_id', 'change_version'])
+    op.create_index('ix_cards_list_id_change_version', 'cards', ['list_id', 'change_version'])
+
+    op.create_table(
+        'board_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('board_id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('change_version', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['board_id'], ['boards.id'], ondelete='CASCADE')
+    )
+    op.create_index('ix_board_tombstones_id', 'board_tombstones', ['id'])
+    op.create_index('ix_board_tombstones_board_version', 'board_tombstones', ['board_id', 'change_version'])
+
+
+def downgrade() -> None:
+    """Remove as versões de alteração e a tabela board_tombstones"""
+    op.drop_index('ix_board_tombstones_board_version', table_name='board_tombstones')
+    op.drop_index('ix_board_tombstones_id', table_name='board_tombstones')
+    op.drop_table('board_tombstones')
+
+    op.drop_index('ix_cards_list_id_change_version', table_name='cards')
+    op.drop_index('ix_lists_board_id_change_version', table_name='lists')
+
+    op.drop_column('cards', 'change_version')
+    op.drop_column('lists', 'change_version')
+    op.drop_column('boards', 'change_version')
@@ -0,0 +1,25 @@
+"""add_cards_list_position_index
+
+Revision ID: 9d41b6e0a7f3
+Revises: 5e8a2f17c4d9
+Create Date: 2026-02-04 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9d41b6e0a7f3'
+down_revision = '5e8a2f17c4d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Adiciona o índice (list_id, position) usado para localizar os vizinhos ao mover cards"""
+    op.create_index('ix_cards_list_id_position', 'cards', ['list_id', 'position'])
+
+
+def downgrade() -> None:
+    """Remove o índice (list_id, position)"""
+    op.drop_index('ix_cards_list_id_position', table_name='cards')
@@ -0,0 +1,69 @@
+"""create_gamification_point_balances
+
+Revision ID: b3f7c2d91e45
+Revises: 9d41b6e0a7f3
+Create Date: 2026-02-05 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f7c2d91e45'
+down_revision = '9d41b6e0a7f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Cria a tabela gamification_point_balances e preenche o total a partir do histórico"""
+    op.create_table(
+        'gamification_point_balances',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_points', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('weekly_points', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('week_start', sa.DateTime(), nullable=False),
+        sa.Column('monthly_points', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('month_start', sa.DateTime(), nullable=False),
+        sa.Column('quarterly_points', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('quarter_start', sa.DateTime(), nullable=False),
+        sa.Column('annual_points', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('year_start', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE')
+    )
+    op.create_index('ix_gamification_point_balances_id', 'gamification_point_balances', ['id'])
+    op.create_index(
+        'ix_gamification_point_balances_user_id', 'gamification_point_balances', ['user_id'], unique=True
+    )
+
+    # Saldos iniciais com o total do histórico. Os contadores de período ficam
+    # com início em 1970 (lidos como zero) até a reconciliação rodar.
+    op.execute(
+        """
+        INSERT INTO gamification_point_balances (
+            user_id, total_points,
+            weekly_points, week_start, monthly_points, month_start,
+            quarterly_points, quarter_start, annual_points, year_start,
+            created_at, updated_at
+        )
+        SELECT
+            user_id, SUM(points),
+            0, '1970-01-01', 0, '1970-01-01',
+            0, '1970-01-01', 0, '1970-01-01',
+            CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM gamification_points
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Remove a tabela gamification_point_balances"""
+    op.drop_index('ix_gamification_point_balances_user_id', table_name='gamification_point_balances')
+    op.drop_index('ix_gamification_point_balances_id', table_name='gamification_point_balances')
+    op.drop_table('gamification_point_balances')
@@ -0,0 +1,27 @@
+"""add_gamification_points_period_index
+
+Revision ID: 4a6d9e3c8b12
+Revises: b3f7c2d91e45
+Create Date: 2026-02-05 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4a6d9e3c8b12'
+down_revision = 'b3f7c2d91e45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Adiciona o índice (created_at, user_id) usado no cálculo dos rankings por período"""
+    op.create_index(
+        'ix_gamification_points_created_at_user_id', 'gamification_points', ['created_at', 'user_id']
+    )
+
+
+def downgrade() -> None:
+    """Remove o índice (created_at, user_id)"""
+    op.drop_index('ix_gamification_points_created_at_user_id', table_name='gamification_points')
@@ -0,0 +1,49 @@
+"""create_outbox_events
+
+Revision ID: c81e5a7d2f40
+Revises: 4a6d9e3c8b12
+Create Date: 2026-02-06 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e5a7d2f40'
+down_revision = '4a6d9e3c8b12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Cria a tabela outbox_events (efeitos colaterais processados fora da requisição)"""
+    op.create_table(
+        'outbox_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_steps', sa.JSON(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_id', 'outbox_events', ['id'])
+    op.create_index('ix_outbox_events_event_type', 'outbox_events', ['event_type'])
+    op.create_index('ix_outbox_events_idempotency_key', 'outbox_events', ['idempotency_key'], unique=True)
+    op.create_index('ix_outbox_events_status_available_at', 'outbox_events', ['status', 'available_at'])
+
+
+def downgrade() -> None:
+    """Remove a tabela outbox_events"""
+    op.drop_index('ix_outbox_events_status_available_at', table_name='outbox_events')
+    op.drop_index('ix_outbox_events_idempotency_key', table_name='outbox_events')
+    op.drop_index('ix_outbox_events_event_type', table_name='outbox_events')
+    op.drop_index('ix_outbox_events_id', table_name='outbox_events')
+    op.drop_table('outbox_events')
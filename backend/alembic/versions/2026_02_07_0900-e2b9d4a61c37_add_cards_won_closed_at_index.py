@@ -0,0 +1,27 @@
+"""add_cards_won_closed_at_index
+
+Revision ID: e2b9d4a61c37
+Revises: c81e5a7d2f40
+Create Date: 2026-02-07 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b9d4a61c37'
+down_revision = 'c81e5a7d2f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Adiciona o índice (is_won, closed_at, assigned_to_id) usado no ranking de vendas por período"""
+    op.create_index(
+        'ix_cards_is_won_closed_at', 'cards', ['is_won', 'closed_at', 'assigned_to_id']
+    )
+
+
+def downgrade() -> None:
+    """Remove o índice (is_won, closed_at, assigned_to_id)"""
+    op.drop_index('ix_cards_is_won_closed_at', table_name='cards')
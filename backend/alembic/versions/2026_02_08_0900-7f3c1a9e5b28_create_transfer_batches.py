@@ -0,0 +1,59 @@
+"""create_transfer_batches
+
+Revision ID: 7f3c1a9e5b28
+Revises: e2b9d4a61c37
+Create Date: 2026-02-08 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3c1a9e5b28'
+down_revision = 'e2b9d4a61c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Cria a tabela transfer_batches (transferências em lote processadas em segundo plano)"""
+    op.create_table(
+        'transfer_batches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('batch_id', sa.String(length=50), nullable=False),
+        sa.Column('requested_by_id', sa.Integer(), nullable=True),
+        sa.Column('to_user_id', sa.Integer(), nullable=True),
+        sa.Column('reason', sa.String(length=100), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('card_ids', sa.JSON(), nullable=True),
+        sa.Column('filters', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('total_cards', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processed_cards', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('successful_cards', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_cards', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cursor', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('errors', sa.JSON(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['to_user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transfer_batches_id', 'transfer_batches', ['id'])
+    op.create_index('ix_transfer_batches_batch_id', 'transfer_batches', ['batch_id'], unique=True)
+    op.create_index('ix_transfer_batches_requested_by_id', 'transfer_batches', ['requested_by_id'])
+    op.create_index('ix_transfer_batches_status', 'transfer_batches', ['status'])
+
+
+def downgrade() -> None:
+    """Remove a tabela transfer_batches"""
+    op.drop_index('ix_transfer_batches_status', table_name='transfer_batches')
+    op.drop_index('ix_transfer_batches_requested_by_id', table_name='transfer_batches')
+    op.drop_index('ix_transfer_batches_batch_id', table_name='transfer_batches')
+    op.drop_index('ix_transfer_batches_id', table_name='transfer_batches')
+    op.drop_table('transfer_batches')
@@ -0,0 +1,33 @@
+"""create_pipeline_dirty_days
+
+Revision ID: 5d8a2f6c1e93
+Revises: 7f3c1a9e5b28
+Create Date: 2026-02-09 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8a2f6c1e93'
+down_revision = '7f3c1a9e5b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Cria a tabela pipeline_dirty_days (dias pendentes do consolidado do pipeline)"""
+    op.create_table(
+        'pipeline_dirty_days',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_pipeline_dirty_days_id', 'pipeline_dirty_days', ['id'])
+
+
+def downgrade() -> None:
+    """Remove a tabela pipeline_dirty_days"""
+    op.drop_index('ix_pipeline_dirty_days_id', table_name='pipeline_dirty_days')
+    op.drop_table('pipeline_dirty_days')
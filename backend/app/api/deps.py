@@ -3,7 +3,7 @@ Dependencies do FastAPI.
 Funções reutilizáveis como dependencies em rotas.
 """
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session, joinedload
 
@@ -176,6 +176,32 @@ async def get_current_active_user(
     return current_user
 
 
+async def get_stream_user(
+    token: Optional[str] = Query(None, description="Access token (EventSource não envia headers)"),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Dependency de autenticação para conexões de streaming (SSE).
+
+    O EventSource do navegador não permite definir o header Authorization,
+    então o token também é aceito no parâmetro `token` da URL.
+
+    Args:
+        token: Access token via query string (opcional)
+        credentials: Credenciais HTTP Bearer (opcional)
+        db: Sessão do banco de dados
+
+    Returns:
+        Usuário autenticado e ativo
+    """
+    if credentials is None and token:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    user = await get_current_user(credentials, db)
+    return await get_current_active_user(user)
+
+
 def require_role(required_role: str):
     """
     Factory de dependency para verificar se o usuário tem um role específico.
@@ -18,6 +18,8 @@ from app.schemas.admin import (
     AutomationMonitorResponse,
     AutomationMonitorItem,
     SystemStatsResponse,
+    SchedulerJobStatus,
+    SchedulerStatusResponse,
     AdminPasswordResetRequest,
     AdminPasswordResetResponse
 )
@@ -33,6 +35,7 @@ from app.models.audit_log import AuditLog
 from app.repositories.user_repository import UserRepository
 from app.services.user_service import UserService
 from app.core.security import hash_password
+from app.utils.pagination import CountMode, count_rows, paginate_keyset, total_pages
 
 router = APIRouter()
 
@@ -160,6 +163,9 @@ async def get_audit_logs(
     user_id: Optional[int] = Query(None, description="Filtrar por usuário"),
     action: Optional[str] = Query(None, description="Filtrar por ação"),
     entity_type: Optional[str] = Query(None, description="Filtrar por tipo de entidade"),
+    cursor: bool = Query(False, description="Usar paginação por cursor (keyset) em vez de offset"),
+    after: Optional[str] = Query(None, description="Cursor da página anterior (next_cursor)"),
+    count: CountMode = Query(CountMode.EXACT, description="Contagem do total: exact, estimated ou none"),
     current_user: User = Depends(require_role("admin")),
     db: Session = Depends(get_db)
 ) -> Any:
@@ -171,6 +177,8 @@ async def get_audit_logs(
     - **user_id**: Filtrar por usuário (opcional)
     - **action**: Filtrar por ação (opcional)
     - **entity_type**: Filtrar por tipo de entidade (opcional)
+    - **cursor** / **after**: Paginação por cursor (use o `next_cursor` da resposta)
+    - **count**: Contagem do total (exact, estimated ou none)
 
     **Requer:** Role de admin
     """
@@ -186,12 +194,21 @@ async def get_audit_logs(
         query = query.filter(AuditLog.entity_type == entity_type)
 
     # Total
-    total = query.count()
+    total = count_rows(query, count)
 
     # Paginação (mais recentes primeiro)
-    logs = query.order_by(AuditLog.created_at.desc()).offset(
-        (page - 1) * page_size
-    ).limit(page_size).all()
+    next_cursor = None
+    if cursor or after:
+        logs, next_cursor = paginate_keyset(
+            query,
+            [(AuditLog.created_at, True), (AuditLog.id, True)],
+            after,
+            page_size
+        )
+    else:
+        logs = query.order_by(AuditLog.created_at.desc()).offset(
+            (page - 1) * page_size
+        ).limit(page_size).all()
 
     # Adiciona nome do usuário
     items = []
@@ -222,7 +239,8 @@ async def get_audit_logs(
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size
+        total_pages=total_pages(total, page_size),
+        next_cursor=next_cursor
     )
 
 
@@ -371,6 +389,48 @@ async def monitor_automations(
     )
 
 
+# ================== Scheduler ==================
+
+@router.get("/scheduler", response_model=SchedulerStatusResponse, summary="[Admin] Métricas dos jobs agendados")
+async def get_scheduler_status(
+    current_user: User = Depends(require_role("admin"))
+) -> Any:
+    """
+    **[ADMIN ONLY]** Retorna os jobs agendados e as métricas de execução.
+
+    As métricas são do processo que atendeu a requisição: cada processo só
+    executa os disparos em que conseguiu a reserva do job.
+
+    **Retorna:**
+    - Próximo disparo de cada job
+    - Execuções, falhas, disparos ignorados e sobreposições
+    - Duração da última execução, média e máxima
+
+    **Requer:** Role de admin
+    """
+    from app.core.job_locks import job_locks
+    from app.workers.job_runner import job_metrics
+    from app.workers.scheduler import get_scheduler
+
+    sched = get_scheduler()
+    metrics = {job["job_id"]: job for job in job_metrics.snapshot()}
+
+    jobs = []
+    for job in sched.get_jobs():
+        jobs.append(SchedulerJobStatus(
+            name=job.name,
+            next_run_time=getattr(job, "next_run_time", None),
+            **metrics.pop(job.id, {"job_id": job.id})
+        ))
+    jobs.extend(SchedulerJobStatus(**job) for job in metrics.values())
+
+    return SchedulerStatusResponse(
+        running=sched.running,
+        lock_backend=job_locks.backend.name,
+        jobs=jobs
+    )
+
+
 # ================== Estatísticas do Sistema ==================
 
 @router.get("/stats", response_model=SystemStatsResponse, summary="[Admin] Estatísticas do sistema")
@@ -4,17 +4,20 @@ Rotas para gerenciamento de quadros e listas.
 """
 from typing import Any, Optional, List
 from fastapi import APIRouter, Depends, Query, Path
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_active_user
 from app.services.board_service import BoardService
 from app.services.list_service import ListService
+from app.services.card_service import CardService
 from app.schemas.board import (
     BoardCreate,
     BoardUpdate,
     BoardResponse,
     BoardListResponse,
-    BoardDuplicateRequest
+    BoardDuplicateRequest,
+    BoardChangesResponse
 )
 from app.schemas.list import (
     ListCreate,
@@ -196,6 +199,56 @@ async def duplicate_board(
     )
 
 
+@router.get("/{board_id}/changes", response_model=BoardChangesResponse, summary="Alterações do board desde uma versão")
+async def get_board_changes(
+    board_id: int = Path(..., description="ID do board"),
+    since: int = Query(0, ge=0, description="Última versão recebida (0 = carga completa)"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Sincronização incremental do Kanban.
+
+    Retorna apenas as listas e cards alterados depois da versão `since`, mais
+    os IDs de listas e cards removidos. O cliente guarda `version` da resposta
+    e usa como `since` no próximo pedido, em vez de recarregar o board inteiro.
+
+    - **board_id**: ID do board
+    - **since**: Última versão recebida (0 ou versão desconhecida retorna o board completo com `full=true`)
+    """
+    service = CardService(db)
+    return service.get_board_changes(board_id, since)
+
+
+@router.get("/{board_id}/snapshot", summary="Snapshot do Kanban (streaming)")
+async def stream_board_snapshot(
+    board_id: int = Path(..., description="ID do board"),
+    batch_size: int = Query(500, ge=50, le=5000, description="Máximo de cards por bloco"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Retorna todos os cards do board em streaming (NDJSON), agrupados por lista.
+
+    Alternativa ao `GET /cards?all=true&minimal=true` para boards grandes: os
+    cards são lidos do banco em lotes e enviados à medida que são lidos, em
+    formato colunar (um array por campo e um dicionário de nomes de usuários).
+
+    **Linhas da resposta:**
+    - `{"type": "board", ...}`: listas do board e nomes dos campos
+    - `{"type": "cards", "list_id", "columns", "users"}`: bloco de cards de uma lista
+    - `{"type": "end", "total_cards"}`: fim do snapshot
+
+    - **board_id**: ID do board
+    - **batch_size**: Máximo de cards por bloco (padrão: 500)
+    """
+    service = CardService(db)
+    return StreamingResponse(
+        service.stream_board_snapshot(board_id, batch_size=batch_size),
+        media_type="application/x-ndjson"
+    )
+
+
 # ========== ENDPOINTS DE LISTS ==========
 
 @router.get("/{board_id}/lists", response_model=List[ListResponse], summary="Listar listas do board")
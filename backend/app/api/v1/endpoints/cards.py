@@ -20,6 +20,7 @@ from app.schemas.card import (
 from app.schemas.field import CardFieldValueCreate, CardFieldValueResponse
 from app.models.user import User
 from app.models.card import Card
+from app.utils.pagination import CountMode
 
 router = APIRouter()
 
@@ -123,6 +124,9 @@ async def list_cards(
     person_id: Optional[int] = Query(None, description="Filtrar por pessoa (contato)"),
     is_won: Optional[bool] = Query(None, description="Filtrar por cards ganhos"),
     is_lost: Optional[bool] = Query(None, description="Filtrar por cards perdidos"),
+    cursor: bool = Query(False, description="Usar paginação por cursor (keyset) em vez de offset"),
+    after: Optional[str] = Query(None, description="Cursor da página anterior (next_cursor)"),
+    count: CountMode = Query(CountMode.EXACT, description="Contagem do total: exact, estimated ou none"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
@@ -132,6 +136,8 @@ async def list_cards(
     Parâmetros especiais para performance:
     - all=true: Retorna TODOS os cards sem limite (para Kanban)
     - minimal=true: Retorna apenas campos essenciais (reduz payload ~60%)
+    - cursor=true / after=<token>: Paginação por cursor, com custo constante em qualquer página
+    - count=estimated|none: Evita o COUNT(*) exato em boards grandes
     """
     service = CardService(db)
     return service.list_cards(
@@ -143,7 +149,10 @@ async def list_cards(
         assigned_to_id=assigned_to_id,
         person_id=person_id,
         is_won=is_won,
-        is_lost=is_lost
+        is_lost=is_lost,
+        cursor=cursor,
+        after=after,
+        count=count
     )
 
 
@@ -305,13 +314,15 @@ async def move_card(
     - **card_id**: ID do card
     - **target_list_id**: ID da lista de destino
     - **position**: Posição na lista de destino (opcional)
+    - **after_card_id**: Card que ficará imediatamente antes (opcional, substitui position)
     """
     service = CardService(db)
     card = service.move_card(
         card_id=card_id,
         target_list_id=move_data.target_list_id,
         position=move_data.position,
-        current_user=current_user
+        current_user=current_user,
+        after_card_id=move_data.after_card_id
     )
 
     return card_to_response(card)
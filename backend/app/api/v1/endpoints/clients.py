@@ -10,6 +10,7 @@ from app.api.deps import get_db, get_current_active_user
 from app.services.client_service import ClientService
 from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse, ClientListResponse
 from app.models.user import User
+from app.utils.pagination import CountMode
 
 router = APIRouter()
 
@@ -75,6 +76,9 @@ async def list_clients(
     is_active: Optional[bool] = Query(None, description="Filtrar por status ativo"),
     search: Optional[str] = Query(None, description="Buscar por nome, email, empresa, telefone ou documento"),
     state: Optional[str] = Query(None, max_length=2, description="Filtrar por estado (UF)"),
+    cursor: bool = Query(False, description="Usar paginação por cursor (keyset) em vez de offset"),
+    after: Optional[str] = Query(None, description="Cursor da página anterior (next_cursor)"),
+    count: CountMode = Query(CountMode.EXACT, description="Contagem do total: exact, estimated ou none"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
@@ -87,7 +91,10 @@ async def list_clients(
         page_size=page_size,
         is_active=is_active,
         search=search,
-        state=state
+        state=state,
+        cursor=cursor,
+        after=after,
+        count=count
     )
 
 
@@ -0,0 +1,78 @@
+"""
+Endpoints de Eventos em Tempo Real.
+Canal Server-Sent Events com notificações e alterações de boards.
+"""
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_stream_user, require_role
+from app.core.config import settings
+from app.core.events import event_broker, user_channel, board_channel, encode_event
+from app.repositories.notification_repository import NotificationRepository
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/stream", summary="Canal de eventos em tempo real (SSE)")
+async def stream_events(
+    board_id: List[int] = Query([], description="Boards a acompanhar (pode repetir o parâmetro)"),
+    current_user: User = Depends(get_stream_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Abre um canal Server-Sent Events para o usuário autenticado.
+
+    Substitui o polling de `/notifications/unread-count` e o recarregamento
+    periódico dos boards. Autenticação pelo header Authorization ou pelo
+    parâmetro `token` (EventSource do navegador não envia headers).
+
+    **Eventos:**
+    - `ready`: conexão aberta, com o contador atual de não lidas
+    - `notification`: nova notificação do usuário
+    - `transfer_decided`: transferência aprovada/rejeitada envolvendo o usuário
+    - `card_moved` / `card_assigned`: alterações nos boards acompanhados
+      (use `GET /boards/{board_id}/changes` para buscar o estado)
+
+    - **board_id**: IDs dos boards a acompanhar
+    """
+    channels = [user_channel(current_user.id)] + [board_channel(item) for item in board_id]
+    unread_count = NotificationRepository(db).count_unread_by_user(current_user.id)
+
+    # Inscreve antes de responder para não perder eventos publicados nesse intervalo
+    subscription = event_broker.subscribe(channels)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield encode_event("ready", {
+                "user_id": current_user.id,
+                "unread_count": unread_count,
+                "boards": board_id
+            })
+
+            while True:
+                message = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                # Comentário SSE mantém a conexão aberta em proxies
+                yield message if message is not None else ": ping\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/stats", summary="[Admin] Estatísticas do canal de eventos")
+async def get_event_stats(
+    current_user: User = Depends(require_role("admin"))
+) -> Any:
+    """
+    **[ADMIN ONLY]** Conexões abertas e eventos publicados neste processo.
+    """
+    return event_broker.stats()
@@ -2,7 +2,7 @@
 Endpoints de Notificações.
 Rotas para gerenciamento de notificações in-app.
 """
-from typing import Any
+from typing import Any, Optional
 from fastapi import APIRouter, Depends, Query, Path
 from sqlalchemy.orm import Session
 
@@ -17,6 +17,7 @@ from app.schemas.notification import (
     BulkNotificationResponse
 )
 from app.models.user import User
+from app.utils.pagination import CountMode
 
 router = APIRouter()
 
@@ -26,6 +27,9 @@ async def list_notifications(
     page: int = Query(1, ge=1, description="Número da página"),
     page_size: int = Query(20, ge=1, le=100, description="Tamanho da página"),
     unread_only: bool = Query(False, description="Retornar apenas não lidas"),
+    cursor: bool = Query(False, description="Usar paginação por cursor (keyset) em vez de offset"),
+    after: Optional[str] = Query(None, description="Cursor da página anterior (next_cursor)"),
+    count: CountMode = Query(CountMode.EXACT, description="Contagem do total: exact, estimated ou none"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
@@ -35,6 +39,8 @@ async def list_notifications(
     - **page**: Número da página (padrão: 1)
     - **page_size**: Tamanho da página (padrão: 20, máx: 100)
     - **unread_only**: Se True, retorna apenas notificações não lidas (padrão: False)
+    - **cursor** / **after**: Paginação por cursor (use o `next_cursor` da resposta)
+    - **count**: Contagem do total (exact, estimated ou none)
 
     **Retorna:**
     - Lista de notificações (mais recentes primeiro)
@@ -47,7 +53,10 @@ async def list_notifications(
         user_id=current_user.id,
         page=page,
         page_size=page_size,
-        unread_only=unread_only
+        unread_only=unread_only,
+        cursor=cursor,
+        after=after,
+        count=count
     )
 
 
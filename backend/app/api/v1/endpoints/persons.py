@@ -10,6 +10,7 @@ from app.api.deps import get_db, get_current_active_user
 from app.services.person_service import PersonService
 from app.schemas.person import PersonCreate, PersonUpdate, PersonResponse, PersonListResponse
 from app.models.user import User
+from app.utils.pagination import CountMode
 
 router = APIRouter()
 
@@ -75,6 +76,9 @@ async def list_persons(
     search: Optional[str] = Query(None, description="Buscar por nome, email, telefone ou cargo"),
     organization_id: Optional[int] = Query(None, description="Filtrar por organização"),
     owner_id: Optional[int] = Query(None, description="Filtrar por responsável"),
+    cursor: bool = Query(False, description="Usar paginação por cursor (keyset) em vez de offset"),
+    after: Optional[str] = Query(None, description="Cursor da página anterior (next_cursor)"),
+    count: CountMode = Query(CountMode.EXACT, description="Contagem do total: exact, estimated ou none"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
@@ -88,7 +92,10 @@ async def list_persons(
         is_active=is_active,
         search=search,
         organization_id=organization_id,
-        owner_id=owner_id
+        owner_id=owner_id,
+        cursor=cursor,
+        after=after,
+        count=count
     )
 
 
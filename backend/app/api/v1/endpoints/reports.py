@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_active_user
+from app.core.cache import report_cache
 from app.services.report_service import ReportService
 from app.schemas.report import (
     DashboardKPIsResponse,
@@ -17,7 +18,8 @@ from app.schemas.report import (
     TransferReportRequest,
     TransferReportResponse,
     ExportReportRequest,
-    ExportReportResponse
+    ExportReportResponse,
+    ReportCacheStatsResponse
 )
 from app.models.user import User
 
@@ -121,6 +123,21 @@ async def get_transfer_report(
     return service.get_transfer_report(request=request)
 
 
+@router.get("/cache/stats", response_model=ReportCacheStatsResponse, summary="Estatísticas do cache de relatórios")
+async def get_report_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Retorna os contadores de acerto/erro do cache de relatórios.
+
+    **Retorna:**
+    - Backend em uso (memory ou redis)
+    - Hits, misses e erros do processo atual
+    - Taxa de acerto (%)
+    """
+    return report_cache.stats()
+
+
 @router.post("/export", response_model=ExportReportResponse, summary="Exportar relatório")
 async def export_report(
     request: ExportReportRequest,
@@ -15,6 +15,8 @@ from app.schemas.transfer import (
     CardTransferListResponse,
     BatchTransferCreate,
     BatchTransferResponse,
+    AsyncBatchTransferCreate,
+    TransferBatchResponse,
     TransferApprovalDecision,
     TransferApprovalResponse,
     TransferApprovalListResponse,
@@ -85,6 +87,55 @@ async def create_batch_transfer(
     return service.create_batch_transfer(batch_data, current_user)
 
 
+@router.post("/batch/async", response_model=TransferBatchResponse, summary="Transferência em lote assíncrona (Admin/Gerente)", status_code=202)
+async def create_async_batch_transfer(
+    batch_data: AsyncBatchTransferCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Agenda uma transferência em lote sem limite de cards, processada em segundo plano.
+
+    Informe **card_ids** ou **filter** (exatamente um):
+    - **card_ids**: IDs dos cards (sem limite)
+    - **filter**: Cards abertos de um usuário - from_user_id e board_id (opcional)
+    - **to_user_id**: ID do usuário destino
+    - **reason**: Motivo da transferência
+    - **notes**: Notas adicionais (opcional)
+
+    Retorna o **batch_id** para acompanhar o andamento em `GET /transfers/batch/{batch_id}`.
+
+    Requer role: admin ou manager
+    """
+    if current_user.role.name not in ["admin", "manager"]:
+        raise HTTPException(
+            status_code=http_status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores e gerentes podem agendar transferências em lote"
+        )
+
+    service = TransferService(db, approval_required=APPROVAL_REQUIRED)
+    return service.start_async_batch(batch_data, current_user)
+
+
+@router.get("/batch/{batch_id}", response_model=TransferBatchResponse, summary="Andamento de transferência em lote")
+async def get_batch_transfer_status(
+    batch_id: str = Path(..., description="ID do lote"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Obtém o andamento de uma transferência em lote assíncrona.
+
+    - **status**: queued, running, completed ou failed
+    - **processed_cards** / **total_cards** e **progress** (%)
+    - **successful** / **failed** e os primeiros **errors**
+
+    Disponível para quem agendou o lote e para admin/manager.
+    """
+    service = TransferService(db)
+    return service.get_batch_status(batch_id, current_user)
+
+
 @router.get("/all", response_model=CardTransferListResponse, summary="Listar todas as transferências (Admin/Gerente)")
 async def list_all_transfers(
     page: int = Query(1, ge=1, description="Número da página"),
@@ -0,0 +1,93 @@
+"""
+Tabela de pontos por ação em cache no processo.
+A configuração de gamification_action_points é carregada uma vez e reutilizada
+a cada ponto atribuído, sem consultar o banco.
+
+A invalidação entre processos usa um contador de versão (em memória por
+padrão, ou Redis quando REDIS_HOST está configurado): alterar a configuração
+incrementa a versão e cada processo recarrega a tabela na próxima leitura.
+"""
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from loguru import logger
+
+from app.core.backends import version_backend
+
+
+class ActionPointsTable:
+    """
+    Pontos por tipo de ação: configuração do banco com fallback para os
+    valores padrão (ACTION_POINTS).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._points: Optional[Dict[str, int]] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _current_version(self) -> Optional[int]:
+        try:
+            return self.backend.get_version()
+        except Exception as e:
+            logger.warning(f"[ACTION POINTS] Erro ao ler versão da configuração: {e}")
+            return None
+
+    def get_points(
+        self,
+        action_type: str,
+        loader: Callable[[], Iterable],
+        defaults: Optional[Dict[str, int]] = None
+    ) -> int:
+        """
+        Retorna quantos pontos vale uma ação.
+
+        Args:
+            action_type: Tipo de ação
+            loader: Função que lê as configurações do banco (usada só ao recarregar)
+            defaults: Pontos padrão para ações sem configuração
+
+        Returns:
+            Pontos configurados (0 se a ação estiver inativa)
+        """
+        version = self._current_version()
+
+        with self._lock:
+            # Sem versão legível (backend fora do ar), mantém a tabela carregada
+            stale = self._points is None or (version is not None and version != self._version)
+            if stale:
+                self._points = {
+                    action.action_type: action.points if action.is_active else 0
+                    for action in loader()
+                }
+                self._version = version
+            points = self._points
+
+        if action_type in points:
+            return points[action_type]
+        return (defaults or {}).get(action_type, 0)
+
+    def invalidate(self) -> None:
+        """
+        Marca a configuração como alterada em todos os processos.
+        """
+        with self._lock:
+            self._points = None
+        try:
+            self.backend.bump_version()
+        except Exception as e:
+            logger.warning(f"[ACTION POINTS] Erro ao invalidar configuração: {e}")
+
+    def clear(self) -> None:
+        """
+        Descarta a tabela carregada e zera a versão.
+        """
+        with self._lock:
+            self._points = None
+            self._version = None
+        self.backend.clear()
+
+
+# Instância global da tabela de pontos por ação
+action_points_table = ActionPointsTable(version_backend("ACTION POINTS", "action_points:version"))
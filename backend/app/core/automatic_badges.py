@@ -0,0 +1,106 @@
+"""
+Badges automáticos em cache no processo.
+Os badges automáticos ativos, com os critérios já validados, são carregados
+uma vez e reutilizados a cada avaliação (que roda a cada ponto atribuído),
+sem consultar gamification_badges.
+
+A invalidação entre processos usa um contador de versão, como a tabela de
+pontos por ação: criar, alterar ou remover um badge incrementa a versão e
+cada processo recarrega os badges na próxima leitura.
+"""
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from loguru import logger
+
+from app.core.backends import version_backend
+from app.utils.badge_criteria import validate_criteria
+
+
+class AutomaticBadge(NamedTuple):
+    """
+    Badge automático: só o que a avaliação e as notificações usam.
+    """
+
+    id: int
+    name: str
+    description: Optional[str]
+    criteria: Dict[str, Any]
+
+
+class AutomaticBadgeSet:
+    """
+    Badges automáticos ativos com critério válido.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._badges: Optional[List[AutomaticBadge]] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _current_version(self) -> Optional[int]:
+        try:
+            return self.backend.get_version()
+        except Exception as e:
+            logger.warning(f"[BADGES] Erro ao ler versão dos badges automáticos: {e}")
+            return None
+
+    def get(self, loader: Callable[[], Iterable]) -> List[AutomaticBadge]:
+        """
+        Retorna os badges automáticos.
+
+        Args:
+            loader: Função que lê os badges automáticos ativos do banco
+                (usada só ao recarregar)
+
+        Returns:
+            Lista de AutomaticBadge
+        """
+        version = self._current_version()
+
+        with self._lock:
+            # Sem versão legível (backend fora do ar), mantém os badges carregados
+            stale = self._badges is None or (version is not None and version != self._version)
+            if stale:
+                self._badges = self._load(loader)
+                self._version = version
+            return self._badges
+
+    @staticmethod
+    def _load(loader: Callable[[], Iterable]) -> List[AutomaticBadge]:
+        badges = []
+        for badge in loader():
+            if not badge.criteria:
+                continue
+            try:
+                validate_criteria(badge.criteria)
+            except ValueError as e:
+                logger.warning(f"[BADGES] Critério inválido no badge {badge.id}: {e}")
+                continue
+            badges.append(AutomaticBadge(badge.id, badge.name, badge.description, badge.criteria))
+        return badges
+
+    def invalidate(self) -> None:
+        """
+        Marca os badges como alterados em todos os processos.
+        """
+        with self._lock:
+            self._badges = None
+        try:
+            self.backend.bump_version()
+        except Exception as e:
+            logger.warning(f"[BADGES] Erro ao invalidar badges automáticos: {e}")
+
+    def clear(self) -> None:
+        """
+        Descarta os badges carregados e zera a versão.
+        """
+        with self._lock:
+            self._badges = None
+            self._version = None
+        self.backend.clear()
+
+
+# Instância global dos badges automáticos
+automatic_badges = AutomaticBadgeSet(version_backend("BADGES", "automatic_badges:version"))
@@ -0,0 +1,166 @@
+"""
+Índice em memória das automações por trigger.
+As automações ativas são compiladas uma vez em um dicionário por
+(board, evento, lista destino, responsável); cada evento de card encontra as
+automações que disparam com buscas no dicionário, sem consultar o banco.
+Este módulo é a única implementação das condições de trigger: to_list_id e
+assigned_to_id (comparadas por igualdade, inclusive com null) e from_list_id.
+
+A invalidação entre processos usa um contador de versão (em memória por
+padrão, ou Redis quando REDIS_HOST está configurado), como a tabela de
+pontos por ação: criar, alterar ou remover uma automação incrementa a versão
+e cada processo recompila o índice na próxima leitura.
+"""
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.backends import version_backend
+
+
+# Condição ausente: casa com qualquer valor. Não é None, porque uma condição
+# explícita null (ex.: {"assigned_to_id": null}) casa só com cards sem valor
+_ANY = object()
+
+TriggerKey = Tuple[int, str, Any, Any]
+
+
+class CompiledTrigger:
+    """
+    Automação compilada: só o que é preciso para decidir se ela dispara.
+    """
+
+    __slots__ = ("automation_id", "priority", "has_from_list", "from_list_id")
+
+    def __init__(self, automation_id: int, priority: int, conditions: Dict[str, Any]):
+        self.automation_id = automation_id
+        self.priority = priority
+        self.has_from_list = "from_list_id" in conditions
+        self.from_list_id = conditions.get("from_list_id")
+
+    def matches(self, trigger_data: Optional[Dict[str, Any]]) -> bool:
+        # from_list_id só é verificado quando o evento traz dados
+        if self.has_from_list and trigger_data:
+            return trigger_data.get("from_list_id") == self.from_list_id
+        return True
+
+
+def compile_triggers(automations: Iterable) -> Dict[TriggerKey, List[CompiledTrigger]]:
+    """
+    Compila as automações de trigger ativas no índice.
+
+    Args:
+        automations: Linhas (id, board_id, trigger_event, trigger_conditions, priority)
+
+    Returns:
+        Dicionário (board_id, evento, to_list_id, assigned_to_id) -> automações,
+        com _ANY nas condições ausentes
+    """
+    index: Dict[TriggerKey, List[CompiledTrigger]] = {}
+    for automation in automations:
+        conditions = automation.trigger_conditions or {}
+        key = (
+            automation.board_id,
+            automation.trigger_event,
+            conditions.get("to_list_id", _ANY),
+            conditions.get("assigned_to_id", _ANY)
+        )
+        try:
+            hash(key)
+        except TypeError:
+            # Condição com lista/objeto nunca é igual a um ID: a automação não dispara
+            continue
+        index.setdefault(key, []).append(
+            CompiledTrigger(automation.id, automation.priority, conditions)
+        )
+    return index
+
+
+class AutomationTriggerIndex:
+    """
+    Automações de trigger ativas indexadas para o caminho quente dos eventos de card.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._index: Optional[Dict[TriggerKey, List[CompiledTrigger]]] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _current_version(self) -> Optional[int]:
+        try:
+            return self.backend.get_version()
+        except Exception as e:
+            logger.warning(f"[AUTOMATION] Erro ao ler versão do índice de triggers: {e}")
+            return None
+
+    def _get_index(self, loader: Callable[[], Iterable]) -> Dict[TriggerKey, List[CompiledTrigger]]:
+        version = self._current_version()
+
+        with self._lock:
+            # Sem versão legível (backend fora do ar), mantém o índice compilado
+            stale = self._index is None or (version is not None and version != self._version)
+            if stale:
+                self._index = compile_triggers(loader())
+                self._version = version
+            return self._index
+
+    def match(
+        self,
+        board_id: int,
+        trigger_event: str,
+        list_id: Optional[int],
+        assigned_to_id: Optional[int],
+        trigger_data: Optional[Dict[str, Any]],
+        loader: Callable[[], Iterable]
+    ) -> List[int]:
+        """
+        Retorna as automações que disparam para um evento de card.
+
+        Args:
+            board_id: ID do board
+            trigger_event: Tipo de evento
+            list_id: Lista atual do card
+            assigned_to_id: Responsável atual do card
+            trigger_data: Dados do evento (from_list_id, ...)
+            loader: Função que lê as automações ativas do banco (usada só ao recompilar)
+
+        Returns:
+            IDs das automações, da maior para a menor prioridade
+        """
+        index = self._get_index(loader)
+
+        matched: List[CompiledTrigger] = []
+        for to_list in (list_id, _ANY):
+            for assignee in (assigned_to_id, _ANY):
+                for trigger in index.get((board_id, trigger_event, to_list, assignee), ()):
+                    if trigger.matches(trigger_data):
+                        matched.append(trigger)
+
+        matched.sort(key=lambda trigger: (-trigger.priority, trigger.automation_id))
+        return [trigger.automation_id for trigger in matched]
+
+    def invalidate(self) -> None:
+        """
+        Marca as automações como alteradas em todos os processos.
+        """
+        with self._lock:
+            self._index = None
+        try:
+            self.backend.bump_version()
+        except Exception as e:
+            logger.warning(f"[AUTOMATION] Erro ao invalidar índice de triggers: {e}")
+
+    def clear(self) -> None:
+        """
+        Descarta o índice compilado e zera a versão.
+        """
+        with self._lock:
+            self._index = None
+            self._version = None
+        self.backend.clear()
+
+
+# Instância global do índice de triggers
+automation_trigger_index = AutomationTriggerIndex(version_backend("AUTOMATION", "automation_triggers:version"))
@@ -0,0 +1,140 @@
+"""
+Seleção de backends compartilhados entre processos.
+Os componentes em tempo real e de cache (relatórios, leaderboard, eventos,
+locks dos jobs, pontos por ação, índice de triggers) usam Redis quando
+REDIS_HOST está configurado, ou um backend em memória do processo.
+
+O cliente Redis é único por processo: todos os backends usam o mesmo pool
+de conexões.
+"""
+import threading
+from typing import Any, Callable, TypeVar
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+T = TypeVar("T")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis_client():
+    """
+    Retorna o cliente Redis do processo, criado na primeira chamada.
+
+    Returns:
+        redis.Redis, ou None se REDIS_HOST não está configurado ou o pacote
+        redis não está instalado
+    """
+    global _client
+
+    if not settings.REDIS_HOST:
+        return None
+
+    with _client_lock:
+        if _client is None:
+            try:
+                import redis
+            except ImportError:
+                return None
+
+            _client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD or None,
+                decode_responses=True,
+                socket_timeout=1,
+                socket_connect_timeout=1
+            )
+        return _client
+
+
+def select_backend(
+    label: str,
+    redis_backend: Callable[[Any], T],
+    memory_backend: Callable[[], T]
+) -> T:
+    """
+    Escolhe o backend: Redis quando REDIS_HOST está configurado, senão memória.
+
+    Args:
+        label: Prefixo dos logs do componente (ex.: "CACHE")
+        redis_backend: Cria o backend Redis a partir do cliente compartilhado
+        memory_backend: Cria o backend em memória
+
+    Returns:
+        Backend escolhido
+    """
+    if settings.REDIS_HOST:
+        client = get_redis_client()
+        if client is not None:
+            return redis_backend(client)
+        logger.warning(f"[{label}] Pacote redis indisponível, usando backend em memória")
+    return memory_backend()
+
+
+class MemoryVersionBackend:
+    """
+    Contador de versão em memória do processo.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get_version(self) -> int:
+        with self._lock:
+            return self._version
+
+    def bump_version(self) -> None:
+        with self._lock:
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = 0
+
+
+class RedisVersionBackend:
+    """
+    Contador de versão compartilhado entre processos, usando Redis.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, key: str):
+        self._client = client
+        self.key = key
+
+    def get_version(self) -> int:
+        return int(self._client.get(self.key) or 0)
+
+    def bump_version(self) -> None:
+        self._client.incr(self.key)
+
+    def clear(self) -> None:
+        self._client.delete(self.key)
+
+
+def version_backend(label: str, key: str):
+    """
+    Contador de versão para invalidação entre processos.
+
+    Args:
+        label: Prefixo dos logs do componente
+        key: Chave do contador no Redis
+
+    Returns:
+        RedisVersionBackend ou MemoryVersionBackend
+    """
+    return select_backend(
+        label,
+        lambda client: RedisVersionBackend(client, key),
+        MemoryVersionBackend
+    )
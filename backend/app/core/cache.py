@@ -0,0 +1,260 @@
+"""
+Cache de respostas de relatórios.
+Backend em memória (cachetools) por padrão, ou Redis quando REDIS_HOST está configurado.
+
+A invalidação usa contadores de versão: cada chave inclui a versão do seu
+escopo (global ou board), então invalidar é só incrementar um contador,
+sem precisar varrer chaves.
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, TypeVar
+
+from cachetools import TTLCache
+from loguru import logger
+from pydantic import BaseModel
+
+from app.core.backends import select_backend
+from app.core.config import settings
+
+
+T = TypeVar("T", bound=BaseModel)
+
+# Versões usadas na composição das chaves
+EPOCH_SCOPE = "epoch"  # Invalida tudo
+GLOBAL_SCOPE = "global"  # Relatórios que abrangem todos os boards
+
+
+class MemoryCacheBackend:
+    """
+    Backend em memória do processo (LRU com TTL via cachetools).
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def get_versions(self, scopes: List[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.get(scope, 0) for scope in scopes]
+
+    def bump_versions(self, scopes: Iterable[str]) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._versions.clear()
+
+
+class RedisCacheBackend:
+    """
+    Backend compartilhado entre processos, usando Redis.
+    """
+
+    name = "redis"
+    prefix = "reports:"
+
+    def __init__(self, client, ttl: int):
+        self._client = client
+        self._ttl = ttl
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: str) -> None:
+        self._client.set(self.prefix + key, value, ex=self._ttl)
+
+    def get_versions(self, scopes: List[str]) -> List[int]:
+        values = self._client.mget([f"{self.prefix}version:{scope}" for scope in scopes])
+        return [int(value or 0) for value in values]
+
+    def bump_versions(self, scopes: Iterable[str]) -> None:
+        pipeline = self._client.pipeline()
+        for scope in scopes:
+            pipeline.incr(f"{self.prefix}version:{scope}")
+        pipeline.execute()
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class ReportCache:
+    """
+    Cache de respostas de relatórios com TTL e invalidação por board.
+    Falhas do backend nunca quebram o relatório: o valor é recalculado.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @staticmethod
+    def _board_scope(board_id: int) -> str:
+        return f"board:{board_id}"
+
+    def _make_key(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        board_id: Optional[int],
+        scope: Optional[str] = None
+    ) -> str:
+        """
+        Monta a chave normalizada: nome, versões do escopo e hash dos parâmetros.
+        """
+        scope = scope or (self._board_scope(board_id) if board_id else GLOBAL_SCOPE)
+        epoch, version = self.backend.get_versions([EPOCH_SCOPE, scope])
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{name}:{scope}:{epoch}.{version}:{digest}"
+
+    def get_or_compute(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        compute: Callable[[], T],
+        response_model: Type[T],
+        board_id: Optional[int] = None,
+        scope: Optional[str] = None
+    ) -> T:
+        """
+        Retorna a resposta em cache ou calcula e armazena.
+
+        Args:
+            name: Nome do relatório (dashboard, sales, ...)
+            params: Parâmetros normalizados da requisição
+            compute: Função que gera a resposta
+            response_model: Schema Pydantic da resposta
+            board_id: Board do relatório (None = todos os boards)
+            scope: Escopo próprio de invalidação (substitui o do board/global),
+                para relatórios que mudam por outros motivos que não os cards
+
+        Returns:
+            Resposta do relatório
+        """
+        key = None
+        try:
+            key = self._make_key(name, params, board_id, scope)
+            cached = self.backend.get(key)
+            if cached is not None:
+                self._count("hits")
+                return response_model.model_validate_json(cached)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"[CACHE] Erro ao ler cache de relatórios: {e}")
+
+        self._count("misses")
+        result = compute()
+
+        if key is not None:
+            try:
+                self.backend.set(key, result.model_dump_json())
+            except Exception as e:
+                self._count("errors")
+                logger.warning(f"[CACHE] Erro ao gravar cache de relatórios: {e}")
+
+        return result
+
+    def invalidate_boards(self, board_ids: Iterable[Optional[int]]) -> None:
+        """
+        Invalida relatórios dos boards informados e os relatórios globais.
+
+        Args:
+            board_ids: IDs dos boards alterados
+        """
+        scopes = {self._board_scope(board_id) for board_id in board_ids if board_id}
+        scopes.add(GLOBAL_SCOPE)
+        try:
+            self.backend.bump_versions(scopes)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"[CACHE] Erro ao invalidar cache de relatórios: {e}")
+
+    def invalidate_scope(self, scope: str) -> None:
+        """
+        Invalida apenas os relatórios gravados com o escopo informado.
+
+        Args:
+            scope: Escopo usado em get_or_compute
+        """
+        try:
+            self.backend.bump_versions([scope])
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"[CACHE] Erro ao invalidar cache de relatórios: {e}")
+
+    def invalidate_all(self) -> None:
+        """
+        Invalida todos os relatórios em cache.
+        """
+        try:
+            self.backend.bump_versions([EPOCH_SCOPE])
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"[CACHE] Erro ao invalidar cache de relatórios: {e}")
+
+    def clear(self) -> None:
+        """
+        Remove todas as entradas e zera os contadores.
+        """
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de acerto/erro do cache (do processo atual).
+
+        Returns:
+            Dict com backend, hits, misses, errors e hit_rate
+        """
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round((self.hits / total) * 100, 2) if total else 0.0
+        }
+
+
+def _create_backend():
+    """
+    Escolhe o backend: Redis quando REDIS_HOST está configurado, senão memória.
+    """
+    return select_backend(
+        "CACHE",
+        lambda client: RedisCacheBackend(client, ttl=settings.CACHE_TTL),
+        lambda: MemoryCacheBackend(maxsize=settings.CACHE_MAXSIZE, ttl=settings.CACHE_TTL)
+    )
+
+
+# Instância global do cache de relatórios
+report_cache = ReportCache(_create_backend())
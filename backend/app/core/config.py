@@ -40,7 +40,7 @@ class Settings(BaseSettings):
     SMTP_FROM: str = ""
     SMTP_FROM_NAME: str = "HSGrowth CRM"
 
-    # Cache (cachetools)
+    # Cache (cachetools em memória, ou Redis quando REDIS_HOST estiver definido)
     CACHE_TTL: int = 3600  # 1 hora
     CACHE_MAXSIZE: int = 1000
 
@@ -49,9 +49,10 @@ class Settings(BaseSettings):
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
 
     # Redis
-    REDIS_HOST: str = "localhost"
+    REDIS_HOST: str = ""  # Vazio = cache de relatórios e eventos em memória
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_PASSWORD: str = ""
 
     # Logs
     LOG_LEVEL: str = "DEBUG"
@@ -68,6 +69,28 @@ class Settings(BaseSettings):
     TRANSFER_APPROVAL_REQUIRED: bool = True
     TRANSFER_APPROVAL_EXPIRATION_HOURS: int = 72
     TRANSFER_MAX_BATCH_SIZE: int = 50
+    TRANSFER_ASYNC_CHUNK_SIZE: int = 500  # Cards por transação nos lotes assíncronos
+
+    # Reports
+    REPORT_SNAPSHOT_REFRESH_MINUTES: int = 5
+
+    # Ordenação de cards no kanban
+    CARD_POSITION_REBALANCE_MINUTES: int = 30  # Intervalo do job que redistribui posições apertadas
+
+    # Outbox de efeitos colaterais (pontos, notificações e automações após o commit)
+    OUTBOX_EXECUTOR: str = "thread"  # thread, celery ou none (apenas o job periódico)
+    OUTBOX_BATCH_SIZE: int = 100  # Eventos processados por lote
+    OUTBOX_POLL_SECONDS: int = 30  # Intervalo do job que recupera eventos pendentes
+    OUTBOX_PUBLISH_CHUNK_SIZE: int = 50  # Tasks do Celery publicadas por group
+    OUTBOX_PUBLISH_SLOW_SECONDS: float = 2.0  # Publicação mais lenta que isso interrompe o lote
+
+    # Scheduler (jobs periódicos)
+    SCHEDULER_MAX_WORKERS: int = 4  # Threads que executam os jobs (fora do event loop)
+    SCHEDULER_LOCK_TTL_SECONDS: int = 600  # Prazo da reserva de um job no cluster
+
+    # Eventos em tempo real (SSE)
+    EVENTS_HEARTBEAT_SECONDS: int = 15  # Intervalo do ping que mantém a conexão aberta
+    EVENTS_QUEUE_SIZE: int = 100  # Eventos pendentes por conexão (excedentes são descartados)
 
     # Frontend URL
     FRONTEND_URL: str = "http://localhost:5173"
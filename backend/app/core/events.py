@@ -0,0 +1,308 @@
+"""
+Canal de eventos em tempo real (push para o frontend via Server-Sent Events).
+Pub/sub em memória do processo por padrão, ou Redis quando REDIS_HOST está configurado.
+
+Com vários workers, cada processo publica no Redis e um listener por processo
+entrega os eventos às conexões abertas nele. Publicar nunca quebra a operação
+que gerou o evento: falhas do backend são apenas registradas no log.
+"""
+import asyncio
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from loguru import logger
+
+from app.core.backends import select_backend
+from app.core.config import settings
+
+
+def user_channel(user_id: int) -> str:
+    """Canal de eventos pessoais (notificações, transferências)."""
+    return f"user:{user_id}"
+
+
+def board_channel(board_id: int) -> str:
+    """Canal de eventos de um board (movimentação de cards)."""
+    return f"board:{board_id}"
+
+
+def encode_event(event_type: str, data: Dict[str, Any]) -> str:
+    """
+    Monta o frame SSE do evento.
+
+    O frame é montado uma única vez na publicação e repassado como está
+    para todas as conexões inscritas no canal.
+
+    Args:
+        event_type: Tipo do evento (campo "event" do SSE)
+        data: Payload do evento
+
+    Returns:
+        Frame SSE ("event: ...\\ndata: ...\\n\\n")
+    """
+    payload = json.dumps(data, separators=(",", ":"), default=str)
+    return f"event: {event_type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """
+    Fila de eventos de uma conexão SSE.
+    """
+
+    def __init__(self, channels: Iterable[str], loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.channels = set(channels)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._loop = loop
+
+    def push(self, message: str) -> None:
+        """
+        Enfileira um evento (pode ser chamado de qualquer thread).
+        """
+        self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: str) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Cliente lento: descarta em vez de acumular memória
+            self.dropped += 1
+
+    async def get(self, timeout: float) -> Optional[str]:
+        """
+        Aguarda o próximo evento.
+
+        Args:
+            timeout: Tempo máximo de espera em segundos
+
+        Returns:
+            Frame SSE ou None se o tempo acabou
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryPubSubBackend:
+    """
+    Backend em memória do processo (também usado como fake nos testes).
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._dispatch: Optional[Callable[[str, str], None]] = None
+
+    def attach(self, dispatch: Callable[[str, str], None]) -> None:
+        self._dispatch = dispatch
+
+    def publish(self, channel: str, message: str) -> None:
+        if self._dispatch:
+            self._dispatch(channel, message)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class RedisPubSubBackend:
+    """
+    Backend compartilhado entre processos, usando Redis pub/sub.
+    """
+
+    name = "redis"
+    prefix = "events:"
+
+    # Espera antes de reiniciar o listener após uma falha (dobra até o máximo)
+    RESTART_DELAY = 1
+    RESTART_MAX_DELAY = 30
+
+    def __init__(self, client):
+        self._client = client
+        self._dispatch: Optional[Callable[[str, str], None]] = None
+        self._pubsub = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.restarts = 0
+
+    def attach(self, dispatch: Callable[[str, str], None]) -> None:
+        self._dispatch = dispatch
+
+    def publish(self, channel: str, message: str) -> None:
+        self._client.publish(self.prefix + channel, message)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        if self._dispatch:
+            self._dispatch(message["channel"][len(self.prefix):], message["data"])
+
+    def _listen(self) -> None:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.psubscribe(**{f"{self.prefix}*": self._on_message})
+        except Exception:
+            pubsub.close()
+            raise
+
+        with self._lock:
+            if self._stopped.is_set():
+                pubsub.close()
+                return
+            self._pubsub = pubsub
+            self._thread = pubsub.run_in_thread(
+                sleep_time=1,
+                daemon=True,
+                exception_handler=self._on_listener_error
+            )
+
+    def _on_listener_error(self, error: BaseException, pubsub, thread) -> None:
+        """
+        Falha na thread do listener (conexão com o Redis perdida): encerra a
+        thread e reinicia o listener com espera crescente até conseguir.
+        """
+        thread.stop()
+        delay = self.RESTART_DELAY
+        logger.warning(f"[EVENTS] Listener do Redis caiu ({error}), reiniciando em {delay}s")
+
+        while not self._stopped.wait(delay):
+            try:
+                self._listen()
+                self.restarts += 1
+                logger.info("[EVENTS] Listener do Redis reiniciado")
+                return
+            except Exception as e:
+                delay = min(delay * 2, self.RESTART_MAX_DELAY)
+                logger.warning(f"[EVENTS] Erro ao reiniciar listener do Redis ({e}), nova tentativa em {delay}s")
+
+    def start(self) -> None:
+        """
+        Inicia o listener do processo (thread em background).
+        """
+        self._stopped.clear()
+        self._listen()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._lock:
+            if self._thread:
+                self._thread.stop()
+                self._thread = None
+            if self._pubsub:
+                self._pubsub.close()
+                self._pubsub = None
+
+
+class EventBroker:
+    """
+    Distribui eventos às conexões SSE abertas no processo.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.published = 0
+        self.errors = 0
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        backend.attach(self.dispatch)
+
+    def subscribe(self, channels: Iterable[str], maxsize: Optional[int] = None) -> Subscription:
+        """
+        Inscreve uma conexão nos canais (chamar de dentro do event loop).
+
+        Args:
+            channels: Canais (user:{id}, board:{id})
+            maxsize: Tamanho máximo da fila da conexão
+
+        Returns:
+            Subscription da conexão
+        """
+        subscription = Subscription(
+            channels,
+            asyncio.get_running_loop(),
+            maxsize or settings.EVENTS_QUEUE_SIZE
+        )
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a inscrição de uma conexão encerrada.
+        """
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def publish(self, channel: str, event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Publica um evento em um canal.
+
+        Args:
+            channel: Canal de destino
+            event_type: Tipo do evento
+            data: Payload do evento
+        """
+        try:
+            self.backend.publish(channel, encode_event(event_type, data))
+            self.published += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[EVENTS] Erro ao publicar evento {event_type} em {channel}: {e}")
+
+    def dispatch(self, channel: str, message: str) -> None:
+        """
+        Entrega um evento às conexões locais inscritas no canal.
+        """
+        with self._lock:
+            subscribers: List[Subscription] = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            subscription.push(message)
+
+    def start(self) -> None:
+        """
+        Inicia o backend (listener do Redis, quando configurado).
+        """
+        try:
+            self.backend.start()
+        except Exception as e:
+            logger.warning(f"[EVENTS] Erro ao iniciar listener de eventos: {e}")
+
+    def stop(self) -> None:
+        """
+        Encerra o backend.
+        """
+        self.backend.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores do broker (do processo atual).
+        """
+        with self._lock:
+            connections = len({sub for subs in self._subscriptions.values() for sub in subs})
+        return {
+            "backend": self.backend.name,
+            "connections": connections,
+            "published": self.published,
+            "errors": self.errors,
+            "listener_restarts": getattr(self.backend, "restarts", 0)
+        }
+
+
+def _create_backend():
+    """
+    Escolhe o backend: Redis quando REDIS_HOST está configurado, senão memória.
+    """
+    return select_backend("EVENTS", RedisPubSubBackend, MemoryPubSubBackend)
+
+
+# Instância global do broker de eventos
+event_broker = EventBroker(_create_backend())
@@ -0,0 +1,153 @@
+"""
+Locks distribuídos dos jobs agendados.
+Cada processo da API tem o seu scheduler; antes de executar, o job reserva
+uma chave com prazo (lease). Só quem conseguiu a reserva executa, então o
+job roda uma única vez no cluster.
+
+Usa Redis (SET NX PX) quando REDIS_HOST está configurado, ou um lock em
+memória do processo (útil para desenvolvimento e testes, com um único
+processo).
+"""
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.core.backends import select_backend
+
+
+class MemoryLockBackend:
+    """
+    Locks com prazo em memória do processo.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, token: str, ttl_ms: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            current = self._locks.get(key)
+            if current and current[1] > now:
+                return False
+            self._locks[key] = (token, now + ttl_ms / 1000)
+            return True
+
+    def release(self, key: str, token: str, keep_ms: int = 0) -> None:
+        with self._lock:
+            current = self._locks.get(key)
+            if not current or current[0] != token:
+                return
+            if keep_ms > 0:
+                self._locks[key] = (token, time.monotonic() + keep_ms / 1000)
+            else:
+                del self._locks[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._locks.clear()
+
+
+class RedisLockBackend:
+    """
+    Locks com prazo compartilhados entre processos, usando Redis.
+    """
+
+    name = "redis"
+
+    # Só o dono da reserva altera a chave: encurta o prazo ou remove
+    RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) ~= ARGV[1] then
+        return 0
+    end
+    if tonumber(ARGV[2]) > 0 then
+        return redis.call('pexpire', KEYS[1], ARGV[2])
+    end
+    return redis.call('del', KEYS[1])
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._release = self._client.register_script(self.RELEASE_SCRIPT)
+
+    def acquire(self, key: str, token: str, ttl_ms: int) -> bool:
+        return bool(self._client.set(key, token, nx=True, px=ttl_ms))
+
+    def release(self, key: str, token: str, keep_ms: int = 0) -> None:
+        self._release(keys=[key], args=[token, keep_ms])
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter("scheduler:job:*"):
+            self._client.delete(key)
+
+
+class JobLocks:
+    """
+    Reserva de execução dos jobs agendados.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def key(job_id: str) -> str:
+        return f"scheduler:job:{job_id}"
+
+    def acquire(self, job_id: str, lease_seconds: float) -> Optional[str]:
+        """
+        Tenta reservar a execução de um job.
+
+        Args:
+            job_id: ID do job
+            lease_seconds: Prazo da reserva (se o processo morrer, a chave expira)
+
+        Returns:
+            Token da reserva, ou None se outro processo já tem a reserva.
+            Falhas do backend também retornam None: na dúvida o job não roda,
+            para não executar em duplicidade.
+        """
+        token = uuid.uuid4().hex
+        try:
+            if self.backend.acquire(self.key(job_id), token, int(lease_seconds * 1000)):
+                return token
+        except Exception as e:
+            logger.warning(f"[SCHEDULER] Erro ao reservar o job {job_id}: {e}")
+        return None
+
+    def release(self, job_id: str, token: str, keep_seconds: float = 0) -> None:
+        """
+        Libera a reserva de um job.
+
+        Args:
+            job_id: ID do job
+            token: Token retornado por acquire
+            keep_seconds: Mantém a chave por mais esse tempo, para que os
+                schedulers dos outros processos, disparados no mesmo horário,
+                não executem o job de novo
+        """
+        try:
+            self.backend.release(self.key(job_id), token, int(keep_seconds * 1000))
+        except Exception as e:
+            logger.warning(f"[SCHEDULER] Erro ao liberar o job {job_id}: {e}")
+
+    def clear(self) -> None:
+        """
+        Remove todas as reservas.
+        """
+        self.backend.clear()
+
+
+def _create_backend():
+    """
+    Escolhe o backend: Redis quando REDIS_HOST está configurado, senão memória.
+    """
+    return select_backend("SCHEDULER", RedisLockBackend, MemoryLockBackend)
+
+
+# Instância global dos locks dos jobs
+job_locks = JobLocks(_create_backend())
@@ -0,0 +1,249 @@
+"""
+Leaderboard de gamificação em tempo real.
+Um conjunto ordenado (usuário → pontos) por período atual, atualizado a cada
+ponto atribuído. Em memória do processo por padrão, ou Redis (ZSET) quando
+REDIS_HOST está configurado.
+
+A posição segue a regra do ranking salvo (RANK()): empates dividem a
+posição e usuários sem pontos positivos ficam fora. Falhas do backend nunca
+quebram a atribuição de pontos: são apenas registradas no log e corrigidas
+na próxima reconstrução a partir de gamification_points.
+"""
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.backends import select_backend
+from app.utils.periods import PERIOD_TYPES, get_period_dates
+
+
+class _SortedScores:
+    """
+    Conjunto ordenado de um período: pontos por usuário e a lista ordenada
+    dos pontos, para contar quantos usuários estão à frente com busca binária.
+    """
+
+    def __init__(self, scores: Optional[Dict[int, int]] = None):
+        self.scores: Dict[int, int] = dict(scores or {})
+        self.sorted: List[int] = sorted(self.scores.values())
+
+    def incr(self, member: int, amount: int) -> int:
+        old = self.scores.get(member)
+        if old is not None:
+            del self.sorted[bisect_left(self.sorted, old)]
+        new = (old or 0) + amount
+        self.scores[member] = new
+        insort(self.sorted, new)
+        return new
+
+    def count_above(self, score: int) -> int:
+        return len(self.sorted) - bisect_right(self.sorted, score)
+
+
+class MemoryLeaderboardBackend:
+    """
+    Backend em memória do processo (cada worker mantém o seu).
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._boards: Dict[str, _SortedScores] = {}
+        self._expires: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self) -> None:
+        now = datetime.utcnow()
+        for key in [key for key, expires_at in self._expires.items() if expires_at <= now]:
+            self._boards.pop(key, None)
+            self._expires.pop(key, None)
+
+    def incr(self, key: str, member: int, amount: int, expires_at: datetime) -> None:
+        with self._lock:
+            self._purge()
+            self._boards.setdefault(key, _SortedScores()).incr(member, amount)
+            self._expires[key] = expires_at
+
+    def score(self, key: str, member: int) -> Optional[int]:
+        with self._lock:
+            board = self._boards.get(key)
+            return board.scores.get(member) if board else None
+
+    def count_above(self, key: str, score: int) -> int:
+        with self._lock:
+            board = self._boards.get(key)
+            return board.count_above(score) if board else 0
+
+    def top(self, key: str, limit: int) -> List[Tuple[int, int]]:
+        with self._lock:
+            board = self._boards.get(key)
+            if not board:
+                return []
+            return heapq.nlargest(limit, board.scores.items(), key=lambda item: item[1])
+
+    def replace(self, key: str, scores: Dict[int, int], expires_at: datetime) -> None:
+        with self._lock:
+            self._purge()
+            self._boards[key] = _SortedScores(scores)
+            self._expires[key] = expires_at
+
+    def clear(self) -> None:
+        with self._lock:
+            self._boards.clear()
+            self._expires.clear()
+
+
+class RedisLeaderboardBackend:
+    """
+    Backend compartilhado entre processos, usando sorted sets do Redis.
+    """
+
+    name = "redis"
+    prefix = "leaderboard:"
+
+    def __init__(self, client):
+        self._client = client
+
+    def incr(self, key: str, member: int, amount: int, expires_at: datetime) -> None:
+        pipeline = self._client.pipeline()
+        pipeline.zincrby(self.prefix + key, amount, member)
+        pipeline.expireat(self.prefix + key, expires_at)
+        pipeline.execute()
+
+    def score(self, key: str, member: int) -> Optional[int]:
+        score = self._client.zscore(self.prefix + key, member)
+        return int(score) if score is not None else None
+
+    def count_above(self, key: str, score: int) -> int:
+        return self._client.zcount(self.prefix + key, f"({score}", "+inf")
+
+    def top(self, key: str, limit: int) -> List[Tuple[int, int]]:
+        members = self._client.zrevrange(self.prefix + key, 0, limit - 1, withscores=True)
+        return [(int(member), int(score)) for member, score in members]
+
+    def replace(self, key: str, scores: Dict[int, int], expires_at: datetime) -> None:
+        # MULTI/EXEC: leitores veem o conjunto antigo ou o novo
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.delete(self.prefix + key)
+        if scores:
+            pipeline.zadd(self.prefix + key, {str(member): score for member, score in scores.items()})
+            pipeline.expireat(self.prefix + key, expires_at)
+        pipeline.execute()
+
+    def clear(self) -> None:
+        keys = list(self._client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self._client.delete(*keys)
+
+
+class Leaderboard:
+    """
+    Leaderboard por tipo de período (weekly, monthly, quarterly, annual).
+    """
+
+    # Tempo que o conjunto de um período encerrado continua disponível
+    RETENTION = timedelta(days=1)
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def _key(period_type: str, period_start: datetime) -> str:
+        return f"{period_type}:{period_start:%Y%m%d}"
+
+    def _current(self, period_type: str, now: Optional[datetime] = None) -> Tuple[str, datetime]:
+        start, end = get_period_dates(period_type, now)
+        return self._key(period_type, start), end + self.RETENTION
+
+    def add_points(self, user_id: int, points: int, now: Optional[datetime] = None) -> None:
+        """
+        Soma pontos do usuário nos conjuntos de todos os períodos atuais.
+
+        Args:
+            user_id: ID do usuário
+            points: Pontos atribuídos (pode ser negativo)
+            now: Instante da atribuição (padrão: agora, UTC)
+        """
+        try:
+            for period_type in PERIOD_TYPES:
+                key, expires_at = self._current(period_type, now)
+                self.backend.incr(key, user_id, points, expires_at)
+        except Exception as e:
+            logger.warning(f"[LEADERBOARD] Erro ao atualizar leaderboard: {e}")
+
+    def get_rank(self, user_id: int, period_type: str) -> Optional[int]:
+        """
+        Retorna a posição do usuário no período atual (1 = primeiro).
+
+        Args:
+            user_id: ID do usuário
+            period_type: Tipo de período
+
+        Returns:
+            Posição ou None se o usuário não tem pontos positivos no período
+        """
+        key, _ = self._current(period_type)
+        try:
+            score = self.backend.score(key, user_id)
+            if score is None or score <= 0:
+                return None
+            return self.backend.count_above(key, score) + 1
+        except Exception as e:
+            logger.warning(f"[LEADERBOARD] Erro ao ler leaderboard: {e}")
+            return None
+
+    def top(self, period_type: str, limit: int = 10) -> List[Tuple[int, int]]:
+        """
+        Retorna os primeiros colocados do período atual.
+
+        Args:
+            period_type: Tipo de período
+            limit: Quantidade de posições
+
+        Returns:
+            Lista de (user_id, pontos) em ordem decrescente de pontos
+        """
+        key, _ = self._current(period_type)
+        try:
+            return [(member, score) for member, score in self.backend.top(key, limit) if score > 0]
+        except Exception as e:
+            logger.warning(f"[LEADERBOARD] Erro ao ler leaderboard: {e}")
+            return []
+
+    def replace_period(
+        self,
+        period_type: str,
+        scores: Dict[int, int],
+        now: Optional[datetime] = None
+    ) -> None:
+        """
+        Substitui o conjunto do período atual (reconstrução a partir do histórico).
+
+        Args:
+            period_type: Tipo de período
+            scores: Pontos do período por usuário
+            now: Instante de referência (padrão: agora, UTC)
+        """
+        key, expires_at = self._current(period_type, now)
+        self.backend.replace(key, scores, expires_at)
+
+    def clear(self) -> None:
+        """
+        Remove todos os conjuntos.
+        """
+        self.backend.clear()
+
+
+def _create_backend():
+    """
+    Escolhe o backend: Redis quando REDIS_HOST está configurado, senão memória.
+    """
+    return select_backend("LEADERBOARD", RedisLeaderboardBackend, MemoryLeaderboardBackend)
+
+
+# Instância global do leaderboard
+leaderboard = Leaderboard(_create_backend())
@@ -0,0 +1,109 @@
+"""
+Disparo do processamento do outbox de eventos.
+Depois do commit, a operação apenas avisa o dispatcher; os efeitos
+colaterais rodam fora da requisição, conforme OUTBOX_EXECUTOR:
+
+- thread: executor em segundo plano no próprio processo (padrão)
+- celery: task process_outbox_task no worker do Celery
+- none: apenas o job periódico do scheduler
+
+O job periódico também recupera eventos que ficaram para trás (falhas,
+reservas expiradas ou processos reiniciados), então a entrega não depende
+do aviso.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+def publish_task_batch(messages: List[Tuple[str, Dict[str, Any], str]]) -> None:
+    """
+    Publica um lote de tasks do Celery de uma vez (group).
+
+    Retorna somente depois que o broker aceitou todas as mensagens; qualquer
+    falha de publicação é propagada para o chamador.
+
+    Args:
+        messages: Lista de (nome da task, kwargs, task_id)
+    """
+    from celery import group
+    from app.workers.celery_app import celery_app
+
+    group(
+        celery_app.signature(task_name, kwargs=kwargs, task_id=task_id)
+        for task_name, kwargs, task_id in messages
+    ).apply_async(
+        # Poucas tentativas curtas: broker fora do ar devolve o lote para o outbox
+        retry=True,
+        retry_policy={"max_retries": 2, "interval_start": 0, "interval_step": 0.5}
+    )
+
+
+def process_outbox_events(limit: Optional[int] = None) -> dict:
+    """
+    Processa um lote de eventos do outbox em uma sessão própria.
+
+    Args:
+        limit: Tamanho do lote (padrão: OUTBOX_BATCH_SIZE)
+
+    Returns:
+        Estatísticas do processamento
+    """
+    # Imports lazy: este módulo é usado pelos services
+    from app.db.session import SessionLocal
+    from app.services.outbox_service import OutboxService
+
+    db = SessionLocal()
+    try:
+        return OutboxService(db).process_pending(limit or settings.OUTBOX_BATCH_SIZE)
+    finally:
+        db.close()
+
+
+class OutboxDispatcher:
+    """
+    Agenda o processamento do outbox após o commit de uma operação.
+    """
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queued = False
+        self._lock = threading.Lock()
+
+    def _run(self) -> None:
+        with self._lock:
+            self._queued = False
+        try:
+            process_outbox_events()
+        except Exception as e:
+            logger.error(f"[OUTBOX] Erro ao processar eventos: {e}")
+
+    def wake(self) -> None:
+        """
+        Avisa que há eventos novos. Falhas apenas adiam o processamento
+        para o job periódico.
+        """
+        try:
+            if self.mode == "celery":
+                from app.workers.tasks import process_outbox_task
+                process_outbox_task.delay()
+            elif self.mode == "thread":
+                with self._lock:
+                    # Um processamento já na fila também pega os eventos novos
+                    if self._queued:
+                        return
+                    self._queued = True
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+                self._executor.submit(self._run)
+        except Exception as e:
+            logger.warning(f"[OUTBOX] Erro ao agendar processamento: {e}")
+
+
+# Instância global do dispatcher
+outbox_dispatcher = OutboxDispatcher(settings.OUTBOX_EXECUTOR)
@@ -1,9 +1,10 @@
 """
 Configuração da sessão do banco de dados SQLAlchemy
 """
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Callable, Generator, Iterator
 
 from app.core.config import settings
 
@@ -41,3 +42,70 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+# Chave em Session.info com os efeitos adiados de um bloco single_transaction
+_AFTER_COMMIT = "after_commit"
+
+
+@contextmanager
+def single_transaction(db: Session) -> Iterator[None]:
+    """
+    Executa um bloco em uma única transação.
+
+    Dentro do bloco, commit(db) de repositories e services só faz flush e os
+    efeitos registrados com after_commit esperam: o bloco faz um único commit
+    no final. Se o bloco falhar, nada foi gravado e quem chamou faz o
+    rollback. Um bloco aninhado participa da transação do bloco externo.
+
+    Uso:
+    ```python
+    with single_transaction(db):
+        GamificationService(db).award_points(...)
+    ```
+    """
+    if _AFTER_COMMIT in db.info:
+        yield
+        return
+
+    callbacks = []
+    db.info[_AFTER_COMMIT] = callbacks
+    try:
+        yield
+    finally:
+        del db.info[_AFTER_COMMIT]
+
+    db.commit()
+    for callback in callbacks:
+        callback()
+
+
+def commit(db: Session) -> None:
+    """
+    Commit de repositories e services que podem rodar dentro de um bloco
+    single_transaction (ex.: etapas do outbox): lá, só faz flush.
+
+    Args:
+        db: Sessão
+    """
+    if _AFTER_COMMIT in db.info:
+        db.flush()
+    else:
+        db.commit()
+
+
+def after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """
+    Executa um efeito fora do banco (leaderboard, tempo real) depois do commit.
+
+    Fora de um bloco single_transaction, o commit já aconteceu e o efeito
+    roda na hora.
+
+    Args:
+        db: Sessão que gravou os dados
+        callback: Efeito a executar
+    """
+    if _AFTER_COMMIT in db.info:
+        db.info[_AFTER_COMMIT].append(callback)
+    else:
+        callback()
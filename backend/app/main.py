@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 from app.core.config import settings
+from app.core.events import event_broker
 from app.core.logging import configure_logging
 from app.middleware.error_handler import catch_exceptions_middleware
 from app.workers.scheduler import start_scheduler, stop_scheduler
@@ -34,6 +35,10 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Scheduler desabilitado durante testes")
 
+    # Inicializar canal de eventos em tempo real (listener do Redis, se configurado)
+    event_broker.start()
+    logger.info(f"Canal de eventos: {event_broker.backend.name}")
+
     # TODO: Verificar conexão com banco de dados
 
     yield
@@ -46,6 +51,9 @@ async def lifespan(app: FastAPI):
         await stop_scheduler()
         logger.success("Scheduler finalizado")
 
+    # Finalizar canal de eventos
+    event_broker.stop()
+
     # TODO: Fechar conexões
 
 
@@ -95,6 +103,10 @@ tags_metadata = [
         "name": "Notifications",
         "description": "Notificações in-app. Sistema de avisos e alertas para usuários.",
     },
+    {
+        "name": "Events",
+        "description": "Canal de eventos em tempo real (Server-Sent Events): notificações e alterações de boards.",
+    },
     {
         "name": "Admin",
         "description": "Endpoints administrativos. Gestão avançada do sistema (requer role admin).",
@@ -13,6 +13,7 @@ from app.models.person import Person
 from app.models.lead import Lead
 from app.models.integration_client import IntegrationClient
 from app.models.board import Board
+from app.models.board_tombstone import BoardTombstone
 from app.models.list import List
 from app.models.field_definition import FieldDefinition
 from app.models.card import Card
@@ -30,6 +31,7 @@ from app.models.card_product import CardProduct
 
 # Modelos de gamificação
 from app.models.gamification_point import GamificationPoint
+from app.models.gamification_point_balance import GamificationPointBalance
 from app.models.gamification_badge import GamificationBadge
 from app.models.user_badge import UserBadge
 from app.models.gamification_ranking import GamificationRanking
@@ -41,10 +43,18 @@ from app.models.automation_execution import AutomationExecution
 # Modelos de transferências
 from app.models.card_transfer import CardTransfer
 from app.models.transfer_approval import TransferApproval
+from app.models.transfer_batch import TransferBatch
 
 # Modelos de notificações
 from app.models.notification import Notification
 
+# Modelos de relatórios
+from app.models.pipeline_daily_snapshot import PipelineDailySnapshot
+from app.models.pipeline_dirty_day import PipelineDirtyDay
+
+# Outbox de eventos
+from app.models.outbox_event import OutboxEvent
+
 # Lista de todos os modelos (útil para imports)
 __all__ = [
     "Base",
@@ -55,6 +65,7 @@ __all__ = [
     "Lead",
     "IntegrationClient",
     "Board",
+    "BoardTombstone",
     "List",
     "FieldDefinition",
     "Card",
@@ -66,6 +77,7 @@ __all__ = [
     "Product",
     "CardProduct",
     "GamificationPoint",
+    "GamificationPointBalance",
     "GamificationBadge",
     "UserBadge",
     "GamificationRanking",
@@ -73,5 +85,9 @@ __all__ = [
     "AutomationExecution",
     "CardTransfer",
     "TransferApproval",
+    "TransferBatch",
     "Notification",
+    "PipelineDailySnapshot",
+    "PipelineDirtyDay",
+    "OutboxEvent",
 ]
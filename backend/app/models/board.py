@@ -2,7 +2,7 @@
 Modelo de Board (Quadro).
 Representa um quadro Kanban no sistema.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Text, JSON
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -30,6 +30,10 @@ class Board(Base, TimestampMixin, SoftDeleteMixin):
     # Exemplo: {"view_mode": "kanban", "columns_visible": [...], etc}
     settings = Column(JSON, default={}, nullable=False)
 
+    # Versão de alterações do board: incrementada a cada mudança em listas e cards.
+    # Começa em 1 para que since=0 sempre signifique "nunca sincronizou".
+    change_version = Column(BigInteger, default=1, nullable=False)
+
     # Relacionamentos
     lists = relationship("List", back_populates="board", lazy="dynamic", order_by="List.position", cascade="all, delete-orphan")
     field_definitions = relationship("FieldDefinition", back_populates="board", lazy="dynamic", cascade="all, delete-orphan")
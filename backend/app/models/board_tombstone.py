@@ -0,0 +1,37 @@
+"""
+Modelo de BoardTombstone (Registro de Exclusão).
+Guarda listas e cards removidos de um board para a sincronização incremental.
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Index
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class BoardTombstone(Base):
+    """
+    Representa a remoção de uma lista ou card de um board.
+
+    Como o registro removido não existe mais (ou foi para outro board), o
+    tombstone é o que permite ao cliente descobrir a exclusão ao pedir as
+    alterações desde uma versão.
+    """
+    __tablename__ = "board_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    entity_type = Column(String(20), nullable=False)  # "card" ou "list"
+    entity_id = Column(Integer, nullable=False)  # ID do card/lista removido (sem FK)
+    change_version = Column(BigInteger, nullable=False)  # Versão do board na remoção
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_board_tombstones_board_version", "board_id", "change_version"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<BoardTombstone(board_id={self.board_id}, {self.entity_type}={self.entity_id}, "
+            f"version={self.change_version})>"
+        )
@@ -2,8 +2,8 @@
 Modelo de Card (Cartão).
 Representa um cartão (lead, oportunidade, tarefa) no sistema.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Numeric, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Text, DateTime, Numeric, JSON, Index
+from sqlalchemy.orm import relationship, column_property
 
 from app.db.base import Base
 from app.models.mixins import TimestampMixin, SoftDeleteMixin
@@ -43,17 +43,30 @@ class Card(Base, TimestampMixin, SoftDeleteMixin):
 
     # Datas importantes
     due_date = Column(DateTime, nullable=True)  # Data de vencimento
-    closed_at = Column(DateTime, nullable=True)  # Data de fechamento (ganho ou perdido)
+    # Data de fechamento (ganho ou perdido). active_history guarda o valor anterior
+    # mesmo com o card expirado: o dia antigo é recalculado no consolidado (PipelineDirtyDay)
+    closed_at = column_property(Column(DateTime, nullable=True), active_history=True)
 
     # Status
     is_won = Column(Integer, default=0, nullable=False)  # 0=aberto, 1=ganho, -1=perdido
 
+    # Versão do board na última alteração do card (sincronização incremental)
+    change_version = Column(BigInteger, default=0, nullable=False)
+
     # Informações de contato (JSON)
     contact_info = Column(JSON, nullable=True)  # Dados de contato: nome, email, telefone, empresa, etc
 
     # Informações de pagamento (JSON)
     payment_info = Column(JSON, nullable=True)  # Condições de pagamento: forma, parcelas, observações
 
+    # Índice da sincronização incremental: cards alterados de uma lista após uma versão
+    __table_args__ = (
+        Index("ix_cards_list_id_change_version", "list_id", "change_version"),
+        Index("ix_cards_list_id_position", "list_id", "position"),
+        # Ranking de vendas: cards ganhos por período de fechamento
+        Index("ix_cards_is_won_closed_at", "is_won", "closed_at", "assigned_to_id"),
+    )
+
     # Relacionamentos
     list = relationship("List", back_populates="cards")
     client = relationship("Client", back_populates="cards")
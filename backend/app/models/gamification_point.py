@@ -2,7 +2,7 @@
 Modelo de GamificationPoint (Pontos de Gamificação).
 Registra pontos ganhos pelos usuários por ações no sistema.
 """
-from sqlalchemy import Column, Integer, ForeignKey, String, Text
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -35,6 +35,11 @@ class GamificationPoint(Base, TimestampMixin):
     related_entity_type = Column(String(50), nullable=True)  # Card, Transfer, Badge
     related_entity_id = Column(Integer, nullable=True)
 
+    # Índice para somar os pontos de um período (rankings)
+    __table_args__ = (
+        Index("ix_gamification_points_created_at_user_id", "created_at", "user_id"),
+    )
+
     # Relacionamentos
     user = relationship("User", back_populates="gamification_points")
 
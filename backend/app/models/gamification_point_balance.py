@@ -0,0 +1,46 @@
+"""
+Modelo de GamificationPointBalance (Saldo de Pontos).
+Mantém o total de pontos e os contadores do período atual de cada usuário,
+para que as leituras não precisem somar o histórico de pontos.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+from app.models.mixins import TimestampMixin
+
+
+class GamificationPointBalance(Base, TimestampMixin):
+    """
+    Representa o saldo de pontos de um usuário.
+
+    Atualizado na mesma transação em que o ponto é registrado. Cada contador
+    de período guarda o início do período a que se refere: quando o período
+    vira, o contador é reiniciado na próxima escrita e lido como zero até lá.
+    O job de reconciliação reconstrói os saldos a partir de gamification_points.
+    """
+    __tablename__ = "gamification_point_balances"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Relacionamento com User (um saldo por usuário)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
+
+    # Total acumulado (nunca reseta)
+    total_points = Column(Integer, default=0, nullable=False)
+
+    # Contadores por período
+    weekly_points = Column(Integer, default=0, nullable=False)
+    week_start = Column(DateTime, nullable=False)
+    monthly_points = Column(Integer, default=0, nullable=False)
+    month_start = Column(DateTime, nullable=False)
+    quarterly_points = Column(Integer, default=0, nullable=False)
+    quarter_start = Column(DateTime, nullable=False)
+    annual_points = Column(Integer, default=0, nullable=False)
+    year_start = Column(DateTime, nullable=False)
+
+    # Relacionamentos
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<GamificationPointBalance(user_id={self.user_id}, total_points={self.total_points})>"
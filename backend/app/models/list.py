@@ -2,7 +2,7 @@
 Modelo de List (Lista/Coluna).
 Representa uma lista (coluna) dentro de um quadro.
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -30,6 +30,14 @@ class List(Base, TimestampMixin):
     is_done_stage = Column(Boolean, default=False, nullable=False)  # Lista de "concluídos/ganhos"
     is_lost_stage = Column(Boolean, default=False, nullable=False)  # Lista de "perdidos"
 
+    # Versão do board na última alteração da lista (sincronização incremental)
+    change_version = Column(BigInteger, default=0, nullable=False)
+
+    # Índice da sincronização incremental: listas alteradas de um board após uma versão
+    __table_args__ = (
+        Index("ix_lists_board_id_change_version", "board_id", "change_version"),
+    )
+
     # Relacionamentos
     board = relationship("Board", back_populates="lists")
     cards = relationship("Card", back_populates="list", lazy="dynamic", order_by="Card.position", cascade="all, delete-orphan")
@@ -0,0 +1,62 @@
+"""
+Modelo de OutboxEvent (Outbox de efeitos colaterais).
+Eventos gravados na mesma transação da operação que os originou e
+processados depois, fora da requisição.
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Index
+
+from app.db.base import Base
+from app.models.mixins import TimestampMixin
+
+
+class OutboxEventType:
+    """Tipos de evento do outbox"""
+    CARD_MOVED = "card_moved"  # Efeitos de um card movido
+    CELERY_TASK = "celery_task"  # Publicação de uma task do Celery
+
+
+class OutboxEventStatus:
+    """Status possíveis de um evento do outbox"""
+    PENDING = "pending"  # Aguardando processamento (ou nova tentativa)
+    PROCESSING = "processing"  # Reservado por um worker até available_at
+    DONE = "done"  # Processado
+    FAILED = "failed"  # Excedeu o número de tentativas
+
+
+class OutboxEvent(Base, TimestampMixin):
+    """
+    Representa um evento pendente de processamento.
+
+    A entrega é pelo menos uma vez: um evento reservado por um worker que
+    morreu volta a ser processado quando a reserva expira. Cada etapa já
+    concluída fica em completed_steps (gravado no mesmo commit da etapa),
+    então uma nova tentativa não repete efeitos.
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Busca dos eventos prontos para processar
+        Index("ix_outbox_events_status_available_at", "status", "available_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Tipo do evento (define o handler) e dados para processá-lo
+    event_type = Column(String(50), nullable=False, index=True)
+    payload = Column(JSON, default={}, nullable=False)
+
+    # Chave de idempotência (um evento por operação)
+    idempotency_key = Column(String(100), nullable=False, unique=True, index=True)
+
+    # Controle de processamento
+    status = Column(String(20), default=OutboxEventStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    completed_steps = Column(JSON, default=list, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    # Próxima vez em que o evento pode ser processado (nova tentativa ou fim da reserva)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type='{self.event_type}', status='{self.status}')>"
@@ -0,0 +1,60 @@
+"""
+Modelo de PipelineDailySnapshot (Consolidado Diário do Pipeline).
+Guarda contagens e somas diárias de cards por board, lista e responsável,
+usadas pelos relatórios no lugar de varrer a tabela de cards.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, Numeric, Float, Index
+
+from app.db.base import Base
+
+
+class PipelineDailySnapshot(Base):
+    """
+    Representa o consolidado de um dia para uma combinação board/lista/responsável.
+
+    Cada card contribui em até dois dias:
+    - no dia de criação (created_*, e open_* enquanto estiver aberto)
+    - no dia de fechamento (won_* ou lost_*)
+
+    Os registros são recalculados por dia pelo job do scheduler,
+    por isso não há UniqueConstraint (o dia inteiro é apagado e reinserido).
+    """
+    __tablename__ = "pipeline_daily_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Chave do consolidado
+    snapshot_date = Column(Date, nullable=False, index=True)  # Dia de referência
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    list_id = Column(Integer, ForeignKey("lists.id", ondelete="CASCADE"), nullable=False, index=True)
+    assigned_to_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    # Cards criados no dia
+    created_count = Column(Integer, default=0, nullable=False)
+    created_value = Column(Numeric(14, 2), default=0, nullable=False)
+
+    # Cards ganhos no dia
+    won_count = Column(Integer, default=0, nullable=False)
+    won_value = Column(Numeric(14, 2), default=0, nullable=False)
+    won_cycle_days = Column(Float, default=0, nullable=False)  # Soma dos dias entre criação e ganho
+
+    # Cards perdidos no dia
+    lost_count = Column(Integer, default=0, nullable=False)
+    lost_value = Column(Numeric(14, 2), default=0, nullable=False)
+
+    # Cards criados no dia que continuam abertos
+    open_count = Column(Integer, default=0, nullable=False)
+    open_value = Column(Numeric(14, 2), default=0, nullable=False)
+
+    # Controle de atualização incremental
+    refreshed_at = Column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_pipeline_daily_snapshots_board_date", "board_id", "snapshot_date"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<PipelineDailySnapshot(date={self.snapshot_date}, list_id={self.list_id}, "
+            f"assigned_to_id={self.assigned_to_id})>"
+        )
@@ -0,0 +1,56 @@
+"""
+Modelo de PipelineDirtyDay (Dia Pendente do Consolidado).
+Dias do consolidado diário do pipeline que deixaram de valer por uma alteração
+que os cards atuais não mostram mais: fechamento sobrescrito ou desfeito,
+data de criação alterada ou card excluído.
+"""
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Column, Integer, Date, event, inspect
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.card import Card
+
+
+class PipelineDirtyDay(Base):
+    """
+    Representa um dia a recalcular na próxima atualização do consolidado.
+
+    Sem UniqueConstraint: o mesmo dia pode ser registrado por várias
+    transações; a atualização incremental lê e apaga todos os registros.
+    """
+    __tablename__ = "pipeline_dirty_days"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+
+    def __repr__(self):
+        return f"<PipelineDirtyDay(day={self.day})>"
+
+
+def _as_day(value) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else value
+
+
+@event.listens_for(Session, "before_flush")
+def record_dirty_days(session: Session, flush_context, instances) -> None:
+    """
+    Registra os dias antigos dos cards alterados e os dias dos cards excluídos.
+
+    Os dias atuais dos cards alterados já são encontrados pelo updated_at
+    (PipelineSnapshotRepository.find_touched_days).
+    """
+    days = set()
+    for obj in session.dirty:
+        if isinstance(obj, Card):
+            state = inspect(obj)
+            for attribute in ("created_at", "closed_at"):
+                days.update(_as_day(value) for value in state.attrs[attribute].history.deleted)
+    for obj in session.deleted:
+        if isinstance(obj, Card):
+            days.update((_as_day(obj.created_at), _as_day(obj.closed_at)))
+
+    days.discard(None)
+    session.add_all([PipelineDirtyDay(day=day) for day in sorted(days)])
@@ -0,0 +1,64 @@
+"""
+Modelo de TransferBatch (Lote de Transferências Assíncrono).
+Acompanha uma transferência em lote grande, processada em partes por uma
+task do Celery.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, JSON, DateTime
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+from app.models.mixins import TimestampMixin
+
+
+class TransferBatchStatus:
+    """Status possíveis de um lote assíncrono"""
+    QUEUED = "queued"  # Aguardando a task
+    RUNNING = "running"  # Em processamento
+    COMPLETED = "completed"  # Todos os cards processados
+    FAILED = "failed"  # Interrompido por erro (cards já processados permanecem)
+
+
+class TransferBatch(Base, TimestampMixin):
+    """
+    Representa um lote de transferências processado em segundo plano.
+
+    Cada parte do lote é gravada no mesmo commit do avanço de cursor e dos
+    contadores: uma task interrompida continua de onde parou, sem repetir
+    transferências.
+    """
+    __tablename__ = "transfer_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Mesmo batch_id gravado em card_transfers
+    batch_id = Column(String(50), unique=True, nullable=False, index=True)
+
+    # Quem pediu e para quem vão os cards
+    requested_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    to_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    reason = Column(String(100), nullable=False)
+    notes = Column(Text, nullable=True)
+
+    # Seleção dos cards: lista explícita ou filtro
+    card_ids = Column(JSON, nullable=True)  # [1, 2, 3, ...]
+    filters = Column(JSON, nullable=True)  # {"from_user_id": 5, "board_id": 2}
+
+    # Andamento
+    status = Column(String(20), default=TransferBatchStatus.QUEUED, nullable=False, index=True)
+    total_cards = Column(Integer, default=0, nullable=False)
+    processed_cards = Column(Integer, default=0, nullable=False)
+    successful_cards = Column(Integer, default=0, nullable=False)
+    failed_cards = Column(Integer, default=0, nullable=False)
+    # Posição em card_ids (lista explícita) ou último card_id processado (filtro)
+    cursor = Column(Integer, default=0, nullable=False)
+    errors = Column(JSON, default=list, nullable=False)  # [{"card_id": 1, "error": "..."}] (limitado)
+    last_error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relacionamentos
+    requested_by = relationship("User", foreign_keys=[requested_by_id])
+    to_user = relationship("User", foreign_keys=[to_user_id])
+
+    def __repr__(self):
+        return f"<TransferBatch(batch_id='{self.batch_id}', status='{self.status}')>"
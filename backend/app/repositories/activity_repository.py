@@ -35,6 +35,34 @@ class ActivityRepository:
         Returns:
             Activity criada
         """
+        activity = self.add(card_id, user_id, activity_type, description, activity_metadata)
+        self.db.commit()
+        self.db.refresh(activity)
+
+        return activity
+
+    def add(
+        self,
+        card_id: int,
+        user_id: int,
+        activity_type: str,
+        description: str,
+        activity_metadata: dict = None
+    ) -> Activity:
+        """
+        Adiciona um registro de atividade à sessão, sem commit: ele é gravado
+        no mesmo commit da operação que o originou.
+
+        Args:
+            card_id: ID do card relacionado
+            user_id: ID do usuário que executou a ação
+            activity_type: Tipo de atividade
+            description: Descrição legível da atividade
+            activity_metadata: Dados adicionais em JSON
+
+        Returns:
+            Activity (ainda não gravada)
+        """
         activity = Activity(
             card_id=card_id,
             user_id=user_id,
@@ -42,11 +70,7 @@ class ActivityRepository:
             description=description,
             activity_metadata=activity_metadata or {}
         )
-
         self.db.add(activity)
-        self.db.commit()
-        self.db.refresh(activity)
-
         return activity
 
     def get_by_card(self, card_id: int, limit: int = 50) -> List[Activity]:
@@ -5,8 +5,10 @@ Gerencia automações e suas execuções.
 from typing import Optional, List
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, Row
 
+from app.core.automation_triggers import automation_trigger_index
+from app.db.session import commit
 from app.models.automation import Automation
 from app.models.automation_execution import AutomationExecution
 from app.schemas.automation import AutomationCreate, AutomationUpdate, AutomationExecutionCreate
@@ -55,6 +57,7 @@ class AutomationRepository:
         self.db.add(automation)
         self.db.commit()
         self.db.refresh(automation)
+        automation_trigger_index.invalidate()
         return automation
 
     def find_by_id(self, automation_id: int) -> Optional[Automation]:
@@ -152,6 +155,7 @@ class AutomationRepository:
 
         self.db.commit()
         self.db.refresh(automation)
+        automation_trigger_index.invalidate()
         return automation
 
     def delete(self, automation: Automation) -> None:
@@ -163,6 +167,7 @@ class AutomationRepository:
         """
         self.db.delete(automation)
         self.db.commit()
+        automation_trigger_index.invalidate()
 
     def increment_execution_count(self, automation: Automation) -> None:
         """
@@ -173,7 +178,7 @@ class AutomationRepository:
         """
         automation.execution_count += 1
         automation.last_run_at = datetime.utcnow()
-        self.db.commit()
+        commit(self.db)
 
     def increment_failure_count(self, automation: Automation) -> None:
         """
@@ -185,10 +190,13 @@ class AutomationRepository:
         automation.failure_count += 1
 
         # Auto-desabilita se atingir limite
-        if automation.failure_count >= automation.auto_disable_on_failures:
+        disabled = automation.is_active and automation.failure_count >= automation.auto_disable_on_failures
+        if disabled:
             automation.is_active = False
 
-        self.db.commit()
+        commit(self.db)
+        if disabled:
+            automation_trigger_index.invalidate()
 
     def update_next_run(self, automation: Automation, next_run_at: datetime) -> None:
         """
@@ -199,7 +207,7 @@ class AutomationRepository:
             next_run_at: Data/hora da próxima execução
         """
         automation.next_run_at = next_run_at
-        self.db.commit()
+        commit(self.db)
 
     def find_scheduled_to_run(self, current_time: datetime) -> List[Automation]:
         """
@@ -219,29 +227,24 @@ class AutomationRepository:
             )
         ).all()
 
-    def find_by_trigger_event(
-        self,
-        board_id: int,
-        trigger_event: str
-    ) -> List[Automation]:
+    def list_active_triggers(self) -> List[Row]:
         """
-        Busca automações ativas por evento de trigger.
-
-        Args:
-            board_id: ID do board
-            trigger_event: Tipo de evento
+        Lista as automações de trigger ativas de todos os boards, só com as
+        colunas usadas pelo índice de triggers (sem montar objetos Automation).
 
         Returns:
-            Lista de automações ordenadas por prioridade
-        """
-        return self.db.query(Automation).filter(
-            and_(
-                Automation.board_id == board_id,
-                Automation.automation_type == "trigger",
-                Automation.trigger_event == trigger_event,
-                Automation.is_active == True
-            )
-        ).order_by(Automation.priority.desc()).all()
+            Linhas (id, board_id, trigger_event, trigger_conditions, priority)
+        """
+        return self.db.query(
+            Automation.id,
+            Automation.board_id,
+            Automation.trigger_event,
+            Automation.trigger_conditions,
+            Automation.priority
+        ).filter(
+            Automation.automation_type == "trigger",
+            Automation.is_active == True
+        ).all()
 
     # ========== EXECUTIONS ==========
 
@@ -257,7 +260,7 @@ class AutomationRepository:
         """
         execution = AutomationExecution(**execution_data.model_dump())
         self.db.add(execution)
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(execution)
         return execution
 
@@ -307,7 +310,7 @@ class AutomationRepository:
         if error_stack:
             execution.error_stack = error_stack
 
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(execution)
         return execution
 
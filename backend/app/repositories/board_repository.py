@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
 from app.models.board import Board
+from app.models.board_tombstone import BoardTombstone
 from app.schemas.board import BoardCreate, BoardUpdate
 
 
@@ -152,3 +153,73 @@ class BoardRepository:
         self.db.refresh(new_board)
 
         return new_board
+
+    def next_change_version(self, board_id: int) -> int:
+        """
+        Incrementa e retorna a versão de alterações do board.
+
+        Deve ser chamada dentro da transação da alteração (antes do commit).
+        No PostgreSQL o UPDATE trava a linha do board até o commit, então as
+        versões de um board são confirmadas na mesma ordem em que são geradas.
+
+        Args:
+            board_id: ID do board
+
+        Returns:
+            Nova versão
+        """
+        self.db.query(Board).filter(
+            Board.id == board_id
+        ).update(
+            {Board.change_version: Board.change_version + 1},
+            synchronize_session=False
+        )
+
+        return self.get_change_version(board_id)
+
+    def get_change_version(self, board_id: int) -> int:
+        """
+        Retorna a versão de alterações atual do board.
+
+        Args:
+            board_id: ID do board
+
+        Returns:
+            Versão atual (0 se o board não existe)
+        """
+        return self.db.query(Board.change_version).filter(
+            Board.id == board_id
+        ).scalar() or 0
+
+    def add_tombstone(self, board_id: int, entity_type: str, entity_id: int, version: int) -> None:
+        """
+        Registra a remoção de uma lista ou card do board (sem commit).
+
+        Args:
+            board_id: ID do board
+            entity_type: "card" ou "list"
+            entity_id: ID do registro removido
+            version: Versão do board na remoção
+        """
+        self.db.add(BoardTombstone(
+            board_id=board_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            change_version=version
+        ))
+
+    def list_tombstones_since(self, board_id: int, since: int) -> List[BoardTombstone]:
+        """
+        Lista as remoções do board posteriores a uma versão.
+
+        Args:
+            board_id: ID do board
+            since: Versão já conhecida pelo cliente
+
+        Returns:
+            Tombstones ordenados por versão
+        """
+        return self.db.query(BoardTombstone).filter(
+            BoardTombstone.board_id == board_id,
+            BoardTombstone.change_version > since
+        ).order_by(BoardTombstone.change_version).all()
@@ -2,13 +2,19 @@
 Card Repository - Operações de acesso a dados de cards.
 Implementa o padrão Repository para isolamento da camada de dados.
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple, Iterator
 from datetime import datetime
+from decimal import Decimal, ROUND_FLOOR
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, or_, func, update, case, Row
 
+from app.core.cache import report_cache
+from app.db.session import commit
 from app.models.card import Card
+from app.models.list import List as BoardList
+from app.repositories.board_repository import BoardRepository
 from app.schemas.card import CardCreate, CardUpdate
+from app.utils.pagination import CountMode, count_rows, paginate_keyset
 
 
 class CardRepository:
@@ -16,9 +22,127 @@ class CardRepository:
     Repository para operações de banco de dados relacionadas a cards.
     """
 
+    # Intervalo entre cards ao inserir nas pontas e ao redistribuir uma lista
+    POSITION_GAP = Decimal("1000")
+    # Menor diferença representável em position (Numeric(12, 2))
+    POSITION_STEP = Decimal("0.01")
+    # Intervalo abaixo do qual o job de manutenção redistribui a lista
+    REBALANCE_MIN_GAP = Decimal("1")
+
     def __init__(self, db: Session):
         self.db = db
 
+    def invalidate_reports(self, *list_ids: int) -> None:
+        """
+        Invalida o cache de relatórios dos boards das listas informadas.
+
+        Args:
+            list_ids: IDs das listas afetadas
+        """
+        board_ids = self.db.query(BoardList.board_id).filter(
+            BoardList.id.in_(set(list_ids))
+        ).distinct().all()
+        report_cache.invalidate_boards(board_id for (board_id,) in board_ids)
+
+    def _board_id_for_list(self, list_id: int) -> Optional[int]:
+        """
+        Retorna o board de uma lista.
+        """
+        return self.db.query(BoardList.board_id).filter(
+            BoardList.id == list_id
+        ).scalar()
+
+    def _touch(self, card: Card) -> None:
+        """
+        Marca o card com uma nova versão do board da sua lista (sem commit).
+
+        Args:
+            card: Card alterado
+        """
+        board_id = self._board_id_for_list(card.list_id)
+        if board_id is not None:
+            card.change_version = BoardRepository(self.db).next_change_version(board_id)
+
+    def find_with_boards(self, card_ids: List[int]) -> Dict[int, Row]:
+        """
+        Busca vários cards junto com a lista e o board de cada um (uma query).
+
+        Args:
+            card_ids: IDs dos cards
+
+        Returns:
+            Dicionário {card_id: linha (id, title, list_id, board_id)}; board_id
+            é None quando a lista ou o board não existem mais
+        """
+        from app.models.board import Board
+
+        rows = self.db.query(
+            Card.id,
+            Card.title,
+            Card.list_id,
+            Board.id.label("board_id")
+        ).outerjoin(
+            BoardList, Card.list_id == BoardList.id
+        ).outerjoin(
+            Board, BoardList.board_id == Board.id
+        ).filter(
+            Card.id.in_(set(card_ids))
+        ).all()
+
+        return {row.id: row for row in rows}
+
+    def _open_cards_of_user_query(self, user_id: int, board_id: Optional[int] = None):
+        """
+        Query dos cards em aberto (não ganhos, perdidos ou excluídos) de um responsável.
+        """
+        query = self.db.query(Card.id).filter(
+            Card.assigned_to_id == user_id,
+            Card.is_won == 0,
+            Card.deleted_at.is_(None)
+        )
+        if board_id is not None:
+            query = query.join(BoardList, Card.list_id == BoardList.id).filter(
+                BoardList.board_id == board_id
+            )
+        return query
+
+    def count_open_cards_of_user(self, user_id: int, board_id: Optional[int] = None) -> int:
+        """
+        Conta os cards em aberto de um responsável.
+
+        Args:
+            user_id: ID do responsável
+            board_id: Restringe a um board (opcional)
+
+        Returns:
+            Quantidade de cards
+        """
+        return self._open_cards_of_user_query(user_id, board_id).count()
+
+    def list_open_card_ids_of_user(
+        self,
+        user_id: int,
+        board_id: Optional[int] = None,
+        after_id: int = 0,
+        limit: int = 500
+    ) -> List[int]:
+        """
+        Lista, por cursor, os IDs dos cards em aberto de um responsável.
+
+        Args:
+            user_id: ID do responsável
+            board_id: Restringe a um board (opcional)
+            after_id: Último ID já lido (keyset sobre Card.id)
+            limit: Quantidade máxima de IDs
+
+        Returns:
+            IDs em ordem crescente
+        """
+        rows = self._open_cards_of_user_query(user_id, board_id).filter(
+            Card.id > after_id
+        ).order_by(Card.id).limit(limit)
+        return [card_id for (card_id,) in rows]
+
     def find_by_id(self, card_id: int) -> Optional[Card]:
         """
         Busca um card por ID.
@@ -47,36 +171,34 @@ class CardRepository:
             Card.list_id == list_id
         ).order_by(Card.position).all()
 
-    def list_by_board(
+    def _board_query(
         self,
         board_id: int,
-        skip: int = 0,
-        limit: int = 100,
         assigned_to_id: Optional[int] = None,
         person_id: Optional[int] = None,
         is_won: Optional[bool] = None,
         is_lost: Optional[bool] = None
-    ) -> List[Card]:
+    ):
         """
-        Lista cards de um board com filtros opcionais.
+        Monta a query de cards de um board com os filtros da listagem (sem ordenação).
 
         Args:
             board_id: ID do board
-            skip: Número de registros para pular
-            limit: Limite de registros
             assigned_to_id: Filtro por responsável
+            person_id: Filtro por pessoa
             is_won: Filtro por cards ganhos
             is_lost: Filtro por cards perdidos
 
         Returns:
-            Lista de cards
+            Query de Card
         """
         from app.models.list import List
-        from sqlalchemy.orm import joinedload
+        from sqlalchemy.orm import joinedload, contains_eager
 
-        # Otimização: Eager loading do usuário responsável (evita problema N+1)
-        query = self.db.query(Card).join(List).options(
-            joinedload(Card.assigned_to)  # Carrega o usuário em uma única query
+        # Otimização: Eager loading do usuário responsável e da lista (evita problema N+1)
+        query = self.db.query(Card).join(Card.list).options(
+            joinedload(Card.assigned_to),  # Carrega o usuário em uma única query
+            contains_eager(Card.list)  # Reaproveita o JOIN com a lista (nome da lista)
         ).filter(
             List.board_id == board_id,
             Card.deleted_at.is_(None)  # Filtrar apenas cards não deletados
@@ -94,16 +216,74 @@ class CardRepository:
         if is_lost is not None:
             query = query.filter(Card.is_lost == is_lost)
 
+        return query
+
+    def list_by_board(
+        self,
+        board_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        assigned_to_id: Optional[int] = None,
+        person_id: Optional[int] = None,
+        is_won: Optional[bool] = None,
+        is_lost: Optional[bool] = None
+    ) -> List[Card]:
+        """
+        Lista cards de um board com filtros opcionais.
+
+        Args:
+            board_id: ID do board
+            skip: Número de registros para pular
+            limit: Limite de registros
+            assigned_to_id: Filtro por responsável
+            is_won: Filtro por cards ganhos
+            is_lost: Filtro por cards perdidos
+
+        Returns:
+            Lista de cards
+        """
+        query = self._board_query(board_id, assigned_to_id, person_id, is_won, is_lost)
+
         return query.order_by(Card.list_id, Card.position).offset(skip).limit(limit).all()
 
-    def count_by_board(
+    def list_by_board_after(
         self,
         board_id: int,
+        after: Optional[str] = None,
+        limit: int = 100,
         assigned_to_id: Optional[int] = None,
         person_id: Optional[int] = None,
         is_won: Optional[bool] = None,
         is_lost: Optional[bool] = None
-    ) -> int:
+    ) -> Tuple[List[Card], Optional[str]]:
+        """
+        Lista cards de um board por cursor (keyset sobre lista, posição e id).
+
+        Args:
+            board_id: ID do board
+            after: Cursor da página anterior (None = primeira página)
+            limit: Limite de registros
+            assigned_to_id: Filtro por responsável
+            is_won: Filtro por cards ganhos
+            is_lost: Filtro por cards perdidos
+
+        Returns:
+            Tupla (lista de cards, cursor da próxima página)
+        """
+        query = self._board_query(board_id, assigned_to_id, person_id, is_won, is_lost)
+        order_by = [(Card.list_id, False), (Card.position, False), (Card.id, False)]
+
+        return paginate_keyset(query, order_by, after, limit)
+
+    def count_by_board(
+        self,
+        board_id: int,
+        assigned_to_id: Optional[int] = None,
+        person_id: Optional[int] = None,
+        is_won: Optional[bool] = None,
+        is_lost: Optional[bool] = None,
+        mode: CountMode = CountMode.EXACT
+    ) -> Optional[int]:
         """
         Conta cards de um board com filtros opcionais.
 
@@ -112,9 +292,10 @@ class CardRepository:
             assigned_to_id: Filtro por responsável
             is_won: Filtro por cards ganhos
             is_lost: Filtro por cards perdidos
+            mode: Modo de contagem (exata, estimada ou nenhuma)
 
         Returns:
-            Número de cards
+            Número de cards (None se mode=none)
         """
         from app.models.list import List
 
@@ -134,7 +315,100 @@ class CardRepository:
         if is_lost is not None:
             query = query.filter(Card.is_lost == is_lost)
 
-        return query.count()
+        return count_rows(query, mode)
+
+    def iter_board_snapshot_rows(self, board_id: int, batch_size: int = 1000) -> Iterator[Row]:
+        """
+        Percorre os cards de um board em streaming, agrupados por lista.
+
+        Seleciona apenas as colunas do Kanban (sem montar objetos Card) e usa
+        yield_per, que no PostgreSQL abre um cursor no servidor: a memória fica
+        limitada a um lote, independente do tamanho do board.
+
+        Args:
+            board_id: ID do board
+            batch_size: Quantidade de linhas buscadas por vez
+
+        Returns:
+            Iterador de linhas (list_id, id, title, position, assigned_to_id,
+            assigned_to_name, value, due_date, is_won)
+        """
+        from app.models.user import User
+
+        query = self.db.query(
+            Card.list_id,
+            Card.id,
+            Card.title,
+            Card.position,
+            Card.assigned_to_id,
+            User.name.label("assigned_to_name"),
+            Card.value,
+            Card.due_date,
+            Card.is_won
+        ).join(
+            BoardList, Card.list_id == BoardList.id
+        ).outerjoin(
+            User, Card.assigned_to_id == User.id
+        ).filter(
+            BoardList.board_id == board_id,
+            Card.deleted_at.is_(None)
+        ).order_by(
+            BoardList.position, BoardList.id, Card.position, Card.id
+        )
+
+        return query.yield_per(batch_size)
+
+    def iter_overdue_assignments(self, now: datetime, batch_size: int = 1000) -> Iterator[Row]:
+        """
+        Percorre em streaming os cards vencidos e em aberto que têm responsável,
+        agrupados por responsável.
+
+        Seleciona apenas as colunas da notificação e usa yield_per, como
+        iter_board_snapshot_rows.
+
+        Args:
+            now: Data/hora de referência (cards com due_date anterior estão vencidos)
+            batch_size: Quantidade de linhas buscadas por vez
+
+        Returns:
+            Iterador de linhas (assigned_to_id, id, title, due_date), ordenadas
+            por responsável e vencimento
+        """
+        query = self.db.query(
+            Card.assigned_to_id,
+            Card.id,
+            Card.title,
+            Card.due_date
+        ).filter(
+            Card.due_date < now,
+            Card.is_won == 0,
+            Card.deleted_at.is_(None),
+            Card.assigned_to_id.isnot(None)
+        ).order_by(
+            Card.assigned_to_id, Card.due_date, Card.id
+        )
+
+        return query.yield_per(batch_size)
+
+    def list_changed_since(self, board_id: int, since: int) -> List[Card]:
+        """
+        Lista os cards de um board alterados depois de uma versão.
+
+        Usa o índice (list_id, change_version): para cada lista do board,
+        apenas a faixa de versões posterior a `since` é lida.
+
+        Args:
+            board_id: ID do board
+            since: Versão já conhecida pelo cliente
+
+        Returns:
+            Cards alterados, ordenados por lista e posição
+        """
+        query = self._board_query(board_id).filter(
+            Card.change_version > since
+        )
+
+        return query.order_by(Card.list_id, Card.position, Card.id).all()
 
     def get_max_position(self, list_id: int) -> int:
         """
@@ -163,7 +437,10 @@ class CardRepository:
             Card criado
         """
         # Coloca o card no final da lista
-        position = self.get_max_position(card_data.list_id) + 1
+        last_position = self.db.query(func.max(Card.position)).filter(
+            Card.list_id == card_data.list_id
+        ).scalar()
+        position = self._position_between(last_position, None)
 
         card = Card(
             title=card_data.title,
@@ -177,9 +454,12 @@ class CardRepository:
         )
 
         self.db.add(card)
+        self._touch(card)
         self.db.commit()
         self.db.refresh(card)
 
+        self.invalidate_reports(card.list_id)
+
         return card
 
     def update(self, card: Card, card_data: CardUpdate) -> Card:
@@ -208,9 +488,12 @@ class CardRepository:
                 # Não setar properties read-only diretamente
                 setattr(card, field, value)
 
+        self._touch(card)
         self.db.commit()
         self.db.refresh(card)
 
+        self.invalidate_reports(card.list_id)
+
         return card
 
     def delete(self, card: Card) -> None:
@@ -220,67 +503,289 @@ class CardRepository:
         Args:
             card: Card a ser deletado
         """
+        list_id = card.list_id
+
+        # Registra a exclusão para a sincronização incremental do board
+        board_id = self._board_id_for_list(list_id)
+        if board_id is not None:
+            board_repository = BoardRepository(self.db)
+            version = board_repository.next_change_version(board_id)
+            board_repository.add_tombstone(board_id, "card", card.id, version)
+
         self.db.delete(card)
         self.db.commit()
 
-    def move_to_list(self, card: Card, target_list_id: int, position: Optional[int] = None) -> Card:
+        self.invalidate_reports(list_id)
+
+    def _position_query(self, list_id: int, exclude_card_id: int):
+        """
+        Query das posições dos cards ativos de uma lista, sem o card sendo movido.
+        """
+        return self.db.query(Card.position).filter(
+            Card.list_id == list_id,
+            Card.id != exclude_card_id,
+            Card.deleted_at.is_(None)
+        )
+
+    def _neighbour_positions(
+        self,
+        list_id: int,
+        index: Optional[int],
+        exclude_card_id: int
+    ) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+        """
+        Busca as posições dos vizinhos de um índice da lista (anterior, seguinte).
+
+        Lê no máximo duas linhas pelo índice (list_id, position), sem carregar a lista.
+
+        Args:
+            list_id: ID da lista
+            index: Índice 0-based desejado (None = final da lista)
+            exclude_card_id: Card sendo movido
+
+        Returns:
+            Tupla (posição anterior, posição seguinte); None onde não há vizinho
+        """
+        query = self._position_query(list_id, exclude_card_id)
+
+        if index is None:
+            last = query.order_by(Card.position.desc(), Card.id.desc()).limit(1).scalar()
+            return last, None
+
+        if index <= 0:
+            first = query.order_by(Card.position, Card.id).limit(1).scalar()
+            return None, first
+
+        rows = query.order_by(Card.position, Card.id).offset(index - 1).limit(2).all()
+        if not rows:
+            # Índice além do final: coloca após o último card
+            return self._neighbour_positions(list_id, None, exclude_card_id)
+
+        following = rows[1].position if len(rows) > 1 else None
+        return rows[0].position, following
+
+    def _neighbours_after_card(
+        self,
+        list_id: int,
+        anchor: Card,
+        exclude_card_id: int
+    ) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+        """
+        Busca as posições ao redor do ponto logo após um card âncora.
+
+        Args:
+            list_id: ID da lista
+            anchor: Card que ficará imediatamente antes do card movido
+            exclude_card_id: Card sendo movido
+
+        Returns:
+            Tupla (posição do âncora, posição do card seguinte ou None)
+        """
+        following = self._position_query(list_id, exclude_card_id).filter(
+            or_(
+                Card.position > anchor.position,
+                and_(Card.position == anchor.position, Card.id > anchor.id)
+            )
+        ).order_by(Card.position, Card.id).limit(1).scalar()
+
+        return anchor.position, following
+
+    def _position_between(
+        self,
+        previous: Optional[Decimal],
+        following: Optional[Decimal]
+    ) -> Optional[Decimal]:
+        """
+        Calcula uma posição entre dois vizinhos.
+
+        Args:
+            previous: Posição do card anterior (None = início da lista)
+            following: Posição do card seguinte (None = final da lista)
+
+        Returns:
+            Nova posição ou None se não há espaço entre os vizinhos
+        """
+        if previous is None and following is None:
+            return self.POSITION_GAP
+        if following is None:
+            return Decimal(previous) + self.POSITION_GAP
+        if previous is None:
+            return Decimal(following) - self.POSITION_GAP
+
+        middle = ((Decimal(previous) + Decimal(following)) / 2).quantize(
+            self.POSITION_STEP, rounding=ROUND_FLOOR
+        )
+        if previous < middle < following:
+            return middle
+        return None
+
+    def rebalance_positions(self, list_id: int) -> int:
+        """
+        Redistribui as posições dos cards de uma lista com intervalos iguais.
+
+        Mantém a ordem atual e é feito em um único UPDATE. Os cards recebem
+        uma nova versão do board, para a sincronização incremental (sem commit).
+
+        Args:
+            list_id: ID da lista
+
+        Returns:
+            Quantidade de cards reposicionados
+        """
+        ranked = self.db.query(
+            Card.id.label("id"),
+            func.row_number().over(order_by=(Card.position, Card.id)).label("rank")
+        ).filter(
+            Card.list_id == list_id
+        ).subquery()
+
+        # A sessão não faz autoflush: grava antes as alterações pendentes
+        # (ex.: is_won/closed_at do card sendo movido)
+        self.db.flush()
+
+        values = {Card.position: ranked.c.rank * self.POSITION_GAP}
+        board_id = self._board_id_for_list(list_id)
+        if board_id is not None:
+            values[Card.change_version] = BoardRepository(self.db).next_change_version(board_id)
+
+        result = self.db.execute(
+            update(Card).where(Card.id == ranked.c.id).values(values),
+            execution_options={"synchronize_session": False}
+        )
+        # Cards da lista carregados na sessão estão com a posição antiga
+        for obj in list(self.db.identity_map.values()):
+            if isinstance(obj, Card) and obj.list_id == list_id:
+                self.db.expire(obj, ["position", "change_version"])
+        return result.rowcount
+
+    def find_lists_to_rebalance(self, min_gap: Decimal = None) -> List[int]:
+        """
+        Lista as listas com cards vizinhos mais próximos que o intervalo mínimo.
+
+        Args:
+            min_gap: Intervalo mínimo aceito (padrão REBALANCE_MIN_GAP)
+
+        Returns:
+            IDs das listas a redistribuir
+        """
+        min_gap = min_gap if min_gap is not None else self.REBALANCE_MIN_GAP
+
+        gaps = self.db.query(
+            Card.list_id.label("list_id"),
+            (
+                Card.position - func.lag(Card.position).over(
+                    partition_by=Card.list_id,
+                    order_by=(Card.position, Card.id)
+                )
+            ).label("gap")
+        ).filter(
+            Card.deleted_at.is_(None)
+        ).subquery()
+
+        rows = self.db.query(gaps.c.list_id).filter(
+            gaps.c.gap < min_gap
+        ).distinct().all()
+
+        return [list_id for (list_id,) in rows]
+
+    def move_to_list(
+        self,
+        card: Card,
+        target_list_id: int,
+        position: Optional[int] = None,
+        after_card: Optional[Card] = None
+    ) -> Card:
         """
         Move um card para outra lista.
 
+        A nova posição é o ponto médio entre os dois vizinhos, lidos pelo índice
+        (list_id, position): o custo não depende do tamanho da lista. Quando não
+        sobra espaço entre os vizinhos, a lista é redistribuída antes.
+
         Args:
             card: Card a ser movido
             target_list_id: ID da lista de destino
             position: Índice da posição na lista de destino (opcional, 0-based)
+            after_card: Card da lista de destino que ficará imediatamente antes
+                (opcional, tem prioridade sobre position)
 
         Returns:
             Card movido
         """
         old_list_id = card.list_id
 
-        # Pegar todos os cards da lista de destino (exceto o card sendo movido) ordenados por position
-        target_cards = self.db.query(Card).filter(
-            Card.list_id == target_list_id,
-            Card.id != card.id,
-            Card.deleted_at.is_(None)
-        ).order_by(Card.position).all()
-
-        # Calcular a nova position baseado no índice desejado
         # IMPORTANTE: Converter position para int antes de usar como índice
         position_idx = int(position) if position is not None else None
 
-        if position_idx is None or position_idx >= len(target_cards):
-            # Posição não especificada ou além do final: coloca no final
-            if target_cards:
-                new_position = float(target_cards[-1].position) + 1000
-            else:
-                new_position = 1000
-        elif position_idx == 0:
-            # Primeira posição: coloca antes do primeiro card
-            if target_cards:
-                new_position = float(target_cards[0].position) - 1000
-            else:
-                new_position = 1000
-        else:
-            # Posição intermediária: calcula a média entre dois cards
-            prev_card = target_cards[position_idx - 1]
-            next_card = target_cards[position_idx] if position_idx < len(target_cards) else None
-
-            if next_card:
-                # Inserir entre prev_card e next_card
-                new_position = (float(prev_card.position) + float(next_card.position)) / 2
-            else:
-                # Inserir após prev_card (no final)
-                new_position = float(prev_card.position) + 1000
+        def neighbours():
+            if after_card is not None:
+                return self._neighbours_after_card(target_list_id, after_card, card.id)
+            return self._neighbour_positions(target_list_id, position_idx, card.id)
+
+        new_position = self._position_between(*neighbours())
+        if new_position is None:
+            # Vizinhos colados (limite de 2 casas decimais): redistribui a lista
+            self.rebalance_positions(target_list_id)
+            new_position = self._position_between(*neighbours())
+
+        # Se o card saiu de outro board, registra a saída nesse board
+        old_board_id = self._board_id_for_list(old_list_id)
+        if old_board_id is not None and old_board_id != self._board_id_for_list(target_list_id):
+            board_repository = BoardRepository(self.db)
+            version = board_repository.next_change_version(old_board_id)
+            board_repository.add_tombstone(old_board_id, "card", card.id, version)
 
         # Move o card
         card.list_id = target_list_id
         card.position = new_position
+        self._touch(card)
 
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(card)
 
+        self.invalidate_reports(old_list_id, target_list_id)
+
         return card
 
+    def assign_bulk(self, cards: List[Row], user_id: Optional[int]) -> int:
+        """
+        Atribui vários cards a um usuário com um único UPDATE (sem commit).
+
+        Cada card recebe uma nova versão do board da sua lista, para a
+        sincronização incremental.
+
+        Args:
+            cards: Linhas com id, list_id e board_id (find_with_boards)
+            user_id: ID do usuário (None = remover responsável)
+
+        Returns:
+            Quantidade de cards atualizados
+        """
+        if not cards:
+            return 0
+
+        # Uma versão por board, incrementadas sempre na mesma ordem
+        board_repository = BoardRepository(self.db)
+        versions = {
+            board_id: board_repository.next_change_version(board_id)
+            for board_id in sorted({card.board_id for card in cards if card.board_id is not None})
+        }
+
+        values = {Card.assigned_to_id: user_id}
+        list_versions = {
+            card.list_id: versions[card.board_id] for card in cards if card.board_id is not None
+        }
+        if list_versions:
+            values[Card.change_version] = case(
+                list_versions, value=Card.list_id, else_=Card.change_version
+            )
+
+        result = self.db.execute(
+            update(Card).where(Card.id.in_({card.id for card in cards})).values(values),
+            execution_options={"synchronize_session": "fetch"}
+        )
+        return result.rowcount
+
     def assign_to_user(self, card: Card, user_id: int) -> Card:
         """
         Atribui um card a um usuário.
@@ -294,7 +799,8 @@ class CardRepository:
         """
         card.assigned_to_id = user_id
 
-        self.db.commit()
+        self._touch(card)
+        commit(self.db)
         self.db.refresh(card)
 
         return card
@@ -2,12 +2,13 @@
 Client Repository - Operações de acesso a dados de clientes.
 Implementa o padrão Repository para isolamento da camada de dados.
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 
 from app.models.client import Client
 from app.schemas.client import ClientCreate, ClientUpdate
+from app.utils.pagination import CountMode, count_rows, paginate_keyset
 
 
 class ClientRepository:
@@ -63,26 +64,22 @@ class ClientRepository:
             Client.is_deleted == False
         ).first()
 
-    def list_all(
+    def _filtered_query(
         self,
-        skip: int = 0,
-        limit: int = 100,
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
         state: Optional[str] = None
-    ) -> List[Client]:
+    ):
         """
-        Lista todos os clientes do sistema.
+        Monta a query de clientes com os filtros da listagem (sem ordenação).
 
         Args:
-            skip: Número de registros para pular (paginação)
-            limit: Limite de registros a retornar
             is_active: Filtro por status ativo (opcional)
             search: Termo de busca (nome, email, empresa, telefone)
             state: Filtro por estado (UF)
 
         Returns:
-            Lista de clientes
+            Query de Client
         """
         query = self.db.query(Client).filter(
             Client.is_deleted == False
@@ -109,54 +106,85 @@ class ClientRepository:
                 )
             )
 
+        return query
+
+    def list_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None,
+        state: Optional[str] = None
+    ) -> List[Client]:
+        """
+        Lista todos os clientes do sistema.
+
+        Args:
+            skip: Número de registros para pular (paginação)
+            limit: Limite de registros a retornar
+            is_active: Filtro por status ativo (opcional)
+            search: Termo de busca (nome, email, empresa, telefone)
+            state: Filtro por estado (UF)
+
+        Returns:
+            Lista de clientes
+        """
+        query = self._filtered_query(is_active, search, state)
+
         # Ordenação: mais recentes primeiro
         query = query.order_by(Client.created_at.desc())
 
         return query.offset(skip).limit(limit).all()
 
-    def count_all(
+    def list_all_after(
         self,
+        after: Optional[str] = None,
+        limit: int = 100,
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
         state: Optional[str] = None
-    ) -> int:
+    ) -> Tuple[List[Client], Optional[str]]:
         """
-        Conta todos os clientes do sistema.
+        Lista clientes por cursor (keyset sobre created_at e id, mais recentes primeiro).
 
         Args:
+            after: Cursor da página anterior (None = primeira página)
+            limit: Limite de registros a retornar
             is_active: Filtro por status ativo (opcional)
             search: Termo de busca (nome, email, empresa, telefone)
             state: Filtro por estado (UF)
 
         Returns:
-            Contagem de clientes
+            Tupla (lista de clientes, cursor da próxima página)
         """
-        query = self.db.query(func.count(Client.id)).filter(
-            Client.is_deleted == False
-        )
+        query = self._filtered_query(is_active, search, state)
+        return paginate_keyset(query, [(Client.created_at, True), (Client.id, True)], after, limit)
 
-        # Filtro de status
-        if is_active is not None:
-            query = query.filter(Client.is_active == is_active)
-
-        # Filtro de estado
-        if state:
-            query = query.filter(Client.state == state)
+    def count_all(
+        self,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None,
+        state: Optional[str] = None,
+        mode: CountMode = CountMode.EXACT
+    ) -> Optional[int]:
+        """
+        Conta todos os clientes do sistema.
 
-        # Busca por termo
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Client.name.ilike(search_term),
-                    Client.email.ilike(search_term),
-                    Client.company_name.ilike(search_term),
-                    Client.phone.ilike(search_term),
-                    Client.document.ilike(search_term)
-                )
-            )
+        Args:
+            is_active: Filtro por status ativo (opcional)
+            search: Termo de busca (nome, email, empresa, telefone)
+            state: Filtro por estado (UF)
+            mode: Modo de contagem (exata, estimada ou nenhuma)
 
-        return query.scalar()
+        Returns:
+            Contagem de clientes (None se mode=none)
+        """
+        query = self._filtered_query(is_active, search, state)
+        return count_rows(
+            query,
+            mode,
+            exact_count=lambda: query.with_entities(func.count(Client.id)).scalar()
+        )
 
     def exists_email(self, email: str, exclude_id: Optional[int] = None) -> bool:
         """
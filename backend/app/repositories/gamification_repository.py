@@ -2,16 +2,25 @@
 Gamification Repository - Acesso a dados de gamificação.
 Gerencia pontos, badges e rankings.
 """
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import (
+    func, and_, or_, case, update, insert, select, literal, cast, extract, DateTime, Integer
+)
 
+from app.models.user import User
+from app.models.card import Card
+from app.models.card_transfer import CardTransfer
 from app.models.gamification_point import GamificationPoint
+from app.models.gamification_point_balance import GamificationPointBalance
 from app.models.gamification_badge import GamificationBadge
 from app.models.user_badge import UserBadge
 from app.models.gamification_ranking import GamificationRanking
 from app.models.gamification_action_points import GamificationActionPoints
+from app.db.session import commit
+from app.utils.periods import PERIOD_TYPES, get_period_starts
 from app.schemas.gamification import (
     GamificationPointCreate,
     BadgeCreate,
@@ -22,6 +31,15 @@ from app.schemas.gamification import (
 )
 
 
+# Colunas do saldo para cada período: (pontos, início do período)
+BALANCE_PERIOD_COLUMNS = {
+    "weekly": ("weekly_points", "week_start"),
+    "monthly": ("monthly_points", "month_start"),
+    "quarterly": ("quarterly_points", "quarter_start"),
+    "annual": ("annual_points", "year_start"),
+}
+
+
 class GamificationRepository:
     """
     Repository para operações de gamificação.
@@ -34,7 +52,8 @@ class GamificationRepository:
 
     def create_point(self, point_data: GamificationPointCreate) -> GamificationPoint:
         """
-        Cria um novo registro de pontos.
+        Cria um novo registro de pontos e atualiza o saldo do usuário
+        na mesma transação.
 
         Args:
             point_data: Dados do ponto
@@ -44,13 +63,105 @@ class GamificationRepository:
         """
         point = GamificationPoint(**point_data.model_dump())
         self.db.add(point)
-        self.db.commit()
+        self._add_to_balance(point.user_id, point.points)
+        commit(self.db)
         self.db.refresh(point)
         return point
 
+    def _update_balance(self, user_id: int, points: int, starts: Dict[str, datetime]) -> int:
+        """
+        Soma pontos ao saldo existente com um único UPDATE atômico.
+
+        Contadores de um período que já virou são reiniciados com os novos pontos.
+
+        Returns:
+            Quantidade de saldos atualizados (0 se o usuário ainda não tem saldo)
+        """
+        values = {
+            GamificationPointBalance.total_points: GamificationPointBalance.total_points + points,
+            GamificationPointBalance.updated_at: datetime.utcnow(),
+        }
+        for period_type, (points_name, start_name) in BALANCE_PERIOD_COLUMNS.items():
+            points_column = getattr(GamificationPointBalance, points_name)
+            start_column = getattr(GamificationPointBalance, start_name)
+            values[points_column] = case(
+                (start_column == starts[period_type], points_column + points),
+                else_=points
+            )
+            values[start_column] = starts[period_type]
+
+        result = self.db.execute(
+            update(GamificationPointBalance).where(
+                GamificationPointBalance.user_id == user_id
+            ).values(values),
+            execution_options={"synchronize_session": "fetch"}
+        )
+        return result.rowcount
+
+    def _add_to_balance(self, user_id: int, points: int) -> None:
+        """
+        Soma pontos ao saldo do usuário, criando o saldo no primeiro registro (sem commit).
+
+        Args:
+            user_id: ID do usuário
+            points: Pontos a somar (pode ser negativo)
+        """
+        starts = get_period_starts()
+        if self._update_balance(user_id, points, starts):
+            return
+
+        balance = GamificationPointBalance(user_id=user_id, total_points=points)
+        for period_type, (points_name, start_name) in BALANCE_PERIOD_COLUMNS.items():
+            setattr(balance, points_name, points)
+            setattr(balance, start_name, starts[period_type])
+
+        try:
+            with self.db.begin_nested():
+                self.db.add(balance)
+        except IntegrityError:
+            # Outro processo criou o saldo ao mesmo tempo
+            self._update_balance(user_id, points, starts)
+
+    def get_user_balance(self, user_id: int) -> Optional[GamificationPointBalance]:
+        """
+        Busca o saldo de pontos de um usuário.
+
+        Args:
+            user_id: ID do usuário
+
+        Returns:
+            GamificationPointBalance ou None se o usuário nunca recebeu pontos
+        """
+        return self.db.query(GamificationPointBalance).filter(
+            GamificationPointBalance.user_id == user_id
+        ).first()
+
+    def get_user_points_summary(self, user_id: int) -> Dict[str, int]:
+        """
+        Retorna o total de pontos e os pontos de cada período atual de um usuário.
+
+        Lê apenas o saldo do usuário; contadores de períodos já encerrados valem zero.
+
+        Args:
+            user_id: ID do usuário
+
+        Returns:
+            Dict com "total" e uma chave por período (weekly, monthly, quarterly, annual)
+        """
+        balance = self.get_user_balance(user_id)
+        if balance is None:
+            return {"total": 0, **{period_type: 0 for period_type in PERIOD_TYPES}}
+
+        starts = get_period_starts()
+        summary = {"total": balance.total_points}
+        for period_type, (points_name, start_name) in BALANCE_PERIOD_COLUMNS.items():
+            is_current = getattr(balance, start_name) == starts[period_type]
+            summary[period_type] = getattr(balance, points_name) if is_current else 0
+        return summary
+
     def get_user_total_points(self, user_id: int) -> int:
         """
-        Calcula total de pontos de um usuário.
+        Obtém o total de pontos de um usuário (lido do saldo).
 
         Args:
             user_id: ID do usuário
@@ -58,11 +169,88 @@ class GamificationRepository:
         Returns:
             Total de pontos
         """
-        result = self.db.query(func.sum(GamificationPoint.points)).filter(
-            GamificationPoint.user_id == user_id
+        result = self.db.query(GamificationPointBalance.total_points).filter(
+            GamificationPointBalance.user_id == user_id
         ).scalar()
         return result or 0
 
+    def sum_points_by_period(self, starts: Dict[str, datetime]) -> List[tuple]:
+        """
+        Soma os pontos de cada usuário ativo nos períodos informados (uma query).
+
+        Args:
+            starts: Início de cada período {period_type: period_start}
+
+        Returns:
+            Lista de tuplas (user_id, pontos de cada período na ordem de starts)
+        """
+        columns = [
+            func.sum(case((GamificationPoint.created_at >= start, GamificationPoint.points), else_=0))
+            for start in starts.values()
+        ]
+
+        return self.db.query(GamificationPoint.user_id, *columns).join(
+            User, User.id == GamificationPoint.user_id
+        ).filter(
+            User.is_deleted == False,
+            GamificationPoint.created_at >= min(starts.values())
+        ).group_by(
+            GamificationPoint.user_id
+        ).all()
+
+    def rebuild_point_balances(self) -> Dict[str, int]:
+        """
+        Reconstrói todos os saldos a partir do histórico de pontos.
+
+        Corrige saldos que divergiram do histórico (pontos gravados fora de
+        create_point, exclusões, falhas). Todo o cálculo é feito no banco
+        com um único INSERT ... SELECT.
+
+        Returns:
+            Dict com a quantidade de saldos gerados e de totais corrigidos
+        """
+        previous = dict(self.db.query(
+            GamificationPointBalance.user_id, GamificationPointBalance.total_points
+        ).all())
+
+        starts = get_period_starts()
+        ledger_columns = [
+            GamificationPoint.user_id,
+            func.sum(GamificationPoint.points),
+        ]
+        balance_columns = ["user_id", "total_points"]
+        for period_type, (points_name, start_name) in BALANCE_PERIOD_COLUMNS.items():
+            start = starts[period_type]
+            ledger_columns.append(func.sum(case(
+                (GamificationPoint.created_at >= start, GamificationPoint.points),
+                else_=0
+            )))
+            ledger_columns.append(literal(start, DateTime))
+            balance_columns.extend([points_name, start_name])
+
+        now = datetime.utcnow()
+        ledger_columns.extend([literal(now, DateTime), literal(now, DateTime)])
+        balance_columns.extend(["created_at", "updated_at"])
+
+        self.db.query(GamificationPointBalance).delete(synchronize_session=False)
+        self.db.execute(
+            insert(GamificationPointBalance).from_select(
+                balance_columns,
+                select(*ledger_columns).group_by(GamificationPoint.user_id)
+            )
+        )
+        self.db.commit()
+
+        current = dict(self.db.query(
+            GamificationPointBalance.user_id, GamificationPointBalance.total_points
+        ).all())
+        corrected = sum(
+            1 for user_id in set(previous) | set(current)
+            if previous.get(user_id) != current.get(user_id)
+        )
+
+        return {"balances": len(current), "corrected": corrected}
+
     def get_user_points_by_period(
         self,
         user_id: int,
@@ -166,6 +354,18 @@ class GamificationRepository:
 
         return query.offset(skip).limit(limit).all()
 
+    def list_automatic_badges(self) -> List[GamificationBadge]:
+        """
+        Lista os badges automáticos ativos (carga do cache automatic_badges).
+
+        Returns:
+            Lista de GamificationBadge
+        """
+        return self.db.query(GamificationBadge).filter(
+            GamificationBadge.criteria_type == "automatic",
+            GamificationBadge.is_active == True
+        ).order_by(GamificationBadge.id).all()
+
     def count_all_badges(self, is_active: Optional[bool] = None) -> int:
         """
         Conta todos os badges do sistema.
@@ -241,6 +441,142 @@ class GamificationRepository:
         self.db.refresh(user_badge)
         return user_badge
 
+    def badge_metrics_subquery(self, user_ids: Optional[List[int]] = None):
+        """
+        Monta a subquery com as métricas de badges de cada usuário ativo.
+
+        Colunas: user_id, total_points, cards_won, won_value,
+        win_streak_days e transfers_received (zero quando não há registros).
+
+        Com user_ids, o filtro vai para cada agregado interno: só os cards e
+        transferências desses usuários são lidos.
+
+        Args:
+            user_ids: Restringe a alguns usuários (opcional)
+
+        Returns:
+            Subquery com uma linha por usuário
+        """
+        won = and_(
+            Card.is_won == 1,
+            Card.deleted_at.is_(None),
+            Card.assigned_to_id.isnot(None)
+        )
+        received = CardTransfer.status == "completed"
+        if user_ids is not None:
+            won = and_(won, Card.assigned_to_id.in_(user_ids))
+            received = and_(received, CardTransfer.to_user_id.in_(user_ids))
+
+        cards = select(
+            Card.assigned_to_id.label("user_id"),
+            func.count(Card.id).label("cards_won"),
+            func.sum(Card.value).label("won_value")
+        ).where(won).group_by(Card.assigned_to_id).subquery()
+
+        # Maior sequência de dias com card ganho (gaps and islands):
+        # dias seguidos têm a mesma diferença entre o número do dia e a ordem do dia
+        day_number = cast(extract("epoch", func.date(Card.closed_at)) / 86400, Integer)
+        won_days = select(
+            Card.assigned_to_id.label("user_id"),
+            day_number.label("day")
+        ).where(won, Card.closed_at.isnot(None)).distinct().subquery()
+
+        islands = select(
+            won_days.c.user_id,
+            (
+                won_days.c.day - func.row_number().over(
+                    partition_by=won_days.c.user_id,
+                    order_by=won_days.c.day
+                )
+            ).label("island")
+        ).subquery()
+
+        runs = select(
+            islands.c.user_id,
+            func.count().label("length")
+        ).group_by(islands.c.user_id, islands.c.island).subquery()
+
+        streaks = select(
+            runs.c.user_id,
+            func.max(runs.c.length).label("win_streak_days")
+        ).group_by(runs.c.user_id).subquery()
+
+        transfers = select(
+            CardTransfer.to_user_id.label("user_id"),
+            func.count(CardTransfer.id).label("transfers_received")
+        ).where(
+            received
+        ).group_by(CardTransfer.to_user_id).subquery()
+
+        query = select(
+            User.id.label("user_id"),
+            func.coalesce(GamificationPointBalance.total_points, 0).label("total_points"),
+            func.coalesce(cards.c.cards_won, 0).label("cards_won"),
+            func.coalesce(cards.c.won_value, 0).label("won_value"),
+            func.coalesce(streaks.c.win_streak_days, 0).label("win_streak_days"),
+            func.coalesce(transfers.c.transfers_received, 0).label("transfers_received"),
+        ).outerjoin(
+            GamificationPointBalance, GamificationPointBalance.user_id == User.id
+        ).outerjoin(
+            cards, cards.c.user_id == User.id
+        ).outerjoin(
+            streaks, streaks.c.user_id == User.id
+        ).outerjoin(
+            transfers, transfers.c.user_id == User.id
+        ).where(
+            User.is_deleted == False
+        )
+
+        if user_ids is not None:
+            query = query.where(User.id.in_(user_ids))
+
+        return query.subquery()
+
+    def list_awarded_badge_pairs(
+        self,
+        badge_ids: List[int],
+        user_ids: Optional[List[int]] = None
+    ) -> set:
+        """
+        Lista os pares (user_id, badge_id) já concedidos.
+
+        Args:
+            badge_ids: Badges consultados
+            user_ids: Restringe a alguns usuários (opcional)
+
+        Returns:
+            Conjunto de tuplas (user_id, badge_id)
+        """
+        query = self.db.query(UserBadge.user_id, UserBadge.badge_id).filter(
+            UserBadge.badge_id.in_(badge_ids)
+        )
+        if user_ids is not None:
+            query = query.filter(UserBadge.user_id.in_(user_ids))
+        return {(user_id, badge_id) for user_id, badge_id in query.all()}
+
+    def award_badges_bulk(self, pairs: List[tuple]) -> None:
+        """
+        Atribui vários badges de uma vez (um único INSERT, sem commit).
+
+        Args:
+            pairs: Lista de tuplas (user_id, badge_id) ainda não concedidas
+        """
+        if not pairs:
+            return
+
+        now = datetime.utcnow()
+        self.db.execute(insert(UserBadge), [
+            {
+                "user_id": user_id,
+                "badge_id": badge_id,
+                "awarded_by_id": None,
+                "awarded_at": now,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for user_id, badge_id in pairs
+        ])
+
     def user_has_badge(self, user_id: int, badge_id: int) -> bool:
         """
         Verifica se usuário já possui um badge.
@@ -311,6 +647,224 @@ class GamificationRepository:
         self.db.refresh(ranking)
         return ranking
 
+    def replace_period_rankings(
+        self,
+        period_type: str,
+        period_start: datetime,
+        period_end: datetime
+    ) -> int:
+        """
+        Recalcula o ranking de um período inteiro em uma única transação.
+
+        Soma os pontos do período por usuário e calcula as posições com RANK()
+        no banco (empates ficam na mesma posição), junto com os cards ganhos
+        no período (won_cards_subquery). Os registros antigos do
+        período são apagados e os novos inseridos com um INSERT ... SELECT,
+        então leitores veem o ranking antigo ou o novo, nunca um parcial.
+
+        Args:
+            period_type: Tipo de período (weekly, monthly, quarterly, annual)
+            period_start: Início do período
+            period_end: Fim do período
+
+        Returns:
+            Quantidade de usuários no ranking
+        """
+        period_points = func.sum(GamificationPoint.points)
+        won = self.won_cards_subquery(period_start, period_end)
+        now = datetime.utcnow()
+
+        ranked = select(
+            GamificationPoint.user_id,
+            literal(period_type),
+            literal(period_start, DateTime),
+            literal(period_end, DateTime),
+            func.rank().over(order_by=period_points.desc()),
+            period_points,
+            func.coalesce(func.max(won.c.cards_won), 0),
+            literal(now, DateTime),
+            literal(now, DateTime),
+        ).join(
+            User, User.id == GamificationPoint.user_id
+        ).outerjoin(
+            won, won.c.user_id == GamificationPoint.user_id
+        ).where(
+            User.is_deleted == False,
+            GamificationPoint.created_at >= period_start,
+            GamificationPoint.created_at <= period_end
+        ).group_by(
+            GamificationPoint.user_id
+        ).having(
+            period_points > 0  # Só inclui usuários com pontos
+        )
+
+        # Apaga apenas por period_type e period_start (microsegundos em period_end)
+        self.db.query(GamificationRanking).filter(
+            GamificationRanking.period_type == period_type,
+            GamificationRanking.period_start == period_start
+        ).delete(synchronize_session=False)
+
+        result = self.db.execute(
+            insert(GamificationRanking).from_select(
+                [
+                    "user_id", "period_type", "period_start", "period_end",
+                    "rank", "points", "cards_won", "created_at", "updated_at",
+                ],
+                ranked
+            )
+        )
+        self.db.commit()
+
+        return result.rowcount
+
+    def won_cards_subquery(self, period_start: datetime, period_end: datetime):
+        """
+        Subquery com a quantidade de cards ganhos por responsável em um período.
+
+        Filtra closed_at por intervalo (sem aplicar funções à coluna), o que
+        permite usar o índice (is_won, closed_at, assigned_to_id).
+
+        Args:
+            period_start: Início do período
+            period_end: Fim do período (inclusive)
+
+        Returns:
+            Subquery com as colunas user_id e cards_won
+        """
+        return select(
+            Card.assigned_to_id.label("user_id"),
+            func.count(Card.id).label("cards_won")
+        ).where(
+            Card.is_won == 1,
+            Card.closed_at >= period_start,
+            Card.closed_at <= period_end,
+            Card.assigned_to_id.isnot(None),
+            Card.deleted_at.is_(None)
+        ).group_by(
+            Card.assigned_to_id
+        ).subquery()
+
+    def _upsert_insert(self, model):
+        """
+        INSERT com ON CONFLICT do banco em uso (PostgreSQL ou SQLite).
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(model)
+
+    def upsert_period_sales(
+        self,
+        period_type: str,
+        period_start: datetime,
+        period_end: datetime
+    ) -> int:
+        """
+        Atualiza os cards ganhos do ranking de um período em uma única transação.
+
+        Agrega as vendas de todos os usuários em uma query (won_cards_subquery)
+        e grava com um único INSERT ... SELECT ... ON CONFLICT: usuários já no
+        ranking têm cards_won atualizado; os demais entram sem pontos, empatados
+        na última posição. Posições e pontos continuam vindo de
+        replace_period_rankings.
+
+        Args:
+            period_type: Tipo de período (weekly, monthly, quarterly, annual)
+            period_start: Início do período
+            period_end: Fim do período
+
+        Returns:
+            Quantidade de usuários com vendas no período
+        """
+        won = self.won_cards_subquery(period_start, period_end)
+        now = datetime.utcnow()
+        in_period = and_(
+            GamificationRanking.period_type == period_type,
+            GamificationRanking.period_start == period_start
+        )
+
+        # Usuários sem pontos só estão no ranking pelas vendas: são recriados
+        # abaixo; os demais têm as vendas zeradas antes de recontar
+        self.db.query(GamificationRanking).filter(
+            in_period, GamificationRanking.points == 0
+        ).delete(synchronize_session="fetch")
+        self.db.query(GamificationRanking).filter(
+            in_period, GamificationRanking.cards_won != 0
+        ).update(
+            {GamificationRanking.cards_won: 0, GamificationRanking.updated_at: now},
+            synchronize_session="fetch"
+        )
+
+        last_rank = select(
+            func.count(GamificationRanking.id) + 1
+        ).where(in_period).scalar_subquery()
+
+        rows = select(
+            won.c.user_id,
+            literal(period_type),
+            literal(period_start, DateTime),
+            literal(period_end, DateTime),
+            last_rank,
+            literal(0),
+            won.c.cards_won,
+            literal(now, DateTime),
+            literal(now, DateTime),
+        ).join(
+            User, User.id == won.c.user_id
+        ).where(
+            User.is_deleted == False
+        )
+
+        statement = self._upsert_insert(GamificationRanking).from_select(
+            [
+                "user_id", "period_type", "period_start", "period_end",
+                "rank", "points", "cards_won", "created_at", "updated_at",
+            ],
+            rows
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "period_type", "period_start"],
+            set_={
+                "cards_won": statement.excluded.cards_won,
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        result = self.db.execute(statement)
+        self.db.commit()
+
+        return result.rowcount
+
+    def list_rankings_with_user_names(
+        self,
+        period_type: str,
+        period_start: datetime,
+        limit: Optional[int] = 100
+    ) -> List[tuple]:
+        """
+        Lista o ranking de um período junto com o nome de cada usuário (uma query).
+
+        Args:
+            period_type: Tipo de período
+            period_start: Início do período
+            limit: Limite de resultados (None = todos)
+
+        Returns:
+            Lista de tuplas (GamificationRanking, nome do usuário) ordenada por posição
+        """
+        query = self.db.query(GamificationRanking, User.name).outerjoin(
+            User, User.id == GamificationRanking.user_id
+        ).filter(
+            GamificationRanking.period_type == period_type,
+            GamificationRanking.period_start == period_start
+        ).order_by(
+            GamificationRanking.rank.asc(), GamificationRanking.user_id.asc()
+        )
+
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
     def find_ranking_by_user_and_period(
         self,
         user_id: int,
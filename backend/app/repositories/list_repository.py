@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 
 from app.models.list import List
+from app.repositories.board_repository import BoardRepository
 from app.schemas.list import ListCreate, ListUpdate
 
 
@@ -46,6 +47,22 @@ class ListRepository:
             List.board_id == board_id
         ).order_by(List.position).all()
 
+    def list_changed_since(self, board_id: int, since: int) -> ListType[List]:
+        """
+        Lista as listas de um board alteradas depois de uma versão.
+
+        Args:
+            board_id: ID do board
+            since: Versão já conhecida pelo cliente
+
+        Returns:
+            Listas alteradas, ordenadas por posição
+        """
+        return self.db.query(List).filter(
+            List.board_id == board_id,
+            List.change_version > since
+        ).order_by(List.position).all()
+
     def count_by_board(self, board_id: int) -> int:
         """
         Conta listas de um board específico.
@@ -96,7 +113,8 @@ class ListRepository:
             name=list_data.name,
             color=list_data.color,
             board_id=list_data.board_id,
-            position=position
+            position=position,
+            change_version=BoardRepository(self.db).next_change_version(list_data.board_id)
         )
 
         self.db.add(new_list)
@@ -122,6 +140,7 @@ class ListRepository:
         for field, value in update_data.items():
             setattr(list_obj, field, value)
 
+        list_obj.change_version = BoardRepository(self.db).next_change_version(list_obj.board_id)
         self.db.commit()
         self.db.refresh(list_obj)
 
@@ -134,6 +153,12 @@ class ListRepository:
         Args:
             list_obj: Lista a ser deletada
         """
+        # Registra a exclusão para a sincronização incremental do board
+        # (os cards da lista são removidos junto e não ganham tombstone próprio)
+        board_repository = BoardRepository(self.db)
+        version = board_repository.next_change_version(list_obj.board_id)
+        board_repository.add_tombstone(list_obj.board_id, "list", list_obj.id, version)
+
         self.db.delete(list_obj)
         self.db.commit()
 
@@ -155,6 +180,9 @@ class ListRepository:
         if old_position == new_position:
             return list_obj
 
+        # Todas as listas deslocadas recebem a mesma nova versão
+        version = BoardRepository(self.db).next_change_version(board_id)
+
         # Move outras listas para abrir espaço
         if new_position < old_position:
             # Movendo para cima: incrementa posição das listas entre new e old
@@ -162,17 +190,18 @@ class ListRepository:
                 List.board_id == board_id,
                 List.position >= new_position,
                 List.position < old_position
-            ).update({List.position: List.position + 1})
+            ).update({List.position: List.position + 1, List.change_version: version})
         else:
             # Movendo para baixo: decrementa posição das listas entre old e new
             self.db.query(List).filter(
                 List.board_id == board_id,
                 List.position > old_position,
                 List.position <= new_position
-            ).update({List.position: List.position - 1})
+            ).update({List.position: List.position - 1, List.change_version: version})
 
         # Atualiza a posição da lista
         list_obj.position = new_position
+        list_obj.change_version = version
         self.db.commit()
         self.db.refresh(list_obj)
 
@@ -187,13 +216,15 @@ class ListRepository:
             target_board_id: ID do board de destino
         """
         source_lists = self.list_by_board(source_board_id)
+        version = BoardRepository(self.db).next_change_version(target_board_id)
 
         for source_list in source_lists:
             new_list = List(
                 name=source_list.name,
                 color=source_list.color,
                 board_id=target_board_id,
-                position=source_list.position
+                position=source_list.position,
+                change_version=version
             )
             self.db.add(new_list)
 
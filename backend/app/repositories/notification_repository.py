@@ -1,11 +1,15 @@
 """
 Notification Repository - Camada de acesso a dados para notificações.
 """
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple
+from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, insert
 
+from app.core.events import event_broker, user_channel
+from app.db.session import after_commit, commit
 from app.models.notification import Notification
+from app.utils.pagination import CountMode, count_rows, paginate_keyset
 
 
 class NotificationRepository:
@@ -35,8 +39,9 @@ class NotificationRepository:
         user_id: int,
         page: int = 1,
         page_size: int = 20,
-        unread_only: bool = False
-    ) -> tuple[List[Notification], int]:
+        unread_only: bool = False,
+        count_mode: CountMode = CountMode.EXACT
+    ) -> tuple[List[Notification], Optional[int]]:
         """
         Lista notificações de um usuário com paginação.
 
@@ -45,6 +50,7 @@ class NotificationRepository:
             page: Número da página
             page_size: Tamanho da página
             unread_only: Se True, retorna apenas não lidas
+            count_mode: Modo de contagem do total (exata, estimada ou nenhuma)
 
         Returns:
             Tupla (lista de notificações, total)
@@ -57,7 +63,7 @@ class NotificationRepository:
             query = query.filter(Notification.is_read == False)
 
         # Total de registros
-        total = query.count()
+        total = count_rows(query, count_mode)
 
         # Busca paginada (ordenado por created_at DESC - mais recentes primeiro)
         notifications = query.order_by(
@@ -68,6 +74,46 @@ class NotificationRepository:
 
         return notifications, total
 
+    def list_by_user_after(
+        self,
+        user_id: int,
+        after: Optional[str] = None,
+        page_size: int = 20,
+        unread_only: bool = False,
+        count_mode: CountMode = CountMode.EXACT
+    ) -> Tuple[List[Notification], Optional[str], Optional[int]]:
+        """
+        Lista notificações de um usuário por cursor (keyset sobre created_at e id).
+
+        Args:
+            user_id: ID do usuário
+            after: Cursor da página anterior (None = primeira página)
+            page_size: Tamanho da página
+            unread_only: Se True, retorna apenas não lidas
+            count_mode: Modo de contagem do total (exata, estimada ou nenhuma)
+
+        Returns:
+            Tupla (lista de notificações, cursor da próxima página, total)
+        """
+        query = self.db.query(Notification).filter(
+            Notification.user_id == user_id
+        )
+
+        if unread_only:
+            query = query.filter(Notification.is_read == False)
+
+        total = count_rows(query, count_mode)
+
+        # Mais recentes primeiro
+        notifications, next_cursor = paginate_keyset(
+            query,
+            [(Notification.created_at, True), (Notification.id, True)],
+            after,
+            page_size
+        )
+
+        return notifications, next_cursor, total
+
     def count_unread_by_user(self, user_id: int) -> int:
         """
         Conta notificações não lidas de um usuário.
@@ -118,8 +164,10 @@ class NotificationRepository:
         """
         notification = Notification(**data)
         self.db.add(notification)
-        self.db.commit()
+        commit(self.db)
         self.db.refresh(notification)
+
+        self._publish(notification)
         return notification
 
     def create_bulk(self, notifications_data: List[dict]) -> List[Notification]:
@@ -134,14 +182,102 @@ class NotificationRepository:
         """
         notifications = [Notification(**data) for data in notifications_data]
         self.db.add_all(notifications)
-        self.db.commit()
+        commit(self.db)
 
         # Refresh todas
         for notification in notifications:
             self.db.refresh(notification)
+            self._publish(notification)
 
         return notifications
 
+    def insert_bulk(self, notifications_data: List[dict]) -> int:
+        """
+        Grava várias notificações com um único INSERT (sem montar objetos
+        Notification) e as envia em tempo real depois do commit.
+
+        Args:
+            notifications_data: Lista de dados de notificações
+
+        Returns:
+            Quantidade de notificações gravadas
+        """
+        if not notifications_data:
+            return 0
+
+        now = datetime.utcnow()
+        rows = [
+            {"is_read": False, "created_at": now, "updated_at": now, **data}
+            for data in notifications_data
+        ]
+        inserted = self.db.execute(
+            insert(Notification).returning(
+                Notification.id,
+                Notification.user_id,
+                Notification.notification_type,
+                Notification.title,
+                Notification.message,
+                Notification.icon,
+                Notification.color,
+                Notification.notification_metadata,
+                Notification.created_at
+            ),
+            rows
+        ).all()
+        commit(self.db)
+
+        for row in inserted:
+            self._publish(row)
+        return len(inserted)
+
+    def find_users_notified_since(
+        self,
+        notification_type: str,
+        since: datetime,
+        user_ids: List[int]
+    ) -> Set[int]:
+        """
+        Retorna quais usuários já receberam uma notificação do tipo desde uma data.
+
+        Args:
+            notification_type: Tipo da notificação
+            since: Data inicial
+            user_ids: Usuários a verificar
+
+        Returns:
+            Conjunto de IDs dos usuários já notificados
+        """
+        if not user_ids:
+            return set()
+
+        rows = self.db.query(Notification.user_id).filter(
+            Notification.notification_type == notification_type,
+            Notification.created_at >= since,
+            Notification.user_id.in_(user_ids)
+        ).distinct()
+        return {user_id for (user_id,) in rows}
+
+    def _publish(self, notification: Notification) -> None:
+        """
+        Envia a notificação em tempo real para as conexões do usuário
+        (depois do commit, dentro de um bloco single_transaction).
+
+        Args:
+            notification: Notificação já gravada
+        """
+        channel = user_channel(notification.user_id)
+        data = {
+            "id": notification.id,
+            "notification_type": notification.notification_type,
+            "title": notification.title,
+            "message": notification.message,
+            "icon": notification.icon,
+            "color": notification.color,
+            "metadata": notification.notification_metadata,
+            "created_at": notification.created_at
+        }
+        after_commit(self.db, lambda: event_broker.publish(channel, "notification", data))
+
     def mark_as_read(self, notification_id: int) -> Optional[Notification]:
         """
         Marca uma notificação como lida.
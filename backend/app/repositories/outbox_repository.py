@@ -0,0 +1,253 @@
+"""
+Outbox Repository - Camada de acesso a dados para o outbox de eventos.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+
+from app.models.outbox_event import OutboxEvent, OutboxEventStatus, OutboxEventType
+
+
+class OutboxRepository:
+    """
+    Repository para operações de banco de dados relacionadas ao outbox.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(
+        self,
+        event_type: str,
+        payload: Dict[str, Any],
+        idempotency_key: str
+    ) -> OutboxEvent:
+        """
+        Adiciona um evento à sessão, sem commit: ele é gravado no mesmo
+        commit da operação que o originou.
+
+        Args:
+            event_type: Tipo do evento
+            payload: Dados do evento
+            idempotency_key: Chave única da operação
+
+        Returns:
+            OutboxEvent (ainda não gravado)
+        """
+        event = OutboxEvent(
+            event_type=event_type,
+            payload=payload,
+            idempotency_key=idempotency_key,
+            status=OutboxEventStatus.PENDING,
+            attempts=0,
+            completed_steps=[],
+            available_at=datetime.utcnow()
+        )
+        self.db.add(event)
+        return event
+
+    def add_tasks(self, tasks: List[Tuple[str, Dict[str, Any], str]]) -> int:
+        """
+        Adiciona publicações de tasks do Celery à sessão, sem commit.
+        Tasks com chave de idempotência já registrada são ignoradas.
+
+        Args:
+            tasks: Lista de (nome da task, kwargs, chave de idempotência)
+
+        Returns:
+            Quantidade de tasks adicionadas
+        """
+        keys = [key for _, _, key in tasks]
+        existing = set()
+        for start in range(0, len(keys), 500):
+            existing.update(
+                key for (key,) in self.db.query(OutboxEvent.idempotency_key).filter(
+                    OutboxEvent.idempotency_key.in_(keys[start:start + 500])
+                )
+            )
+
+        added = 0
+        for task_name, kwargs, key in tasks:
+            if key in existing:
+                continue
+            existing.add(key)
+            self.add(OutboxEventType.CELERY_TASK, {"task": task_name, "kwargs": kwargs}, key)
+            added += 1
+        return added
+
+    def find_by_idempotency_key(self, idempotency_key: str) -> Optional[OutboxEvent]:
+        """
+        Busca um evento pela chave de idempotência.
+
+        Args:
+            idempotency_key: Chave do evento
+
+        Returns:
+            OutboxEvent ou None
+        """
+        return self.db.query(OutboxEvent).filter(
+            OutboxEvent.idempotency_key == idempotency_key
+        ).first()
+
+    def claim_ready(
+        self,
+        limit: int,
+        lease: timedelta,
+        event_types: Optional[List[str]] = None
+    ) -> List[OutboxEvent]:
+        """
+        Reserva eventos prontos para processar (pendentes ou com reserva expirada).
+
+        Os eventos ficam com status processing até now + lease; se o worker
+        morrer, voltam a ficar disponíveis quando a reserva expira.
+
+        Args:
+            limit: Quantidade máxima de eventos
+            lease: Duração da reserva
+            event_types: Restringe a alguns tipos de evento (opcional)
+
+        Returns:
+            Lista de OutboxEvent reservados, em ordem de criação
+        """
+        now = datetime.utcnow()
+
+        query = self.db.query(OutboxEvent.id).filter(
+            OutboxEvent.status.in_([OutboxEventStatus.PENDING, OutboxEventStatus.PROCESSING]),
+            OutboxEvent.available_at <= now
+        )
+        if event_types:
+            query = query.filter(OutboxEvent.event_type.in_(event_types))
+
+        # SKIP LOCKED: workers concorrentes reservam eventos diferentes
+        event_ids = [
+            event_id for (event_id,) in query.order_by(OutboxEvent.id).limit(limit).with_for_update(
+                skip_locked=True
+            ).all()
+        ]
+        if not event_ids:
+            self.db.commit()
+            return []
+
+        self.db.query(OutboxEvent).filter(OutboxEvent.id.in_(event_ids)).update(
+            {
+                OutboxEvent.status: OutboxEventStatus.PROCESSING,
+                OutboxEvent.available_at: now + lease,
+                OutboxEvent.attempts: OutboxEvent.attempts + 1
+            },
+            synchronize_session="fetch"
+        )
+        self.db.commit()
+
+        return self.db.query(OutboxEvent).filter(
+            OutboxEvent.id.in_(event_ids)
+        ).order_by(OutboxEvent.id).all()
+
+    def mark_step(self, event: OutboxEvent, step: str) -> None:
+        """
+        Registra uma etapa concluída do evento (sem commit: gravada junto
+        com o commit da própria etapa).
+
+        Args:
+            event: Evento
+            step: Nome da etapa
+        """
+        event.completed_steps = [*(event.completed_steps or []), step]
+
+    def mark_done(self, event: OutboxEvent) -> OutboxEvent:
+        """
+        Marca o evento como processado.
+
+        Args:
+            event: Evento
+
+        Returns:
+            OutboxEvent atualizado
+        """
+        event.status = OutboxEventStatus.DONE
+        event.processed_at = datetime.utcnow()
+        event.last_error = None
+        self.db.commit()
+        return event
+
+    def mark_done_bulk(self, event_ids: List[int]) -> None:
+        """
+        Marca vários eventos como processados (um único UPDATE).
+
+        Args:
+            event_ids: IDs dos eventos
+        """
+        if not event_ids:
+            return
+        self.db.query(OutboxEvent).filter(OutboxEvent.id.in_(event_ids)).update(
+            {
+                OutboxEvent.status: OutboxEventStatus.DONE,
+                OutboxEvent.processed_at: datetime.utcnow(),
+                OutboxEvent.last_error: None
+            },
+            synchronize_session="fetch"
+        )
+        self.db.commit()
+
+    def release(self, event_ids: List[int]) -> None:
+        """
+        Devolve eventos reservados sem contar a tentativa (não foram processados).
+
+        Args:
+            event_ids: IDs dos eventos
+        """
+        if not event_ids:
+            return
+        self.db.query(OutboxEvent).filter(OutboxEvent.id.in_(event_ids)).update(
+            {
+                OutboxEvent.status: OutboxEventStatus.PENDING,
+                OutboxEvent.available_at: datetime.utcnow(),
+                OutboxEvent.attempts: OutboxEvent.attempts - 1
+            },
+            synchronize_session="fetch"
+        )
+        self.db.commit()
+
+    def mark_failed(
+        self,
+        event: OutboxEvent,
+        error: str,
+        max_attempts: int,
+        retry_delay: timedelta
+    ) -> OutboxEvent:
+        """
+        Registra uma falha: agenda nova tentativa ou encerra o evento.
+
+        Args:
+            event: Evento
+            error: Mensagem de erro
+            max_attempts: Tentativas permitidas
+            retry_delay: Espera até a próxima tentativa
+
+        Returns:
+            OutboxEvent atualizado
+        """
+        event.last_error = error
+        if event.attempts >= max_attempts:
+            event.status = OutboxEventStatus.FAILED
+        else:
+            event.status = OutboxEventStatus.PENDING
+            event.available_at = datetime.utcnow() + retry_delay
+        self.db.commit()
+        return event
+
+    def delete_processed_before(self, before: datetime) -> int:
+        """
+        Remove eventos processados antes de uma data.
+
+        Args:
+            before: Data limite
+
+        Returns:
+            Quantidade de eventos removidos
+        """
+        deleted = self.db.query(OutboxEvent).filter(
+            OutboxEvent.status == OutboxEventStatus.DONE,
+            OutboxEvent.processed_at < before
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
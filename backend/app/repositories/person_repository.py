@@ -2,12 +2,13 @@
 Person Repository - Operações de acesso a dados de pessoas/contatos.
 Implementa o padrão Repository para isolamento da camada de dados.
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 
 from app.models.person import Person
 from app.schemas.person import PersonCreate, PersonUpdate
+from app.utils.pagination import CountMode, count_rows, paginate_keyset
 
 
 class PersonRepository:
@@ -70,28 +71,24 @@ class PersonRepository:
             Person.is_active == True
         ).order_by(Person.name).all()
 
-    def list_all(
+    def _filtered_query(
         self,
-        skip: int = 0,
-        limit: int = 100,
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
         organization_id: Optional[int] = None,
         owner_id: Optional[int] = None
-    ) -> List[Person]:
+    ):
         """
-        Lista todas as pessoas do sistema.
+        Monta a query de pessoas com os filtros da listagem (sem ordenação).
 
         Args:
-            skip: Número de registros para pular (paginação)
-            limit: Limite de registros a retornar
             is_active: Filtro por status ativo (opcional)
             search: Termo de busca (nome, email, telefone, cargo)
             organization_id: Filtro por organização
             owner_id: Filtro por responsável
 
         Returns:
-            Lista de pessoas
+            Query de Person
         """
         query = self.db.query(Person)
 
@@ -125,63 +122,91 @@ class PersonRepository:
                 )
             )
 
+        return query
+
+    def list_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None,
+        organization_id: Optional[int] = None,
+        owner_id: Optional[int] = None
+    ) -> List[Person]:
+        """
+        Lista todas as pessoas do sistema.
+
+        Args:
+            skip: Número de registros para pular (paginação)
+            limit: Limite de registros a retornar
+            is_active: Filtro por status ativo (opcional)
+            search: Termo de busca (nome, email, telefone, cargo)
+            organization_id: Filtro por organização
+            owner_id: Filtro por responsável
+
+        Returns:
+            Lista de pessoas
+        """
+        query = self._filtered_query(is_active, search, organization_id, owner_id)
+
         # Ordenação: alfabética por nome
         query = query.order_by(Person.name)
 
         return query.offset(skip).limit(limit).all()
 
-    def count_all(
+    def list_all_after(
         self,
+        after: Optional[str] = None,
+        limit: int = 100,
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
         organization_id: Optional[int] = None,
         owner_id: Optional[int] = None
-    ) -> int:
+    ) -> Tuple[List[Person], Optional[str]]:
         """
-        Conta todas as pessoas do sistema.
+        Lista pessoas por cursor (keyset sobre nome e id).
 
         Args:
+            after: Cursor da página anterior (None = primeira página)
+            limit: Limite de registros a retornar
             is_active: Filtro por status ativo (opcional)
             search: Termo de busca (nome, email, telefone, cargo)
             organization_id: Filtro por organização
             owner_id: Filtro por responsável
 
         Returns:
-            Contagem de pessoas
+            Tupla (lista de pessoas, cursor da próxima página)
         """
-        query = self.db.query(func.count(Person.id))
+        query = self._filtered_query(is_active, search, organization_id, owner_id)
+        return paginate_keyset(query, [(Person.name, False), (Person.id, False)], after, limit)
 
-        # Filtro de status
-        if is_active is not None:
-            query = query.filter(Person.is_active == is_active)
-
-        # Filtro de organização
-        if organization_id:
-            query = query.filter(Person.organization_id == organization_id)
-
-        # Filtro de responsável
-        if owner_id:
-            query = query.filter(Person.owner_id == owner_id)
+    def count_all(
+        self,
+        is_active: Optional[bool] = None,
+        search: Optional[str] = None,
+        organization_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+        mode: CountMode = CountMode.EXACT
+    ) -> Optional[int]:
+        """
+        Conta todas as pessoas do sistema.
 
-        # Busca por termo
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Person.name.ilike(search_term),
-                    Person.first_name.ilike(search_term),
-                    Person.last_name.ilike(search_term),
-                    Person.email.ilike(search_term),
-                    Person.email_commercial.ilike(search_term),
-                    Person.email_personal.ilike(search_term),
-                    Person.phone.ilike(search_term),
-                    Person.phone_commercial.ilike(search_term),
-                    Person.phone_whatsapp.ilike(search_term),
-                    Person.position.ilike(search_term)
-                )
-            )
+        Args:
+            is_active: Filtro por status ativo (opcional)
+            search: Termo de busca (nome, email, telefone, cargo)
+            organization_id: Filtro por organização
+            owner_id: Filtro por responsável
+            mode: Modo de contagem (exata, estimada ou nenhuma)
 
-        return query.scalar()
+        Returns:
+            Contagem de pessoas (None se mode=none)
+        """
+        query = self._filtered_query(is_active, search, organization_id, owner_id)
+        return count_rows(
+            query,
+            mode,
+            exact_count=lambda: query.with_entities(func.count(Person.id)).scalar()
+        )
 
     def exists_email(self, email: str, exclude_id: Optional[int] = None) -> bool:
         """
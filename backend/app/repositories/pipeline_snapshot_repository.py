@@ -0,0 +1,247 @@
+"""
+Pipeline Snapshot Repository - Manutenção do consolidado diário do pipeline.
+Recalcula os dias afetados por alterações em cards desde a última execução.
+"""
+from typing import Optional, List, Iterable, Tuple, Dict, Any
+from datetime import datetime, date, time, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_, or_, case, literal, insert, select, union_all, DateTime
+
+from app.core.cache import report_cache
+from app.models.card import Card
+from app.models.list import List as BoardList
+from app.models.pipeline_daily_snapshot import PipelineDailySnapshot
+from app.models.pipeline_dirty_day import PipelineDirtyDay
+
+
+def _as_date(value) -> Optional[date]:
+    """Converte o resultado de func.date() (date no PostgreSQL, str no SQLite)."""
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _day_ranges(days: Iterable[date]) -> List[Tuple[datetime, datetime]]:
+    """
+    Agrupa dias consecutivos em intervalos [início, fim) de datetime.
+
+    Args:
+        days: Dias a agrupar
+
+    Returns:
+        Lista de intervalos semiabertos
+    """
+    ranges = []
+    for day in sorted(set(days)):
+        start = datetime.combine(day, time.min)
+        end = start + timedelta(days=1)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+class PipelineSnapshotRepository:
+    """
+    Repository para o consolidado diário do pipeline (pipeline_daily_snapshots).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_last_refresh(self) -> Optional[datetime]:
+        """
+        Retorna o momento da última atualização do consolidado.
+
+        Returns:
+            datetime ou None se o consolidado nunca foi gerado
+        """
+        return self.db.query(func.max(PipelineDailySnapshot.refreshed_at)).scalar()
+
+    def find_touched_days(self, since: datetime) -> List[date]:
+        """
+        Lista os dias cujos totais podem ter mudado desde um instante.
+
+        Um card alterado afeta o dia em que foi criado e o dia em que foi fechado.
+        Os dias que os cards atuais não mostram mais (fechamento sobrescrito
+        ou desfeito, card excluído) vêm de take_dirty_days.
+
+        Args:
+            since: Instante da última atualização
+
+        Returns:
+            Lista de dias a recalcular
+        """
+        rows = self.db.query(
+            func.date(Card.created_at),
+            func.date(Card.closed_at)
+        ).filter(
+            Card.updated_at >= since
+        ).distinct().all()
+
+        days = set()
+        for created_day, closed_day in rows:
+            days.update(day for day in (_as_date(created_day), _as_date(closed_day)) if day)
+        return sorted(days)
+
+    def take_dirty_days(self) -> List[date]:
+        """
+        Lê e apaga os dias pendentes registrados na gravação dos cards (sem
+        commit: os registros só somem junto com o recálculo desses dias).
+
+        Returns:
+            Lista de dias a recalcular
+        """
+        rows = self.db.query(PipelineDirtyDay.id, PipelineDirtyDay.day).all()
+        if rows:
+            self.db.query(PipelineDirtyDay).filter(
+                PipelineDirtyDay.id.in_([row_id for row_id, _ in rows])
+            ).delete(synchronize_session=False)
+        return sorted({day for _, day in rows})
+
+    def refresh_days(self, days: Optional[List[date]], refreshed_at: datetime) -> None:
+        """
+        Recalcula o consolidado dos dias informados (apaga e reinsere).
+
+        Todo o cálculo é feito no banco com um único INSERT ... SELECT.
+
+        Args:
+            days: Dias a recalcular (None recalcula o histórico inteiro)
+            refreshed_at: Marca de atualização gravada nos registros
+        """
+        delete_query = self.db.query(PipelineDailySnapshot)
+        created_filter = []
+        closed_filter = []
+
+        if days is not None:
+            if not days:
+                return
+            ranges = _day_ranges(days)
+            delete_query = delete_query.filter(PipelineDailySnapshot.snapshot_date.in_(days))
+            created_filter.append(or_(*[
+                and_(Card.created_at >= start, Card.created_at < end) for start, end in ranges
+            ]))
+            closed_filter.append(or_(*[
+                and_(Card.closed_at >= start, Card.closed_at < end) for start, end in ranges
+            ]))
+
+        delete_query.delete(synchronize_session=False)
+
+        value = func.coalesce(Card.value, 0)
+        is_open = Card.is_won == 0
+        is_won = Card.is_won == 1
+        is_lost = Card.is_won == -1
+
+        # Contribuição de cada card no dia de criação
+        created_rows = select(
+            func.date(Card.created_at).label("day"),
+            BoardList.board_id.label("board_id"),
+            Card.list_id.label("list_id"),
+            Card.assigned_to_id.label("assigned_to_id"),
+            literal(1).label("created_count"),
+            value.label("created_value"),
+            literal(0).label("won_count"),
+            literal(0).label("won_value"),
+            literal(0).label("won_cycle_days"),
+            literal(0).label("lost_count"),
+            literal(0).label("lost_value"),
+            case((is_open, 1), else_=0).label("open_count"),
+            case((is_open, value), else_=0).label("open_value"),
+        ).join(
+            BoardList, Card.list_id == BoardList.id
+        ).where(*created_filter)
+
+        # Contribuição de cada card no dia de fechamento
+        closed_rows = select(
+            func.date(Card.closed_at).label("day"),
+            BoardList.board_id.label("board_id"),
+            Card.list_id.label("list_id"),
+            Card.assigned_to_id.label("assigned_to_id"),
+            literal(0).label("created_count"),
+            literal(0).label("created_value"),
+            case((is_won, 1), else_=0).label("won_count"),
+            case((is_won, value), else_=0).label("won_value"),
+            case(
+                (is_won, func.extract('epoch', Card.closed_at - Card.created_at) / 86400),
+                else_=0
+            ).label("won_cycle_days"),
+            case((is_lost, 1), else_=0).label("lost_count"),
+            case((is_lost, value), else_=0).label("lost_value"),
+            literal(0).label("open_count"),
+            literal(0).label("open_value"),
+        ).join(
+            BoardList, Card.list_id == BoardList.id
+        ).where(
+            Card.is_won != 0,
+            Card.closed_at.isnot(None),
+            *closed_filter
+        )
+
+        contributions = union_all(created_rows, closed_rows).subquery()
+        c = contributions.c
+
+        aggregated = select(
+            c.day,
+            c.board_id,
+            c.list_id,
+            c.assigned_to_id,
+            func.sum(c.created_count),
+            func.sum(c.created_value),
+            func.sum(c.won_count),
+            func.sum(c.won_value),
+            func.sum(c.won_cycle_days),
+            func.sum(c.lost_count),
+            func.sum(c.lost_value),
+            func.sum(c.open_count),
+            func.sum(c.open_value),
+            literal(refreshed_at, DateTime),
+        ).group_by(
+            c.day, c.board_id, c.list_id, c.assigned_to_id
+        )
+
+        self.db.execute(
+            insert(PipelineDailySnapshot).from_select(
+                [
+                    "snapshot_date", "board_id", "list_id", "assigned_to_id",
+                    "created_count", "created_value",
+                    "won_count", "won_value", "won_cycle_days",
+                    "lost_count", "lost_value",
+                    "open_count", "open_value",
+                    "refreshed_at",
+                ],
+                aggregated,
+                include_defaults=False
+            )
+        )
+        self.db.commit()
+
+    def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Atualiza o consolidado de forma incremental.
+
+        Recalcula apenas os dias tocados por cards alterados desde a última
+        execução e os dias pendentes (PipelineDirtyDay). Se o consolidado
+        estiver vazio (ou full=True), reconstrói tudo.
+
+        Args:
+            full: Força a reconstrução completa
+
+        Returns:
+            Dict com o modo executado e a quantidade de dias recalculados
+        """
+        started_at = datetime.utcnow()
+        last_refresh = None if full else self.get_last_refresh()
+
+        if last_refresh is None:
+            self.db.query(PipelineDirtyDay).delete(synchronize_session=False)
+            self.refresh_days(None, started_at)
+            report_cache.invalidate_all()
+            return {"mode": "full", "days_refreshed": None}
+
+        days = sorted(set(self.find_touched_days(last_refresh)) | set(self.take_dirty_days()))
+        self.refresh_days(days, started_at)
+        if days:
+            # Relatórios em cache foram calculados sobre o consolidado anterior
+            report_cache.invalidate_all()
+        return {"mode": "incremental", "days_refreshed": len(days)}
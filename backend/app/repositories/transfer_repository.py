@@ -5,10 +5,14 @@ Gerencia transferências de cards e aprovações.
 from typing import Optional, List
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import (
+    and_, or_, func, case, cast, insert, literal, null, select, tuple_, union_all, update,
+    Integer, Row, String
+)
 
 from app.models.card_transfer import CardTransfer
 from app.models.transfer_approval import TransferApproval
+from app.models.transfer_batch import TransferBatch
 from app.schemas.transfer import CardTransferCreate
 
 
@@ -59,6 +63,30 @@ class TransferRepository:
         self.db.refresh(transfer)
         return transfer
 
+    def create_bulk(self, transfers_data: List[dict]) -> List[Row]:
+        """
+        Grava várias transferências com um único INSERT (sem commit).
+
+        Args:
+            transfers_data: Lista de dados das transferências (colunas de CardTransfer)
+
+        Returns:
+            Linhas gravadas (id, card_id, created_at, updated_at), ordenadas por id
+        """
+        if not transfers_data:
+            return []
+
+        rows = self.db.execute(
+            insert(CardTransfer).returning(
+                CardTransfer.id,
+                CardTransfer.card_id,
+                CardTransfer.created_at,
+                CardTransfer.updated_at
+            ),
+            transfers_data
+        ).all()
+        return sorted(rows, key=lambda row: row.id)
+
     def find_by_id(self, transfer_id: int) -> Optional[CardTransfer]:
         """
         Busca uma transferência por ID.
@@ -304,6 +332,159 @@ class TransferRepository:
             for user_id, name, count in results
         ]
 
+    def get_statistics_rollup(
+        self,
+        today_start: datetime,
+        week_start: datetime,
+        month_start: datetime,
+        top_limit: int = 5
+    ) -> dict:
+        """
+        Calcula todas as estatísticas de transferências em uma única query.
+
+        A CTE transfer_rollup traz o total e as concluídas por período para
+        cada motivo, remetente, destinatário e no geral. No PostgreSQL é um
+        GROUP BY GROUPING SETS (uma leitura de card_transfers); nos demais
+        bancos, um UNION ALL dos mesmos agrupamentos. Os rankings e as
+        aprovações pendentes são lidos da CTE na mesma query.
+
+        Args:
+            today_start: Início do dia
+            week_start: Início da semana
+            month_start: Início do mês
+            top_limit: Tamanho dos rankings de remetentes e destinatários
+
+        Returns:
+            Dict com os campos de TransferStatistics
+        """
+        from app.models.user import User
+
+        rollup = self._transfer_rollup(today_start, week_start, month_start)
+        no_text = cast(null(), String)
+        no_int = cast(null(), Integer)
+
+        def top_users(kind: str):
+            return select(
+                select(
+                    rollup.c.kind,
+                    rollup.c.reason,
+                    rollup.c.user_id,
+                    User.name.label("user_name"),
+                    rollup.c.total,
+                    rollup.c.today,
+                    rollup.c.week,
+                    rollup.c.month
+                ).join(User, User.id == rollup.c.user_id).where(
+                    rollup.c.kind == kind
+                ).order_by(rollup.c.total.desc(), rollup.c.user_id).limit(top_limit).subquery()
+            )
+
+        statement = union_all(
+            select(
+                rollup.c.kind,
+                rollup.c.reason,
+                rollup.c.user_id,
+                no_text.label("user_name"),
+                rollup.c.total,
+                rollup.c.today,
+                rollup.c.week,
+                rollup.c.month
+            ).where(rollup.c.kind.in_(["total", "reason"])),
+            top_users("receiver"),
+            top_users("sender"),
+            select(
+                literal("pending"),
+                no_text,
+                no_int,
+                no_text,
+                func.count(),
+                no_int,
+                no_int,
+                no_int
+            ).select_from(TransferApproval).where(TransferApproval.status == "pending")
+        )
+
+        stats = {
+            "total_transfers": 0,
+            "pending_approvals": 0,
+            "completed_today": 0,
+            "completed_this_week": 0,
+            "completed_this_month": 0,
+            "by_reason": {},
+            "top_receivers": [],
+            "top_senders": []
+        }
+        for row in self.db.execute(statement):
+            if row.kind == "total":
+                stats["total_transfers"] = int(row.total)
+                stats["completed_today"] = int(row.today or 0)
+                stats["completed_this_week"] = int(row.week or 0)
+                stats["completed_this_month"] = int(row.month or 0)
+            elif row.kind == "pending":
+                stats["pending_approvals"] = int(row.total)
+            elif row.kind == "reason":
+                stats["by_reason"][row.reason] = int(row.total)
+            else:
+                stats[f"top_{row.kind}s"].append(
+                    {"user_id": row.user_id, "user_name": row.user_name, "count": int(row.total)}
+                )
+
+        for key in ("top_receivers", "top_senders"):
+            stats[key].sort(key=lambda item: (-item["count"], item["user_id"]))
+        return stats
+
+    def _transfer_rollup(self, today_start: datetime, week_start: datetime, month_start: datetime):
+        """
+        CTE (kind, reason, user_id, total, today, week, month) com as
+        contagens por motivo, remetente, destinatário e total geral.
+        """
+        def completed_since(start: datetime):
+            return func.sum(case(
+                (and_(CardTransfer.status == "completed", CardTransfer.created_at >= start), 1),
+                else_=0
+            ))
+
+        counts = [
+            func.count().label("total"),
+            completed_since(today_start).label("today"),
+            completed_since(week_start).label("week"),
+            completed_since(month_start).label("month")
+        ]
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            # GROUPING() marca com 1 as colunas fora do agrupamento da linha
+            grouping = func.grouping(CardTransfer.reason, CardTransfer.from_user_id, CardTransfer.to_user_id)
+            return select(
+                case(
+                    (grouping == 3, "reason"),
+                    (grouping == 5, "sender"),
+                    (grouping == 6, "receiver"),
+                    else_="total"
+                ).label("kind"),
+                CardTransfer.reason,
+                func.coalesce(CardTransfer.from_user_id, CardTransfer.to_user_id).label("user_id"),
+                *counts
+            ).group_by(
+                func.grouping_sets(
+                    tuple_(CardTransfer.reason),
+                    tuple_(CardTransfer.from_user_id),
+                    tuple_(CardTransfer.to_user_id),
+                    tuple_()
+                )
+            ).cte("transfer_rollup")
+
+        # Sem GROUPING SETS: cada agrupamento é um SELECT; as concluídas por
+        # período só interessam no total geral, os demais usam só count()
+        no_text = cast(null(), String)
+        no_int = cast(null(), Integer)
+        only_total = [func.count(), no_int, no_int, no_int]
+        return union_all(
+            select(literal("total").label("kind"), no_text.label("reason"), no_int.label("user_id"), *counts),
+            select(literal("reason"), CardTransfer.reason, no_int, *only_total).group_by(CardTransfer.reason),
+            select(literal("sender"), no_text, CardTransfer.from_user_id, *only_total).group_by(CardTransfer.from_user_id),
+            select(literal("receiver"), no_text, CardTransfer.to_user_id, *only_total).group_by(CardTransfer.to_user_id)
+        ).cte("transfer_rollup")
+
     # ========== APPROVALS ==========
 
     def create_approval(
@@ -335,6 +516,28 @@ class TransferRepository:
         self.db.refresh(approval)
         return approval
 
+    def create_approvals_bulk(self, transfer_ids: List[int], expires_at: datetime) -> None:
+        """
+        Cria aprovações pendentes (sem aprovador definido) para várias
+        transferências com um único INSERT (sem commit).
+
+        Args:
+            transfer_ids: IDs das transferências
+            expires_at: Data de expiração
+        """
+        if not transfer_ids:
+            return
+
+        self.db.execute(insert(TransferApproval), [
+            {
+                "transfer_id": transfer_id,
+                "approver_id": None,
+                "status": "pending",
+                "expires_at": expires_at
+            }
+            for transfer_id in transfer_ids
+        ])
+
     def find_approval_by_id(self, approval_id: int) -> Optional[TransferApproval]:
         """
         Busca uma aprovação por ID.
@@ -446,26 +649,100 @@ class TransferRepository:
         self.db.refresh(approval)
         return approval
 
-    def expire_old_approvals(self) -> int:
+    def expire_old_approvals(self, now: Optional[datetime] = None) -> List[Row]:
         """
-        Expira aprovações antigas que passaram do prazo.
+        Expira as aprovações pendentes que passaram do prazo e rejeita as
+        transferências correspondentes, sem carregar objetos (sem commit).
+
+        No PostgreSQL é um único comando: o UPDATE das aprovações vira uma
+        CTE cujo RETURNING alimenta o UPDATE das transferências. Nos demais
+        bancos são dois UPDATE ... RETURNING na mesma transação. Só linhas
+        ainda pendentes são alteradas, então repetir a execução não tem efeito.
+
+        Args:
+            now: Momento de referência (padrão: agora)
 
         Returns:
-            Quantidade de aprovações expiradas
+            Linhas (id, card_id, from_user_id, card_title) das transferências expiradas
+        """
+        from app.models.card import Card
+
+        now = now or datetime.utcnow()
+        expire_approvals = update(TransferApproval).where(
+            TransferApproval.status == "pending",
+            TransferApproval.expires_at <= now
+        ).values(
+            status="expired",
+            decided_at=now,
+            updated_at=now
+        ).returning(TransferApproval.transfer_id)
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            expired = expire_approvals.cte("expired_approvals")
+            transfer_ids = select(expired.c.transfer_id).scalar_subquery()
+        else:
+            transfer_ids = self.db.execute(expire_approvals).scalars().all()
+            if not transfer_ids:
+                return []
+
+        card_title = select(Card.title).where(Card.id == CardTransfer.card_id).scalar_subquery()
+        return self.db.execute(
+            update(CardTransfer).where(
+                CardTransfer.id.in_(transfer_ids),
+                CardTransfer.status == "pending_approval"
+            ).values(
+                status="rejected",
+                updated_at=now
+            ).returning(
+                CardTransfer.id,
+                CardTransfer.card_id,
+                CardTransfer.from_user_id,
+                card_title.label("card_title")
+            ).execution_options(synchronize_session=False)
+        ).all()
+
+    # ========== BATCHES ==========
+
+    def add_batch(self, **fields) -> TransferBatch:
         """
-        now = datetime.utcnow()
+        Adiciona um lote assíncrono à sessão, sem commit (gravado junto com
+        a publicação da task que vai processá-lo).
 
-        expired = self.db.query(TransferApproval).filter(
-            and_(
-                TransferApproval.status == "pending",
-                TransferApproval.expires_at <= now
-            )
-        ).all()
+        Args:
+            **fields: Colunas de TransferBatch
 
-        for approval in expired:
-            approval.status = "expired"
-            approval.decided_at = now
+        Returns:
+            TransferBatch (ainda não gravado)
+        """
+        batch = TransferBatch(errors=[], **fields)
+        self.db.add(batch)
+        return batch
 
-        self.db.commit()
+    def find_batch(self, batch_id: str) -> Optional[TransferBatch]:
+        """
+        Busca um lote assíncrono pelo batch_id.
+
+        Args:
+            batch_id: ID do lote
+
+        Returns:
+            TransferBatch ou None
+        """
+        return self.db.query(TransferBatch).filter(
+            TransferBatch.batch_id == batch_id
+        ).first()
 
-        return len(expired)
+    def lock_batch(self, batch_id: str) -> Optional[TransferBatch]:
+        """
+        Busca um lote travando a linha até o commit (SKIP LOCKED): dois
+        workers nunca processam a mesma parte do lote.
+
+        Args:
+            batch_id: ID do lote
+
+        Returns:
+            TransferBatch, ou None se não existe ou já está travado por outro worker
+        """
+        return self.db.query(TransferBatch).filter(
+            TransferBatch.batch_id == batch_id
+        ).with_for_update(skip_locked=True).first()
@@ -50,10 +50,11 @@ class AuditLogListResponse(BaseModel):
     Lista de logs de auditoria com paginação.
     """
     items: List[AuditLogResponse] = Field(..., description="Lista de logs")
-    total: int = Field(..., description="Total de logs")
+    total: Optional[int] = Field(None, description="Total de logs (None quando count=none)")
     page: int = Field(..., description="Página atual")
     page_size: int = Field(..., description="Tamanho da página")
-    total_pages: int = Field(..., description="Total de páginas")
+    total_pages: Optional[int] = Field(None, description="Total de páginas")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (modo cursor)")
 
 
 # ================== Execução de Query SQL ==================
@@ -146,6 +147,37 @@ class SystemStatsResponse(BaseModel):
     database_size_mb: Optional[float] = Field(None, description="Tamanho do banco (MB)")
 
 
+# ================== Scheduler ==================
+
+class SchedulerJobStatus(BaseModel):
+    """
+    Métricas de um job agendado (execuções neste processo).
+    """
+    job_id: str = Field(..., description="ID do job")
+    name: Optional[str] = Field(None, description="Nome do job")
+    next_run_time: Optional[datetime] = Field(None, description="Próximo disparo")
+    runs: int = Field(0, description="Execuções concluídas")
+    failures: int = Field(0, description="Execuções com erro")
+    skipped: int = Field(0, description="Disparos ignorados (job reservado por outro processo)")
+    overlaps: int = Field(0, description="Disparos ignorados (execução anterior ainda rodando)")
+    overruns: int = Field(0, description="Execuções mais longas que a reserva")
+    running: bool = Field(False, description="Se está executando agora")
+    last_started_at: Optional[datetime] = Field(None, description="Início da última execução")
+    last_duration_seconds: Optional[float] = Field(None, description="Duração da última execução (s)")
+    avg_duration_seconds: Optional[float] = Field(None, description="Duração média (s)")
+    max_duration_seconds: Optional[float] = Field(None, description="Maior duração (s)")
+    last_error: Optional[str] = Field(None, description="Último erro")
+
+
+class SchedulerStatusResponse(BaseModel):
+    """
+    Estado do scheduler e métricas dos jobs.
+    """
+    running: bool = Field(..., description="Se o scheduler está rodando neste processo")
+    lock_backend: str = Field(..., description="Backend das reservas dos jobs (memory ou redis)")
+    jobs: List[SchedulerJobStatus] = Field(..., description="Jobs configurados e suas métricas")
+
+
 # ================== Reset de Senha (Admin) ==================
 
 class AdminPasswordResetRequest(BaseModel):
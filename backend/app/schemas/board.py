@@ -6,6 +6,9 @@ from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, Field
 
+from app.schemas.list import ListResponse
+from app.schemas.card import CardMinimalResponse
+
 
 class BoardBase(BaseModel):
     """
@@ -117,3 +120,22 @@ class BoardDuplicateRequest(BaseModel):
             ]
         }
     }
+
+
+class BoardChangesResponse(BaseModel):
+    """
+    Schema de resposta da sincronização incremental de um board.
+
+    O cliente guarda `version` e envia no próximo pedido como `since`.
+    Quando `full` é True a resposta traz o board inteiro e o cliente deve
+    substituir o estado local (primeira carga ou versão desconhecida).
+    Ao remover uma lista, o cliente também remove os cards dela.
+    """
+    board_id: int = Field(..., description="ID do board")
+    since: int = Field(..., description="Versão informada pelo cliente")
+    version: int = Field(..., description="Versão atual do board")
+    full: bool = Field(..., description="Resposta completa (substituir estado local)")
+    lists: list[ListResponse] = Field(default_factory=list, description="Listas criadas ou alteradas")
+    cards: list[CardMinimalResponse] = Field(default_factory=list, description="Cards criados, alterados ou movidos para o board")
+    deleted_list_ids: list[int] = Field(default_factory=list, description="Listas removidas")
+    deleted_card_ids: list[int] = Field(default_factory=list, description="Cards removidos ou movidos para outro board")
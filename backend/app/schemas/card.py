@@ -248,6 +248,10 @@ class CardMoveRequest(BaseModel):
     """
     target_list_id: int = Field(..., description="ID da lista de destino")
     position: Optional[float] = Field(None, description="Posição na lista de destino (índice 0-based)")
+    after_card_id: Optional[int] = Field(
+        None,
+        description="ID do card da lista de destino que ficará imediatamente antes (substitui position)"
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -389,10 +393,11 @@ class CardListResponse(BaseModel):
     Schema para listagem paginada de cards.
     """
     cards: list[CardResponse] = Field(..., description="Lista de cards")
-    total: int = Field(..., description="Total de cards")
+    total: Optional[int] = Field(None, description="Total de cards (None quando count=none)")
     page: int = Field(..., description="Página atual")
     page_size: int = Field(..., description="Tamanho da página")
-    total_pages: int = Field(..., description="Total de páginas")
+    total_pages: Optional[int] = Field(None, description="Total de páginas")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (modo cursor)")
 
 
 class CardMinimalListResponse(BaseModel):
@@ -400,10 +405,11 @@ class CardMinimalListResponse(BaseModel):
     Schema para listagem de cards minimalista (otimizado para Kanban).
     """
     cards: list[CardMinimalResponse] = Field(..., description="Lista de cards (campos essenciais)")
-    total: int = Field(..., description="Total de cards")
+    total: Optional[int] = Field(None, description="Total de cards (None quando count=none)")
     page: int = Field(..., description="Página atual")
     page_size: int = Field(..., description="Tamanho da página")
-    total_pages: int = Field(..., description="Total de páginas")
+    total_pages: Optional[int] = Field(None, description="Total de páginas")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (modo cursor)")
 
 
 class CardExpandedResponse(CardResponse):
@@ -125,10 +125,11 @@ class ClientListResponse(BaseModel):
     Schema de resposta para lista de clientes com paginação.
     """
     clients: list[ClientResponse] = Field(..., description="Lista de clientes")
-    total: int = Field(..., description="Total de clientes")
+    total: Optional[int] = Field(None, description="Total de clientes (None quando count=none)")
     page: int = Field(..., description="Página atual")
     page_size: int = Field(..., description="Tamanho da página")
-    total_pages: int = Field(..., description="Total de páginas")
+    total_pages: Optional[int] = Field(None, description="Total de páginas")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (modo cursor)")
 
     model_config = {
         "json_schema_extra": {
@@ -160,11 +160,12 @@ class NotificationListResponse(BaseModel):
     """
     # Usa serialization_alias para compatibilidade com frontend
     items: List[NotificationResponse] = Field(..., serialization_alias="notifications", description="Lista de notificações")
-    total: int = Field(..., description="Total de notificações")
+    total: Optional[int] = Field(None, description="Total de notificações (None quando count=none)")
     unread_count: int = Field(..., description="Total de notificações não lidas")
     page: int = Field(..., description="Página atual")
     page_size: int = Field(..., description="Tamanho da página")
-    total_pages: int = Field(..., description="Total de páginas")
+    total_pages: Optional[int] = Field(None, description="Total de páginas")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (modo cursor)")
 
     model_config = {
         "populate_by_name": True,
@@ -202,7 +203,7 @@ class NotificationStatsResponse(BaseModel):
     """
     Estatísticas de notificações do usuário.
     """
-    total: int = Field(..., description="Total de notificações")
+    total: Optional[int] = Field(None, description="Total de notificações (None quando count=none)")
     unread_count: int = Field(..., description="Notificações não lidas")
     by_type: Dict[str, int] = Field(..., description="Contagem por tipo de notificação")
 
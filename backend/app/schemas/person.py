@@ -223,10 +223,11 @@ class PersonListResponse(BaseModel):
     Schema de resposta para lista de pessoas com paginação.
     """
     persons: list[PersonResponse] = Field(..., description="Lista de pessoas")
-    total: int = Field(..., description="Total de pessoas")
+    total: Optional[int] = Field(None, description="Total de pessoas (None quando count=none)")
     page: int = Field(..., description="Página atual")
     page_size: int = Field(..., description="Tamanho da página")
-    total_pages: int = Field(..., description="Total de páginas")
+    total_pages: Optional[int] = Field(None, description="Total de páginas")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (modo cursor)")
 
     model_config = {
         "json_schema_extra": {
@@ -272,3 +272,16 @@ class ExportReportResponse(BaseModel):
             ]
         }
     }
+
+
+# ================== Cache ==================
+
+class ReportCacheStatsResponse(BaseModel):
+    """
+    Contadores do cache de relatórios (por processo).
+    """
+    backend: str = Field(..., description="Backend do cache (memory ou redis)")
+    hits: int = Field(..., description="Respostas servidas do cache")
+    misses: int = Field(..., description="Respostas calculadas")
+    errors: int = Field(..., description="Falhas de acesso ao backend")
+    hit_rate: float = Field(..., description="Taxa de acerto (%)")
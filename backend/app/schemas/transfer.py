@@ -4,7 +4,7 @@ Define estruturas de dados para transferências de cards entre usuários.
 """
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from enum import Enum
 
 
@@ -101,6 +101,49 @@ class BatchTransferResponse(BaseModel):
     errors: Optional[List[Dict]] = None
 
 
+class BatchTransferFilter(BaseModel):
+    """Filtro de cards para transferência em lote: cards em aberto de um responsável."""
+    from_user_id: int = Field(..., description="Responsável atual dos cards")
+    board_id: Optional[int] = Field(None, description="Restringe a um board (opcional)")
+
+
+class AsyncBatchTransferCreate(BaseModel):
+    """Schema para criar transferência em lote assíncrona (sem limite de cards)."""
+    card_ids: Optional[List[int]] = Field(None, min_length=1, description="IDs dos cards")
+    filter: Optional[BatchTransferFilter] = Field(None, description="Seleção dos cards por filtro")
+    to_user_id: int = Field(..., description="ID do usuário destino")
+    reason: TransferReason = Field(..., description="Motivo da transferência")
+    notes: Optional[str] = Field(None, description="Notas adicionais")
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        """Exige exatamente uma forma de seleção: card_ids ou filter."""
+        if (self.card_ids is None) == (self.filter is None):
+            raise ValueError("Informe card_ids ou filter (apenas um)")
+        return self
+
+    class Config:
+        use_enum_values = True
+
+
+class TransferBatchResponse(BaseModel):
+    """Andamento de uma transferência em lote assíncrona."""
+    batch_id: str
+    status: str = Field(..., description="queued, running, completed ou failed")
+    to_user_id: Optional[int] = None
+    requested_by_id: Optional[int] = None
+    total_cards: int
+    processed_cards: int
+    successful: int
+    failed: int
+    progress: float = Field(..., description="Percentual processado (0 a 100)")
+    errors: Optional[List[Dict]] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 # ========== APPROVAL SCHEMAS ==========
 
 class TransferApprovalBase(BaseModel):
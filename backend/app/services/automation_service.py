@@ -22,6 +22,8 @@ from app.schemas.automation import (
     AutomationExecutionListResponse,
     ExecutionStatus
 )
+from app.core.automation_triggers import automation_trigger_index
+from app.db.session import commit
 from app.models.user import User
 from app.models.automation import Automation
 from app.models.card import Card
@@ -240,9 +242,11 @@ class AutomationService:
         execution = self.repository.create_execution(execution_create)
 
         try:
-            # Executa ações
+            # Executa ações em um savepoint: se uma ação falhar, só as ações são
+            # desfeitas e a sessão continua válida para registrar a falha
             card = self.card_repository.find_by_id(card_id) if card_id else None
-            self._execute_actions(automation, card, execution)
+            with self.db.begin_nested():
+                self._execute_actions(automation, card, execution)
 
             # Marca como sucesso
             execution = self.repository.update_execution_status(execution, ExecutionStatus.SUCCESS)
@@ -289,23 +293,20 @@ class AutomationService:
         Returns:
             Lista de execuções
         """
-        # Busca automações ativas para este trigger
-        automations = self.repository.find_by_trigger_event(board_id, trigger_event)
-
-        executions = []
-        for automation in automations:
-            # Verifica condições
-            if self._check_trigger_conditions(automation, card, trigger_data):
-                # Executa
-                execution = self.execute_automation(
-                    automation.id,
-                    card.id,
-                    user.id,
-                    trigger_data
-                )
-                executions.append(execution)
+        # Automações que disparam, pelo índice em memória (sem query no caminho quente)
+        automation_ids = automation_trigger_index.match(
+            board_id,
+            trigger_event,
+            card.list_id,
+            card.assigned_to_id,
+            trigger_data,
+            loader=self.repository.list_active_triggers
+        )
 
-        return executions
+        return [
+            self.execute_automation(automation_id, card.id, user.id, trigger_data)
+            for automation_id in automation_ids
+        ]
 
     # ========== EXECUÇÕES ==========
 
@@ -399,46 +400,6 @@ class AutomationService:
 
         return None
 
-    def _check_trigger_conditions(
-        self,
-        automation: Automation,
-        card: Card,
-        trigger_data: Optional[Dict[str, Any]]
-    ) -> bool:
-        """
-        Verifica se as condições do trigger foram atendidas.
-
-        Args:
-            automation: Automação
-            card: Card
-            trigger_data: Dados do trigger
-
-        Returns:
-            True se condições atendidas
-        """
-        if not automation.trigger_conditions:
-            return True  # Sem condições, sempre executa
-
-        conditions = automation.trigger_conditions
-
-        # Verifica condição de from_list_id/to_list_id (para card_moved)
-        if "from_list_id" in conditions and trigger_data:
-            if trigger_data.get("from_list_id") != conditions["from_list_id"]:
-                return False
-
-        if "to_list_id" in conditions:
-            if card.list_id != conditions["to_list_id"]:
-                return False
-
-        # Verifica condição de assigned_to_id
-        if "assigned_to_id" in conditions:
-            if card.assigned_to_id != conditions["assigned_to_id"]:
-                return False
-
-        # Adicionar mais condições conforme necessário
-
-        return True
-
     def _execute_actions(
         self,
         automation: Automation,
@@ -472,14 +433,14 @@ class AutomationService:
                 card.won_at = datetime.utcnow()
                 card.is_lost = False
                 card.lost_at = None
-                self.db.commit()
+                commit(self.db)
 
             elif action_type == "mark_lost" and card:
                 card.is_lost = True
                 card.lost_at = datetime.utcnow()
                 card.is_won = False
                 card.won_at = None
-                self.db.commit()
+                commit(self.db)
 
             elif action_type == "assign_round_robin" and card:
                 # Rodízio de vendedores
@@ -540,12 +501,12 @@ class AutomationService:
 
         # Atribui o card ao vendedor
         card.assigned_to_id = next_user.id
-        self.db.commit()
+        commit(self.db)
 
         # Atualiza o estado da automação
         automation.state = automation.state or {}
         automation.state["round_robin_last_user_id"] = next_user.id
-        self.db.commit()
+        commit(self.db)
 
     def _to_response(self, automation: Automation) -> AutomationResponse:
         """Converte Automation para AutomationResponse."""
@@ -2,7 +2,9 @@
 Card Service - Lógica de negócio para cards.
 Implementa validações e regras de negócio.
 """
-from typing import Optional, List
+import json
+from uuid import uuid4
+from typing import Optional, List, Iterator
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -13,10 +15,17 @@ from app.repositories.field_repository import FieldRepository
 from app.repositories.notification_repository import NotificationRepository
 from app.repositories.activity_repository import ActivityRepository
 from app.repositories.person_repository import PersonRepository
-from app.schemas.card import CardCreate, CardUpdate, CardResponse, CardListResponse
+from app.repositories.outbox_repository import OutboxRepository
+from app.schemas.card import CardCreate, CardUpdate, CardResponse, CardListResponse, CardMinimalResponse
+from app.schemas.board import BoardChangesResponse
+from app.schemas.list import ListResponse
 from app.schemas.field import CardFieldValueCreate, CardFieldValueResponse
+from app.core.events import event_broker, board_channel
+from app.core.outbox import outbox_dispatcher
 from app.models.card import Card
+from app.models.outbox_event import OutboxEventType
 from app.models.user import User
+from app.utils.pagination import CountMode, total_pages as calculate_total_pages
 
 
 class CardService:
@@ -33,6 +42,7 @@ class CardService:
         self.activity_repository = ActivityRepository(db)
         self.notification_repository = NotificationRepository(db)
         self.person_repository = PersonRepository(db)
+        self.outbox_repository = OutboxRepository(db)
 
     def _verify_card_access(self, card: Card) -> None:
         """
@@ -86,6 +96,28 @@ class CardService:
 
         return card
 
+    def _to_minimal_response(self, card: Card) -> CardMinimalResponse:
+        """
+        Converte um card para o schema minimalista do Kanban.
+        """
+        # Usa o usuário já carregado via eager loading (sem query adicional)
+        assigned_to_name = None
+        if card.assigned_to:
+            assigned_to_name = card.assigned_to.name
+
+        return CardMinimalResponse(
+            id=card.id,
+            title=card.title,
+            list_id=card.list_id,
+            position=card.position,
+            assigned_to_id=card.assigned_to_id,
+            assigned_to_name=assigned_to_name,
+            value=card.value,
+            due_date=card.due_date,
+            is_won=card.is_won,
+            is_lost=card.is_lost
+        )
+
     def list_cards(
         self,
         board_id: int,
@@ -96,7 +128,10 @@ class CardService:
         assigned_to_id: Optional[int] = None,
         person_id: Optional[int] = None,
         is_won: Optional[bool] = None,
-        is_lost: Optional[bool] = None
+        is_lost: Optional[bool] = None,
+        cursor: bool = False,
+        after: Optional[str] = None,
+        count: CountMode = CountMode.EXACT
     ):
         """
         Lista cards de um board com paginação e filtros.
@@ -110,11 +145,14 @@ class CardService:
             assigned_to_id: Filtro por responsável
             is_won: Filtro por cards ganhos
             is_lost: Filtro por cards perdidos
+            cursor: Se True, usa paginação por cursor em vez de offset
+            after: Cursor da página anterior (implica cursor=True)
+            count: Modo de contagem do total (exact, estimated, none)
 
         Returns:
             CardListResponse ou CardMinimalListResponse
         """
-        from app.schemas.card import CardMinimalResponse, CardMinimalListResponse
+        from app.schemas.card import CardMinimalListResponse
 
         # Verifica se o board existe
         board = self.board_repository.find_by_id(board_id)
@@ -132,16 +170,28 @@ class CardService:
             skip = (page - 1) * page_size
             limit = page_size
 
-        # Busca cards
-        cards = self.card_repository.list_by_board(
-            board_id=board_id,
-            skip=skip,
-            limit=limit,
-            assigned_to_id=assigned_to_id,
-            person_id=person_id,
-            is_won=is_won,
-            is_lost=is_lost
-        )
+        # Busca cards (por cursor ou por offset)
+        next_cursor = None
+        if (cursor or after) and not all:
+            cards, next_cursor = self.card_repository.list_by_board_after(
+                board_id=board_id,
+                after=after,
+                limit=page_size,
+                assigned_to_id=assigned_to_id,
+                person_id=person_id,
+                is_won=is_won,
+                is_lost=is_lost
+            )
+        else:
+            cards = self.card_repository.list_by_board(
+                board_id=board_id,
+                skip=skip,
+                limit=limit,
+                assigned_to_id=assigned_to_id,
+                person_id=person_id,
+                is_won=is_won,
+                is_lost=is_lost
+            )
 
         # Conta total
         total = self.card_repository.count_by_board(
@@ -149,45 +199,27 @@ class CardService:
             assigned_to_id=assigned_to_id,
             person_id=person_id,
             is_won=is_won,
-            is_lost=is_lost
+            is_lost=is_lost,
+            mode=count
         )
 
         # Calcula total de páginas
         if all:
             total_pages = 1  # Se retornou todos, só tem 1 "página"
         else:
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = calculate_total_pages(total, page_size)
 
         # Modo MINIMAL: Retorna apenas campos essenciais (otimizado para Kanban)
         if minimal:
-            cards_response = []
-            for card in cards:
-                # Usa o usuário já carregado via eager loading (sem query adicional)
-                assigned_to_name = None
-                if card.assigned_to:
-                    assigned_to_name = card.assigned_to.name
-
-                cards_response.append(
-                    CardMinimalResponse(
-                        id=card.id,
-                        title=card.title,
-                        list_id=card.list_id,
-                        position=card.position,
-                        assigned_to_id=card.assigned_to_id,
-                        assigned_to_name=assigned_to_name,
-                        value=card.value,
-                        due_date=card.due_date,
-                        is_won=card.is_won,
-                        is_lost=card.is_lost
-                    )
-                )
+            cards_response = [self._to_minimal_response(card) for card in cards]
 
             return CardMinimalListResponse(
                 cards=cards_response,
                 total=total,
                 page=page,
-                page_size=page_size if not all else total,
-                total_pages=total_pages
+                page_size=page_size if not all else len(cards_response),
+                total_pages=total_pages,
+                next_cursor=next_cursor
             )
 
         # Modo COMPLETO: Retorna todos os campos
@@ -198,8 +230,8 @@ class CardService:
             if card.assigned_to:
                 assigned_to_name = card.assigned_to.name
 
-            list_obj = self.list_repository.find_by_id(card.list_id)
-            list_name = list_obj.name if list_obj else None
+            # Lista já carregada junto com o card (JOIN da listagem)
+            list_name = card.list.name if card.list else None
 
             cards_response.append(
                 CardResponse(
@@ -228,9 +260,179 @@ class CardService:
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
 
+    def get_board_changes(self, board_id: int, since: int) -> BoardChangesResponse:
+        """
+        Retorna o que mudou em um board desde uma versão conhecida pelo cliente.
+
+        Com since <= 0, ou com uma versão maior que a atual (estado local
+        inválido), retorna o board inteiro com full=True.
+
+        Args:
+            board_id: ID do board
+            since: Última versão recebida pelo cliente
+
+        Returns:
+            BoardChangesResponse
+
+        Raises:
+            HTTPException 404: Board não encontrado
+        """
+        board = self.board_repository.find_by_id(board_id)
+        if not board:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Board não encontrado"
+            )
+
+        # A versão é lida antes das alterações: o que for gravado entre as
+        # consultas volta de novo no próximo pedido, mas nunca é perdido
+        version = self.board_repository.get_change_version(board_id)
+        full = since <= 0 or since > version
+        start = -1 if full else since
+
+        lists = self.list_repository.list_changed_since(board_id, start)
+        cards = self.card_repository.list_changed_since(board_id, start)
+
+        deleted_list_ids = []
+        deleted_card_ids = []
+        if not full:
+            for tombstone in self.board_repository.list_tombstones_since(board_id, since):
+                if tombstone.entity_type == "list":
+                    deleted_list_ids.append(tombstone.entity_id)
+                else:
+                    deleted_card_ids.append(tombstone.entity_id)
+
+            # Card removido e recriado no board (ex: transferido de volta) vem como alterado
+            changed_card_ids = {card.id for card in cards}
+            deleted_card_ids = [card_id for card_id in deleted_card_ids if card_id not in changed_card_ids]
+
+        return BoardChangesResponse(
+            board_id=board_id,
+            since=since,
+            version=version,
+            full=full,
+            lists=[ListResponse.model_validate(list_obj) for list_obj in lists],
+            cards=[self._to_minimal_response(card) for card in cards],
+            deleted_list_ids=deleted_list_ids,
+            deleted_card_ids=deleted_card_ids
+        )
+
+    # Campos do snapshot do Kanban, na ordem das colunas do payload
+    SNAPSHOT_FIELDS = ["id", "title", "position", "assigned_to_id", "value", "due_date", "status"]
+
+    def stream_board_snapshot(self, board_id: int, batch_size: int = 500) -> Iterator[str]:
+        """
+        Gera o snapshot do Kanban de um board em NDJSON (uma linha JSON por bloco).
+
+        Formato colunar: cada bloco traz os cards de uma lista como um array por
+        campo, mais um dicionário com os nomes dos responsáveis que ainda não
+        apareceram. Linhas emitidas:
+        - {"type": "board", "board_id", "version", "fields", "lists": [{id, name, position, ...}]}
+        - {"type": "cards", "list_id", "columns": {campo: [...]}, "users": {id: nome}}
+        - {"type": "end", "total_cards"}
+
+        status: 0 = aberto, 1 = ganho, -1 = perdido.
+
+        Args:
+            board_id: ID do board
+            batch_size: Máximo de cards por bloco (e por ida ao banco)
+
+        Returns:
+            Iterador de linhas NDJSON
+
+        Raises:
+            HTTPException 404: Board não encontrado
+        """
+        # Validação feita antes do streaming para ainda poder responder 404
+        board = self.board_repository.find_by_id(board_id)
+        if not board:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Board não encontrado"
+            )
+
+        lists = self.list_repository.list_by_board(board_id)
+        header = {
+            "type": "board",
+            "board_id": board_id,
+            "version": self.board_repository.get_change_version(board_id),
+            "fields": self.SNAPSHOT_FIELDS,
+            "lists": [
+                {
+                    "id": list_obj.id,
+                    "name": list_obj.name,
+                    "color": list_obj.color,
+                    "position": list_obj.position,
+                    "is_done_stage": list_obj.is_done_stage,
+                    "is_lost_stage": list_obj.is_lost_stage
+                }
+                for list_obj in lists
+            ]
+        }
+
+        return self._iter_board_snapshot(board_id, header, batch_size)
+
+    def _iter_board_snapshot(self, board_id: int, header: dict, batch_size: int) -> Iterator[str]:
+        """
+        Percorre o cursor de cards e emite os blocos do snapshot.
+        """
+        def dump(payload: dict) -> str:
+            return json.dumps(payload, separators=(",", ":")) + "\n"
+
+        def new_block(list_id: int) -> dict:
+            return {
+                "type": "cards",
+                "list_id": list_id,
+                "columns": {field: [] for field in self.SNAPSHOT_FIELDS},
+                "users": {}
+            }
+
+        try:
+            yield dump(header)
+
+            known_users = set()
+            block = None
+            size = 0
+            total = 0
+
+            for row in self.card_repository.iter_board_snapshot_rows(board_id, batch_size):
+                if block is not None and (block["list_id"] != row.list_id or size >= batch_size):
+                    yield dump(block)
+                    block = None
+
+                if block is None:
+                    block = new_block(row.list_id)
+                    size = 0
+
+                columns = block["columns"]
+                columns["id"].append(row.id)
+                columns["title"].append(row.title)
+                columns["position"].append(float(row.position) if row.position is not None else 0)
+                columns["assigned_to_id"].append(row.assigned_to_id)
+                columns["value"].append(float(row.value) if row.value is not None else None)
+                columns["due_date"].append(row.due_date.isoformat() if row.due_date else None)
+                columns["status"].append(row.is_won or 0)
+
+                if row.assigned_to_id is not None and row.assigned_to_id not in known_users:
+                    known_users.add(row.assigned_to_id)
+                    block["users"][str(row.assigned_to_id)] = row.assigned_to_name
+
+                size += 1
+                total += 1
+
+            if block is not None:
+                yield dump(block)
+
+            yield dump({"type": "end", "total_cards": total})
+        finally:
+            # A resposta é enviada depois que a dependência get_db já encerrou a
+            # sessão; devolve ao pool a conexão usada durante o streaming.
+            self.db.close()
+
     def create_card(self, card_data: CardCreate, current_user: User) -> Card:
         """
         Cria um novo card.
@@ -306,7 +508,14 @@ class CardService:
         # Deleta o card
         self.card_repository.delete(card)
 
-    def move_card(self, card_id: int, target_list_id: int, position: Optional[int], current_user: User) -> Card:
+    def move_card(
+        self,
+        card_id: int,
+        target_list_id: int,
+        position: Optional[int],
+        current_user: User,
+        after_card_id: Optional[int] = None
+    ) -> Card:
         """
         Move um card para outra lista.
 
@@ -315,6 +524,7 @@ class CardService:
             target_list_id: ID da lista de destino
             position: Posição na lista de destino
             current_user: Usuário autenticado
+            after_card_id: Card que ficará imediatamente antes (substitui position)
 
         Returns:
             Card movido
@@ -339,75 +549,168 @@ class CardService:
                 detail="Board não encontrado"
             )
 
+        # Card âncora precisa estar na lista de destino
+        after_card = None
+        if after_card_id is not None:
+            after_card = self.card_repository.find_by_id(after_card_id)
+            if (
+                not after_card
+                or after_card.deleted_at is not None
+                or after_card.list_id != target_list_id
+                or after_card.id == card.id
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Card de referência não pertence à lista de destino"
+                )
+
         # Guarda lista de origem para parabenização
-        source_list = self.list_repository.find_by_id(card.list_id)
+        source_list_id = card.list_id
+        source_list = self.list_repository.find_by_id(source_list_id)
         source_list_name = source_list.name if source_list else "Lista"
 
         # Verifica se a lista de destino é uma lista "won" ou "lost"
         # e marca o card adequadamente
+        # Import lazy para evitar importação circular
+        from app.services.gamification_service import GamificationService
+        gamification_service = GamificationService(self.db)
+
         points_awarded = 0
         if target_list.is_done_stage:
             card.is_won = 1  # 1 = ganho (Integer no banco)
             card.closed_at = datetime.now()  # won_at é uma property que usa closed_at
-            points_awarded = 20  # Pontos por ganhar card
+            points_awarded = gamification_service.get_points_for_action("card_won")
         elif target_list.is_lost_stage:
             card.is_won = -1  # -1 = perdido (Integer no banco)
             card.closed_at = datetime.now()  # lost_at é uma property que usa closed_at
         else:
-            points_awarded = 2  # Pontos por mover card
-
-        # Move o card
-        moved_card = self.card_repository.move_to_list(card, target_list_id, position)
-
-        # Atribui pontos e cria parabenização (se card tiver responsável)
-        if moved_card.assigned_to_id:
-            try:
-                # Import lazy para evitar importação circular
-                from app.services.gamification_service import GamificationService
-                gamification_service = GamificationService(self.db)
-
-                # Atribui pontos
-                reason = "card_won" if target_list.is_done_stage else "card_moved"
-                gamification_service.award_points(
-                    user_id=moved_card.assigned_to_id,
-                    reason=reason,
-                    description=f"Card '{moved_card.title}' movido de '{source_list_name}' para '{target_list.name}'",
-                    custom_points=points_awarded
-                )
+            points_awarded = gamification_service.get_points_for_action("card_moved")
+
+        # Registra a mudança de etapa (base do funil de conversão) no mesmo commit do movimento
+        if source_list_id != target_list_id:
+            self.activity_repository.add(
+                card_id=card.id,
+                user_id=current_user.id,
+                activity_type="card_moved",
+                description=f"Card movido de '{source_list_name}' para '{target_list.name}'",
+                activity_metadata={"from_list_id": source_list_id, "to_list_id": target_list_id}
+            )
 
-                # Cria notificação de parabenização
-                congratulation_message = self._generate_congratulation_message(
-                    card=moved_card,
-                    source_list_name=source_list_name,
-                    target_list_name=target_list.name,
-                    points_awarded=points_awarded,
-                    is_won=target_list.is_done_stage
-                )
+        # Pontos, parabenização e automações são processados depois do commit (outbox)
+        self.outbox_repository.add(
+            event_type=OutboxEventType.CARD_MOVED,
+            payload={
+                "card_id": card.id,
+                "card_title": card.title,
+                "board_id": target_board.id,
+                "from_list_id": source_list_id,
+                "to_list_id": target_list_id,
+                "source_list_name": source_list_name,
+                "target_list_name": target_list.name,
+                "is_won": bool(target_list.is_done_stage),
+                "assigned_to_id": card.assigned_to_id,
+                "moved_by_id": current_user.id,
+                "points": points_awarded
+            },
+            idempotency_key=f"card_moved:{card.id}:{uuid4().hex}"
+        )
 
-                notification_data = {
-                    "user_id": moved_card.assigned_to_id,
-                    "notification_type": "card_won" if target_list.is_done_stage else "card_moved",
-                    "title": "Parabéns! Card avançou",
-                    "message": congratulation_message,
-                    "icon": "trophy" if target_list.is_done_stage else "arrow-right",
-                    "color": "success",
-                    "notification_metadata": {
-                        "card_id": moved_card.id,
-                        "card_title": moved_card.title,
-                        "source_list": source_list_name,
-                        "target_list": target_list.name,
-                        "points_awarded": points_awarded,
-                        "url": f"/cards/{moved_card.id}"
-                    }
-                }
-                self.notification_repository.create(notification_data)
+        # Move o card (único commit da requisição)
+        moved_card = self.card_repository.move_to_list(card, target_list_id, position, after_card)
+
+        # Avisa em tempo real quem está com o board aberto
+        event_data = {
+            "card_id": moved_card.id,
+            "from_list_id": source_list_id,
+            "to_list_id": target_list_id,
+            "position": float(moved_card.position),
+            "is_won": moved_card.is_won,
+            "version": moved_card.change_version,
+            "moved_by_id": current_user.id
+        }
+        event_broker.publish(board_channel(target_board.id), "card_moved", event_data)
+        if source_list and source_list.board_id != target_board.id:
+            event_broker.publish(board_channel(source_list.board_id), "card_moved", event_data)
 
-            except Exception as e:
-                # Log erro mas não quebra o fluxo principal
-                print(f"Erro ao criar parabenização: {e}")
+        outbox_dispatcher.wake()
 
         return moved_card
 
+    def award_move_points(self, payload: dict) -> None:
+        """
+        Atribui os pontos de um movimento ao responsável pelo card (etapa do outbox).
+
+        Args:
+            payload: Dados do evento card_moved
+        """
+        from app.services.gamification_service import GamificationService
+
+        GamificationService(self.db).award_points(
+            user_id=payload["assigned_to_id"],
+            reason="card_won" if payload["is_won"] else "card_moved",
+            description=(
+                f"Card '{payload['card_title']}' movido de '{payload['source_list_name']}' "
+                f"para '{payload['target_list_name']}'"
+            ),
+            custom_points=payload["points"]
+        )
+
+    def notify_move(self, card: Card, payload: dict) -> None:
+        """
+        Cria a notificação de parabenização de um movimento (etapa do outbox).
+
+        Args:
+            card: Card movido
+            payload: Dados do evento card_moved
+        """
+        is_won = payload["is_won"]
+        congratulation_message = self._generate_congratulation_message(
+            card=card,
+            source_list_name=payload["source_list_name"],
+            target_list_name=payload["target_list_name"],
+            points_awarded=payload["points"],
+            is_won=is_won
+        )
+
+        notification_data = {
+            "user_id": payload["assigned_to_id"],
+            "notification_type": "card_won" if is_won else "card_moved",
+            "title": "Parabéns! Card avançou",
+            "message": congratulation_message,
+            "icon": "trophy" if is_won else "arrow-right",
+            "color": "success",
+            "notification_metadata": {
+                "card_id": card.id,
+                "card_title": card.title,
+                "source_list": payload["source_list_name"],
+                "target_list": payload["target_list_name"],
+                "points_awarded": payload["points"],
+                "url": f"/cards/{card.id}"
+            }
+        }
+        self.notification_repository.create(notification_data)
+
+    def trigger_move_automations(self, card: Card, user: User, payload: dict) -> None:
+        """
+        Dispara as automações de card movido (e de card ganho) do board (etapa do outbox).
+
+        Args:
+            card: Card movido
+            user: Usuário que moveu o card
+            payload: Dados do evento card_moved
+        """
+        # Import lazy para evitar importação circular
+        from app.services.automation_service import AutomationService
+        automation_service = AutomationService(self.db)
+
+        trigger_data = {
+            "from_list_id": payload["from_list_id"],
+            "to_list_id": payload["to_list_id"]
+        }
+        automation_service.process_trigger(payload["board_id"], "card_moved", card, user, trigger_data)
+        if payload["is_won"]:
+            automation_service.process_trigger(payload["board_id"], "card_won", card, user, trigger_data)
+
     def _generate_congratulation_message(
         self,
         card: Card,
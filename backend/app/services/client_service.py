@@ -10,6 +10,7 @@ from app.repositories.client_repository import ClientRepository
 from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse, ClientListResponse
 from app.models.client import Client
 from app.models.user import User
+from app.utils.pagination import CountMode, total_pages as calculate_total_pages
 
 
 class ClientService:
@@ -48,7 +49,10 @@ class ClientService:
         page_size: int = 50,
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
-        state: Optional[str] = None
+        state: Optional[str] = None,
+        cursor: bool = False,
+        after: Optional[str] = None,
+        count: CountMode = CountMode.EXACT
     ) -> ClientListResponse:
         """
         Lista clientes do sistema com paginação.
@@ -59,31 +63,42 @@ class ClientService:
             is_active: Filtro por status ativo
             search: Termo de busca (nome, email, empresa, telefone)
             state: Filtro por estado (UF)
+            cursor: Se True, usa paginação por cursor em vez de offset
+            after: Cursor da página anterior (implica cursor=True)
+            count: Modo de contagem do total (exact, estimated, none)
 
         Returns:
             ClientListResponse com lista paginada de clientes
         """
-        # Calcula offset
-        skip = (page - 1) * page_size
-
-        # Busca clientes
-        clients = self.repository.list_all(
-            skip=skip,
-            limit=page_size,
-            is_active=is_active,
-            search=search,
-            state=state
-        )
+        # Busca clientes (por cursor ou por offset)
+        next_cursor = None
+        if cursor or after:
+            clients, next_cursor = self.repository.list_all_after(
+                after=after,
+                limit=page_size,
+                is_active=is_active,
+                search=search,
+                state=state
+            )
+        else:
+            clients = self.repository.list_all(
+                skip=(page - 1) * page_size,
+                limit=page_size,
+                is_active=is_active,
+                search=search,
+                state=state
+            )
 
         # Conta total
         total = self.repository.count_all(
             is_active=is_active,
             search=search,
-            state=state
+            state=state,
+            mode=count
         )
 
         # Calcula total de páginas
-        total_pages = (total + page_size - 1) // page_size
+        total_pages = calculate_total_pages(total, page_size)
 
         # Converte para response schema
         clients_response = [
@@ -114,7 +129,8 @@ class ClientService:
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
 
     def create_client(self, client_data: ClientCreate) -> Client:
@@ -3,10 +3,10 @@ Gamification Service - Lógica de negócio de gamificação.
 Gerencia pontos, badges e rankings com regras de negócio.
 """
 from typing import Optional, List, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, case, select
 
 from app.repositories.gamification_repository import GamificationRepository
 from app.repositories.notification_repository import NotificationRepository
@@ -31,6 +31,12 @@ from app.schemas.notification import NotificationCreate
 from app.models.user import User
 from app.models.gamification_badge import GamificationBadge
 from app.models.user_badge import UserBadge
+from app.core.action_points import action_points_table
+from app.core.automatic_badges import automatic_badges
+from app.core.leaderboard import leaderboard
+from app.db.session import after_commit, commit
+from app.utils.periods import PERIOD_TYPES, get_period_dates, get_period_starts
+from app.utils.badge_criteria import compile_criteria, validate_criteria
 
 
 class GamificationService:
@@ -100,7 +106,7 @@ class GamificationService:
             GamificationPointResponse
         """
         # Determina quantidade de pontos
-        points = custom_points if custom_points is not None else ACTION_POINTS.get(reason, 0)
+        points = custom_points if custom_points is not None else self.get_points_for_action(reason)
 
         if points == 0:
             raise HTTPException(
@@ -116,6 +122,10 @@ class GamificationService:
             description=description
         )
         point = self.repository.create_point(point_data)
+        total_points = self.repository.get_user_total_points(user_id)
+
+        # Atualiza a posição do usuário no leaderboard dos períodos atuais
+        after_commit(self.db, lambda: leaderboard.add_points(user_id, points))
 
         # Cria notificação de pontos ganhos
         self._create_gamification_notification(
@@ -126,12 +136,12 @@ class GamificationService:
             metadata={
                 "points": points,
                 "reason": reason,
-                "total_points": self.repository.get_user_total_points(user_id)
+                "total_points": total_points
             }
         )
 
-        # Verifica se o usuário conquistou algum badge baseado em pontos
-        self._check_and_award_point_badges(user_id)
+        # Verifica se o usuário conquistou algum badge automático
+        self.award_automatic_badges([user_id])
 
         return GamificationPointResponse(
             id=point.id,
@@ -142,6 +152,25 @@ class GamificationService:
             created_at=point.created_at
         )
 
+    def get_points_for_action(self, action_type: str) -> int:
+        """
+        Retorna quantos pontos vale uma ação, pela configuração em cache.
+
+        O banco só é consultado quando a configuração muda; ações sem
+        configuração usam os valores padrão (ACTION_POINTS).
+
+        Args:
+            action_type: Tipo de ação
+
+        Returns:
+            Quantidade de pontos (0 se a ação estiver inativa)
+        """
+        return action_points_table.get_points(
+            action_type,
+            loader=self.repository.list_all_action_points,
+            defaults=ACTION_POINTS
+        )
+
     def get_user_total_points(self, user_id: int) -> int:
         """
         Obtém total de pontos de um usuário.
@@ -167,7 +196,10 @@ class GamificationService:
         Returns:
             BadgeResponse
         """
+        self._validate_badge_criteria(badge_data.criteria_type, badge_data.criteria)
+
         badge = self.repository.create_badge(badge_data)
+        automatic_badges.invalidate()
 
         return BadgeResponse(
             id=badge.id,
@@ -267,8 +299,14 @@ class GamificationService:
                 detail="Badge não encontrado"
             )
 
+        self._validate_badge_criteria(
+            badge_data.criteria_type or badge.criteria_type,
+            badge_data.criteria if badge_data.criteria is not None else badge.criteria
+        )
+
         # Atualiza o badge
         updated_badge = self.repository.update_badge(badge, badge_data)
+        automatic_badges.invalidate()
 
         return BadgeResponse(
             id=updated_badge.id,
@@ -304,6 +342,7 @@ class GamificationService:
 
         # Deleta o badge (soft delete)
         self.repository.delete_badge(badge)
+        automatic_badges.invalidate()
 
         return {"message": "Badge deletado com sucesso"}
 
@@ -375,52 +414,119 @@ class GamificationService:
             badge_icon=badge.icon_url
         )
 
-    def _check_and_award_point_badges(self, user_id: int) -> None:
+    def award_automatic_badges(self, user_ids: Optional[List[int]] = None) -> dict:
         """
-        Verifica e atribui badges automaticamente baseados em pontos.
+        Avalia os badges automáticos e atribui os que foram conquistados.
+
+        Todos os critérios são avaliados no banco em uma única consulta sobre
+        as métricas de cada usuário; os novos badges e notificações são
+        gravados em lote. Os badges automáticos vêm do cache automatic_badges.
 
         Args:
-            user_id: ID do usuário
-        """
-        # Obtém total de pontos do usuário
-        total_points = self.repository.get_user_total_points(user_id)
+            user_ids: Restringe a alguns usuários (padrão: todos os ativos)
 
-        # Busca usuário
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return
+        Returns:
+            Estatísticas da execução
+        """
+        metrics = self.repository.badge_metrics_subquery(user_ids)
+
+        badges = {
+            badge.id: badge
+            for badge in automatic_badges.get(loader=self.repository.list_automatic_badges)
+        }
+        predicates = {
+            badge_id: compile_criteria(badge.criteria, metrics.c)
+            for badge_id, badge in badges.items()
+        }
+
+        # Avaliação de poucos usuários (a cada ponto atribuído): sem contar a base toda
+        total_users = (
+            len(user_ids) if user_ids is not None
+            else self.db.query(func.count()).select_from(metrics).scalar()
+        )
+        if not predicates:
+            return {
+                "total_users_checked": total_users,
+                "total_badges_awarded": 0,
+                "users_with_new_badges": []
+            }
+
+        columns = [
+            case((predicate, True), else_=False).label(f"badge_{badge_id}")
+            for badge_id, predicate in predicates.items()
+        ]
+        rows = self.db.execute(
+            select(metrics.c.user_id, *columns).where(or_(*predicates.values()))
+        ).all()
 
-        # Busca badges automáticos do sistema
-        badges = self.repository.list_all_badges(skip=0, limit=1000)
-
-        for badge in badges:
-            # TODO: Implementar lógica de avaliação de critérios JSON
-            # Por enquanto, apenas badges manuais são suportados
-            if badge.criteria_type == "automatic" and badge.criteria:
-                # Verifica se é um badge baseado em pontos
-                if badge.criteria.get("field") == "total_points":
-                    required_points = badge.criteria.get("value", 0)
-                    operator = badge.criteria.get("operator", ">=")
-
-                    if operator == ">=" and total_points >= required_points:
-                        # Verifica se o usuário já tem o badge
-                        if not self.repository.user_has_badge(user_id, badge.id):
-                            # Atribui automaticamente
-                            self.repository.award_badge(user_id, badge.id, awarded_by_id=None)
-
-                            # Cria notificação de badge conquistado automaticamente
-                            self._create_gamification_notification(
-                                user_id=user_id,
-                                notification_type="badge_earned",
-                                title=f"🏆 Badge conquistado!",
-                                message=f"Parabéns! Você conquistou o badge '{badge.name}'",
-                                metadata={
-                                    "badge_id": badge.id,
-                                    "badge_name": badge.name,
-                                    "badge_description": badge.description,
-                                    "url": "/gamification"
-                                }
-                            )
+        earned = [
+            (row.user_id, badge_id)
+            for row in rows
+            for badge_id in predicates
+            if row._mapping[f"badge_{badge_id}"]
+        ]
+        awarded = self.repository.list_awarded_badge_pairs(list(badges), user_ids)
+        new_pairs = [pair for pair in earned if pair not in awarded]
+
+        self.repository.award_badges_bulk(new_pairs)
+        commit(self.db)
+
+        if new_pairs:
+            try:
+                self.notification_repository.create_bulk([
+                    {
+                        "user_id": user_id,
+                        "notification_type": "badge_earned",
+                        "title": "🏆 Badge conquistado!",
+                        "message": f"Parabéns! Você conquistou o badge '{badges[badge_id].name}'",
+                        "icon": "trophy",
+                        "color": "success",
+                        "notification_metadata": {
+                            "badge_id": badge_id,
+                            "badge_name": badges[badge_id].name,
+                            "badge_description": badges[badge_id].description,
+                            "url": "/gamification"
+                        }
+                    }
+                    for user_id, badge_id in new_pairs
+                ])
+            except Exception as e:
+                # Log do erro mas não quebra o fluxo principal
+                print(f"Erro ao criar notificações de badges: {e}")
+
+        awarded_by_user = {}
+        for user_id, _ in new_pairs:
+            awarded_by_user[user_id] = awarded_by_user.get(user_id, 0) + 1
+
+        names = dict(
+            self.db.query(User.id, User.name).filter(User.id.in_(list(awarded_by_user))).all()
+        ) if awarded_by_user else {}
+
+        return {
+            "total_users_checked": total_users,
+            "total_badges_awarded": len(new_pairs),
+            "users_with_new_badges": [
+                {"user_id": user_id, "user_name": names.get(user_id), "badges_awarded": count}
+                for user_id, count in awarded_by_user.items()
+            ]
+        }
+
+    def _validate_badge_criteria(self, criteria_type: Optional[str], criteria: Optional[dict]) -> None:
+        """
+        Valida os critérios de um badge automático.
+
+        Raises:
+            HTTPException: Se o critério for inválido
+        """
+        if criteria_type != "automatic" or not criteria:
+            return
+        try:
+            validate_criteria(criteria)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Critério do badge inválido: {e}"
+            )
 
     def get_user_badges(self, user_id: int) -> List[UserBadgeResponse]:
         """
@@ -472,49 +578,55 @@ class GamificationService:
         Returns:
             Tupla (period_start, period_end)
         """
-        now = datetime.utcnow()
-
-        if period_type == "weekly":
-            # Semana: segunda a domingo
-            start = now - timedelta(days=now.weekday())
-            start = start.replace(hour=0, minute=0, second=0, microsecond=0)
-            end = start + timedelta(days=6, hours=23, minutes=59, seconds=59)
-
-        elif period_type == "monthly":
-            # Mês atual
-            start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # Último dia do mês
-            if now.month == 12:
-                end = now.replace(month=12, day=31, hour=23, minute=59, second=59)
-            else:
-                next_month = now.replace(month=now.month + 1, day=1)
-                end = next_month - timedelta(seconds=1)
-
-        elif period_type == "quarterly":
-            # Trimestre atual (Q1: jan-mar, Q2: abr-jun, Q3: jul-set, Q4: out-dez)
-            quarter = (now.month - 1) // 3
-            start_month = quarter * 3 + 1
-            start = now.replace(month=start_month, day=1, hour=0, minute=0, second=0, microsecond=0)
-
-            end_month = start_month + 2
-            if end_month == 12:
-                end = now.replace(month=12, day=31, hour=23, minute=59, second=59)
-            else:
-                next_quarter = now.replace(month=end_month + 1, day=1)
-                end = next_quarter - timedelta(seconds=1)
-
-        elif period_type == "annual":
-            # Ano atual
-            start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            end = now.replace(month=12, day=31, hour=23, minute=59, second=59)
-
-        else:
+        try:
+            return get_period_dates(period_type)
+        except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Tipo de período inválido"
             )
 
-        return start, end
+    def _build_ranking_list(
+        self,
+        period_type: str,
+        period_start: datetime,
+        period_end: datetime,
+        limit: Optional[int] = None
+    ) -> RankingListResponse:
+        """
+        Monta a resposta do ranking de um período a partir dos registros salvos.
+
+        Args:
+            period_type: Tipo de período
+            period_start: Início do período
+            period_end: Fim do período
+            limit: Limite de resultados (None = todos)
+
+        Returns:
+            RankingListResponse
+        """
+        rows = self.repository.list_rankings_with_user_names(period_type, period_start, limit)
+
+        rankings = [
+            RankingResponse(
+                id=ranking.id,
+                user_id=ranking.user_id,
+                period_type=ranking.period_type,
+                period_start=ranking.period_start,
+                period_end=ranking.period_end,
+                total_points=ranking.points,
+                rank_position=ranking.rank,
+                user_name=user_name
+            )
+            for ranking, user_name in rows
+        ]
+
+        return RankingListResponse(
+            rankings=rankings,
+            period_type=period_type,
+            period_start=period_start,
+            period_end=period_end
+        )
 
     def calculate_rankings(self, period_type: str) -> RankingListResponse:
         """
@@ -528,57 +640,25 @@ class GamificationService:
         """
         period_start, period_end = self._get_period_dates(period_type)
 
-        # Deleta rankings antigos deste período
-        self.repository.delete_rankings_by_period(period_type, period_start, period_end)
+        # Soma, ordena e grava o período inteiro no banco (substitui o ranking anterior)
+        self.repository.replace_period_rankings(period_type, period_start, period_end)
 
-        # Busca todos os usuários do sistema
-        users = self.db.query(User).filter(
-            User.is_deleted == False
-        ).all()
+        return self._build_ranking_list(period_type, period_start, period_end)
 
-        # Calcula pontos de cada usuário no período
-        user_points = []
-        for user in users:
-            points = self.repository.get_user_points_by_period(
-                user.id, period_start, period_end
-            )
-            if points > 0:  # Só inclui usuários com pontos
-                user_points.append((user.id, points, user.name))
-
-        # Ordena por pontos (decrescente)
-        user_points.sort(key=lambda x: x[1], reverse=True)
-
-        # Cria rankings
-        rankings = []
-        for position, (user_id, points, user_name) in enumerate(user_points, start=1):
-            ranking = self.repository.create_ranking(
-                user_id=user_id,
-                period_type=period_type,
-                period_start=period_start,
-                period_end=period_end,
-                total_points=points,
-                rank_position=position
-            )
+    def update_sales_rankings(self) -> dict:
+        """
+        Atualiza os cards ganhos nos rankings dos períodos atuais.
 
-            rankings.append(
-                RankingResponse(
-                    id=ranking.id,
-                    user_id=ranking.user_id,
-                    period_type=ranking.period_type,
-                    period_start=ranking.period_start,
-                    period_end=ranking.period_end,
-                    total_points=ranking.points,
-                    rank_position=ranking.rank,
-                    user_name=user_name
-                )
+        Returns:
+            Dicionário {tipo de período: usuários com vendas no período}
+        """
+        result = {}
+        for period_type in PERIOD_TYPES:
+            period_start, period_end = self._get_period_dates(period_type)
+            result[period_type] = self.repository.upsert_period_sales(
+                period_type, period_start, period_end
             )
-
-        return RankingListResponse(
-            rankings=rankings,
-            period_type=period_type,
-            period_start=period_start,
-            period_end=period_end
-        )
+        return result
 
     def get_rankings(self, period_type: str, limit: int = 100) -> RankingListResponse:
         """
@@ -593,38 +673,30 @@ class GamificationService:
         """
         period_start, period_end = self._get_period_dates(period_type)
 
-        # Busca rankings existentes
-        rankings = self.repository.list_rankings_by_period(
-            period_type, period_start, period_end, limit
-        )
+        ranking_list = self._build_ranking_list(period_type, period_start, period_end, limit)
 
         # Se não existir, calcula
-        if not rankings:
+        if not ranking_list.rankings:
             return self.calculate_rankings(period_type)
 
-        # Converte para response
-        rankings_response = []
-        for ranking in rankings:
-            user = self.db.query(User).filter(User.id == ranking.user_id).first()
-            rankings_response.append(
-                RankingResponse(
-                    id=ranking.id,
-                    user_id=ranking.user_id,
-                    period_type=ranking.period_type,
-                    period_start=ranking.period_start,
-                    period_end=ranking.period_end,
-                    total_points=ranking.points,
-                    rank_position=ranking.rank,
-                    user_name=user.name if user else None
-                )
-            )
+        return ranking_list
 
-        return RankingListResponse(
-            rankings=rankings_response,
-            period_type=period_type,
-            period_start=period_start,
-            period_end=period_end
-        )
+    def rebuild_leaderboard(self) -> int:
+        """
+        Reconstrói o leaderboard dos períodos atuais a partir do histórico de pontos.
+
+        Returns:
+            Quantidade de usuários com pontos nos períodos atuais
+        """
+        starts = get_period_starts()
+        rows = self.repository.sum_points_by_period(starts)
+
+        for index, period_type in enumerate(starts, start=1):
+            leaderboard.replace_period(period_type, {
+                row[0]: int(row[index]) for row in rows if row[index]
+            })
+
+        return len(rows)
 
     # ========== RESUMO DO USUÁRIO ==========
 
@@ -646,37 +718,25 @@ class GamificationService:
                 detail="Usuário não encontrado"
             )
 
-        # Total de pontos
-        total_points = self.repository.get_user_total_points(user_id)
+        # Total e pontos dos períodos atuais (lidos do saldo do usuário)
+        points = self.repository.get_user_points_summary(user_id)
 
         # Badges
         badges = self.get_user_badges(user_id)
 
-        # Pontos da semana atual
-        week_start, week_end = self._get_period_dates("weekly")
-        current_week_points = self.repository.get_user_points_by_period(user_id, week_start, week_end)
-
-        # Pontos do mês atual
-        month_start, month_end = self._get_period_dates("monthly")
-        current_month_points = self.repository.get_user_points_by_period(user_id, month_start, month_end)
-
-        # Rankings
-        weekly_rank = self.repository.get_user_rank_in_period(user_id, "weekly", week_start, week_end)
-        monthly_rank = self.repository.get_user_rank_in_period(user_id, "monthly", month_start, month_end)
-
-        quarter_start, quarter_end = self._get_period_dates("quarterly")
-        quarterly_rank = self.repository.get_user_rank_in_period(user_id, "quarterly", quarter_start, quarter_end)
-
-        annual_start, annual_end = self._get_period_dates("annual")
-        annual_rank = self.repository.get_user_rank_in_period(user_id, "annual", annual_start, annual_end)
+        # Posições atuais (leaderboard em tempo real)
+        weekly_rank = leaderboard.get_rank(user_id, "weekly")
+        monthly_rank = leaderboard.get_rank(user_id, "monthly")
+        quarterly_rank = leaderboard.get_rank(user_id, "quarterly")
+        annual_rank = leaderboard.get_rank(user_id, "annual")
 
         return UserGamificationSummary(
             user_id=user_id,
             user_name=user.name,
-            total_points=total_points,
+            total_points=points["total"],
             badges=badges,
-            current_week_points=current_week_points,
-            current_month_points=current_month_points,
+            current_week_points=points["weekly"],
+            current_month_points=points["monthly"],
             weekly_rank=weekly_rank,
             monthly_rank=monthly_rank,
             quarterly_rank=quarterly_rank,
@@ -754,6 +814,7 @@ class GamificationService:
             )
 
         action = self.repository.create_action_points(action_data)
+        action_points_table.invalidate()
 
         return ActionPointsResponse(
             id=action.id,
@@ -790,6 +851,7 @@ class GamificationService:
             )
 
         updated_action = self.repository.update_action_points(action, action_data)
+        action_points_table.invalidate()
 
         return ActionPointsResponse(
             id=updated_action.id,
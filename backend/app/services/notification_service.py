@@ -3,9 +3,12 @@ Notification Service - Lógica de negócio para notificações.
 Implementa criação, listagem e gerenciamento de notificações in-app.
 """
 from typing import Optional, List
+from datetime import datetime
+from itertools import groupby
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.repositories.card_repository import CardRepository
 from app.repositories.notification_repository import NotificationRepository
 from app.schemas.notification import (
     NotificationCreate,
@@ -19,6 +22,7 @@ from app.schemas.notification import (
     NotificationColorEnum
 )
 from app.models.notification import Notification
+from app.utils.pagination import CountMode, total_pages as calculate_total_pages
 
 
 class NotificationService:
@@ -26,6 +30,10 @@ class NotificationService:
     Service para lógica de negócio relacionada a notificações.
     """
 
+    # Títulos citados na mensagem e IDs guardados nos metadados do resumo
+    DIGEST_TITLES = 3
+    DIGEST_CARD_IDS = 50
+
     def __init__(self, db: Session):
         self.db = db
         self.notification_repository = NotificationRepository(db)
@@ -83,7 +91,10 @@ class NotificationService:
         user_id: int,
         page: int = 1,
         page_size: int = 20,
-        unread_only: bool = False
+        unread_only: bool = False,
+        cursor: bool = False,
+        after: Optional[str] = None,
+        count: CountMode = CountMode.EXACT
     ) -> NotificationListResponse:
         """
         Lista notificações de um usuário com paginação.
@@ -93,22 +104,36 @@ class NotificationService:
             page: Número da página
             page_size: Tamanho da página
             unread_only: Se True, retorna apenas não lidas
+            cursor: Se True, usa paginação por cursor em vez de offset
+            after: Cursor da página anterior (implica cursor=True)
+            count: Modo de contagem do total (exact, estimated, none)
 
         Returns:
             NotificationListResponse
         """
-        notifications, total = self.notification_repository.list_by_user(
-            user_id=user_id,
-            page=page,
-            page_size=page_size,
-            unread_only=unread_only
-        )
+        next_cursor = None
+        if cursor or after:
+            notifications, next_cursor, total = self.notification_repository.list_by_user_after(
+                user_id=user_id,
+                after=after,
+                page_size=page_size,
+                unread_only=unread_only,
+                count_mode=count
+            )
+        else:
+            notifications, total = self.notification_repository.list_by_user(
+                user_id=user_id,
+                page=page,
+                page_size=page_size,
+                unread_only=unread_only,
+                count_mode=count
+            )
 
         # Conta não lidas
         unread_count = self.notification_repository.count_unread_by_user(user_id)
 
         # Total de páginas
-        total_pages = (total + page_size - 1) // page_size
+        total_pages = calculate_total_pages(total, page_size)
 
         # Converte para response
         items = [NotificationResponse.model_validate(n) for n in notifications]
@@ -119,7 +144,8 @@ class NotificationService:
             unread_count=unread_count,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
 
     def get_notification_stats(self, user_id: int) -> NotificationStatsResponse:
@@ -342,6 +368,98 @@ class NotificationService:
         )
         return self.create_notification(data)
 
+    def send_overdue_digests(self, now: Optional[datetime] = None, batch_size: int = 500) -> dict:
+        """
+        Envia um resumo diário de cards vencidos para cada responsável.
+
+        Os cards são lidos em streaming (apenas id, título e responsável) e
+        agrupados por usuário: cada um recebe uma única notificação com todos
+        os seus cards vencidos. As notificações são gravadas com um INSERT por
+        lote de usuários.
+
+        Idempotente por dia: usuários que já receberam o resumo hoje são
+        ignorados, então rodar de novo após uma falha não duplica o envio.
+
+        Args:
+            now: Data/hora de referência (padrão: agora, UTC)
+            batch_size: Quantidade de usuários por INSERT
+
+        Returns:
+            Estatísticas: users_notified, users_skipped e overdue_cards
+        """
+        now = now or datetime.utcnow()
+        start_of_day = datetime(now.year, now.month, now.day)
+
+        # Agrupa durante o streaming; os commits ficam para depois, pois
+        # encerrariam o cursor que está sendo percorrido
+        digests = []
+        overdue_cards = 0
+        rows = CardRepository(self.db).iter_overdue_assignments(now)
+        for user_id, cards in groupby(rows, key=lambda row: row.assigned_to_id):
+            cards = list(cards)
+            overdue_cards += len(cards)
+            digests.append(self._build_overdue_digest(user_id, cards, start_of_day))
+
+        notified = 0
+        for start in range(0, len(digests), batch_size):
+            batch = digests[start:start + batch_size]
+            already_notified = self.notification_repository.find_users_notified_since(
+                NotificationTypeEnum.CARD_OVERDUE.value,
+                start_of_day,
+                [digest["user_id"] for digest in batch]
+            )
+            notified += self.notification_repository.insert_bulk([
+                digest for digest in batch if digest["user_id"] not in already_notified
+            ])
+
+        return {
+            "users_notified": notified,
+            "users_skipped": len(digests) - notified,
+            "overdue_cards": overdue_cards
+        }
+
+    def _build_overdue_digest(self, user_id: int, cards: list, day: datetime) -> dict:
+        """
+        Monta os dados da notificação de resumo de cards vencidos de um usuário.
+
+        Args:
+            user_id: ID do responsável
+            cards: Linhas (id, title, due_date) dos cards vencidos do usuário
+            day: Dia do resumo
+
+        Returns:
+            Dados da notificação
+        """
+        total = len(cards)
+        if total == 1:
+            card = cards[0]
+            title = "Card vencido"
+            message = f"O card '{card.title}' está vencido desde {card.due_date:%d/%m/%Y}"
+            url = f"/cards/{card.id}"
+        else:
+            titles = ", ".join(f"'{card.title}'" for card in cards[:self.DIGEST_TITLES])
+            remaining = total - self.DIGEST_TITLES
+            title = f"{total} cards vencidos"
+            message = f"Você tem {total} cards vencidos: {titles}"
+            if remaining > 0:
+                message += f" e mais {remaining}"
+            url = "/notifications"
+
+        return {
+            "user_id": user_id,
+            "notification_type": NotificationTypeEnum.CARD_OVERDUE.value,
+            "title": title,
+            "message": message,
+            "icon": NotificationIconEnum.WARNING.value,
+            "color": NotificationColorEnum.DANGER.value,
+            "notification_metadata": {
+                "digest_date": day.date().isoformat(),
+                "total_cards": total,
+                "card_ids": [card.id for card in cards[:self.DIGEST_CARD_IDS]],
+                "url": url
+            }
+        }
+
     def notify_transfer_received(
         self,
         user_id: int,
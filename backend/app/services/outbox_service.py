@@ -0,0 +1,181 @@
+"""
+Outbox Service - Processamento dos eventos do outbox.
+Executa os efeitos colaterais gravados junto com cada operação, fora da
+requisição, com novas tentativas e sem repetir etapas já concluídas.
+"""
+import time
+from typing import Callable, List, Optional, Tuple
+from datetime import timedelta
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core import outbox
+from app.core.config import settings
+from app.db.session import single_transaction
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.card_repository import CardRepository
+from app.models.outbox_event import OutboxEvent, OutboxEventType
+from app.models.user import User
+
+
+class OutboxService:
+    """
+    Service que processa os eventos do outbox.
+    """
+
+    # Tentativas antes de o evento ficar como failed
+    MAX_ATTEMPTS = 5
+    # Reserva de um lote: após esse tempo, outro worker pode reprocessar
+    LEASE = timedelta(minutes=5)
+    # Espera da primeira nova tentativa (dobra a cada falha)
+    RETRY_DELAY = timedelta(minutes=1)
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = OutboxRepository(db)
+        self.handlers = {
+            OutboxEventType.CARD_MOVED: self._handle_card_moved,
+        }
+
+    def process_pending(self, limit: int = 100) -> dict:
+        """
+        Reserva e processa um lote de eventos prontos.
+
+        Args:
+            limit: Quantidade máxima de eventos
+
+        Returns:
+            Estatísticas: claimed, processed e failed
+        """
+        events = self.repository.claim_ready(limit, self.LEASE)
+
+        # Publicações de tasks do Celery vão em lote; os demais eventos, um a um
+        tasks = [event for event in events if event.event_type == OutboxEventType.CELERY_TASK]
+        published, failed = self._publish_tasks(tasks)
+
+        processed = published
+        for event in events:
+            if event.event_type == OutboxEventType.CELERY_TASK:
+                continue
+            try:
+                handler = self.handlers.get(event.event_type)
+                if handler is None:
+                    raise ValueError(f"Tipo de evento sem handler: {event.event_type}")
+
+                handler(event)
+                self.repository.mark_done(event)
+                processed += 1
+            except Exception as e:
+                self.db.rollback()
+                logger.warning(f"[OUTBOX] Erro no evento {event.id} ({event.event_type}): {e}")
+                self._fail(event, str(e))
+                failed += 1
+
+        return {"claimed": len(events), "processed": processed, "failed": failed}
+
+    def _fail(self, event: OutboxEvent, error: str) -> None:
+        """
+        Registra a falha de um evento com espera exponencial até a próxima tentativa.
+        """
+        self.repository.mark_failed(
+            event,
+            error,
+            self.MAX_ATTEMPTS,
+            self.RETRY_DELAY * (2 ** max(event.attempts - 1, 0))
+        )
+
+    def _publish_tasks(self, events: List[OutboxEvent]) -> Tuple[int, int]:
+        """
+        Publica as tasks do Celery em grupos de OUTBOX_PUBLISH_CHUNK_SIZE.
+
+        Cada grupo só é marcado como processado depois que o broker aceitou
+        as mensagens. Se o broker falhar ou ficar lento, o restante do lote
+        volta para o outbox e é publicado na próxima rodada.
+
+        Args:
+            events: Eventos do tipo celery_task já reservados
+
+        Returns:
+            Tupla (publicados, com falha)
+        """
+        published = 0
+        failed = 0
+        chunk_size = settings.OUTBOX_PUBLISH_CHUNK_SIZE
+
+        for index in range(0, len(events), chunk_size):
+            chunk = events[index:index + chunk_size]
+            started = time.perf_counter()
+            try:
+                outbox.publish_task_batch([
+                    (event.payload["task"], event.payload.get("kwargs") or {}, f"outbox-{event.id}")
+                    for event in chunk
+                ])
+            except Exception as e:
+                logger.warning(f"[OUTBOX] Erro ao publicar {len(chunk)} tasks: {e}")
+                for event in chunk:
+                    self._fail(event, str(e))
+                failed += len(chunk)
+                # Broker com problema: não insiste no restante do lote
+                self.repository.release([event.id for event in events[index + chunk_size:]])
+                break
+
+            self.repository.mark_done_bulk([event.id for event in chunk])
+            published += len(chunk)
+
+            if time.perf_counter() - started > settings.OUTBOX_PUBLISH_SLOW_SECONDS:
+                logger.warning("[OUTBOX] Broker lento, adiando o restante das publicações")
+                self.repository.release([event.id for event in events[index + chunk_size:]])
+                break
+
+        return published, failed
+
+    def run_step(self, event: OutboxEvent, step: str, action: Callable[[], None]) -> None:
+        """
+        Executa uma etapa do evento uma única vez.
+
+        A etapa é registrada na mesma transação dos seus efeitos: dentro de
+        single_transaction, commit(db) dos repositories e services só faz
+        flush e o único commit é o da etapa. Se a ação falhar em qualquer
+        ponto, o rollback desfaz a etapa inteira e ela roda de novo na
+        próxima tentativa.
+
+        Args:
+            event: Evento em processamento
+            step: Nome da etapa
+            action: Função que executa a etapa
+        """
+        if step in (event.completed_steps or []):
+            return
+
+        with single_transaction(self.db):
+            self.repository.mark_step(event, step)
+            action()
+
+    # ========== HANDLERS ==========
+
+    def _handle_card_moved(self, event: OutboxEvent) -> None:
+        """
+        Efeitos de um card movido: pontos e parabenização para o responsável
+        e automações do board.
+        """
+        # Import lazy para evitar importação circular
+        from app.services.card_service import CardService
+
+        payload = event.payload
+        card = CardRepository(self.db).find_by_id(payload["card_id"])
+        if not card:
+            return  # Card removido depois do movimento: nada a fazer
+
+        card_service = CardService(self.db)
+
+        if payload.get("assigned_to_id") and payload.get("points"):
+            self.run_step(event, "points", lambda: card_service.award_move_points(payload))
+            self.run_step(event, "notification", lambda: card_service.notify_move(card, payload))
+
+        user: Optional[User] = self.db.query(User).filter(User.id == payload["moved_by_id"]).first()
+        if user and payload["from_list_id"] != payload["to_list_id"]:
+            self.run_step(
+                event,
+                "automations",
+                lambda: card_service.trigger_move_automations(card, user, payload)
+            )
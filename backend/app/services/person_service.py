@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from app.repositories.person_repository import PersonRepository
 from app.schemas.person import PersonCreate, PersonUpdate, PersonResponse, PersonListResponse
 from app.models.person import Person
+from app.utils.pagination import CountMode, total_pages as calculate_total_pages
 
 
 class PersonService:
@@ -48,7 +49,10 @@ class PersonService:
         is_active: Optional[bool] = None,
         search: Optional[str] = None,
         organization_id: Optional[int] = None,
-        owner_id: Optional[int] = None
+        owner_id: Optional[int] = None,
+        cursor: bool = False,
+        after: Optional[str] = None,
+        count: CountMode = CountMode.EXACT
     ) -> PersonListResponse:
         """
         Lista pessoas do sistema com paginação.
@@ -60,33 +64,45 @@ class PersonService:
             search: Termo de busca (nome, email, telefone, cargo)
             organization_id: Filtro por organização
             owner_id: Filtro por responsável
+            cursor: Se True, usa paginação por cursor em vez de offset
+            after: Cursor da página anterior (implica cursor=True)
+            count: Modo de contagem do total (exact, estimated, none)
 
         Returns:
             PersonListResponse com lista paginada de pessoas
         """
-        # Calcula offset
-        skip = (page - 1) * page_size
-
-        # Busca pessoas
-        persons = self.repository.list_all(
-            skip=skip,
-            limit=page_size,
-            is_active=is_active,
-            search=search,
-            organization_id=organization_id,
-            owner_id=owner_id
-        )
+        # Busca pessoas (por cursor ou por offset)
+        next_cursor = None
+        if cursor or after:
+            persons, next_cursor = self.repository.list_all_after(
+                after=after,
+                limit=page_size,
+                is_active=is_active,
+                search=search,
+                organization_id=organization_id,
+                owner_id=owner_id
+            )
+        else:
+            persons = self.repository.list_all(
+                skip=(page - 1) * page_size,
+                limit=page_size,
+                is_active=is_active,
+                search=search,
+                organization_id=organization_id,
+                owner_id=owner_id
+            )
 
         # Conta total
         total = self.repository.count_all(
             is_active=is_active,
             search=search,
             organization_id=organization_id,
-            owner_id=owner_id
+            owner_id=owner_id,
+            mode=count
         )
 
         # Calcula total de páginas
-        total_pages = (total + page_size - 1) // page_size
+        total_pages = calculate_total_pages(total, page_size)
 
         # Converte para response schema
         persons_response = [
@@ -99,7 +115,8 @@ class PersonService:
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
 
     def create_person(self, person_data: PersonCreate) -> Person:
@@ -3,18 +3,19 @@ Report Service - Lógica de negócio para relatórios e KPIs.
 Implementa cálculos e agregações para dashboards e relatórios.
 """
 from typing import Optional, List, Dict, Any, Tuple
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 from decimal import Decimal
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, case
+from sqlalchemy import func, and_, or_, case, cast, null, select, union_all, DateTime, Integer
 
 from app.models.card import Card
-from app.models.board import Board
 from app.models.list import List as BoardList
 from app.models.user import User
 from app.models.card_transfer import CardTransfer
 from app.models.activity import Activity
+from app.models.pipeline_daily_snapshot import PipelineDailySnapshot
+from app.core.cache import report_cache
 from app.repositories.board_repository import BoardRepository
 from app.repositories.card_repository import CardRepository
 from app.schemas.report import (
@@ -133,144 +134,195 @@ class ReportService:
                 detail=f"Período inválido: {period}"
             )
 
-    def get_dashboard_kpis(self) -> DashboardKPIsResponse:
+    def _sales_evolution_months(self, today: date) -> List[Tuple[date, date]]:
         """
-        Retorna os KPIs principais para o dashboard.
+        Calcula os meses exibidos no gráfico de evolução de vendas.
+
+        Args:
+            today: Data de referência
 
         Returns:
-            DashboardKPIsResponse
+            Lista de tuplas (primeiro dia, último dia) dos últimos 6 meses
         """
-        today = date.today()
-        start_of_week, _ = self._get_date_range(PeriodEnum.THIS_WEEK)
-        start_of_month, _ = self._get_date_range(PeriodEnum.THIS_MONTH)
+        months = []
+        for i in range(5, -1, -1):  # 6 meses atrás até hoje
+            # Calcula o primeiro e último dia do mês
+            target_date = today - timedelta(days=30 * i)
+            month_start = target_date.replace(day=1)
 
-        # Busca todos os boards do sistema
-        boards = self.db.query(Board).all()
-        board_ids = [b.id for b in boards]
+            # Último dia do mês
+            if month_start.month == 12:
+                next_month = month_start.replace(year=month_start.year + 1, month=1, day=1)
+            else:
+                next_month = month_start.replace(month=month_start.month + 1, day=1)
+            month_end = next_month - timedelta(days=1)
 
-        # Total de cards
-        total_cards = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(BoardList.board_id.in_(board_ids)).scalar() or 0
+            months.append((month_start, month_end))
 
-        # Novos cards
-        new_cards_today = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            func.date(Card.created_at) == today
-        ).scalar() or 0
+        return months
 
-        new_cards_this_week = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            func.date(Card.created_at) >= start_of_week
-        ).scalar() or 0
+    def _cached(self, name: str, request: Optional[Any], compute, response_model, board_id=None):
+        """
+        Busca o relatório no cache ou calcula e armazena.
 
-        new_cards_this_month = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            func.date(Card.created_at) >= start_of_month
-        ).scalar() or 0
+        A chave usa os parâmetros da requisição e o intervalo de datas já
+        resolvido, para que períodos relativos (this_month, ...) mudem de
+        chave na virada do dia.
 
-        # Cards ganhos
-        won_cards_today = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == 1,
-            func.date(Card.closed_at) == today
-        ).scalar() or 0
+        Args:
+            name: Nome do relatório
+            request: Requisição do relatório (None para o dashboard)
+            compute: Função que gera a resposta
+            response_model: Schema da resposta
+            board_id: Board do relatório (None = todos os boards)
 
-        won_cards_this_week = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == 1,
-            func.date(Card.closed_at) >= start_of_week
-        ).scalar() or 0
+        Returns:
+            Resposta do relatório
+        """
+        params: Dict[str, Any] = {"today": date.today()}
+        if request is not None:
+            params.update(request.model_dump(mode="json"))
+            params["date_range"] = self._get_date_range(
+                request.period,
+                request.start_date,
+                request.end_date
+            )
 
-        won_cards_this_month = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == 1,
-            func.date(Card.closed_at) >= start_of_month
-        ).scalar() or 0
+        return report_cache.get_or_compute(
+            name, params, compute, response_model, board_id=board_id
+        )
 
-        # Cards perdidos
-        lost_cards_today = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == -1,
-            func.date(Card.closed_at) == today
-        ).scalar() or 0
+    def get_dashboard_kpis(self) -> DashboardKPIsResponse:
+        """
+        Retorna os KPIs principais para o dashboard (com cache).
 
-        lost_cards_this_week = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == -1,
-            func.date(Card.closed_at) >= start_of_week
-        ).scalar() or 0
+        Returns:
+            DashboardKPIsResponse
+        """
+        return self._cached(
+            "dashboard", None, self._build_dashboard_kpis, DashboardKPIsResponse
+        )
 
-        lost_cards_this_month = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == -1,
-            func.date(Card.closed_at) >= start_of_month
-        ).scalar() or 0
+    def get_sales_report(self, request: SalesReportRequest) -> SalesReportResponse:
+        """
+        Gera relatório de vendas por período (com cache).
 
-        # Cards vencidos
-        overdue_cards = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.due_date < datetime.now(),
-            Card.is_won == 0
-        ).scalar() or 0
+        Args:
+            request: Parâmetros do relatório
 
-        due_today = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            func.date(Card.due_date) == today,
-            Card.is_won == 0
-        ).scalar() or 0
+        Returns:
+            SalesReportResponse
+        """
+        return self._cached(
+            "sales", request, lambda: self._build_sales_report(request),
+            SalesReportResponse, board_id=request.board_id
+        )
 
+    def get_conversion_report(self, request: ConversionReportRequest) -> ConversionReportResponse:
+        """
+        Gera relatório de conversão (funil de vendas) com cache.
+
+        Args:
+            request: Parâmetros do relatório
+
+        Returns:
+            ConversionReportResponse
+        """
+        return self._cached(
+            "conversion", request, lambda: self._build_conversion_report(request),
+            ConversionReportResponse, board_id=request.board_id
+        )
+
+    def get_transfer_report(self, request: TransferReportRequest) -> TransferReportResponse:
+        """
+        Gera relatório de transferências (com cache).
+
+        Args:
+            request: Parâmetros do relatório
+
+        Returns:
+            TransferReportResponse
+        """
+        return self._cached(
+            "transfers", request, lambda: self._build_transfer_report(request),
+            TransferReportResponse
+        )
+
+    def _build_dashboard_kpis(self) -> DashboardKPIsResponse:
+        """
+        Retorna os KPIs principais para o dashboard.
+
+        Contadores, somas e a série de evolução de vendas vêm do consolidado
+        diário (pipeline_daily_snapshots), atualizado pelo scheduler, então o
+        custo não cresce com o histórico de cards. Apenas os indicadores de
+        vencimento, que dependem do horário atual, consultam os cards abertos.
+
+        Returns:
+            DashboardKPIsResponse
+        """
+        today = date.today()
+        start_of_week, _ = self._get_date_range(PeriodEnum.THIS_WEEK)
+        start_of_month, _ = self._get_date_range(PeriodEnum.THIS_MONTH)
         end_of_week = start_of_week + timedelta(days=6)
-        due_this_week = self.db.query(func.count(Card.id)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            func.date(Card.due_date) >= today,
-            func.date(Card.due_date) <= end_of_week,
-            Card.is_won == 0
-        ).scalar() or 0
-
-        # Valores monetários
-        total_value = self.db.query(func.sum(Card.value)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(BoardList.board_id.in_(board_ids)).scalar() or Decimal(0)
 
-        won_value_this_month = self.db.query(func.sum(Card.value)).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == 1,
-            func.date(Card.closed_at) >= start_of_month
-        ).scalar() or Decimal(0)
+        snapshot = PipelineDailySnapshot
+        day = snapshot.snapshot_date
+
+        def sum_if(column, *conditions):
+            return func.sum(case((and_(*conditions), column)))
+
+        columns = [
+            func.sum(snapshot.created_count).label("total_cards"),
+            sum_if(snapshot.created_count, day == today).label("new_cards_today"),
+            sum_if(snapshot.created_count, day >= start_of_week).label("new_cards_this_week"),
+            sum_if(snapshot.created_count, day >= start_of_month).label("new_cards_this_month"),
+            sum_if(snapshot.won_count, day == today).label("won_cards_today"),
+            sum_if(snapshot.won_count, day >= start_of_week).label("won_cards_this_week"),
+            sum_if(snapshot.won_count, day >= start_of_month).label("won_cards_this_month"),
+            sum_if(snapshot.lost_count, day == today).label("lost_cards_today"),
+            sum_if(snapshot.lost_count, day >= start_of_week).label("lost_cards_this_week"),
+            sum_if(snapshot.lost_count, day >= start_of_month).label("lost_cards_this_month"),
+            func.sum(snapshot.created_value).label("total_value"),
+            sum_if(snapshot.won_value, day >= start_of_month).label("won_value_this_month"),
+            func.sum(snapshot.open_value).label("pipeline_value"),
+            func.sum(snapshot.won_count).label("total_won"),
+            func.sum(snapshot.won_cycle_days).label("total_won_cycle_days"),
+        ]
 
-        pipeline_value = self.db.query(func.sum(Card.value)).join(
+        # Evolução de vendas (últimos 6 meses) na mesma consulta
+        months = self._sales_evolution_months(today)
+        for index, (first_day, last_day) in enumerate(months):
+            in_month = and_(day >= first_day, day <= last_day)
+            columns.extend([
+                sum_if(snapshot.won_count, in_month).label(f"won_count_{index}"),
+                sum_if(snapshot.won_value, in_month).label(f"won_value_{index}"),
+                sum_if(snapshot.lost_count, in_month).label(f"lost_count_{index}"),
+            ])
+
+        totals = self.db.query(*columns).one()._mapping
+
+        # Vencimentos dependem do horário atual: consulta apenas cards abertos
+        today_start = datetime.combine(today, time.min)
+        tomorrow_start = today_start + timedelta(days=1)
+        week_end = datetime.combine(end_of_week, time.min) + timedelta(days=1)
+        now = datetime.now()
+
+        def count_if(*conditions):
+            return func.count(case((and_(*conditions), Card.id)))
+
+        due = self.db.query(
+            count_if(Card.due_date < now).label("overdue_cards"),
+            count_if(Card.due_date >= today_start, Card.due_date < tomorrow_start).label("due_today"),
+            count_if(Card.due_date >= today_start, Card.due_date < week_end).label("due_this_week"),
+        ).select_from(Card).join(
             BoardList, Card.list_id == BoardList.id
         ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == 0
-        ).scalar() or Decimal(0)
+            Card.is_won == 0,
+            Card.due_date.isnot(None)
+        ).one()._mapping
+
+        new_cards_this_month = totals["new_cards_this_month"] or 0
+        won_cards_this_month = totals["won_cards_this_month"] or 0
 
         # Taxa de conversão do mês
         conversion_rate_this_month = 0.0
@@ -280,37 +332,38 @@ class ReportService:
             )
 
         # Tempo médio para ganhar (em dias)
-        avg_time_result = self.db.query(
-            func.avg(
-                func.extract('epoch', Card.closed_at - Card.created_at) / 86400
+        avg_time_to_win_days = None
+        if totals["total_won"] and totals["total_won_cycle_days"]:
+            avg_time_to_win_days = round(
+                float(totals["total_won_cycle_days"]) / totals["total_won"], 2
             )
-        ).join(
-            BoardList, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == 1,
-            Card.closed_at.isnot(None)
-        ).scalar()
 
-        avg_time_to_win_days = round(float(avg_time_result), 2) if avg_time_result else None
+        sales_evolution = [
+            {
+                "period": first_day.strftime("%b/%y"),  # Ex: "Jan/26"
+                "won_count": totals[f"won_count_{index}"] or 0,
+                "won_value": float(totals[f"won_value_{index}"] or 0),
+                "lost_count": totals[f"lost_count_{index}"] or 0
+            }
+            for index, (first_day, _) in enumerate(months)
+        ]
 
         # Top 5 vendedores do mês
+        cards_won = func.sum(snapshot.won_count)
         top_sellers_query = self.db.query(
             User.name,
-            func.count(Card.id).label('cards_won'),
-            func.sum(Card.value).label('total_value')
+            cards_won.label('cards_won'),
+            func.sum(snapshot.won_value).label('total_value')
         ).join(
-            Card, Card.assigned_to_id == User.id
-        ).join(
-            BoardList, Card.list_id == BoardList.id
+            snapshot, snapshot.assigned_to_id == User.id
         ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == 1,
-            func.date(Card.closed_at) >= start_of_month
+            day >= start_of_month
         ).group_by(
             User.id, User.name
+        ).having(
+            cards_won > 0
         ).order_by(
-            func.count(Card.id).desc()
+            cards_won.desc()
         ).limit(5).all()
 
         top_sellers_this_month = [
@@ -323,17 +376,17 @@ class ReportService:
         ]
 
         # Cards por estágio/lista (para gráfico de barras)
+        open_cards = func.sum(snapshot.open_count)
         cards_by_stage_query = self.db.query(
             BoardList.name.label('stage_name'),
-            func.count(Card.id).label('card_count'),
-            func.sum(Card.value).label('total_value')
+            open_cards.label('card_count'),
+            func.sum(snapshot.open_value).label('total_value')
         ).join(
-            Card, Card.list_id == BoardList.id
-        ).filter(
-            BoardList.board_id.in_(board_ids),
-            Card.is_won == 0  # Apenas cards ativos
+            snapshot, snapshot.list_id == BoardList.id
         ).group_by(
             BoardList.id, BoardList.name, BoardList.position
+        ).having(
+            open_cards > 0  # Apenas cards ativos
         ).order_by(
             BoardList.position
         ).all()
@@ -347,73 +400,23 @@ class ReportService:
             for stage_name, card_count, total_value in cards_by_stage_query
         ]
 
-        # Evolução de vendas (últimos 6 meses para gráfico de linha)
-        sales_evolution = []
-        for i in range(5, -1, -1):  # 6 meses atrás até hoje
-            # Calcula o primeiro e último dia do mês
-            target_date = today - timedelta(days=30 * i)
-            month_start = target_date.replace(day=1)
-
-            # Último dia do mês
-            if month_start.month == 12:
-                next_month = month_start.replace(year=month_start.year + 1, month=1, day=1)
-            else:
-                next_month = month_start.replace(month=month_start.month + 1, day=1)
-            month_end = next_month - timedelta(days=1)
-
-            # Cards ganhos no mês
-            won_count = self.db.query(func.count(Card.id)).join(
-                BoardList, Card.list_id == BoardList.id
-            ).filter(
-                BoardList.board_id.in_(board_ids),
-                Card.is_won == 1,
-                func.date(Card.closed_at) >= month_start,
-                func.date(Card.closed_at) <= month_end
-            ).scalar() or 0
-
-            won_value = self.db.query(func.sum(Card.value)).join(
-                BoardList, Card.list_id == BoardList.id
-            ).filter(
-                BoardList.board_id.in_(board_ids),
-                Card.is_won == 1,
-                func.date(Card.closed_at) >= month_start,
-                func.date(Card.closed_at) <= month_end
-            ).scalar() or Decimal(0)
-
-            # Cards perdidos no mês
-            lost_count = self.db.query(func.count(Card.id)).join(
-                BoardList, Card.list_id == BoardList.id
-            ).filter(
-                BoardList.board_id.in_(board_ids),
-                Card.is_won == -1,
-                func.date(Card.closed_at) >= month_start,
-                func.date(Card.closed_at) <= month_end
-            ).scalar() or 0
-
-            sales_evolution.append({
-                "period": month_start.strftime("%b/%y"),  # Ex: "Jan/26"
-                "won_count": won_count,
-                "won_value": float(won_value),
-                "lost_count": lost_count
-            })
-
         return DashboardKPIsResponse(
-            total_cards=total_cards,
-            new_cards_today=new_cards_today,
-            new_cards_this_week=new_cards_this_week,
+            total_cards=totals["total_cards"] or 0,
+            new_cards_today=totals["new_cards_today"] or 0,
+            new_cards_this_week=totals["new_cards_this_week"] or 0,
             new_cards_this_month=new_cards_this_month,
-            won_cards_today=won_cards_today,
-            won_cards_this_week=won_cards_this_week,
+            won_cards_today=totals["won_cards_today"] or 0,
+            won_cards_this_week=totals["won_cards_this_week"] or 0,
             won_cards_this_month=won_cards_this_month,
-            lost_cards_today=lost_cards_today,
-            lost_cards_this_week=lost_cards_this_week,
-            lost_cards_this_month=lost_cards_this_month,
-            overdue_cards=overdue_cards,
-            due_today=due_today,
-            due_this_week=due_this_week,
-            total_value=total_value,
-            won_value_this_month=won_value_this_month,
-            pipeline_value=pipeline_value,
+            lost_cards_today=totals["lost_cards_today"] or 0,
+            lost_cards_this_week=totals["lost_cards_this_week"] or 0,
+            lost_cards_this_month=totals["lost_cards_this_month"] or 0,
+            overdue_cards=due["overdue_cards"] or 0,
+            due_today=due["due_today"] or 0,
+            due_this_week=due["due_this_week"] or 0,
+            total_value=totals["total_value"] or Decimal(0),
+            won_value_this_month=totals["won_value_this_month"] or Decimal(0),
+            pipeline_value=totals["pipeline_value"] or Decimal(0),
             conversion_rate_this_month=conversion_rate_this_month,
             avg_time_to_win_days=avg_time_to_win_days,
             top_sellers_this_month=top_sellers_this_month,
@@ -421,13 +424,15 @@ class ReportService:
             sales_evolution=sales_evolution
         )
 
-    def get_sales_report(
+    def _build_sales_report(
         self,
         request: SalesReportRequest
     ) -> SalesReportResponse:
         """
         Gera relatório de vendas por período.
 
+        Lê do consolidado diário do pipeline, agrupando por responsável.
+
         Args:
             request: Parâmetros do relatório
 
@@ -440,53 +445,29 @@ class ReportService:
             request.end_date
         )
 
-        # Filtra boards
-        query_filter = []
-        if request.board_id:
-            query_filter.append(Board.id == request.board_id)
-
-        boards = self.db.query(Board).filter(*query_filter).all() if query_filter else self.db.query(Board).all()
-        board_ids = [b.id for b in boards]
+        snapshot = PipelineDailySnapshot
 
-        # Filtro adicional de usuário
-        user_filter = []
+        # Filtros de board, usuário e período
+        filters = [
+            snapshot.snapshot_date >= start_date,
+            snapshot.snapshot_date <= end_date
+        ]
+        if request.board_id:
+            filters.append(snapshot.board_id == request.board_id)
         if request.user_id:
-            user_filter.append(Card.assigned_to_id == request.user_id)
+            filters.append(snapshot.assigned_to_id == request.user_id)
 
         # Agrupa por vendedor
         sales_data = self.db.query(
             User.name,
-            func.count(
-                case((func.date(Card.created_at) >= start_date, Card.id))
-            ).label('new_cards'),
-            func.count(
-                case((and_(
-                    Card.is_won == True,
-                    func.date(Card.won_at) >= start_date,
-                    func.date(Card.won_at) <= end_date
-                ), Card.id))
-            ).label('won_cards'),
-            func.count(
-                case((and_(
-                    Card.is_lost == True,
-                    func.date(Card.lost_at) >= start_date,
-                    func.date(Card.lost_at) <= end_date
-                ), Card.id))
-            ).label('lost_cards'),
-            func.sum(
-                case((and_(
-                    Card.is_won == True,
-                    func.date(Card.won_at) >= start_date,
-                    func.date(Card.won_at) <= end_date
-                ), Card.value), else_=0)
-            ).label('won_value')
-        ).join(
-            Card, Card.assigned_to_id == User.id
+            func.sum(snapshot.created_count).label('new_cards'),
+            func.sum(snapshot.won_count).label('won_cards'),
+            func.sum(snapshot.lost_count).label('lost_cards'),
+            func.sum(snapshot.won_value).label('won_value')
         ).join(
-            BoardList, Card.list_id == BoardList.id
+            snapshot, snapshot.assigned_to_id == User.id
         ).filter(
-            BoardList.board_id.in_(board_ids),
-            *user_filter
+            *filters
         ).group_by(
             User.id, User.name
         ).all()
@@ -498,6 +479,10 @@ class ReportService:
         total_won_value = Decimal(0)
 
         for name, new_cards, won_cards, lost_cards, won_value in sales_data:
+            new_cards = new_cards or 0
+            won_cards = won_cards or 0
+            lost_cards = lost_cards or 0
+
             conversion_rate = 0.0
             if new_cards > 0:
                 conversion_rate = round((won_cards / new_cards) * 100, 2)
@@ -534,13 +519,115 @@ class ReportService:
             items=items
         )
 
-    def get_conversion_report(
+    def _days_between(self, start, end):
+        """
+        Expressão SQL com a diferença em dias entre duas colunas datetime.
+
+        Args:
+            start: Coluna/expressão inicial
+            end: Coluna/expressão final
+
+        Returns:
+            Expressão SQL (float)
+        """
+        if self.db.get_bind().dialect.name == "sqlite":
+            return func.julianday(end) - func.julianday(start)
+        return func.extract('epoch', end - start) / 86400
+
+    def _get_stage_transitions(self, board_id: int, start_date: date, end_date: date) -> List[Any]:
+        """
+        Agrega as passagens dos cards pelas etapas de um board.
+
+        Cada passagem é a entrada de um card em uma lista, pela criação do
+        card ou por um evento card_moved. Uma única consulta com funções de
+        janela (LAG/ROW_NUMBER por card) reconstrói quando o card entrou,
+        quando saiu e para qual lista foi.
+
+        Args:
+            board_id: ID do board
+            start_date: Data inicial (entrada na etapa)
+            end_date: Data final (entrada na etapa)
+
+        Returns:
+            Linhas (list_id, next_list_id, entries, total_days, completed)
+        """
+        from_list_id = Activity.activity_metadata["from_list_id"].as_integer()
+        to_list_id = Activity.activity_metadata["to_list_id"].as_integer()
+
+        moves = select(
+            Activity.card_id.label("card_id"),
+            from_list_id.label("from_list_id"),
+            to_list_id.label("to_list_id"),
+            Activity.created_at.label("moved_at"),
+            func.lag(Activity.created_at).over(
+                partition_by=Activity.card_id,
+                order_by=(Activity.created_at, Activity.id)
+            ).label("previous_moved_at"),
+            func.row_number().over(
+                partition_by=Activity.card_id,
+                order_by=(Activity.created_at.desc(), Activity.id.desc())
+            ).label("reverse_order")
+        ).join(
+            Card, Activity.card_id == Card.id
+        ).join(
+            BoardList, Card.list_id == BoardList.id
+        ).where(
+            Activity.activity_type == "card_moved",
+            BoardList.board_id == board_id
+        ).cte("card_moves")
+
+        # Passagens encerradas: cada movimentação encerra a etapa de origem
+        completed_stays = select(
+            moves.c.from_list_id.label("list_id"),
+            func.coalesce(moves.c.previous_moved_at, Card.created_at).label("entered_at"),
+            moves.c.moved_at.label("left_at"),
+            moves.c.to_list_id.label("next_list_id")
+        ).join(
+            Card, Card.id == moves.c.card_id
+        )
+
+        # Passagem atual: a lista em que o card está agora
+        current_stays = select(
+            Card.list_id.label("list_id"),
+            func.coalesce(moves.c.moved_at, Card.created_at).label("entered_at"),
+            cast(null(), DateTime).label("left_at"),
+            cast(null(), Integer).label("next_list_id")
+        ).join(
+            BoardList, Card.list_id == BoardList.id
+        ).outerjoin(
+            moves, and_(moves.c.card_id == Card.id, moves.c.reverse_order == 1)
+        ).where(
+            BoardList.board_id == board_id
+        )
+
+        stays = union_all(completed_stays, current_stays).subquery()
+
+        return self.db.query(
+            stays.c.list_id,
+            stays.c.next_list_id,
+            func.count().label("entries"),
+            func.sum(self._days_between(stays.c.entered_at, stays.c.left_at)).label("total_days"),
+            func.count(stays.c.left_at).label("completed")
+        ).filter(
+            stays.c.entered_at >= datetime.combine(start_date, time.min),
+            stays.c.entered_at < datetime.combine(end_date, time.min) + timedelta(days=1)
+        ).group_by(
+            stays.c.list_id,
+            stays.c.next_list_id
+        ).all()
+
+    def _build_conversion_report(
         self,
         request: ConversionReportRequest
     ) -> ConversionReportResponse:
         """
         Gera relatório de conversão (funil de vendas).
 
+        Os totais por lista vêm do consolidado diário do pipeline
+        (cards criados no período, agrupados pela lista atual). A conversão
+        entre etapas e o tempo médio em cada etapa vêm dos eventos de
+        movimentação (card_moved) dos cards que entraram na etapa no período.
+
         Args:
             request: Parâmetros do relatório
 
@@ -566,42 +653,66 @@ class ReportService:
             BoardList.board_id == request.board_id
         ).order_by(BoardList.position).all()
 
+        # Cards criados no período, por lista (uma única consulta)
+        snapshot = PipelineDailySnapshot
+        totals_by_list = {
+            list_id: (cards_count or 0, cards_value or Decimal(0))
+            for list_id, cards_count, cards_value in self.db.query(
+                snapshot.list_id,
+                func.sum(snapshot.created_count),
+                func.sum(snapshot.created_value)
+            ).filter(
+                snapshot.board_id == request.board_id,
+                snapshot.snapshot_date >= start_date,
+                snapshot.snapshot_date <= end_date
+            ).group_by(snapshot.list_id).all()
+        }
+
+        # Passagens pelas etapas (entradas, avanços e tempo de permanência)
+        stage_order = {list_obj.id: index for index, list_obj in enumerate(lists)}
+        lost_lists = {list_obj.id for list_obj in lists if list_obj.is_lost_stage}
+        entries: Dict[int, int] = {}
+        advanced: Dict[int, int] = {}
+        days_in_stage: Dict[int, float] = {}
+        completed_stays: Dict[int, int] = {}
+
+        for list_id, next_list_id, count, total_days, completed in self._get_stage_transitions(
+            request.board_id, start_date, end_date
+        ):
+            entries[list_id] = entries.get(list_id, 0) + count
+            if completed:
+                days_in_stage[list_id] = days_in_stage.get(list_id, 0.0) + float(total_days or 0)
+                completed_stays[list_id] = completed_stays.get(list_id, 0) + completed
+
+            # Avanço = ir para uma etapa posterior do funil (exceto etapas de perda)
+            if (
+                list_id in stage_order
+                and next_list_id in stage_order
+                and next_list_id not in lost_lists
+                and stage_order[next_list_id] > stage_order[list_id]
+            ):
+                advanced[list_id] = advanced.get(list_id, 0) + count
+
         stages = []
         total_cards = 0
         total_value = Decimal(0)
 
-        for i, list_obj in enumerate(lists):
-            # Conta cards nesta lista
-            cards_in_stage = self.db.query(func.count(Card.id)).filter(
-                Card.list_id == list_obj.id,
-                func.date(Card.created_at) >= start_date,
-                func.date(Card.created_at) <= end_date
-            ).scalar() or 0
-
-            # Valor total
-            value_in_stage = self.db.query(func.sum(Card.value)).filter(
-                Card.list_id == list_obj.id,
-                func.date(Card.created_at) >= start_date,
-                func.date(Card.created_at) <= end_date
-            ).scalar() or Decimal(0)
-
-            # Taxa de conversão para próxima etapa
+        for list_obj in lists:
+            cards_in_stage, value_in_stage = totals_by_list.get(list_obj.id, (0, Decimal(0)))
+
+            # Taxa de conversão: cards que avançaram / cards que entraram na etapa
             conversion_rate = 0.0
-            if i < len(lists) - 1:
-                next_list = lists[i + 1]
-                cards_moved_to_next = self.db.query(func.count(Card.id)).filter(
-                    Card.list_id == next_list.id,
-                    func.date(Card.created_at) >= start_date,
-                    func.date(Card.created_at) <= end_date
-                ).scalar() or 0
-
-                if cards_in_stage > 0:
-                    conversion_rate = round(
-                        (cards_moved_to_next / cards_in_stage) * 100, 2
-                    )
-
-            # Tempo médio nesta etapa (estimativa simples)
+            if entries.get(list_obj.id):
+                conversion_rate = round(
+                    (advanced.get(list_obj.id, 0) / entries[list_obj.id]) * 100, 2
+                )
+
+            # Tempo médio nesta etapa (apenas passagens encerradas)
             avg_time_in_stage_days = None
+            if completed_stays.get(list_obj.id):
+                avg_time_in_stage_days = round(
+                    days_in_stage[list_obj.id] / completed_stays[list_obj.id], 2
+                )
 
             stages.append(ConversionFunnelStage(
                 list_name=list_obj.name,
@@ -615,11 +726,12 @@ class ReportService:
             total_cards += cards_in_stage
             total_value += value_in_stage
 
-        # Taxa de conversão geral (primeiro estágio → último estágio)
+        # Taxa de conversão geral (entradas na última etapa / entradas na primeira)
         overall_conversion_rate = 0.0
-        if len(stages) >= 2 and stages[0].cards_count > 0:
+        funnel = [list_obj.id for list_obj in lists if list_obj.id not in lost_lists]
+        if len(funnel) >= 2 and entries.get(funnel[0]):
             overall_conversion_rate = round(
-                (stages[-1].cards_count / stages[0].cards_count) * 100, 2
+                (entries.get(funnel[-1], 0) / entries[funnel[0]]) * 100, 2
             )
 
         return ConversionReportResponse(
@@ -633,7 +745,7 @@ class ReportService:
             stages=stages
         )
 
-    def get_transfer_report(
+    def _build_transfer_report(
         self,
         request: TransferReportRequest
     ) -> TransferReportResponse:
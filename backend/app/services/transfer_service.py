@@ -2,9 +2,10 @@
 Transfer Service - Lógica de negócio de transferências.
 Gerencia transferências de cards entre usuários com fluxo de aprovação.
 """
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 import uuid
 
@@ -12,21 +13,31 @@ from app.repositories.transfer_repository import TransferRepository
 from app.repositories.card_repository import CardRepository
 from app.repositories.list_repository import ListRepository
 from app.repositories.board_repository import BoardRepository
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.notification_repository import NotificationRepository
 from app.schemas.transfer import (
     CardTransferCreate,
     CardTransferResponse,
     CardTransferListResponse,
     BatchTransferCreate,
     BatchTransferResponse,
+    AsyncBatchTransferCreate,
+    TransferBatchResponse,
     TransferApprovalDecision,
     TransferApprovalResponse,
     TransferApprovalListResponse,
     TransferStatistics,
     APPROVAL_EXPIRATION_HOURS
 )
+from app.schemas.notification import NotificationTypeEnum, NotificationIconEnum, NotificationColorEnum
+from app.core.cache import report_cache
+from app.core.config import settings
+from app.core.events import event_broker, user_channel, board_channel
+from app.core.outbox import outbox_dispatcher
 from app.models.user import User
 from app.models.card_transfer import CardTransfer
 from app.models.transfer_approval import TransferApproval as TransferApprovalModel
+from app.models.transfer_batch import TransferBatch, TransferBatchStatus
 
 
 class TransferService:
@@ -34,6 +45,9 @@ class TransferService:
     Service para lógica de negócio de transferências.
     """
 
+    # Escopo do cache de relatórios das estatísticas de transferências
+    STATISTICS_CACHE_SCOPE = "transfer_statistics"
+
     def __init__(self, db: Session, approval_required: bool = False):
         """
         Inicializa o service.
@@ -124,6 +138,8 @@ class TransferService:
         if not self.approval_required:
             self._execute_transfer(transfer)
 
+        self._invalidate_statistics()
+
         return self._to_response(transfer)
 
     def create_batch_transfer(
@@ -134,6 +150,11 @@ class TransferService:
         """
         Cria transferência em lote.
 
+        Valida todos os cards com uma query, grava transferências e aprovações
+        com INSERTs em lote e reatribui os cards com um único UPDATE, tudo na
+        mesma transação. Cards inválidos são informados em errors e não
+        impedem a transferência dos demais.
+
         Args:
             batch_data: Dados da transferência em lote
             current_user: Usuário autenticado
@@ -141,72 +162,331 @@ class TransferService:
         Returns:
             BatchTransferResponse
         """
+        to_user = self._get_destination_user(batch_data.to_user_id)
         batch_id = str(uuid.uuid4())
-        successful = 0
-        failed = 0
-        transfers = []
+
+        cards, created, errors = self._transfer_cards(
+            batch_data.card_ids,
+            from_user_id=current_user.id,
+            to_user_id=batch_data.to_user_id,
+            reason=batch_data.reason,
+            notes=batch_data.notes,
+            batch_id=batch_id
+        )
+        self.db.commit()
+        self._invalidate_transfer_reports(cards, created)
+
+        transfer_status = "pending_approval" if self.approval_required else "completed"
+        transfers = [
+            CardTransferResponse(
+                id=row.id,
+                card_id=row.card_id,
+                from_user_id=current_user.id,
+                to_user_id=batch_data.to_user_id,
+                reason=batch_data.reason,
+                notes=batch_data.notes,
+                status=transfer_status,
+                is_batch_transfer=True,
+                batch_id=batch_id,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                card_title=cards[row.card_id].title,
+                from_user_name=current_user.name,
+                to_user_name=to_user.name
+            )
+            for row in created
+        ]
+
+        return BatchTransferResponse(
+            batch_id=batch_id,
+            total_cards=len(batch_data.card_ids),
+            successful=len(transfers),
+            failed=len(errors),
+            transfers=transfers,
+            errors=errors if errors else None
+        )
+
+    def _get_destination_user(self, user_id: int) -> User:
+        """
+        Busca o usuário destino de uma transferência.
+
+        Raises:
+            HTTPException: Se o usuário não existir
+        """
+        to_user = self.db.query(User).filter(User.id == user_id).first()
+        if not to_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário destino não encontrado"
+            )
+        return to_user
+
+    def _transfer_cards(
+        self,
+        card_ids: List[int],
+        from_user_id: Optional[int],
+        to_user_id: int,
+        reason: str,
+        notes: Optional[str],
+        batch_id: str
+    ) -> Tuple[Dict[int, Row], List[Row], List[dict]]:
+        """
+        Transfere um conjunto de cards com operações em lote (sem commit).
+
+        Args:
+            card_ids: IDs dos cards
+            from_user_id: Usuário de origem registrado na transferência
+            to_user_id: Usuário destino
+            reason: Motivo
+            notes: Notas
+            batch_id: ID do lote
+
+        Returns:
+            Tupla (cards encontrados por ID, transferências gravadas, erros por card)
+        """
         errors = []
 
-        for card_id in batch_data.card_ids:
-            try:
-                transfer_data = CardTransferCreate(
-                    card_id=card_id,
-                    to_user_id=batch_data.to_user_id,
-                    reason=batch_data.reason,
-                    notes=batch_data.notes
-                )
+        # Valida todos os cards de uma vez (card, lista e board)
+        cards = self.card_repository.find_with_boards(card_ids)
+        valid_cards = []
+        for card_id in card_ids:
+            card = cards.get(card_id)
+            if not card:
+                errors.append({"card_id": card_id, "error": "Card não encontrado"})
+            elif card.board_id is None:
+                errors.append({"card_id": card_id, "error": "Board não encontrado"})
+            else:
+                valid_cards.append(card)
+
+        transfer_status = "pending_approval" if self.approval_required else "completed"
+        created = self.repository.create_bulk([
+            {
+                "card_id": card.id,
+                "from_user_id": from_user_id,
+                "to_user_id": to_user_id,
+                "reason": reason,
+                "notes": notes,
+                "status": transfer_status,
+                "is_batch_transfer": True,
+                "batch_id": batch_id
+            }
+            for card in valid_cards
+        ])
+
+        if self.approval_required:
+            # Qualquer gerente/admin pode aprovar (approver_id = None)
+            expires_at = datetime.utcnow() + timedelta(hours=APPROVAL_EXPIRATION_HOURS)
+            self.repository.create_approvals_bulk([row.id for row in created], expires_at)
+        else:
+            self.card_repository.assign_bulk(valid_cards, to_user_id)
+
+        return cards, created, errors
+
+    def _invalidate_transfer_reports(self, cards: Dict[int, Row], created: List[Row]) -> None:
+        """
+        Invalida as estatísticas e os relatórios dos boards com cards
+        reatribuídos (após o commit).
+        """
+        if not created:
+            return
+        self._invalidate_statistics()
+        if not self.approval_required:
+            # Relatórios por vendedor e de transferências mudam com o novo responsável
+            self.card_repository.invalidate_reports(*{cards[row.card_id].list_id for row in created})
+
+    def _invalidate_statistics(self) -> None:
+        """
+        Invalida as estatísticas de transferências, que têm escopo próprio no
+        cache: os demais relatórios globais continuam válidos.
+        """
+        report_cache.invalidate_scope(self.STATISTICS_CACHE_SCOPE)
+
+    # ========== LOTES ASSÍNCRONOS ==========
+
+    # Erros guardados por lote (o restante é só contado)
+    MAX_BATCH_ERRORS = 100
 
-                # Valida card
-                card = self.card_repository.find_by_id(card_id)
-                if not card:
-                    failed += 1
-                    errors.append({"card_id": card_id, "error": "Card não encontrado"})
-                    continue
-
-                # Verifica acesso
-                list_obj = self.list_repository.find_by_id(card.list_id)
-                board = self.board_repository.find_by_id(list_obj.board_id) if list_obj else None
-
-                if not board:
-                    failed += 1
-                    errors.append({"card_id": card_id, "error": "Board não encontrado"})
-                    continue
-
-                # Cria transferência
-                transfer_status = "pending_approval" if self.approval_required else "completed"
-                transfer = self.repository.create(
-                    transfer_data,
-                    from_user_id=current_user.id,
-                    status=transfer_status,
-                    is_batch=True,
-                    batch_id=batch_id
+    def start_async_batch(
+        self,
+        batch_data: AsyncBatchTransferCreate,
+        current_user: User
+    ) -> TransferBatchResponse:
+        """
+        Registra uma transferência em lote assíncrona e agenda o processamento.
+
+        O lote é gravado no mesmo commit da publicação da task (outbox) e
+        processado em partes de TRANSFER_ASYNC_CHUNK_SIZE cards, cada uma
+        na sua transação.
+
+        Args:
+            batch_data: Cards (lista ou filtro) e destino
+            current_user: Usuário autenticado
+
+        Returns:
+            TransferBatchResponse com status queued
+        """
+        self._get_destination_user(batch_data.to_user_id)
+
+        if batch_data.filter:
+            if batch_data.filter.from_user_id == batch_data.to_user_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="O usuário destino já é o responsável pelos cards"
                 )
+            total_cards = self.card_repository.count_open_cards_of_user(
+                batch_data.filter.from_user_id, batch_data.filter.board_id
+            )
+        else:
+            total_cards = len(batch_data.card_ids)
+
+        batch = self.repository.add_batch(
+            batch_id=str(uuid.uuid4()),
+            requested_by_id=current_user.id,
+            to_user_id=batch_data.to_user_id,
+            reason=batch_data.reason,
+            notes=batch_data.notes,
+            card_ids=batch_data.card_ids,
+            filters=batch_data.filter.model_dump() if batch_data.filter else None,
+            status=TransferBatchStatus.QUEUED,
+            total_cards=total_cards
+        )
+        OutboxRepository(self.db).add_tasks([(
+            "process_transfer_batch_task",
+            {"batch_id": batch.batch_id},
+            f"transfer_batch:{batch.batch_id}"
+        )])
+        self.db.commit()
+        outbox_dispatcher.wake()
 
-                # Se requer aprovação, cria 1 aprovação com approver_id = None
-                if self.approval_required:
-                    expires_at = datetime.utcnow() + timedelta(hours=APPROVAL_EXPIRATION_HOURS)
-                    self.repository.create_approval(transfer.id, approver_id=None, expires_at=expires_at)
+        return self._to_batch_response(batch)
 
-                # Executa se não requer aprovação
-                if not self.approval_required:
-                    self._execute_transfer(transfer)
+    def process_batch_chunk(self, batch_id: str) -> bool:
+        """
+        Processa a próxima parte de um lote assíncrono em uma transação.
 
-                transfers.append(self._to_response(transfer))
-                successful += 1
+        As transferências da parte, o avanço do cursor e os contadores são
+        gravados no mesmo commit: se o worker parar, a próxima execução
+        continua exatamente da parte seguinte.
 
-            except Exception as e:
-                failed += 1
-                errors.append({"card_id": card_id, "error": str(e)})
+        Args:
+            batch_id: ID do lote
 
-        return BatchTransferResponse(
-            batch_id=batch_id,
-            total_cards=len(batch_data.card_ids),
-            successful=successful,
-            failed=failed,
-            transfers=transfers,
-            errors=errors if errors else None
+        Returns:
+            True se ainda há cards a processar
+        """
+        batch = self.repository.lock_batch(batch_id)
+        if batch is None or batch.status in (TransferBatchStatus.COMPLETED, TransferBatchStatus.FAILED):
+            self.db.rollback()
+            return False
+
+        chunk_size = settings.TRANSFER_ASYNC_CHUNK_SIZE
+        # Origem registrada: o responsável do filtro ou, numa lista de IDs, quem pediu
+        from_user_id = batch.requested_by_id
+        if batch.card_ids is not None:
+            card_ids = batch.card_ids[batch.cursor:batch.cursor + chunk_size]
+            next_cursor = batch.cursor + len(card_ids)
+        else:
+            card_ids = self.card_repository.list_open_card_ids_of_user(
+                batch.filters["from_user_id"],
+                batch.filters.get("board_id"),
+                after_id=batch.cursor,
+                limit=chunk_size
+            )
+            next_cursor = card_ids[-1] if card_ids else batch.cursor
+            from_user_id = batch.filters["from_user_id"]
+
+        now = datetime.utcnow()
+        batch.started_at = batch.started_at or now
+
+        if not card_ids:
+            batch.status = TransferBatchStatus.COMPLETED
+            batch.finished_at = now
+            self.db.commit()
+            return False
+
+        cards, created, errors = self._transfer_cards(
+            card_ids,
+            from_user_id=from_user_id,
+            to_user_id=batch.to_user_id,
+            reason=batch.reason,
+            notes=batch.notes,
+            batch_id=batch.batch_id
         )
 
+        batch.status = TransferBatchStatus.RUNNING
+        batch.cursor = next_cursor
+        batch.processed_cards += len(card_ids)
+        batch.successful_cards += len(created)
+        batch.failed_cards += len(errors)
+        if errors and len(batch.errors) < self.MAX_BATCH_ERRORS:
+            batch.errors = (batch.errors + errors)[:self.MAX_BATCH_ERRORS]
+        self.db.commit()
+
+        self._invalidate_transfer_reports(cards, created)
+        return True
+
+    def run_async_batch(self, batch_id: str) -> TransferBatchResponse:
+        """
+        Processa um lote assíncrono até o fim, uma parte por transação.
+
+        Args:
+            batch_id: ID do lote
+
+        Returns:
+            TransferBatchResponse com o andamento final
+        """
+        while self.process_batch_chunk(batch_id):
+            pass
+
+        batch = self.repository.find_batch(batch_id)
+        self.db.refresh(batch)
+        return self._to_batch_response(batch)
+
+    def fail_async_batch(self, batch_id: str, error: str) -> None:
+        """
+        Marca um lote como interrompido (cards já processados permanecem).
+
+        Args:
+            batch_id: ID do lote
+            error: Mensagem de erro
+        """
+        self.db.rollback()
+        batch = self.repository.find_batch(batch_id)
+        if batch and batch.status != TransferBatchStatus.COMPLETED:
+            batch.status = TransferBatchStatus.FAILED
+            batch.last_error = error
+            batch.finished_at = datetime.utcnow()
+            self.db.commit()
+
+    def get_batch_status(self, batch_id: str, current_user: User) -> TransferBatchResponse:
+        """
+        Obtém o andamento de um lote assíncrono.
+
+        Args:
+            batch_id: ID do lote
+            current_user: Usuário autenticado
+
+        Returns:
+            TransferBatchResponse
+
+        Raises:
+            HTTPException: Lote não encontrado ou sem permissão
+        """
+        batch = self.repository.find_batch(batch_id)
+        if not batch:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Lote de transferências não encontrado"
+            )
+
+        if batch.requested_by_id != current_user.id and current_user.role.name not in ["admin", "manager"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado a este lote"
+            )
+
+        return self._to_batch_response(batch)
+
     def list_transfers(
         self,
         user_id: int,
@@ -382,59 +662,88 @@ class TransferService:
                 transfer = self.repository.update_status(transfer, "completed")
                 self._execute_transfer(transfer)
             else:
-                self.repository.update_status(transfer, "rejected")
+                transfer = self.repository.update_status(transfer, "rejected")
+
+            self._invalidate_statistics()
+            self._publish_decision(transfer, approval)
 
         return self._to_approval_response(approval)
 
+    def expire_pending_transfers(self, now: Optional[datetime] = None) -> int:
+        """
+        Expira as aprovações vencidas, rejeita as transferências e avisa quem
+        pediu cada uma.
+
+        A expiração é um UPDATE ... RETURNING e as notificações são gravadas
+        com um único INSERT, no mesmo commit: uma nova execução não encontra
+        pendências já expiradas nem duplica avisos.
+
+        Args:
+            now: Momento de referência (padrão: agora)
+
+        Returns:
+            Quantidade de transferências expiradas
+        """
+        expired = self.repository.expire_old_approvals(now)
+        if not expired:
+            self.db.commit()
+            return 0
+
+        NotificationRepository(self.db).insert_bulk([
+            {
+                "user_id": row.from_user_id,
+                "notification_type": NotificationTypeEnum.TRANSFER_REJECTED.value,
+                "title": "Transferência Expirada",
+                "message": f"A transferência do card '{row.card_title}' expirou sem aprovação",
+                "icon": NotificationIconEnum.WARNING.value,
+                "color": NotificationColorEnum.WARNING.value,
+                "notification_metadata": {
+                    "transfer_id": row.id,
+                    "card_id": row.card_id,
+                    "url": f"/cards/{row.card_id}"
+                }
+            }
+            for row in expired
+            if row.from_user_id is not None
+        ])
+        # insert_bulk não faz commit quando não há notificações
+        self.db.commit()
+        self._invalidate_statistics()
+        return len(expired)
+
     # ========== ESTATÍSTICAS ==========
 
-    def get_statistics(self) -> TransferStatistics:
+    def get_statistics(self, use_cache: bool = True) -> TransferStatistics:
         """
         Obtém estatísticas de transferências do sistema.
 
+        Todos os números saem de uma única query (get_statistics_rollup). O
+        resultado fica no cache de relatórios, num escopo próprio invalidado
+        a cada transferência, aprovação ou expiração.
+
+        Args:
+            use_cache: Usa o cache de relatórios (False sempre recalcula)
+
         Returns:
             TransferStatistics
         """
         now = datetime.utcnow()
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        week_start = now - timedelta(days=now.weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-        total_transfers = self.repository.count_by_period(
-            datetime(2000, 1, 1), now
-        )
+        week_start = today_start - timedelta(days=now.weekday())
+        month_start = today_start.replace(day=1)
 
-        # Conta aprovações pendentes (simplificado)
-        pending_approvals = self.db.query(TransferApprovalModel).filter(
-            TransferApprovalModel.status == "pending"
-        ).count()
-
-        completed_today = self.repository.count_by_period(
-            today_start, now, status="completed"
-        )
-
-        completed_this_week = self.repository.count_by_period(
-            week_start, now, status="completed"
-        )
+        def compute() -> TransferStatistics:
+            return TransferStatistics(**self.repository.get_statistics_rollup(
+                today_start, week_start, month_start, top_limit=5
+            ))
 
-        completed_this_month = self.repository.count_by_period(
-            month_start, now, status="completed"
-        )
+        if not use_cache:
+            return compute()
 
-        by_reason = self.repository.count_by_reason()
-        top_receivers = self.repository.get_top_receivers(limit=5)
-        top_senders = self.repository.get_top_senders(limit=5)
-
-        return TransferStatistics(
-            total_transfers=total_transfers,
-            pending_approvals=pending_approvals,
-            completed_today=completed_today,
-            completed_this_week=completed_this_week,
-            completed_this_month=completed_this_month,
-            by_reason=by_reason,
-            top_receivers=top_receivers,
-            top_senders=top_senders
+        # A chave muda na virada do dia, junto com os períodos
+        return report_cache.get_or_compute(
+            "transfer_statistics", {"today": today_start.date()}, compute, TransferStatistics,
+            scope=self.STATISTICS_CACHE_SCOPE
         )
 
     # ========== MÉTODOS AUXILIARES ==========
@@ -450,6 +759,65 @@ class TransferService:
         if card:
             self.card_repository.assign_to_user(card, transfer.to_user_id)
 
+            # Relatórios por vendedor e de transferências mudam com o novo responsável
+            self.card_repository.invalidate_reports(card.list_id)
+
+    def _publish_decision(self, transfer: CardTransfer, approval: TransferApprovalModel) -> None:
+        """
+        Avisa em tempo real os envolvidos (e o board do card) sobre a decisão.
+
+        Args:
+            transfer: Transferência decidida
+            approval: Aprovação com a decisão
+        """
+        event_data = {
+            "transfer_id": transfer.id,
+            "approval_id": approval.id,
+            "card_id": transfer.card_id,
+            "status": transfer.status,
+            "from_user_id": transfer.from_user_id,
+            "to_user_id": transfer.to_user_id,
+            "decided_by_id": approval.approver_id
+        }
+
+        for user_id in {transfer.from_user_id, transfer.to_user_id} - {None}:
+            event_broker.publish(user_channel(user_id), "transfer_decided", event_data)
+
+        if transfer.status == "completed" and transfer.card:
+            card_list = self.list_repository.find_by_id(transfer.card.list_id)
+            if card_list:
+                event_broker.publish(board_channel(card_list.board_id), "card_assigned", {
+                    "card_id": transfer.card_id,
+                    "assigned_to_id": transfer.to_user_id,
+                    "version": transfer.card.change_version
+                })
+
+    def _to_batch_response(self, batch: TransferBatch) -> TransferBatchResponse:
+        """Converte TransferBatch para TransferBatchResponse."""
+        if batch.status == TransferBatchStatus.COMPLETED:
+            progress = 100.0
+        elif batch.total_cards:
+            progress = min(round(batch.processed_cards * 100 / batch.total_cards, 1), 100.0)
+        else:
+            progress = 0.0
+
+        return TransferBatchResponse(
+            batch_id=batch.batch_id,
+            status=batch.status,
+            to_user_id=batch.to_user_id,
+            requested_by_id=batch.requested_by_id,
+            total_cards=batch.total_cards,
+            processed_cards=batch.processed_cards,
+            successful=batch.successful_cards,
+            failed=batch.failed_cards,
+            progress=progress,
+            errors=batch.errors or None,
+            last_error=batch.last_error,
+            created_at=batch.created_at,
+            started_at=batch.started_at,
+            finished_at=batch.finished_at
+        )
+
     def _to_response(self, transfer: CardTransfer) -> CardTransferResponse:
         """Converte CardTransfer para CardTransferResponse."""
         # Busca informações relacionadas
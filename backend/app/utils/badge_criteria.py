@@ -0,0 +1,88 @@
+"""
+Critérios de badges automáticos.
+Converte o JSON de critérios de um badge em uma condição SQL sobre as
+métricas de cada usuário, para avaliar todos os usuários de uma vez.
+
+Formatos aceitos:
+    {"field": "cards_won", "operator": ">=", "value": 10}
+    {"all": [critério, ...]}  # todos os critérios
+    {"any": [critério, ...]}  # pelo menos um critério
+"""
+import operator
+from typing import Any, Dict, Mapping
+
+from sqlalchemy import and_, column, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+# Métricas disponíveis por usuário
+BADGE_METRICS = {
+    "total_points": "Total de pontos acumulados",
+    "cards_won": "Cards ganhos",
+    "won_value": "Valor somado dos cards ganhos",
+    "win_streak_days": "Maior sequência de dias seguidos com card ganho",
+    "transfers_received": "Transferências de cards recebidas",
+}
+
+# Nomes alternativos usados em badges já cadastrados
+METRIC_ALIASES = {
+    "total_sales": "cards_won",
+}
+
+OPERATORS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<=": operator.le,
+    "<": operator.lt,
+}
+
+
+def compile_criteria(criteria: Dict[str, Any], metrics: Mapping[str, Any]) -> ColumnElement:
+    """
+    Converte os critérios de um badge em uma condição SQL.
+
+    Args:
+        criteria: JSON de critérios do badge
+        metrics: Colunas das métricas por nome (ex: subquery.c)
+
+    Returns:
+        Condição SQL verdadeira para os usuários que atendem os critérios
+
+    Raises:
+        ValueError: Critério inválido (campo, operador ou valor)
+    """
+    if not isinstance(criteria, dict) or not criteria:
+        raise ValueError("Critério vazio ou inválido")
+
+    for combinator, join in (("all", and_), ("any", or_)):
+        if combinator in criteria:
+            items = criteria[combinator]
+            if not isinstance(items, list) or not items:
+                raise ValueError(f"'{combinator}' deve ser uma lista não vazia de critérios")
+            return join(*[compile_criteria(item, metrics) for item in items])
+
+    field = METRIC_ALIASES.get(criteria.get("field"), criteria.get("field"))
+    if field not in BADGE_METRICS:
+        raise ValueError(f"Métrica desconhecida: {criteria.get('field')}")
+
+    compare = OPERATORS.get(criteria.get("operator", ">="))
+    if compare is None:
+        raise ValueError(f"Operador inválido: {criteria.get('operator')}")
+
+    value = criteria.get("value", 0)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Valor inválido para {field}: {value!r}")
+
+    return compare(metrics[field], value)
+
+
+def validate_criteria(criteria: Dict[str, Any]) -> None:
+    """
+    Valida os critérios de um badge automático.
+
+    Raises:
+        ValueError: Critério inválido
+    """
+    compile_criteria(criteria, {name: column(name) for name in BADGE_METRICS})
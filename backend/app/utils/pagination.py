@@ -0,0 +1,212 @@
+"""
+Utilitários de paginação.
+Paginação por cursor (keyset) sobre (chave de ordenação, id) e contagem
+exata, estimada ou desligada para listagens grandes.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+class CountMode(str, Enum):
+    """
+    Modos de contagem do total de registros.
+    """
+    EXACT = "exact"  # COUNT(*) - custo cresce com a tabela
+    ESTIMATED = "estimated"  # Estimativa do planner (PostgreSQL)
+    NONE = "none"  # Não calcula o total
+
+
+# Ordenação de keyset: lista de (coluna, descendente?)
+OrderSpec = Sequence[Tuple[Any, bool]]
+
+
+def _serialize(value: Any) -> Any:
+    """Converte um valor da chave de ordenação para JSON."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _deserialize(column: Any, value: Any) -> Any:
+    """Converte um valor do cursor de volta para o tipo da coluna."""
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Gera o token opaco do cursor a partir dos valores da chave de ordenação.
+
+    Args:
+        values: Valores da chave (ex: created_at, id) do último item da página
+
+    Returns:
+        Token base64 url-safe
+    """
+    payload = json.dumps([_serialize(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, order_by: OrderSpec) -> List[Any]:
+    """
+    Decodifica o token do cursor.
+
+    Args:
+        token: Token recebido no parâmetro `after`
+        order_by: Ordenação da listagem
+
+    Returns:
+        Valores da chave de ordenação
+
+    Raises:
+        HTTPException 400: Cursor inválido
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(order_by):
+            raise ValueError("tamanho inválido")
+        return [_deserialize(column, value) for (column, _), value in zip(order_by, values)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+
+
+def _after_condition(order_by: OrderSpec, values: List[Any]):
+    """
+    Monta a condição "depois de" para a chave composta.
+
+    Ex: (a, b) DESC depois de (x, y) → a < x OR (a = x AND b < y)
+    """
+    conditions = []
+    for index, (column, descending) in enumerate(order_by):
+        equal_prefix = [
+            previous == previous_value
+            for (previous, _), previous_value in zip(order_by[:index], values[:index])
+        ]
+        comparison = column < values[index] if descending else column > values[index]
+        conditions.append(and_(*equal_prefix, comparison))
+    return or_(*conditions)
+
+
+def paginate_keyset(
+    query: Query,
+    order_by: OrderSpec,
+    after: Optional[str],
+    limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Busca uma página por cursor (keyset) em vez de OFFSET.
+
+    O custo independe da profundidade da página: o banco usa o índice para
+    posicionar direto após o último item da página anterior.
+
+    Args:
+        query: Query já filtrada (sem ordenação)
+        order_by: Ordenação, terminando em uma coluna única (id)
+        after: Token da página anterior (None = primeira página)
+        limit: Tamanho da página
+
+    Returns:
+        Tupla (itens, token da próxima página ou None)
+    """
+    if after:
+        query = query.filter(_after_condition(order_by, decode_cursor(after, order_by)))
+
+    query = query.order_by(*[
+        column.desc() if descending else column.asc()
+        for column, descending in order_by
+    ])
+
+    # Busca um item a mais para saber se existe próxima página
+    items = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in order_by])
+
+    return items, next_cursor
+
+
+def estimate_count(query: Query) -> Optional[int]:
+    """
+    Estima a quantidade de linhas de uma query pelo planner do PostgreSQL.
+
+    Usa EXPLAIN, que lê as estatísticas da tabela (pg_class.reltuples e
+    histogramas) sem varrer os dados.
+
+    Args:
+        query: Query filtrada
+
+    Returns:
+        Estimativa ou None se o banco não suporta
+    """
+    session = query.session
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    compiled = query.order_by(None).statement.compile(dialect=bind.dialect)
+    plan = session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(query: Query, mode: CountMode, exact_count=None) -> Optional[int]:
+    """
+    Conta as linhas de uma query conforme o modo pedido.
+
+    Args:
+        query: Query filtrada
+        mode: exact, estimated ou none
+        exact_count: Função de contagem exata já existente (opcional)
+
+    Returns:
+        Total, estimativa ou None
+    """
+    if mode == CountMode.NONE:
+        return None
+
+    if mode == CountMode.ESTIMATED:
+        estimate = estimate_count(query)
+        if estimate is not None:
+            return estimate
+
+    # Contagem exata (ou fallback quando não há estimativa)
+    if exact_count is not None:
+        return exact_count()
+    return query.order_by(None).count()
+
+
+def total_pages(total: Optional[int], page_size: int) -> Optional[int]:
+    """
+    Calcula o total de páginas (None quando o total não foi calculado).
+    """
+    if total is None:
+        return None
+    return (total + page_size - 1) // page_size
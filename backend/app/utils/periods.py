@@ -0,0 +1,80 @@
+"""
+Utilitários de períodos da gamificação.
+Calcula início e fim dos períodos (semanal, mensal, trimestral, anual)
+usados pelos rankings e pelos contadores de pontos.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+
+PERIOD_TYPES = ("weekly", "monthly", "quarterly", "annual")
+
+
+def get_period_dates(period_type: str, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """
+    Calcula início e fim do período que contém `now`.
+
+    Args:
+        period_type: Tipo de período (weekly, monthly, quarterly, annual)
+        now: Instante de referência (padrão: agora, UTC)
+
+    Returns:
+        Tupla (period_start, period_end)
+
+    Raises:
+        ValueError: Tipo de período inválido
+    """
+    now = now or datetime.utcnow()
+
+    if period_type == "weekly":
+        # Semana: segunda a domingo
+        start = now - timedelta(days=now.weekday())
+        start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=6, hours=23, minutes=59, seconds=59)
+
+    elif period_type == "monthly":
+        # Mês atual
+        start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        # Último dia do mês
+        if now.month == 12:
+            end = now.replace(month=12, day=31, hour=23, minute=59, second=59)
+        else:
+            next_month = now.replace(month=now.month + 1, day=1)
+            end = next_month - timedelta(seconds=1)
+
+    elif period_type == "quarterly":
+        # Trimestre atual (Q1: jan-mar, Q2: abr-jun, Q3: jul-set, Q4: out-dez)
+        quarter = (now.month - 1) // 3
+        start_month = quarter * 3 + 1
+        start = now.replace(month=start_month, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        end_month = start_month + 2
+        if end_month == 12:
+            end = now.replace(month=12, day=31, hour=23, minute=59, second=59)
+        else:
+            next_quarter = now.replace(month=end_month + 1, day=1)
+            end = next_quarter - timedelta(seconds=1)
+
+    elif period_type == "annual":
+        # Ano atual
+        start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = now.replace(month=12, day=31, hour=23, minute=59, second=59)
+
+    else:
+        raise ValueError(f"Tipo de período inválido: {period_type}")
+
+    return start, end
+
+
+def get_period_starts(now: Optional[datetime] = None) -> Dict[str, datetime]:
+    """
+    Retorna o início de cada período que contém `now`.
+
+    Args:
+        now: Instante de referência (padrão: agora, UTC)
+
+    Returns:
+        Dict {period_type: period_start}
+    """
+    now = now or datetime.utcnow()
+    return {period_type: get_period_dates(period_type, now)[0] for period_type in PERIOD_TYPES}
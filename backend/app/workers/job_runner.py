@@ -0,0 +1,131 @@
+"""
+Execução dos jobs agendados com reserva distribuída e métricas.
+Cada execução reserva o job no cluster (job_locks) antes de rodar e registra
+duração, falhas, execuções puladas e sobreposições por job.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.job_locks import job_locks
+
+
+class JobMetrics:
+    """
+    Métricas das execuções dos jobs neste processo.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _job(self, job_id: str) -> dict:
+        if job_id not in self._jobs:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "runs": 0,
+                "failures": 0,
+                "skipped": 0,
+                "overlaps": 0,
+                "overruns": 0,
+                "running": False,
+                "last_started_at": None,
+                "last_duration_seconds": None,
+                "max_duration_seconds": None,
+                "total_duration_seconds": 0.0,
+                "last_error": None,
+            }
+        return self._jobs[job_id]
+
+    def record_start(self, job_id: str) -> None:
+        with self._lock:
+            job = self._job(job_id)
+            job["running"] = True
+            job["last_started_at"] = datetime.utcnow()
+
+    def record_finish(self, job_id: str, duration: float, error: Optional[str], overrun: bool) -> None:
+        with self._lock:
+            job = self._job(job_id)
+            job["running"] = False
+            job["runs"] += 1
+            job["last_duration_seconds"] = duration
+            job["max_duration_seconds"] = max(job["max_duration_seconds"] or 0.0, duration)
+            job["total_duration_seconds"] += duration
+            if error:
+                job["failures"] += 1
+                job["last_error"] = error
+            if overrun:
+                job["overruns"] += 1
+
+    def record_skipped(self, job_id: str) -> None:
+        """Disparo ignorado: o job está reservado por outro processo."""
+        with self._lock:
+            self._job(job_id)["skipped"] += 1
+
+    def record_overlap(self, job_id: str) -> None:
+        """Disparo ignorado: a execução anterior neste processo ainda não terminou."""
+        with self._lock:
+            self._job(job_id)["overlaps"] += 1
+
+    def snapshot(self) -> List[dict]:
+        """
+        Retorna as métricas de todos os jobs, com a duração média.
+        """
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values()]
+
+        for job in jobs:
+            total = job.pop("total_duration_seconds")
+            job["avg_duration_seconds"] = total / job["runs"] if job["runs"] else None
+        return sorted(jobs, key=lambda job: job["job_id"])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jobs.clear()
+
+
+# Instância global das métricas dos jobs
+job_metrics = JobMetrics()
+
+
+def run_locked_job(job_id: str, func: Callable[[], None], spacing_seconds: float) -> None:
+    """
+    Executa um job somente se conseguir a reserva dele no cluster.
+
+    A reserva vale por SCHEDULER_LOCK_TTL_SECONDS (ou pelo intervalo do job,
+    se maior) e, ao terminar, continua valendo até completar spacing_seconds
+    desde o início: os schedulers dos outros processos disparam no mesmo
+    horário e encontram o job já reservado.
+
+    Args:
+        job_id: ID do job
+        func: Função do job
+        spacing_seconds: Intervalo mínimo entre execuções no cluster
+    """
+    lease = max(settings.SCHEDULER_LOCK_TTL_SECONDS, spacing_seconds)
+    token = job_locks.acquire(job_id, lease)
+    if token is None:
+        job_metrics.record_skipped(job_id)
+        logger.debug(f"[SCHEDULER] Job {job_id} reservado por outro processo, ignorando")
+        return
+
+    job_metrics.record_start(job_id)
+    started = time.monotonic()
+    error = None
+    try:
+        func()
+    except Exception as e:
+        error = str(e)
+        logger.error(f"[SCHEDULER] Erro no job {job_id}: {e}")
+    finally:
+        duration = time.monotonic() - started
+        overrun = duration > lease
+        if overrun:
+            # A reserva expirou durante a execução: outro processo pode ter rodado o job
+            logger.warning(f"[SCHEDULER] Job {job_id} levou {duration:.1f}s, mais que a reserva de {lease}s")
+        job_metrics.record_finish(job_id, duration, error, overrun)
+        job_locks.release(job_id, token, keep_seconds=spacing_seconds - duration)
@@ -1,7 +1,14 @@
 """
 APScheduler - Agendador de tarefas periódicas (cron jobs).
 Define jobs programados para executar automaticamente em intervalos específicos.
+
+Todo processo da API tem um scheduler, mas cada disparo só executa no
+processo que conseguir a reserva do job (run_locked_job). Os jobs rodam em
+um pool de threads, fora do event loop, e repassam seus erros depois de
+registrá-los no log, para que entrem nas métricas do job.
 """
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
@@ -11,11 +18,12 @@ from typing import Optional
 
 from app.db.session import SessionLocal
 from app.core.config import settings
+from app.core.outbox import outbox_dispatcher
+from app.repositories.outbox_repository import OutboxRepository
+from app.workers.job_runner import job_metrics, run_locked_job
 from app.workers.tasks import (
     check_scheduled_automations_task,
-    cleanup_old_data_task,
-    send_email_task,
-    send_notification_task
+    cleanup_old_data_task
 )
 
 
@@ -32,7 +40,16 @@ def get_scheduler() -> AsyncIOScheduler:
     """
     global scheduler
     if scheduler is None:
-        scheduler = AsyncIOScheduler(timezone="America/Sao_Paulo")
+        scheduler = AsyncIOScheduler(
+            timezone="America/Sao_Paulo",
+            executors={"default": ThreadPoolExecutor(settings.SCHEDULER_MAX_WORKERS)},
+            # Disparos atrasados viram uma única execução; nunca duas ao mesmo tempo
+            job_defaults={"coalesce": True, "max_instances": 1}
+        )
+        scheduler.add_listener(
+            lambda event: job_metrics.record_overlap(event.job_id),
+            EVENT_JOB_MAX_INSTANCES
+        )
     return scheduler
 
 
@@ -47,9 +64,12 @@ def job_check_scheduled_automations():
     try:
         logger.info("[CRON] Verificando automações agendadas...")
         result = check_scheduled_automations_task()
+        if not result["success"]:
+            raise RuntimeError(result["error"])
         logger.success(f"[CRON] Automações verificadas: {result}")
     except Exception as e:
         logger.error(f"[CRON] Erro ao verificar automações: {e}")
+        raise
 
 
 def job_update_sales_ranking():
@@ -61,46 +81,17 @@ def job_update_sales_ranking():
     try:
         logger.info("[CRON] Atualizando ranking de vendedores...")
 
-        from app.repositories.user_repository import UserRepository
-        from app.models.user import User
-        from app.models.card import Card
-        from sqlalchemy import func, and_
-        from datetime import date
-
-        user_repo = UserRepository(db)
-
-        # Busca todos os vendedores ativos
-        users = db.query(User).filter(
-            User.is_deleted == False,
-            User.is_active == True,
-            User.role.in_(["salesperson", "manager"])
-        ).all()
+        from app.services.gamification_service import GamificationService
 
-        # Atualiza pontos de gamificação baseado em vendas do mês
-        today = date.today()
-        month_start = today.replace(day=1)
-
-        for user in users:
-            # Conta cards ganhos no mês
-            won_cards = db.query(func.count(Card.id)).filter(
-                and_(
-                    Card.assigned_to_id == user.id,
-                    Card.stage == "won",
-                    func.date(Card.updated_at) >= month_start
-                )
-            ).scalar() or 0
-
-            # Atualiza estatísticas de gamificação (se existir)
-            if hasattr(user, 'gamification_stats') and user.gamification_stats:
-                user.gamification_stats.monthly_points = won_cards * 10  # 10 pontos por venda
-                user.gamification_stats.total_points = user.gamification_stats.monthly_points
+        # Uma agregação por período sobre os cards ganhos, gravada com upsert
+        result = GamificationService(db).update_sales_rankings()
 
-        db.commit()
-        logger.success(f"[CRON] Ranking atualizado para {len(users)} vendedores")
+        logger.success(f"[CRON] Ranking atualizado para {result['monthly']} vendedores no mês")
 
     except Exception as e:
         logger.error(f"[CRON] Erro ao atualizar ranking: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
@@ -128,52 +119,34 @@ def job_verify_badges():
     except Exception as e:
         logger.error(f"[CRON] Erro ao verificar badges: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
 
 def job_check_overdue_cards():
     """
-    Job: Verifica cards vencidos e notifica responsáveis.
+    Job: Envia a cada responsável um resumo dos seus cards vencidos.
     Frequência: Diariamente às 08:00
     """
     db = SessionLocal()
     try:
         logger.info("[CRON] Verificando cards vencidos...")
 
-        from app.models.card import Card
-        from datetime import date
+        from app.services.notification_service import NotificationService
 
-        today = date.today()
+        # Um resumo por usuário por dia; rodar de novo não duplica
+        result = NotificationService(db).send_overdue_digests()
 
-        # Busca cards vencidos que ainda não foram ganhos/perdidos
-        overdue_cards = db.query(Card).filter(
-            Card.due_date < today,
-            Card.stage.notin_(["won", "lost"]),
-            Card.assigned_to_id.isnot(None)
-        ).all()
-
-        # Notifica para cada card vencido
-        notified_count = 0
-        for card in overdue_cards:
-            try:
-                # Envia notificação
-                send_notification_task.delay(
-                    user_ids=[card.assigned_to_id],
-                    notification_type="card_overdue",
-                    title="Card Vencido",
-                    message=f"O card '{card.title}' está vencido desde {card.due_date}",
-                    entity_id=card.id,
-                    entity_type="card"
-                )
-                notified_count += 1
-            except Exception as e:
-                logger.warning(f"[CRON] Erro ao notificar card vencido {card.id}: {e}")
-
-        logger.success(f"[CRON] {notified_count} notificações de cards vencidos enviadas")
+        logger.success(
+            f"[CRON] {result['users_notified']} resumos de cards vencidos enviados "
+            f"({result['overdue_cards']} cards, {result['users_skipped']} usuários já notificados hoje)"
+        )
 
     except Exception as e:
         logger.error(f"[CRON] Erro ao verificar cards vencidos: {e}")
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -229,38 +202,47 @@ def job_report_failed_automations():
             User.is_deleted == False
         ).all()
 
-        # Envia email para cada admin
-        emails_sent = 0
-        if admins:
-
-            for admin in admins:
-                try:
-                    if len(failures) >= settings.EMAIL_GROUP_THRESHOLD:
-                        # Envia email agrupado
-                        send_email_task.delay(
-                            email_type="automation_failures_grouped",
-                            to_email=admin.email,
-                            user_name=admin.name,
-                            failures=failures
-                        )
-                    else:
-                        # Envia email individual para cada falha
-                        for failure in failures:
-                            send_email_task.delay(
-                                email_type="automation_failure",
-                                to_email=admin.email,
-                                automation_name=failure["automation_name"],
-                                error_message=failure["error_message"],
-                                automation_id=failure["automation_id"]
-                            )
-                    emails_sent += 1
-                except Exception as e:
-                    logger.warning(f"[CRON] Erro ao enviar relatório para {admin.email}: {e}")
+        # Envia email para cada admin (um relatório por admin e por dia)
+        report_date = datetime.utcnow().date()
+        emails = []
+        for admin in admins:
+            if len(failures) >= settings.EMAIL_GROUP_THRESHOLD:
+                # Envia email agrupado
+                emails.append((
+                    "send_email_task",
+                    {
+                        "email_type": "automation_failures_grouped",
+                        "to_email": admin.email,
+                        "user_name": admin.name,
+                        "failures": failures
+                    },
+                    f"automation_failures:{admin.id}:{report_date}"
+                ))
+            else:
+                # Envia email individual para cada falha
+                for failure in failures:
+                    emails.append((
+                        "send_email_task",
+                        {
+                            "email_type": "automation_failure",
+                            "to_email": admin.email,
+                            "automation_name": failure["automation_name"],
+                            "error_message": failure["error_message"],
+                            "automation_id": failure["automation_id"]
+                        },
+                        f"automation_failure:{admin.id}:{failure['automation_id']}:{report_date}"
+                    ))
+
+        OutboxRepository(db).add_tasks(emails)
+        db.commit()
+        outbox_dispatcher.wake()
+        emails_sent = len(admins)
 
         logger.success(f"[CRON] Relatório de falhas enviado para {emails_sent} admins")
 
     except Exception as e:
         logger.error(f"[CRON] Erro ao gerar relatório de automações falhadas: {e}")
+        raise
     finally:
         db.close()
 
@@ -276,6 +258,7 @@ def job_cleanup_notifications():
         logger.success(f"[CRON] Task de limpeza disparada: {result}")
     except Exception as e:
         logger.error(f"[CRON] Erro ao disparar limpeza: {e}")
+        raise
 
 
 def job_update_gamification_stats():
@@ -324,61 +307,155 @@ def job_update_gamification_stats():
     except Exception as e:
         logger.error(f"[CRON] Erro ao atualizar estatísticas de gamificação: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
 
 def job_check_pending_transfers():
     """
-    Job: Verifica transferências pendentes que expiraram.
+    Job: Expira transferências pendentes sem aprovação no prazo.
     Frequência: Diariamente às 10:00
     """
     db = SessionLocal()
     try:
         logger.info("[CRON] Verificando transferências pendentes...")
 
-        from app.models.card_transfer import CardTransfer, TransferStatus
+        from app.services.transfer_service import TransferService
 
-        # Busca transferências pendentes que expiraram
-        expiration_date = datetime.utcnow() - timedelta(hours=settings.TRANSFER_APPROVAL_EXPIRATION_HOURS)
+        # Expira aprovações e transferências em lote e notifica com um único INSERT
+        expired_count = TransferService(db).expire_pending_transfers()
+        logger.success(f"[CRON] {expired_count} transferências expiradas canceladas")
 
-        expired_transfers = db.query(CardTransfer).filter(
-            CardTransfer.status == TransferStatus.PENDING,
-            CardTransfer.created_at < expiration_date
-        ).all()
+    except Exception as e:
+        logger.error(f"[CRON] Erro ao verificar transferências pendentes: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
-        # Cancela transferências expiradas
-        cancelled_count = 0
-        for transfer in expired_transfers:
-            try:
-                transfer.status = TransferStatus.REJECTED
-                transfer.rejection_reason = "Transferência expirou (sem aprovação no prazo)"
 
-                # Notifica usuário de origem
-                send_notification_task.delay(
-                    user_ids=[transfer.from_user_id],
-                    notification_type="transfer_rejected",
-                    title="Transferência Expirada",
-                    message=f"A transferência do card '{transfer.card.title}' expirou",
-                    entity_id=transfer.id,
-                    entity_type="transfer"
-                )
+def job_refresh_pipeline_snapshots():
+    """
+    Job: Atualiza o consolidado diário do pipeline usado pelos relatórios.
+    Recalcula apenas os dias tocados por cards alterados desde a última execução.
+    Frequência: A cada REPORT_SNAPSHOT_REFRESH_MINUTES minutos
+    """
+    db = SessionLocal()
+    try:
+        from app.repositories.pipeline_snapshot_repository import PipelineSnapshotRepository
 
-                cancelled_count += 1
+        result = PipelineSnapshotRepository(db).refresh()
+        logger.info(f"[CRON] Consolidado do pipeline atualizado: {result}")
 
-            except Exception as e:
-                logger.warning(f"[CRON] Erro ao cancelar transferência {transfer.id}: {e}")
+    except Exception as e:
+        logger.error(f"[CRON] Erro ao atualizar consolidado do pipeline: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
-        db.commit()
-        logger.success(f"[CRON] {cancelled_count} transferências expiradas canceladas")
+
+def job_rebuild_pipeline_snapshots():
+    """
+    Job: Reconstrói o consolidado diário do pipeline do zero.
+    Rede de segurança para alterações feitas fora do ORM, que a atualização
+    incremental não detecta.
+    Frequência: Diariamente às 02:00
+    """
+    db = SessionLocal()
+    try:
+        logger.info("[CRON] Reconstruindo consolidado do pipeline...")
+
+        from app.repositories.pipeline_snapshot_repository import PipelineSnapshotRepository
+
+        PipelineSnapshotRepository(db).refresh(full=True)
+        logger.success("[CRON] Consolidado do pipeline reconstruído")
 
     except Exception as e:
-        logger.error(f"[CRON] Erro ao verificar transferências pendentes: {e}")
+        logger.error(f"[CRON] Erro ao reconstruir consolidado do pipeline: {e}")
         db.rollback()
+        raise
     finally:
         db.close()
 
 
+def job_rebalance_card_positions():
+    """
+    Job: Redistribui as posições dos cards em listas com intervalos muito pequenos.
+    Evita que a movimentação precise redistribuir a lista durante a requisição.
+    Frequência: A cada CARD_POSITION_REBALANCE_MINUTES minutos
+    """
+    db = SessionLocal()
+    try:
+        from app.repositories.card_repository import CardRepository
+
+        card_repo = CardRepository(db)
+        list_ids = card_repo.find_lists_to_rebalance()
+        for list_id in list_ids:
+            card_repo.rebalance_positions(list_id)
+            db.commit()
+
+        if list_ids:
+            logger.info(f"[CRON] Posições redistribuídas em {len(list_ids)} listas")
+
+    except Exception as e:
+        logger.error(f"[CRON] Erro ao redistribuir posições de cards: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def job_reconcile_point_balances():
+    """
+    Job: Reconstrói os saldos de pontos e o leaderboard a partir do histórico de pontos.
+    Corrige divergências e reinicia contadores de períodos encerrados.
+    Frequência: Diariamente às 00:05 (e na inicialização)
+    """
+    db = SessionLocal()
+    try:
+        logger.info("[CRON] Reconciliando saldos de pontos...")
+
+        from app.repositories.gamification_repository import GamificationRepository
+        from app.services.gamification_service import GamificationService
+
+        result = GamificationRepository(db).rebuild_point_balances()
+        logger.success(
+            f"[CRON] Saldos de pontos reconciliados: {result['balances']} saldos, "
+            f"{result['corrected']} corrigidos"
+        )
+
+        users = GamificationService(db).rebuild_leaderboard()
+        logger.success(f"[CRON] Leaderboard reconstruído com {users} usuários")
+
+    except Exception as e:
+        logger.error(f"[CRON] Erro ao reconciliar saldos de pontos: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def job_process_outbox():
+    """
+    Job: Processa eventos pendentes do outbox (recupera falhas e reservas expiradas).
+    Os eventos novos normalmente já são processados logo após o commit.
+    Frequência: A cada OUTBOX_POLL_SECONDS segundos
+    """
+    try:
+        from app.core.outbox import process_outbox_events
+
+        result = process_outbox_events()
+        if result["claimed"]:
+            logger.info(
+                f"[CRON] Outbox: {result['processed']} eventos processados, {result['failed']} com falha"
+            )
+    except Exception as e:
+        logger.error(f"[CRON] Erro ao processar outbox: {e}")
+        raise
+
+
 def job_backup_audit_logs():
     """
     Job: Faz backup de logs de auditoria para arquivo.
@@ -429,6 +506,7 @@ def job_backup_audit_logs():
 
     except Exception as e:
         logger.error(f"[CRON] Erro ao fazer backup de logs: {e}")
+        raise
     finally:
         db.close()
 
@@ -436,6 +514,40 @@ def job_backup_audit_logs():
 # ===================== SCHEDULER CONFIGURATION =====================
 
 
+def _job_spacing(trigger) -> float:
+    """
+    Intervalo mínimo entre execuções de um job no cluster, em segundos.
+
+    Jobs de intervalo: um pouco menos que o intervalo, para a próxima
+    execução não encontrar a própria reserva. Jobs de cron: um minuto, a
+    precisão do cron.
+    """
+    if isinstance(trigger, IntervalTrigger):
+        return trigger.interval.total_seconds() * 0.9
+    return 60
+
+
+def add_locked_job(func, trigger, id: str, name: str, **kwargs) -> None:
+    """
+    Registra um job que executa uma única vez no cluster a cada disparo.
+
+    Args:
+        func: Função do job
+        trigger: Trigger do APScheduler
+        id: ID do job (também usado na reserva)
+        name: Nome exibido
+        **kwargs: Demais opções do add_job
+    """
+    get_scheduler().add_job(
+        run_locked_job,
+        trigger=trigger,
+        args=[id, func, _job_spacing(trigger)],
+        id=id,
+        name=name,
+        **kwargs
+    )
+
+
 def configure_jobs():
     """
     Configura todos os cron jobs no scheduler.
@@ -443,7 +555,7 @@ def configure_jobs():
     sched = get_scheduler()
 
     # 1. Verificar automações agendadas - A cada 1 minuto
-    sched.add_job(
+    add_locked_job(
         job_check_scheduled_automations,
         trigger=IntervalTrigger(minutes=settings.AUTOMATION_CRON_INTERVAL_MINUTES),
         id="check_scheduled_automations",
@@ -452,7 +564,7 @@ def configure_jobs():
     )
 
     # 2. Atualizar ranking de vendedores - Diariamente às 00:00
-    sched.add_job(
+    add_locked_job(
         job_update_sales_ranking,
         trigger=CronTrigger(hour=0, minute=0),
         id="update_sales_ranking",
@@ -461,7 +573,7 @@ def configure_jobs():
     )
 
     # 3. Verificar badges - Diariamente às 01:00
-    sched.add_job(
+    add_locked_job(
         job_verify_badges,
         trigger=CronTrigger(hour=1, minute=0),
         id="verify_badges",
@@ -470,7 +582,7 @@ def configure_jobs():
     )
 
     # 4. Verificar cards vencidos - Diariamente às 08:00
-    sched.add_job(
+    add_locked_job(
         job_check_overdue_cards,
         trigger=CronTrigger(hour=8, minute=0),
         id="check_overdue_cards",
@@ -479,7 +591,7 @@ def configure_jobs():
     )
 
     # 5. Relatório de automações falhadas - Diariamente às 09:00
-    sched.add_job(
+    add_locked_job(
         job_report_failed_automations,
         trigger=CronTrigger(hour=9, minute=0),
         id="report_failed_automations",
@@ -488,7 +600,7 @@ def configure_jobs():
     )
 
     # 6. Verificar transferências pendentes - Diariamente às 10:00
-    sched.add_job(
+    add_locked_job(
         job_check_pending_transfers,
         trigger=CronTrigger(hour=10, minute=0),
         id="check_pending_transfers",
@@ -497,7 +609,7 @@ def configure_jobs():
     )
 
     # 7. Atualizar estatísticas de gamificação - Diariamente às 23:00
-    sched.add_job(
+    add_locked_job(
         job_update_gamification_stats,
         trigger=CronTrigger(hour=23, minute=0),
         id="update_gamification_stats",
@@ -506,7 +618,7 @@ def configure_jobs():
     )
 
     # 8. Limpar notificações antigas - Semanalmente aos domingos às 03:00
-    sched.add_job(
+    add_locked_job(
         job_cleanup_notifications,
         trigger=CronTrigger(day_of_week="sun", hour=3, minute=0),
         id="cleanup_notifications",
@@ -515,7 +627,7 @@ def configure_jobs():
     )
 
     # 9. Backup de logs de auditoria - Semanalmente aos domingos às 04:00
-    sched.add_job(
+    add_locked_job(
         job_backup_audit_logs,
         trigger=CronTrigger(day_of_week="sun", hour=4, minute=0),
         id="backup_audit_logs",
@@ -523,6 +635,53 @@ def configure_jobs():
         replace_existing=True
     )
 
+    # 10. Atualizar consolidado do pipeline - A cada 5 minutos (executa já na inicialização)
+    add_locked_job(
+        job_refresh_pipeline_snapshots,
+        trigger=IntervalTrigger(minutes=settings.REPORT_SNAPSHOT_REFRESH_MINUTES),
+        id="refresh_pipeline_snapshots",
+        name="Atualizar Consolidado do Pipeline",
+        next_run_time=datetime.now(),
+        replace_existing=True
+    )
+
+    # 11. Reconstruir consolidado do pipeline - Diariamente às 02:00
+    add_locked_job(
+        job_rebuild_pipeline_snapshots,
+        trigger=CronTrigger(hour=2, minute=0),
+        id="rebuild_pipeline_snapshots",
+        name="Reconstruir Consolidado do Pipeline",
+        replace_existing=True
+    )
+
+    # 12. Redistribuir posições de cards - A cada 30 minutos
+    add_locked_job(
+        job_rebalance_card_positions,
+        trigger=IntervalTrigger(minutes=settings.CARD_POSITION_REBALANCE_MINUTES),
+        id="rebalance_card_positions",
+        name="Redistribuir Posições de Cards",
+        replace_existing=True
+    )
+
+    # 13. Reconciliar saldos de pontos - Diariamente às 00:05 (executa já na inicialização)
+    add_locked_job(
+        job_reconcile_point_balances,
+        trigger=CronTrigger(hour=0, minute=5),
+        id="reconcile_point_balances",
+        name="Reconciliar Saldos de Pontos",
+        next_run_time=datetime.now(),
+        replace_existing=True
+    )
+
+    # 14. Processar eventos pendentes do outbox - A cada 30 segundos
+    add_locked_job(
+        job_process_outbox,
+        trigger=IntervalTrigger(seconds=settings.OUTBOX_POLL_SECONDS),
+        id="process_outbox",
+        name="Processar Outbox de Eventos",
+        replace_existing=True
+    )
+
     logger.info(f"[SCHEDULER] {len(sched.get_jobs())} jobs configurados")
 
 
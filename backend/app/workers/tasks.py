@@ -315,6 +315,63 @@ def generate_report_task(
         db.close()
 
 
+# ===================== TRANSFERS =====================
+
+
+@celery_app.task(name="process_transfer_batch_task", bind=True, max_retries=3)
+def process_transfer_batch_task(self, batch_id: str):
+    """
+    Processa uma transferência em lote assíncrona, parte por parte.
+
+    Cada parte é gravada na sua transação junto com o cursor do lote; em
+    caso de erro, a nova tentativa continua da parte seguinte.
+
+    Args:
+        batch_id: ID do lote
+
+    Returns:
+        Dict com o andamento do lote
+    """
+    from app.core.config import settings
+    from app.services.transfer_service import TransferService
+
+    db = SessionLocal()
+    try:
+        logger.info(f"Processando lote de transferências {batch_id}")
+
+        service = TransferService(db, approval_required=settings.TRANSFER_APPROVAL_REQUIRED)
+        result = service.run_async_batch(batch_id)
+
+        logger.success(
+            f"Lote {batch_id}: {result.successful} transferidos, {result.failed} com erro"
+        )
+        return {
+            "success": True,
+            "batch_id": batch_id,
+            "status": result.status,
+            "successful": result.successful,
+            "failed": result.failed
+        }
+
+    except Exception as e:
+        logger.error(f"Erro ao processar lote de transferências {batch_id}: {e}")
+
+        # Retry com exponential backoff
+        try:
+            raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+        except self.MaxRetriesExceededError:
+            logger.error(f"Máximo de tentativas excedido para o lote {batch_id}")
+            TransferService(db).fail_async_batch(batch_id, str(e))
+            return {
+                "success": False,
+                "error": str(e),
+                "message": "Falha após múltiplas tentativas"
+            }
+
+    finally:
+        db.close()
+
+
 # ===================== MAINTENANCE =====================
 
 
@@ -347,15 +404,20 @@ def cleanup_old_data_task(retention_days: int = 90):
         ).delete(synchronize_session=False)
         db.commit()
 
+        # Limpa eventos do outbox já processados
+        from app.repositories.outbox_repository import OutboxRepository
+        deleted_outbox_events = OutboxRepository(db).delete_processed_before(cutoff_date)
+
         logger.success(
             f"Limpeza concluída: {deleted_notifications} notificações, "
-            f"{deleted_executions} execuções removidas"
+            f"{deleted_executions} execuções, {deleted_outbox_events} eventos do outbox removidos"
         )
 
         return {
             "success": True,
             "deleted_notifications": deleted_notifications,
             "deleted_executions": deleted_executions,
+            "deleted_outbox_events": deleted_outbox_events,
             "cutoff_date": cutoff_date.isoformat(),
             "message": "Limpeza concluída com sucesso"
         }
@@ -372,6 +434,37 @@ def cleanup_old_data_task(retention_days: int = 90):
         db.close()
 
 
+# ===================== OUTBOX =====================
+
+
+@celery_app.task(name="process_outbox_task")
+def process_outbox_task(limit: Optional[int] = None):
+    """
+    Processa um lote de eventos do outbox (pontos, notificações e automações
+    de operações já gravadas).
+
+    Args:
+        limit: Tamanho do lote (padrão: OUTBOX_BATCH_SIZE)
+
+    Returns:
+        Dict com estatísticas do processamento
+    """
+    from app.core.outbox import process_outbox_events
+
+    try:
+        result = process_outbox_events(limit)
+        if result["claimed"]:
+            logger.info(f"Outbox: {result['processed']} eventos processados, {result['failed']} com falha")
+        return {"success": True, **result}
+
+    except Exception as e:
+        logger.error(f"Erro ao processar outbox: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
 # ===================== UTILITY TASKS =====================
 
 
@@ -391,16 +484,23 @@ def check_scheduled_automations_task():
         repo = AutomationRepository(db)
 
         # Busca automações que devem rodar agora
-        automations = repo.find_scheduled_to_run()
-
-        executed_count = 0
-        for automation in automations:
-            try:
-                # Dispara task assíncrona para executar
-                execute_automation_task.delay(automation.id)
-                executed_count += 1
-            except Exception as e:
-                logger.warning(f"Falha ao disparar automação {automation.id}: {e}")
+        automations = repo.find_scheduled_to_run(datetime.utcnow())
+
+        # Grava as execuções no outbox (uma por automação e horário agendado);
+        # a publicação no broker acontece depois do commit, em lote
+        from app.core.outbox import outbox_dispatcher
+        from app.repositories.outbox_repository import OutboxRepository
+
+        executed_count = OutboxRepository(db).add_tasks([
+            (
+                "execute_automation_task",
+                {"automation_id": automation.id},
+                f"automation:{automation.id}:{automation.next_run_at:%Y%m%d%H%M%S}"
+            )
+            for automation in automations
+        ])
+        db.commit()
+        outbox_dispatcher.wake()
 
         logger.success(f"{executed_count} automações agendadas disparadas")
         return {
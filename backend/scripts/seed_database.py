@@ -31,6 +31,7 @@ from app.models.gamification_badge import GamificationBadge
 from app.models.user_badge import UserBadge
 from app.models.gamification_point import GamificationPoint
 from app.models.gamification_ranking import GamificationRanking
+from app.repositories.gamification_repository import GamificationRepository
 from app.core.security import hash_password
 
 # Inicializa Faker em português brasileiro
@@ -462,6 +463,9 @@ def create_gamification_data(db: Session, users: list[User]):
 
     db.commit()
 
+    # Saldos de pontos a partir do histórico criado acima
+    GamificationRepository(db).rebuild_point_balances()
+
     # Rankings semanal e mensal
     # Semanal
     week_start = datetime.now() - timedelta(days=datetime.now().weekday())
@@ -490,3 +490,122 @@ def disable_email_sending(monkeypatch):
         return True
 
     monkeypatch.setattr(EmailService, '_send_email', mock_send_email)
+
+
+@pytest.fixture(autouse=True)
+def clear_report_cache():
+    """
+    Limpa o cache de relatórios entre testes (o banco é recriado a cada teste).
+    """
+    from app.core.cache import report_cache
+
+    report_cache.clear()
+    yield
+    report_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_leaderboard():
+    """
+    Limpa o leaderboard em memória entre testes.
+    """
+    from app.core.leaderboard import leaderboard
+
+    leaderboard.clear()
+    yield
+    leaderboard.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_action_points():
+    """
+    Descarta a tabela de pontos por ação carregada entre testes.
+    """
+    from app.core.action_points import action_points_table
+
+    action_points_table.clear()
+    yield
+    action_points_table.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_automatic_badges():
+    """
+    Descarta os badges automáticos carregados entre testes.
+    """
+    from app.core.automatic_badges import automatic_badges
+
+    automatic_badges.clear()
+    yield
+    automatic_badges.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_automation_triggers():
+    """
+    Descarta o índice de triggers de automação compilado entre testes.
+    """
+    from app.core.automation_triggers import automation_trigger_index
+
+    automation_trigger_index.clear()
+    yield
+    automation_trigger_index.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_job_locks():
+    """
+    Limpa as reservas e as métricas dos jobs agendados entre testes.
+    """
+    from app.core.job_locks import job_locks
+    from app.workers.job_runner import job_metrics
+
+    job_locks.clear()
+    job_metrics.clear()
+    yield
+    job_locks.clear()
+    job_metrics.clear()
+
+
+@pytest.fixture(autouse=True)
+def disable_outbox_dispatch(monkeypatch):
+    """
+    Não processa o outbox em segundo plano durante os testes (a sessão de
+    teste não é visível para outras sessões); os testes chamam
+    OutboxService.process_pending quando precisam dos efeitos.
+    """
+    from app.core.outbox import outbox_dispatcher
+
+    monkeypatch.setattr(outbox_dispatcher, "mode", "none")
+
+
+@pytest.fixture
+def query_counter():
+    """
+    Conta os comandos SQL executados no engine de teste.
+
+    Uso:
+        with query_counter() as queries:
+            client.get(...)
+        assert len(queries) <= 5
+
+    Returns:
+        Context manager que devolve a lista de SQLs executados
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _count():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count
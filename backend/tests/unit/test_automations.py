@@ -0,0 +1,149 @@
+"""
+Testes unitários de automações.
+Testa o índice de triggers em memória e o disparo por eventos de card.
+"""
+from types import SimpleNamespace
+
+from app.core.backends import MemoryVersionBackend
+from app.core.automation_triggers import AutomationTriggerIndex
+from app.models.card import Card
+from app.repositories.automation_repository import AutomationRepository
+from app.schemas.automation import AutomationCreate, AutomationUpdate
+from app.services.automation_service import AutomationService
+
+
+def _trigger(automation_id, board_id=1, event="card_moved", conditions=None, priority=50):
+    return SimpleNamespace(
+        id=automation_id, board_id=board_id, trigger_event=event,
+        trigger_conditions=conditions, priority=priority
+    )
+
+
+class TestTriggerIndex:
+    """Testes do índice de triggers"""
+
+    def _match(self, index, automations, list_id=10, assigned_to_id=7, trigger_data=None, board_id=1):
+        return index.match(board_id, "card_moved", list_id, assigned_to_id, trigger_data, loader=lambda: automations)
+
+    def test_conditions_and_priority(self):
+        """Condições ausentes casam com qualquer valor; a ordem segue a prioridade"""
+        automations = [
+            _trigger(1),
+            _trigger(2, conditions={"to_list_id": 10}, priority=90),
+            _trigger(3, conditions={"to_list_id": 11}),
+            _trigger(4, conditions={"to_list_id": 10, "assigned_to_id": 7}, priority=70),
+            _trigger(5, conditions={"assigned_to_id": 8}),
+            _trigger(6, event="card_won"),
+            _trigger(7, board_id=2),
+        ]
+        index = AutomationTriggerIndex(MemoryVersionBackend())
+
+        assert self._match(index, automations) == [2, 4, 1]
+        assert self._match(index, automations, list_id=11, assigned_to_id=None) == [1, 3]
+
+    def test_explicit_null_condition(self):
+        """Condição null casa só com cards sem valor, não com qualquer card"""
+        automations = [_trigger(1, conditions={"assigned_to_id": None}), _trigger(2)]
+        index = AutomationTriggerIndex(MemoryVersionBackend())
+
+        assert self._match(index, automations, assigned_to_id=7) == [2]
+        assert self._match(index, automations, assigned_to_id=None) == [1, 2]
+
+    def test_from_list_only_checked_with_trigger_data(self):
+        """from_list_id é verificado apenas quando o evento traz dados"""
+        automations = [_trigger(1, conditions={"from_list_id": 5})]
+        index = AutomationTriggerIndex(MemoryVersionBackend())
+
+        assert self._match(index, automations, trigger_data={"from_list_id": 5}) == [1]
+        assert self._match(index, automations, trigger_data={"from_list_id": 6}) == []
+        assert self._match(index, automations) == [1]
+
+    def test_unhashable_condition_never_matches(self):
+        """Condição com lista nunca é igual a um ID"""
+        automations = [_trigger(1, conditions={"to_list_id": [10]}), _trigger(2)]
+        index = AutomationTriggerIndex(MemoryVersionBackend())
+
+        assert self._match(index, automations) == [2]
+
+    def test_recompiles_only_after_invalidation(self):
+        """O índice é compilado uma vez e recompilado após invalidar"""
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return [_trigger(1)]
+
+        index = AutomationTriggerIndex(MemoryVersionBackend())
+        for _ in range(3):
+            index.match(1, "card_moved", 10, None, None, loader=loader)
+        assert len(loads) == 1
+
+        index.invalidate()
+        index.match(1, "card_moved", 10, None, None, loader=loader)
+        assert len(loads) == 2
+
+
+class TestProcessTrigger:
+    """Testes do disparo de automações por evento de card"""
+
+    def _automation(self, db, board_id: int, **fields):
+        data = AutomationCreate(
+            board_id=board_id,
+            name="Automação",
+            automation_type="trigger",
+            trigger_event="card_moved",
+            actions=[{"type": "send_notification", "params": {}}],
+            **fields
+        )
+        return AutomationRepository(db).create(data)
+
+    def _executed(self, monkeypatch) -> list:
+        executed = []
+        monkeypatch.setattr(
+            AutomationService, "execute_automation",
+            lambda self, automation_id, *args: executed.append(automation_id)
+        )
+        return executed
+
+    def test_no_query_on_hot_path(self, db, monkeypatch, test_board, test_lists,
+                                  test_salesperson_user, query_counter):
+        """Depois de compilado, o disparo não consulta o banco"""
+        executed = self._executed(monkeypatch)
+        moved = self._automation(db, test_board.id, trigger_conditions={"to_list_id": test_lists[1].id})
+        self._automation(db, test_board.id, trigger_conditions={"to_list_id": test_lists[0].id})
+        card = Card(title="Lead", list_id=test_lists[1].id, assigned_to_id=test_salesperson_user.id, position=0)
+        db.add(card)
+        db.commit()
+        db.refresh(card)
+        service = AutomationService(db)
+
+        service.process_trigger(test_board.id, "card_moved", card, test_salesperson_user)
+        with query_counter() as queries:
+            service.process_trigger(test_board.id, "card_moved", card, test_salesperson_user)
+
+        assert queries == []
+        assert executed == [moved.id, moved.id]
+
+    def test_index_follows_changes(self, db, monkeypatch, test_board, test_lists, test_salesperson_user):
+        """Criar, alterar e remover automações invalida o índice"""
+        executed = self._executed(monkeypatch)
+        card = Card(title="Lead", list_id=test_lists[0].id, position=0)
+        db.add(card)
+        db.commit()
+        service = AutomationService(db)
+        repository = AutomationRepository(db)
+
+        first = self._automation(db, test_board.id)
+        service.process_trigger(test_board.id, "card_moved", card, test_salesperson_user)
+        assert executed == [first.id]
+
+        second = self._automation(db, test_board.id, priority=90)
+        repository.update(first, AutomationUpdate(is_active=False))
+        executed.clear()
+        service.process_trigger(test_board.id, "card_moved", card, test_salesperson_user)
+        assert executed == [second.id]
+
+        repository.delete(second)
+        executed.clear()
+        service.process_trigger(test_board.id, "card_moved", card, test_salesperson_user)
+        assert executed == []
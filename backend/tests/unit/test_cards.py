@@ -2,10 +2,12 @@
 Testes unitários para gestão de cards.
 Testa CRUD de cards, movimentação, atribuição, campos customizados, etc.
 """
+import json
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 from app.models.card import Card
 
@@ -57,6 +59,289 @@ class TestListCards:
         assert response.status_code == 401
 
 
+class TestListCardsCursor:
+    """Testes de paginação por cursor na listagem de cards"""
+
+    @pytest.fixture
+    def many_cards(self, db: Session, test_lists):
+        """Cria 7 cards em duas listas, com posições repetidas"""
+        cards = []
+        for index in range(7):
+            card = Card(
+                title=f"Cursor Card {index}",
+                list_id=test_lists[index % 2].id,
+                position=index // 3
+            )
+            db.add(card)
+            cards.append(card)
+        db.commit()
+        return cards
+
+    def test_cursor_walks_all_cards_without_duplicates(self, client: TestClient, salesperson_headers, test_board, many_cards):
+        """Percorre todas as páginas pelo next_cursor"""
+        seen = []
+        after = None
+        for _ in range(10):
+            url = f"/api/v1/cards?board_id={test_board.id}&page_size=3&cursor=true"
+            if after:
+                url += f"&after={after}"
+            response = client.get(url, headers=salesperson_headers)
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["cards"]) <= 3
+            seen.extend(card["id"] for card in data["cards"])
+            after = data["next_cursor"]
+            if not after:
+                break
+
+        assert sorted(seen) == sorted(card.id for card in many_cards)
+        assert len(seen) == len(set(seen))
+
+    def test_cursor_with_minimal(self, client: TestClient, salesperson_headers, test_board, many_cards):
+        """Cursor também funciona no modo minimal"""
+        response = client.get(
+            f"/api/v1/cards?board_id={test_board.id}&page_size=5&cursor=true&minimal=true",
+            headers=salesperson_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["cards"]) == 5
+        assert data["next_cursor"]
+        assert data["total"] == 7
+
+    def test_count_none_skips_total(self, client: TestClient, salesperson_headers, test_board, many_cards):
+        """count=none não calcula o total"""
+        response = client.get(
+            f"/api/v1/cards?board_id={test_board.id}&page_size=3&count=none",
+            headers=salesperson_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        assert data["total_pages"] is None
+        assert len(data["cards"]) == 3
+
+    def test_count_estimated_falls_back_to_exact(self, client: TestClient, salesperson_headers, test_board, many_cards):
+        """Sem estimativa do planner (SQLite), usa a contagem exata"""
+        response = client.get(
+            f"/api/v1/cards?board_id={test_board.id}&count=estimated",
+            headers=salesperson_headers
+        )
+
+        assert response.status_code == 200
+        assert response.json()["total"] == 7
+
+    def test_invalid_cursor(self, client: TestClient, salesperson_headers, test_board):
+        """Cursor inválido retorna 400"""
+        response = client.get(
+            f"/api/v1/cards?board_id={test_board.id}&after=nao-e-um-cursor",
+            headers=salesperson_headers
+        )
+
+        assert response.status_code == 400
+
+
+class TestListCardsQueryCount:
+    """Garante que a listagem de cards não faz uma query por card (N+1)"""
+
+    MAX_QUERIES = 8
+
+    def _add_cards(self, db: Session, test_lists, total: int):
+        for index in range(total):
+            db.add(Card(
+                title=f"Query Card {index}",
+                list_id=test_lists[index % len(test_lists)].id,
+                position=index
+            ))
+        db.commit()
+
+    def _count_list_queries(self, client: TestClient, headers, board_id: int, query_counter, minimal: bool):
+        with query_counter() as queries:
+            response = client.get(
+                f"/api/v1/cards?board_id={board_id}&all=true&minimal={str(minimal).lower()}",
+                headers=headers
+            )
+        assert response.status_code == 200
+        return len(queries), response.json()
+
+    @pytest.mark.parametrize("minimal", [False, True])
+    def test_query_count_independent_of_card_count(
+        self, client: TestClient, salesperson_headers, db, test_board, test_lists, query_counter, minimal
+    ):
+        """Número de queries não cresce com a quantidade de cards"""
+        self._add_cards(db, test_lists, 3)
+        few_queries, data = self._count_list_queries(
+            client, salesperson_headers, test_board.id, query_counter, minimal
+        )
+        assert len(data["cards"]) == 3
+
+        self._add_cards(db, test_lists, 40)
+        many_queries, data = self._count_list_queries(
+            client, salesperson_headers, test_board.id, query_counter, minimal
+        )
+        assert len(data["cards"]) == 43
+
+        assert many_queries == few_queries
+        assert many_queries <= self.MAX_QUERIES
+
+    def test_list_name_loaded(self, client: TestClient, salesperson_headers, test_card, test_board, test_lists):
+        """list_name continua preenchido no modo completo"""
+        response = client.get(
+            f"/api/v1/cards?board_id={test_board.id}&all=true",
+            headers=salesperson_headers
+        )
+
+        assert response.status_code == 200
+        card = response.json()["cards"][0]
+        assert card["list_name"] == test_lists[0].name
+
+
+class TestBoardSnapshot:
+    """Testes do snapshot do Kanban em streaming (NDJSON colunar)"""
+
+    def _read_snapshot(self, client: TestClient, headers, board_id: int, batch_size: int = 50):
+        response = client.get(
+            f"/api/v1/boards/{board_id}/snapshot?batch_size={batch_size}",
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.text.splitlines() if line]
+
+    def test_snapshot_groups_cards_by_list(
+        self, client: TestClient, salesperson_headers, db, test_board, test_lists, test_card, test_salesperson_user
+    ):
+        """Cards vêm agrupados por lista, em formato colunar"""
+        db.add(Card(title="Proposta Card", list_id=test_lists[2].id, position=0, value=250, is_won=0))
+        db.add(Card(title="Ganho Card", list_id=test_lists[3].id, position=0, is_won=1))
+        db.commit()
+
+        lines = self._read_snapshot(client, salesperson_headers, test_board.id)
+
+        header = lines[0]
+        assert header["type"] == "board"
+        assert [item["id"] for item in header["lists"]] == [item.id for item in test_lists]
+
+        blocks = [line for line in lines if line["type"] == "cards"]
+        assert [block["list_id"] for block in blocks] == [test_lists[0].id, test_lists[2].id, test_lists[3].id]
+
+        first = blocks[0]
+        assert first["columns"]["id"] == [test_card.id]
+        assert first["columns"]["value"] == [1000.0]
+        assert first["users"] == {str(test_salesperson_user.id): test_salesperson_user.name}
+        assert blocks[2]["columns"]["status"] == [1]
+
+        assert lines[-1] == {"type": "end", "total_cards": 3}
+
+    def test_snapshot_splits_large_lists_in_blocks(self, client: TestClient, salesperson_headers, db, test_board, test_lists):
+        """Listas maiores que batch_size são enviadas em vários blocos"""
+        for index in range(120):
+            db.add(Card(title=f"Card {index}", list_id=test_lists[0].id, position=index))
+        db.commit()
+
+        lines = self._read_snapshot(client, salesperson_headers, test_board.id, batch_size=50)
+
+        blocks = [line for line in lines if line["type"] == "cards"]
+        assert [len(block["columns"]["id"]) for block in blocks] == [50, 50, 20]
+        positions = [position for block in blocks for position in block["columns"]["position"]]
+        assert positions == sorted(positions)
+        assert lines[-1]["total_cards"] == 120
+
+    def test_snapshot_board_not_found(self, client: TestClient, salesperson_headers):
+        """Board inexistente retorna 404 antes do streaming"""
+        response = client.get("/api/v1/boards/99999/snapshot", headers=salesperson_headers)
+
+        assert response.status_code == 404
+
+
+class TestBoardChanges:
+    """Testes da sincronização incremental do board (versão + tombstones)"""
+
+    def _changes(self, client: TestClient, headers, board_id: int, since: int):
+        response = client.get(
+            f"/api/v1/boards/{board_id}/changes?since={since}",
+            headers=headers
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def test_full_load(self, client: TestClient, salesperson_headers, test_board, test_lists, test_card):
+        """since=0 retorna o board inteiro"""
+        data = self._changes(client, salesperson_headers, test_board.id, 0)
+
+        assert data["full"] is True
+        assert {item["id"] for item in data["lists"]} == {item.id for item in test_lists}
+        assert [card["id"] for card in data["cards"]] == [test_card.id]
+        assert data["deleted_card_ids"] == []
+
+    def test_only_changed_cards_since_version(
+        self, client: TestClient, salesperson_headers, test_board, test_lists, test_card
+    ):
+        """Depois de uma versão, retorna apenas o que mudou"""
+        created = client.post(
+            "/api/v1/cards",
+            headers=salesperson_headers,
+            json={"title": "Card Versionado", "list_id": test_lists[0].id}
+        ).json()
+        version = self._changes(client, salesperson_headers, test_board.id, 0)["version"]
+
+        # Nada mudou
+        data = self._changes(client, salesperson_headers, test_board.id, version)
+        assert data["full"] is False
+        assert data["cards"] == [] and data["lists"] == []
+        assert data["version"] == version
+
+        # Move um card: apenas ele volta, com versão maior
+        client.put(
+            f"/api/v1/cards/{created['id']}/move",
+            headers=salesperson_headers,
+            json={"target_list_id": test_lists[1].id}
+        )
+        data = self._changes(client, salesperson_headers, test_board.id, version)
+        assert [card["id"] for card in data["cards"]] == [created["id"]]
+        assert data["cards"][0]["list_id"] == test_lists[1].id
+        assert data["version"] > version
+
+    def test_deleted_card_tombstone(
+        self, client: TestClient, salesperson_headers, manager_headers, test_board, test_card
+    ):
+        """Card removido aparece em deleted_card_ids"""
+        version = self._changes(client, salesperson_headers, test_board.id, 0)["version"]
+
+        response = client.delete(f"/api/v1/cards/{test_card.id}", headers=manager_headers)
+        assert response.status_code == 200
+
+        data = self._changes(client, salesperson_headers, test_board.id, version)
+        assert data["deleted_card_ids"] == [test_card.id]
+        assert data["cards"] == []
+
+    def test_list_update_and_delete(
+        self, client: TestClient, salesperson_headers, manager_headers, test_board, test_lists
+    ):
+        """Alterações e remoções de listas também são sincronizadas"""
+        version = self._changes(client, salesperson_headers, test_board.id, 0)["version"]
+
+        client.put(
+            f"/api/v1/boards/{test_board.id}/lists/{test_lists[0].id}",
+            headers=manager_headers,
+            json={"name": "Leads Renomeada"}
+        )
+        client.delete(f"/api/v1/boards/{test_board.id}/lists/{test_lists[2].id}", headers=manager_headers)
+
+        data = self._changes(client, salesperson_headers, test_board.id, version)
+        assert [item["name"] for item in data["lists"]] == ["Leads Renomeada"]
+        assert data["deleted_list_ids"] == [test_lists[2].id]
+
+    def test_unknown_version_returns_full(self, client: TestClient, salesperson_headers, test_board, test_card):
+        """Versão maior que a atual força carga completa"""
+        data = self._changes(client, salesperson_headers, test_board.id, 10**9)
+
+        assert data["full"] is True
+        assert [card["id"] for card in data["cards"]] == [test_card.id]
+
+
 class TestGetCard:
     """Testes de busca de card por ID"""
 
@@ -248,6 +533,143 @@ class TestMoveCard:
         assert response.status_code == 404
 
 
+class TestCardPositions:
+    """Testes do posicionamento fracionário de cards na movimentação"""
+
+    def _add_cards(self, db: Session, list_id: int, total: int, gap=1000):
+        cards = [
+            Card(title=f"Pos Card {index}", list_id=list_id, position=(index + 1) * gap)
+            for index in range(total)
+        ]
+        db.add_all(cards)
+        db.commit()
+        return cards
+
+    def _ordered_ids(self, db: Session, list_id: int):
+        return [
+            card_id for (card_id,) in db.query(Card.id).filter(
+                Card.list_id == list_id
+            ).order_by(Card.position, Card.id).all()
+        ]
+
+    def test_move_between_neighbours(self, client: TestClient, salesperson_headers, db, test_card, test_lists):
+        """Card movido para um índice fica entre os dois vizinhos"""
+        cards = self._add_cards(db, test_lists[1].id, 3)
+
+        response = client.put(
+            f"/api/v1/cards/{test_card.id}/move",
+            headers=salesperson_headers,
+            json={"target_list_id": test_lists[1].id, "position": 1}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["position"] == 1500
+        assert self._ordered_ids(db, test_lists[1].id) == [cards[0].id, test_card.id, cards[1].id, cards[2].id]
+
+    def test_move_after_card(self, client: TestClient, salesperson_headers, db, test_card, test_lists):
+        """after_card_id posiciona o card logo após o card de referência"""
+        cards = self._add_cards(db, test_lists[1].id, 3)
+
+        response = client.put(
+            f"/api/v1/cards/{test_card.id}/move",
+            headers=salesperson_headers,
+            json={"target_list_id": test_lists[1].id, "after_card_id": cards[1].id}
+        )
+
+        assert response.status_code == 200
+        assert self._ordered_ids(db, test_lists[1].id) == [cards[0].id, cards[1].id, test_card.id, cards[2].id]
+
+    def test_move_after_card_from_other_list(
+        self, client: TestClient, salesperson_headers, db, test_card, test_lists
+    ):
+        """Card de referência fora da lista de destino retorna 400"""
+        cards = self._add_cards(db, test_lists[2].id, 1)
+
+        response = client.put(
+            f"/api/v1/cards/{test_card.id}/move",
+            headers=salesperson_headers,
+            json={"target_list_id": test_lists[1].id, "after_card_id": cards[0].id}
+        )
+
+        assert response.status_code == 400
+
+    def test_collapsed_gap_rebalances_list(self, db, test_card, test_lists):
+        """Sem espaço entre os vizinhos, a lista é redistribuída mantendo a ordem"""
+        from app.repositories.card_repository import CardRepository
+
+        repository = CardRepository(db)
+        cards = self._add_cards(db, test_lists[1].id, 2, gap=Decimal("0.01"))
+        version_before = cards[0].change_version
+
+        moved = repository.move_to_list(test_card, test_lists[1].id, 1)
+
+        assert self._ordered_ids(db, test_lists[1].id) == [cards[0].id, moved.id, cards[1].id]
+        positions = [card.position for card in db.query(Card).filter(Card.list_id == test_lists[1].id)]
+        assert len(set(positions)) == 3
+        db.refresh(cards[0])
+        assert cards[0].change_version > version_before
+
+    def test_rebalance_keeps_won_status(self, client: TestClient, salesperson_headers, db, test_card, test_lists):
+        """Movimento para a lista de ganho que redistribui a lista mantém o card como ganho"""
+        cards = self._add_cards(db, test_lists[3].id, 2, gap=Decimal("0.01"))
+
+        response = client.put(
+            f"/api/v1/cards/{test_card.id}/move",
+            headers=salesperson_headers,
+            json={"target_list_id": test_lists[3].id, "position": 1}
+        )
+
+        assert response.status_code == 200
+        assert self._ordered_ids(db, test_lists[3].id) == [cards[0].id, test_card.id, cards[1].id]
+        db.expire_all()
+        card = db.query(Card).filter(Card.id == test_card.id).one()
+        assert card.is_won == 1
+        assert card.closed_at is not None
+
+    def test_repeated_inserts_keep_order(self, db, test_lists):
+        """Inserções sucessivas no mesmo ponto não perdem a ordem"""
+        from app.repositories.card_repository import CardRepository
+
+        repository = CardRepository(db)
+        first, last = self._add_cards(db, test_lists[1].id, 2)
+        inserted = self._add_cards(db, test_lists[2].id, 30)
+
+        # Cada card entra logo após o primeiro: o intervalo cai pela metade a cada vez
+        for card in inserted:
+            repository.move_to_list(card, test_lists[1].id, 1)
+
+        expected = [first.id] + [card.id for card in reversed(inserted)] + [last.id]
+        assert self._ordered_ids(db, test_lists[1].id) == expected
+
+    def test_move_does_not_load_target_list(self, db, test_card, test_lists):
+        """A movimentação não carrega os cards da lista de destino"""
+        from app.repositories.card_repository import CardRepository
+
+        self._add_cards(db, test_lists[1].id, 200)
+        db.expunge_all()
+
+        card = db.query(Card).filter(Card.id == test_card.id).first()
+        CardRepository(db).move_to_list(card, test_lists[1].id, 100)
+
+        loaded = [obj for obj in db.identity_map.values() if isinstance(obj, Card)]
+        assert loaded == [card]
+
+    def test_find_lists_to_rebalance(self, db, test_lists):
+        """Job de manutenção encontra e redistribui listas com intervalos pequenos"""
+        from app.repositories.card_repository import CardRepository
+
+        repository = CardRepository(db)
+        self._add_cards(db, test_lists[1].id, 3, gap=Decimal("0.5"))
+        self._add_cards(db, test_lists[2].id, 3)
+
+        assert repository.find_lists_to_rebalance() == [test_lists[1].id]
+
+        assert repository.rebalance_positions(test_lists[1].id) == 3
+        db.commit()
+
+        assert repository.find_lists_to_rebalance() == []
+
+
 class TestAssignCard:
     """Testes de atribuição de responsável"""
 
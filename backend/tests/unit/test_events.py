@@ -0,0 +1,192 @@
+"""
+Testes unitários do canal de eventos em tempo real.
+Testa o broker em memória (fake do Redis pub/sub) e os publicadores.
+"""
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from redis.client import PubSubWorkerThread
+
+from app.core.events import RedisPubSubBackend, event_broker, user_channel, board_channel
+from app.repositories.notification_repository import NotificationRepository
+
+
+def parse_frame(frame: str):
+    """Extrai (tipo, payload) de um frame SSE."""
+    lines = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+
+class TestEventBroker:
+    """Testes do broker de eventos"""
+
+    async def test_delivers_only_to_channel_subscribers(self):
+        """Evento chega apenas às conexões inscritas no canal"""
+        subscription = event_broker.subscribe([user_channel(1)])
+        other = event_broker.subscribe([user_channel(2)])
+        try:
+            # Publicação a partir de outra thread (como nos endpoints síncronos)
+            thread = threading.Thread(
+                target=event_broker.publish,
+                args=(user_channel(1), "notification", {"id": 10})
+            )
+            thread.start()
+            thread.join()
+
+            frame = await subscription.get(timeout=1)
+            assert parse_frame(frame) == ("notification", {"id": 10})
+            assert await other.get(timeout=0.05) is None
+        finally:
+            event_broker.unsubscribe(subscription)
+            event_broker.unsubscribe(other)
+
+    async def test_slow_client_drops_events(self):
+        """Fila cheia descarta eventos em vez de crescer"""
+        subscription = event_broker.subscribe([board_channel(1)], maxsize=1)
+        try:
+            for index in range(3):
+                event_broker.publish(board_channel(1), "card_moved", {"card_id": index})
+
+            frame = await subscription.get(timeout=1)
+            assert parse_frame(frame)[1] == {"card_id": 0}
+            assert subscription.dropped == 2
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    async def test_unsubscribe_removes_connection(self):
+        """Conexão encerrada deixa de ser contada"""
+        subscription = event_broker.subscribe([user_channel(3), board_channel(3)])
+        assert event_broker.stats()["connections"] >= 1
+
+        event_broker.unsubscribe(subscription)
+        event_broker.publish(user_channel(3), "notification", {"id": 1})
+
+        assert await subscription.get(timeout=0.05) is None
+
+
+class FakePubSub:
+    """
+    PubSub do Redis: a conexão do primeiro listener cai na primeira leitura
+    e a primeira tentativa de reinício encontra o Redis ainda fora do ar.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.patterns = {}
+        self.closed = False
+
+    def psubscribe(self, **patterns):
+        if len(self.client.pubsubs) == 2 and self is self.client.pubsubs[1]:
+            raise ConnectionError("Redis fora do ar")
+        self.patterns.update(patterns)
+
+    def get_message(self, ignore_subscribe_messages=True, timeout=0):
+        if self is self.client.pubsubs[0]:
+            raise ConnectionError("Conexão perdida")
+        self.client.listening.set()
+        time.sleep(0.01)
+
+    def run_in_thread(self, sleep_time=0, daemon=False, exception_handler=None):
+        thread = PubSubWorkerThread(self, sleep_time, daemon=daemon, exception_handler=exception_handler)
+        thread.start()
+        return thread
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    """Cliente Redis mínimo para o listener de eventos."""
+
+    def __init__(self):
+        self.pubsubs = []
+        self.listening = threading.Event()
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        pubsub = FakePubSub(self)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+
+class TestRedisListener:
+    """Testes do listener do Redis pub/sub"""
+
+    def test_listener_restarts_after_connection_error(self, monkeypatch):
+        """Conexão perdida reinicia o listener (com nova tentativa se o Redis ainda não voltou)"""
+        monkeypatch.setattr(RedisPubSubBackend, "RESTART_DELAY", 0.01)
+        client = FakeRedis()
+        backend = RedisPubSubBackend(client)
+        backend.start()
+        try:
+            assert client.listening.wait(timeout=2)
+        finally:
+            backend.stop()
+
+        # Primeiro listener, tentativa que falhou no psubscribe e listener reiniciado
+        first, failed, restarted = client.pubsubs
+        assert first.closed and failed.closed
+        assert list(restarted.patterns) == ["events:*"]
+        assert backend.restarts == 1
+        assert restarted.closed
+
+
+class TestEventPublishers:
+    """Testes dos pontos que publicam eventos"""
+
+    async def test_notification_create_publishes(self, db, test_salesperson_user):
+        """Nova notificação é enviada ao canal do usuário"""
+        subscription = event_broker.subscribe([user_channel(test_salesperson_user.id)])
+        try:
+            notification = NotificationRepository(db).create({
+                "user_id": test_salesperson_user.id,
+                "notification_type": "info",
+                "title": "Teste",
+                "message": "Mensagem de teste"
+            })
+
+            event_type, data = parse_frame(await subscription.get(timeout=1))
+            assert event_type == "notification"
+            assert data["id"] == notification.id
+            assert data["title"] == "Teste"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    async def test_move_card_publishes_board_event(
+        self, client: TestClient, salesperson_headers, test_board, test_lists, test_card
+    ):
+        """Mover card avisa as conexões que acompanham o board"""
+        subscription = event_broker.subscribe([board_channel(test_board.id)])
+        try:
+            response = client.put(
+                f"/api/v1/cards/{test_card.id}/move",
+                headers=salesperson_headers,
+                json={"target_list_id": test_lists[1].id}
+            )
+            assert response.status_code == 200
+
+            event_type, data = parse_frame(await subscription.get(timeout=1))
+            assert event_type == "card_moved"
+            assert data["card_id"] == test_card.id
+            assert data["from_list_id"] == test_lists[0].id
+            assert data["to_list_id"] == test_lists[1].id
+            assert data["version"] > 0
+        finally:
+            event_broker.unsubscribe(subscription)
+
+
+class TestEventStream:
+    """Testes do endpoint SSE"""
+
+    def test_stream_requires_auth(self, client: TestClient):
+        """Sem token retorna 401"""
+        response = client.get("/api/v1/events/stream")
+
+        assert response.status_code == 401
+
+    def test_stream_invalid_query_token(self, client: TestClient):
+        """Token inválido na query retorna 401"""
+        response = client.get("/api/v1/events/stream?token=invalido")
+
+        assert response.status_code == 401
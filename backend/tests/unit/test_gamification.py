@@ -329,6 +329,165 @@ class TestRankings:
         assert response.status_code == 403
 
 
+class TestRankingCalculation:
+    """Testes do cálculo de rankings em lote"""
+
+    def _add_users(self, db, total: int, deleted: bool = False):
+        from app.models.user import User
+        from app.models.role import Role
+
+        role = db.query(Role).filter(Role.name == "salesperson").first()
+        users = [
+            User(
+                name=f"Ranking User {index}",
+                email=f"ranking{index}{'-deleted' if deleted else ''}@test.com",
+                password_hash="x",
+                role_id=role.id,
+                is_deleted=deleted
+            )
+            for index in range(total)
+        ]
+        db.add_all(users)
+        db.commit()
+        return users
+
+    def _add_points(self, db, user, *points):
+        db.add_all([GamificationPoint(user_id=user.id, points=value, reason="card_won") for value in points])
+        db.commit()
+
+    def test_rank_ties_and_order(self, db, test_salesperson_user):
+        """Posições calculadas por RANK(): empates dividem a posição"""
+        from app.services.gamification_service import GamificationService
+
+        first, tied_a, tied_b, without_points = self._add_users(db, 4)
+        self._add_points(db, first, 50, 50)
+        self._add_points(db, tied_a, 40)
+        self._add_points(db, tied_b, 30, 10)
+        self._add_points(db, without_points, 5, -5)
+
+        result = GamificationService(db).calculate_rankings("weekly")
+
+        positions = [(ranking.user_id, ranking.rank_position, ranking.total_points) for ranking in result.rankings]
+        assert positions == [(first.id, 1, 100), (tied_a.id, 2, 40), (tied_b.id, 2, 40)]
+        assert result.rankings[0].user_name == first.name
+
+    def test_recalculate_replaces_period(self, db, test_salesperson_user):
+        """Recalcular substitui o ranking do período e ignora usuários excluídos"""
+        from app.models.gamification_ranking import GamificationRanking
+        from app.services.gamification_service import GamificationService
+
+        service = GamificationService(db)
+        user, = self._add_users(db, 1)
+        deleted_user, = self._add_users(db, 1, deleted=True)
+        self._add_points(db, user, 10)
+        self._add_points(db, deleted_user, 500)
+
+        service.calculate_rankings("monthly")
+        self._add_points(db, user, 15)
+        result = service.calculate_rankings("monthly")
+
+        assert [(ranking.user_id, ranking.total_points) for ranking in result.rankings] == [(user.id, 25)]
+        assert db.query(GamificationRanking).filter(GamificationRanking.period_type == "monthly").count() == 1
+
+    def test_get_rankings_query_count(self, client: TestClient, salesperson_headers, db, query_counter):
+        """Listar o ranking não busca o usuário de cada posição"""
+        from app.services.gamification_service import GamificationService
+
+        users = self._add_users(db, 20)
+        for index, user in enumerate(users):
+            self._add_points(db, user, index + 1)
+        GamificationService(db).calculate_rankings("weekly")
+
+        with query_counter() as queries:
+            response = client.get(
+                "/api/v1/gamification/rankings?period_type=weekly",
+                headers=salesperson_headers
+            )
+
+        assert response.status_code == 200
+        assert len(response.json()["rankings"]) == 20
+        assert len(queries) <= 3
+
+    def _add_won_cards(self, db, list_id: int, rows) -> None:
+        """Insere cards em lote: rows = [(user_id, is_won, closed_at, deleted_at)]"""
+        from sqlalchemy import insert
+        from app.models.card import Card
+
+        db.execute(insert(Card), [
+            {
+                "title": f"Venda {index}",
+                "list_id": list_id,
+                "assigned_to_id": user_id,
+                "position": index,
+                "is_won": is_won,
+                "closed_at": closed_at,
+                "deleted_at": deleted_at,
+            }
+            for index, (user_id, is_won, closed_at, deleted_at) in enumerate(rows)
+        ])
+        db.commit()
+
+    def test_sales_ranking_counts_won_cards(self, db, test_lists, test_salesperson_user, query_counter):
+        """Ranking de vendas agrega milhares de cards com poucas queries"""
+        from app.models.gamification_ranking import GamificationRanking
+        from app.services.gamification_service import GamificationService
+        from app.utils.periods import get_period_dates
+
+        users = self._add_users(db, 10)
+        month_start, _ = get_period_dates("monthly")
+        in_month = month_start + timedelta(hours=1)
+        rows = []
+        for index, user in enumerate(users):
+            rows += [(user.id, 1, in_month, None)] * (index * 50)
+            # Não contam: perdidos, abertos, de meses anteriores e excluídos
+            rows += [(user.id, -1, in_month, None)] * 50
+            rows += [(user.id, 0, None, None)] * 50
+            rows += [(user.id, 1, month_start - timedelta(days=40), None)] * 20
+            rows += [(user.id, 1, in_month, datetime.utcnow())] * 10
+        self._add_won_cards(db, test_lists[0].id, rows)
+        self._add_points(db, users[9], 100)
+        GamificationService(db).calculate_rankings("monthly")
+
+        with query_counter() as queries:
+            result = GamificationService(db).update_sales_rankings()
+
+        assert result["monthly"] == 9
+        # Poucos comandos por período, independente da quantidade de cards
+        assert len(queries) <= 4 * len(result)
+        rankings = {
+            ranking.user_id: ranking
+            for ranking in db.query(GamificationRanking).filter(GamificationRanking.period_type == "monthly")
+        }
+        assert {user_id: ranking.cards_won for user_id, ranking in rankings.items()} == {
+            user.id: index * 50 for index, user in enumerate(users) if index
+        }
+        # Quem tem pontos mantém a posição; quem só tem vendas fica depois
+        assert rankings[users[9].id].rank == 1
+        assert rankings[users[9].id].points == 100
+        assert rankings[users[1].id].rank == 2
+        assert rankings[users[1].id].points == 0
+
+    def test_sales_ranking_rerun_updates_counts(self, db, test_lists, test_salesperson_user):
+        """Rodar de novo atualiza as vendas sem duplicar registros"""
+        from app.models.card import Card
+        from app.models.gamification_ranking import GamificationRanking
+        from app.services.gamification_service import GamificationService
+
+        user, = self._add_users(db, 1)
+        self._add_won_cards(db, test_lists[0].id, [(user.id, 1, datetime.utcnow(), None)] * 3)
+        service = GamificationService(db)
+
+        service.update_sales_rankings()
+        # Um card é reaberto
+        card = db.query(Card).filter(Card.assigned_to_id == user.id).first()
+        card.is_won = 0
+        db.commit()
+        service.update_sales_rankings()
+
+        ranking = db.query(GamificationRanking).filter(GamificationRanking.period_type == "monthly").one()
+        assert ranking.cards_won == 2
+
+
 class TestPointsHistory:
     """Testes de histórico de pontos"""
 
@@ -365,3 +524,314 @@ class TestPointsHistory:
 
         total = sum(p.points for p in all_points)
         assert total >= 60  # Pelo menos 60 pontos (pode ter mais de testes anteriores)
+
+
+class TestPointBalances:
+    """Testes do saldo de pontos mantido junto com o histórico"""
+
+    def _award(self, db, user_id: int, points: int):
+        from app.repositories.gamification_repository import GamificationRepository
+        from app.schemas.gamification import GamificationPointCreate
+
+        return GamificationRepository(db).create_point(
+            GamificationPointCreate(user_id=user_id, points=points, reason="card_won")
+        )
+
+    def test_create_point_updates_balance(self, db, test_salesperson_user):
+        """Cada ponto registrado soma no total e nos contadores do período"""
+        from app.repositories.gamification_repository import GamificationRepository
+
+        self._award(db, test_salesperson_user.id, 20)
+        self._award(db, test_salesperson_user.id, -5)
+
+        summary = GamificationRepository(db).get_user_points_summary(test_salesperson_user.id)
+        assert summary == {"total": 15, "weekly": 15, "monthly": 15, "quarterly": 15, "annual": 15}
+
+    def test_closed_period_reads_as_zero(self, db, test_salesperson_user):
+        """Contador de um período encerrado vale zero e reinicia na próxima escrita"""
+        from app.repositories.gamification_repository import GamificationRepository
+
+        repository = GamificationRepository(db)
+        self._award(db, test_salesperson_user.id, 30)
+
+        balance = repository.get_user_balance(test_salesperson_user.id)
+        balance.week_start = balance.week_start - timedelta(days=7)
+        db.commit()
+
+        assert repository.get_user_points_summary(test_salesperson_user.id)["weekly"] == 0
+
+        self._award(db, test_salesperson_user.id, 10)
+        summary = repository.get_user_points_summary(test_salesperson_user.id)
+        assert summary["weekly"] == 10
+        assert summary["total"] == 40
+
+    def test_rebuild_balances_from_ledger(self, db, test_salesperson_user):
+        """Reconciliação corrige saldos a partir do histórico"""
+        from app.repositories.gamification_repository import GamificationRepository
+
+        repository = GamificationRepository(db)
+        self._award(db, test_salesperson_user.id, 10)
+
+        # Pontos gravados fora de create_point e um ponto antigo (fora da semana)
+        db.add(GamificationPoint(user_id=test_salesperson_user.id, points=25, reason="import"))
+        db.add(GamificationPoint(
+            user_id=test_salesperson_user.id,
+            points=100,
+            reason="import",
+            created_at=datetime.utcnow() - timedelta(days=400)
+        ))
+        db.commit()
+
+        result = repository.rebuild_point_balances()
+
+        assert result == {"balances": 1, "corrected": 1}
+        summary = repository.get_user_points_summary(test_salesperson_user.id)
+        assert summary["total"] == 135
+        assert summary["weekly"] == 35
+
+    def test_summary_endpoint_reads_balance(self, client: TestClient, manager_headers, db, test_salesperson_user):
+        """Resumo do usuário usa o saldo mantido"""
+        self._award(db, test_salesperson_user.id, 40)
+
+        response = client.get(
+            f"/api/v1/gamification/users/{test_salesperson_user.id}",
+            headers=manager_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_points"] == 40
+        assert data["current_week_points"] == 40
+        assert data["current_month_points"] == 40
+
+
+class TestAutomaticBadges:
+    """Testes da avaliação em lote dos badges automáticos"""
+
+    def _badge(self, db, name: str, criteria: dict) -> GamificationBadge:
+        badge = GamificationBadge(
+            name=name,
+            description=f"Badge {name}",
+            criteria_type="automatic",
+            criteria=criteria,
+            is_active=True
+        )
+        db.add(badge)
+        db.commit()
+        return badge
+
+    def _won_card(self, db, list_id: int, user_id: int, value: float, closed_at: datetime):
+        from app.models.card import Card
+
+        db.add(Card(
+            title="Venda",
+            list_id=list_id,
+            assigned_to_id=user_id,
+            value=value,
+            position=0,
+            is_won=1,
+            closed_at=closed_at
+        ))
+
+    def test_awards_card_metrics_and_streak(self, db, test_lists, test_salesperson_user, test_manager_user):
+        """Cards ganhos, valor ganho e sequência de dias são avaliados juntos"""
+        from app.services.gamification_service import GamificationService
+
+        today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+        for days_ago, value in [(0, 500), (1, 300), (2, 200), (5, 1000)]:
+            self._won_card(db, test_lists[3].id, test_salesperson_user.id, value, today - timedelta(days=days_ago))
+        self._won_card(db, test_lists[3].id, test_manager_user.id, 100, today)
+        db.commit()
+
+        sales = self._badge(db, "Vendedor", {"field": "total_sales", "operator": ">=", "value": 4})
+        value = self._badge(db, "Grandes negócios", {"field": "won_value", "operator": ">", "value": 1500})
+        streak = self._badge(db, "Em sequência", {"field": "win_streak_days", "operator": ">=", "value": 3})
+        long_streak = self._badge(db, "Imparável", {"field": "win_streak_days", "operator": ">=", "value": 4})
+
+        result = GamificationService(db).award_automatic_badges()
+
+        awarded = {
+            (user_badge.user_id, user_badge.badge_id)
+            for user_badge in db.query(UserBadge).all()
+        }
+        assert awarded == {
+            (test_salesperson_user.id, sales.id),
+            (test_salesperson_user.id, value.id),
+            (test_salesperson_user.id, streak.id),
+        }
+        assert (test_salesperson_user.id, long_streak.id) not in awarded
+        assert result["total_badges_awarded"] == 3
+        assert result["users_with_new_badges"] == [{
+            "user_id": test_salesperson_user.id,
+            "user_name": test_salesperson_user.name,
+            "badges_awarded": 3
+        }]
+
+    def test_combined_criteria_and_transfers(self, db, test_card, test_salesperson_user, test_manager_user):
+        """Critérios 'all' e 'any' combinam métricas, incluindo transferências recebidas"""
+        from app.models.card_transfer import CardTransfer
+        from app.services.gamification_service import GamificationService
+
+        db.add_all([
+            CardTransfer(card_id=test_card.id, from_user_id=test_manager_user.id,
+                         to_user_id=test_salesperson_user.id, reason="reassignment", status="completed"),
+            CardTransfer(card_id=test_card.id, from_user_id=test_manager_user.id,
+                         to_user_id=test_salesperson_user.id, reason="reassignment", status="pending_approval"),
+        ])
+        db.commit()
+
+        both = self._badge(db, "Colaborativo", {"all": [
+            {"field": "transfers_received", "operator": ">=", "value": 1},
+            {"field": "total_points", "operator": ">=", "value": 1},
+        ]})
+        either = self._badge(db, "Receptivo", {"any": [
+            {"field": "transfers_received", "operator": "==", "value": 1},
+            {"field": "total_points", "operator": ">=", "value": 1000},
+        ]})
+
+        GamificationService(db).award_automatic_badges()
+
+        awarded = {(ub.user_id, ub.badge_id) for ub in db.query(UserBadge).all()}
+        assert awarded == {(test_salesperson_user.id, either.id)}
+        assert both.id not in {badge_id for _, badge_id in awarded}
+
+    def test_does_not_award_twice_and_notifies(self, db, test_salesperson_user):
+        """Badges já conquistados não são repetidos e cada novo gera uma notificação"""
+        from app.models.notification import Notification
+        from app.services.gamification_service import GamificationService
+
+        self._badge(db, "Primeiros pontos", {"field": "total_points", "operator": ">=", "value": 10})
+        service = GamificationService(db)
+
+        service.award_points(test_salesperson_user.id, "card_won", custom_points=15)
+        service.award_points(test_salesperson_user.id, "card_won", custom_points=15)
+        result = service.award_automatic_badges()
+
+        assert result["total_badges_awarded"] == 0
+        assert db.query(UserBadge).filter(UserBadge.user_id == test_salesperson_user.id).count() == 1
+        assert db.query(Notification).filter(
+            Notification.user_id == test_salesperson_user.id,
+            Notification.notification_type == "badge_earned"
+        ).count() == 1
+
+    def test_award_uses_cached_badges(self, db, test_salesperson_user, query_counter):
+        """Atribuir pontos não relê os badges nem conta a base de usuários"""
+        from app.services.gamification_service import GamificationService
+
+        badge = self._badge(db, "Primeiros pontos", {"field": "total_points", "operator": ">=", "value": 10})
+        service = GamificationService(db)
+        service.award_automatic_badges([test_salesperson_user.id])
+
+        with query_counter() as queries:
+            service.award_points(test_salesperson_user.id, "card_won", custom_points=15)
+
+        assert not [sql for sql in queries if "FROM gamification_badges" in sql]
+        assert not [sql for sql in queries if sql.lstrip().upper().startswith("SELECT COUNT(*)")]
+        assert db.query(UserBadge).filter(UserBadge.badge_id == badge.id).count() == 1
+
+    def test_badge_update_invalidates_cache(self, client: TestClient, admin_headers, db, test_salesperson_user):
+        """Alterar o critério de um badge pela API vale para a próxima avaliação"""
+        from app.services.gamification_service import GamificationService
+
+        badge = self._badge(db, "Mil pontos", {"field": "total_points", "operator": ">=", "value": 1000})
+        service = GamificationService(db)
+        service.award_points(test_salesperson_user.id, "card_won", custom_points=15)
+        assert db.query(UserBadge).count() == 0
+
+        response = client.put(
+            f"/api/v1/gamification/badges/{badge.id}",
+            headers=admin_headers,
+            json={"criteria": {"field": "total_points", "operator": ">=", "value": 10}}
+        )
+        assert response.status_code == 200
+
+        service.award_automatic_badges([test_salesperson_user.id])
+        assert db.query(UserBadge).filter(UserBadge.badge_id == badge.id).count() == 1
+
+    def test_create_badge_with_invalid_criteria(self, client: TestClient, admin_headers):
+        """Critério com métrica desconhecida é rejeitado na criação"""
+        response = client.post(
+            "/api/v1/gamification/badges",
+            headers=admin_headers,
+            json={
+                "name": "Badge inválido",
+                "criteria_type": "automatic",
+                "criteria": {"field": "unknown_metric", "operator": ">=", "value": 1}
+            }
+        )
+
+        assert response.status_code == 400
+
+
+class TestActionPointsTable:
+    """Testes da tabela de pontos por ação em cache"""
+
+    def _configure(self, db, action_type: str, points: int, is_active: bool = True):
+        from app.models.gamification_action_points import GamificationActionPoints
+
+        db.add(GamificationActionPoints(action_type=action_type, points=points, is_active=is_active))
+        db.commit()
+
+    def test_configuration_overrides_defaults(self, db):
+        """Ações configuradas usam o banco; as demais, os valores padrão"""
+        from app.services.gamification_service import GamificationService
+
+        self._configure(db, "card_moved", 7)
+        self._configure(db, "daily_login", 50, is_active=False)
+        service = GamificationService(db)
+
+        assert service.get_points_for_action("card_moved") == 7
+        assert service.get_points_for_action("daily_login") == 0
+        assert service.get_points_for_action("card_won") == 20
+        assert service.get_points_for_action("unknown") == 0
+
+    def test_lookup_is_cached(self, db, test_salesperson_user, query_counter):
+        """Depois da primeira leitura, atribuir pontos não consulta a configuração"""
+        from app.services.gamification_service import GamificationService
+
+        self._configure(db, "card_moved", 7)
+        service = GamificationService(db)
+        service.get_points_for_action("card_moved")
+
+        with query_counter() as queries:
+            assert service.get_points_for_action("card_moved") == 7
+            service.award_points(test_salesperson_user.id, "card_moved")
+
+        assert not [sql for sql in queries if "gamification_action_points" in sql]
+        assert service.get_user_total_points(test_salesperson_user.id) == 7
+
+    def test_update_invalidates_table(self, client: TestClient, admin_headers, db):
+        """Alterar a configuração pela API recarrega a tabela"""
+        from app.services.gamification_service import GamificationService
+
+        self._configure(db, "card_won", 20)
+        service = GamificationService(db)
+        assert service.get_points_for_action("card_won") == 20
+
+        response = client.put(
+            "/api/v1/gamification/action-points/card_won",
+            headers=admin_headers,
+            json={"points": 35}
+        )
+
+        assert response.status_code == 200
+        assert service.get_points_for_action("card_won") == 35
+
+    def test_shared_version_reloads_other_processes(self, db):
+        """Outro processo que incrementa a versão força a recarga local"""
+        from app.core.action_points import action_points_table
+        from app.models.gamification_action_points import GamificationActionPoints
+        from app.services.gamification_service import GamificationService
+
+        self._configure(db, "card_moved", 7)
+        service = GamificationService(db)
+        assert service.get_points_for_action("card_moved") == 7
+
+        # Alteração feita por outro worker: só a versão compartilhada muda
+        action = db.query(GamificationActionPoints).filter_by(action_type="card_moved").first()
+        action.points = 9
+        db.commit()
+        assert service.get_points_for_action("card_moved") == 7
+
+        action_points_table.backend.bump_version()
+        assert service.get_points_for_action("card_moved") == 9
@@ -0,0 +1,92 @@
+"""
+Testes unitários do leaderboard em tempo real.
+Testa o backend em memória (fallback do Redis) e a integração com a gamificação.
+"""
+from datetime import datetime, timedelta
+
+from app.core.leaderboard import Leaderboard, MemoryLeaderboardBackend, leaderboard
+from app.models.gamification_point import GamificationPoint
+from app.services.gamification_service import GamificationService
+
+
+class TestLeaderboard:
+    """Testes da estrutura do leaderboard"""
+
+    def test_rank_with_ties(self):
+        """Empates dividem a posição, como no RANK() do ranking salvo"""
+        board = Leaderboard(MemoryLeaderboardBackend())
+        board.add_points(1, 50)
+        board.add_points(2, 30)
+        board.add_points(3, 30)
+        board.add_points(4, 10)
+
+        assert [board.get_rank(user_id, "weekly") for user_id in (1, 2, 3, 4)] == [1, 2, 2, 4]
+        assert board.top("weekly", 2) == [(1, 50), (2, 30)]
+
+    def test_incremental_update_changes_rank(self):
+        """Novos pontos reposicionam o usuário sem recalcular o conjunto"""
+        board = Leaderboard(MemoryLeaderboardBackend())
+        board.add_points(1, 50)
+        board.add_points(2, 30)
+
+        board.add_points(2, 25)
+
+        assert board.get_rank(2, "monthly") == 1
+        assert board.get_rank(1, "monthly") == 2
+
+    def test_users_without_positive_points_are_unranked(self):
+        """Usuário sem pontos positivos fica fora do ranking"""
+        board = Leaderboard(MemoryLeaderboardBackend())
+        board.add_points(1, 10)
+        board.add_points(1, -10)
+
+        assert board.get_rank(1, "weekly") is None
+        assert board.get_rank(2, "weekly") is None
+        assert board.top("weekly") == []
+
+    def test_closed_period_is_not_read(self):
+        """Pontos de um período anterior não contam no período atual"""
+        board = Leaderboard(MemoryLeaderboardBackend())
+        board.add_points(1, 10, now=datetime.utcnow() - timedelta(days=8))
+
+        assert board.get_rank(1, "weekly") is None
+
+
+class TestLeaderboardGamification:
+    """Testes da integração do leaderboard com a gamificação"""
+
+    def test_award_points_updates_summary_ranks(self, db, test_salesperson_user, test_manager_user):
+        """Atribuir pontos atualiza as posições do resumo do usuário"""
+        service = GamificationService(db)
+        service.award_points(test_manager_user.id, "card_won", custom_points=30)
+        service.award_points(test_salesperson_user.id, "card_won", custom_points=20)
+
+        summary = service.get_user_summary(test_salesperson_user.id)
+        assert summary.weekly_rank == 2
+        assert summary.monthly_rank == 2
+
+        service.award_points(test_salesperson_user.id, "card_won", custom_points=20)
+
+        summary = service.get_user_summary(test_salesperson_user.id)
+        assert summary.weekly_rank == 1
+        assert summary.annual_rank == 1
+
+    def test_rebuild_from_ledger(self, db, test_salesperson_user, test_manager_user):
+        """Reconstrução a partir de gamification_points respeita cada período"""
+        db.add_all([
+            GamificationPoint(user_id=test_salesperson_user.id, points=10, reason="card_won"),
+            GamificationPoint(
+                user_id=test_manager_user.id,
+                points=100,
+                reason="card_won",
+                created_at=datetime.utcnow() - timedelta(days=400)
+            ),
+            GamificationPoint(user_id=test_manager_user.id, points=5, reason="card_won"),
+        ])
+        db.commit()
+
+        users = GamificationService(db).rebuild_leaderboard()
+
+        assert users == 2
+        assert leaderboard.top("weekly") == [(test_salesperson_user.id, 10), (test_manager_user.id, 5)]
+        assert leaderboard.get_rank(test_manager_user.id, "annual") == 2
@@ -0,0 +1,89 @@
+"""
+Testes unitários de notificações.
+Testa o resumo diário de cards vencidos.
+"""
+from datetime import datetime, timedelta
+
+from app.models.card import Card
+from app.models.notification import Notification
+from app.services.notification_service import NotificationService
+
+
+class TestOverdueDigest:
+    """Testes do resumo de cards vencidos"""
+
+    def _card(self, db, list_id: int, user_id, title: str, days_overdue: int = 1, **fields) -> Card:
+        card = Card(
+            title=title,
+            list_id=list_id,
+            assigned_to_id=user_id,
+            due_date=datetime.utcnow() - timedelta(days=days_overdue),
+            position=0,
+            **fields
+        )
+        db.add(card)
+        db.commit()
+        return card
+
+    def test_one_digest_per_user(self, db, test_lists, test_salesperson_user, test_manager_user):
+        """Cada responsável recebe uma única notificação com todos os seus cards"""
+        list_id = test_lists[0].id
+        for index in range(5):
+            self._card(db, list_id, test_salesperson_user.id, f"Venda {index}", days_overdue=5 - index)
+        single = self._card(db, list_id, test_manager_user.id, "Contrato")
+
+        result = NotificationService(db).send_overdue_digests()
+
+        assert result == {"users_notified": 2, "users_skipped": 0, "overdue_cards": 6}
+        digest = db.query(Notification).filter(Notification.user_id == test_salesperson_user.id).one()
+        assert digest.notification_type == "card_overdue"
+        assert digest.title == "5 cards vencidos"
+        assert digest.message == "Você tem 5 cards vencidos: 'Venda 0', 'Venda 1', 'Venda 2' e mais 2"
+        assert digest.notification_metadata["total_cards"] == 5
+        assert digest.color == "danger"
+
+        single_digest = db.query(Notification).filter(Notification.user_id == test_manager_user.id).one()
+        assert single_digest.title == "Card vencido"
+        assert single_digest.notification_metadata["card_ids"] == [single.id]
+        assert single_digest.notification_metadata["url"] == f"/cards/{single.id}"
+
+    def test_ignores_closed_deleted_and_unassigned_cards(self, db, test_lists, test_salesperson_user):
+        """Cards ganhos, perdidos, excluídos, sem responsável ou no prazo não entram no resumo"""
+        list_id = test_lists[0].id
+        open_card = self._card(db, list_id, test_salesperson_user.id, "Aberto")
+        self._card(db, list_id, test_salesperson_user.id, "Ganho", is_won=1)
+        self._card(db, list_id, test_salesperson_user.id, "Perdido", is_won=-1)
+        self._card(db, list_id, test_salesperson_user.id, "Excluído", deleted_at=datetime.utcnow())
+        self._card(db, list_id, None, "Sem responsável")
+        self._card(db, list_id, test_salesperson_user.id, "No prazo", days_overdue=-3)
+
+        result = NotificationService(db).send_overdue_digests()
+
+        assert result["overdue_cards"] == 1
+        digest = db.query(Notification).one()
+        assert digest.notification_metadata["card_ids"] == [open_card.id]
+
+    def test_rerun_same_day_does_not_duplicate(self, db, test_lists, test_salesperson_user):
+        """Rodar o job de novo no mesmo dia não envia outro resumo"""
+        self._card(db, test_lists[0].id, test_salesperson_user.id, "Aberto")
+        service = NotificationService(db)
+
+        service.send_overdue_digests()
+        result = service.send_overdue_digests()
+
+        assert result == {"users_notified": 0, "users_skipped": 1, "overdue_cards": 1}
+        assert db.query(Notification).count() == 1
+
+    def test_single_insert_for_all_users(self, db, test_lists, test_salesperson_user,
+                                         test_manager_user, test_admin_user, query_counter):
+        """Os resumos de todos os usuários são gravados com um único INSERT"""
+        for user in (test_salesperson_user, test_manager_user, test_admin_user):
+            for index in range(3):
+                self._card(db, test_lists[0].id, user.id, f"Card {index}")
+
+        with query_counter() as queries:
+            result = NotificationService(db).send_overdue_digests()
+
+        assert result["users_notified"] == 3
+        inserts = [sql for sql in queries if sql.lstrip().upper().startswith("INSERT")]
+        assert len(inserts) == 1
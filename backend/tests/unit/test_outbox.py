@@ -0,0 +1,322 @@
+"""
+Testes unitários do outbox de efeitos colaterais.
+Testa a gravação do evento junto com o movimento do card e o processamento
+posterior (pontos, parabenização, automações, novas tentativas).
+"""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.core.leaderboard import leaderboard
+from app.models.activity import Activity
+from app.models.automation import Automation
+from app.models.gamification_point import GamificationPoint
+from app.models.notification import Notification
+from app.models.outbox_event import OutboxEvent, OutboxEventStatus
+from app.repositories.outbox_repository import OutboxRepository
+from app.services.card_service import CardService
+from app.services.gamification_service import GamificationService
+from app.services.outbox_service import OutboxService
+
+
+class TestCardMovedOutbox:
+    """Testes do evento card_moved"""
+
+    def _move(self, client: TestClient, headers: dict, card_id: int, list_id: int):
+        response = client.put(
+            f"/api/v1/cards/{card_id}/move",
+            headers=headers,
+            json={"target_list_id": list_id}
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def test_move_defers_side_effects(self, client: TestClient, salesperson_headers, db, test_card, test_lists):
+        """O movimento grava o evento e a atividade; pontos e notificação ficam para depois"""
+        self._move(client, salesperson_headers, test_card.id, test_lists[1].id)
+
+        event = db.query(OutboxEvent).one()
+        assert event.event_type == "card_moved"
+        assert event.status == OutboxEventStatus.PENDING
+        assert event.payload["to_list_id"] == test_lists[1].id
+        assert event.payload["points"] == 2
+        assert db.query(Activity).filter(Activity.activity_type == "card_moved").count() == 1
+        assert db.query(GamificationPoint).count() == 0
+        assert db.query(Notification).count() == 0
+
+    def test_process_applies_side_effects(self, client: TestClient, salesperson_headers, db,
+                                          test_card, test_lists, test_salesperson_user):
+        """Processar o evento atribui os pontos e cria a parabenização"""
+        self._move(client, salesperson_headers, test_card.id, test_lists[3].id)
+
+        result = OutboxService(db).process_pending()
+
+        assert result == {"claimed": 1, "processed": 1, "failed": 0}
+        point = db.query(GamificationPoint).one()
+        assert point.user_id == test_salesperson_user.id
+        assert point.points == 20
+        assert point.reason == "card_won"
+        assert db.query(Notification).filter(Notification.notification_type == "card_won").count() == 1
+
+        event = db.query(OutboxEvent).one()
+        assert event.status == OutboxEventStatus.DONE
+        assert event.completed_steps == ["points", "notification", "automations"]
+        assert OutboxService(db).process_pending()["claimed"] == 0
+
+    def test_retry_does_not_repeat_completed_steps(self, client: TestClient, salesperson_headers, db,
+                                                   test_card, test_lists):
+        """Evento de um worker que parou no meio é retomado sem repetir etapas"""
+        self._move(client, salesperson_headers, test_card.id, test_lists[1].id)
+        service = OutboxService(db)
+
+        # Worker reservou o evento, concluiu a etapa de pontos e morreu
+        event = OutboxRepository(db).claim_ready(10, OutboxService.LEASE)[0]
+        service.run_step(event, "points", lambda: CardService(db).award_move_points(event.payload))
+        event.available_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+
+        result = service.process_pending()
+
+        assert result["processed"] == 1
+        assert db.query(GamificationPoint).count() == 1
+        assert db.query(Notification).filter(Notification.notification_type == "card_moved").count() == 1
+
+    def test_failed_step_is_rolled_back_whole(self, client: TestClient, salesperson_headers, db,
+                                              test_card, test_lists, test_salesperson_user, monkeypatch):
+        """Falha depois do primeiro commit interno da etapa não deixa efeitos parciais"""
+        self._move(client, salesperson_headers, test_card.id, test_lists[3].id)
+
+        # Pontos e notificação de pontos já gravados quando a avaliação de badges falha
+        def badges_down(self, user_ids=None):
+            raise RuntimeError("falha nos badges")
+
+        monkeypatch.setattr(GamificationService, "award_automatic_badges", badges_down)
+        assert OutboxService(db).process_pending()["failed"] == 1
+
+        event = db.query(OutboxEvent).one()
+        assert not event.completed_steps
+        assert db.query(GamificationPoint).count() == 0
+        assert db.query(Notification).count() == 0
+        assert leaderboard.top("weekly") == []
+
+        monkeypatch.undo()
+        event.available_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+        assert OutboxService(db).process_pending()["processed"] == 1
+
+        assert db.query(GamificationPoint).count() == 1
+        assert db.query(Notification).filter(Notification.notification_type == "points_awarded").count() == 1
+        assert db.query(Notification).filter(Notification.notification_type == "card_won").count() == 1
+        assert leaderboard.top("weekly") == [(test_salesperson_user.id, 20)]
+
+    def test_move_triggers_board_automations(self, client: TestClient, salesperson_headers, db,
+                                             test_card, test_lists, test_board, test_manager_user):
+        """Automações de card movido do board rodam no processamento do evento"""
+        db.add(Automation(
+            board_id=test_board.id,
+            name="Passar para o gerente",
+            automation_type="trigger",
+            trigger_event="card_moved",
+            trigger_conditions={"to_list_id": test_lists[2].id},
+            actions=[{"type": "assign_card", "params": {"user_id": test_manager_user.id}}]
+        ))
+        db.commit()
+
+        self._move(client, salesperson_headers, test_card.id, test_lists[2].id)
+        OutboxService(db).process_pending()
+
+        db.refresh(test_card)
+        assert test_card.assigned_to_id == test_manager_user.id
+        assert "automations" in db.query(OutboxEvent).one().completed_steps
+
+    def test_failed_automation_action_is_recorded(self, client: TestClient, salesperson_headers, db,
+                                                  test_card, test_lists, test_board, test_manager_user,
+                                                  monkeypatch):
+        """Ação de automação com flush inválido registra a falha e a etapa conclui"""
+        from app.db.session import commit
+        from app.models.automation_execution import AutomationExecution
+        from app.repositories.card_repository import CardRepository
+
+        db.add(Automation(
+            board_id=test_board.id,
+            name="Passar para o gerente",
+            automation_type="trigger",
+            trigger_event="card_moved",
+            trigger_conditions={"to_list_id": test_lists[2].id},
+            actions=[{"type": "assign_card", "params": {"user_id": test_manager_user.id}}]
+        ))
+        db.commit()
+        title = test_card.title
+
+        # A ação grava um card inválido (título NOT NULL): o flush falha dentro da etapa
+        def invalid_assign(self, card, user_id):
+            card.assigned_to_id = user_id
+            card.title = None
+            commit(self.db)
+
+        monkeypatch.setattr(CardRepository, "assign_to_user", invalid_assign)
+        self._move(client, salesperson_headers, test_card.id, test_lists[2].id)
+
+        assert OutboxService(db).process_pending()["processed"] == 1
+
+        event = db.query(OutboxEvent).one()
+        assert event.completed_steps == ["points", "notification", "automations"]
+        execution = db.query(AutomationExecution).one()
+        assert execution.status == "failed"
+        assert execution.error_message
+        assert db.query(GamificationPoint).count() == 1
+        db.refresh(test_card)
+        assert test_card.title == title
+        assert test_card.assigned_to_id != test_manager_user.id
+
+
+class TestOutboxRetries:
+    """Testes de falhas e novas tentativas"""
+
+    def _event(self, db, event_type: str = "unknown") -> OutboxEvent:
+        event = OutboxRepository(db).add(event_type, {}, f"{event_type}:test")
+        db.commit()
+        return event
+
+    def test_failure_schedules_retry(self, db):
+        """Falha registra o erro e adia a próxima tentativa"""
+        event = self._event(db)
+
+        result = OutboxService(db).process_pending()
+
+        assert result == {"claimed": 1, "processed": 0, "failed": 1}
+        db.refresh(event)
+        assert event.status == OutboxEventStatus.PENDING
+        assert event.attempts == 1
+        assert "unknown" in event.last_error
+        assert event.available_at > datetime.utcnow()
+        assert OutboxService(db).process_pending()["claimed"] == 0
+
+    def test_gives_up_after_max_attempts(self, db):
+        """Depois do limite de tentativas o evento fica como failed"""
+        event = self._event(db)
+        service = OutboxService(db)
+
+        for _ in range(OutboxService.MAX_ATTEMPTS):
+            event.available_at = datetime.utcnow() - timedelta(seconds=1)
+            db.commit()
+            service.process_pending()
+            db.refresh(event)
+
+        assert event.status == OutboxEventStatus.FAILED
+        assert event.attempts == OutboxService.MAX_ATTEMPTS
+
+
+class TestCeleryTaskPublication:
+    """Testes da publicação de tasks do Celery pelo outbox"""
+
+    def _add_tasks(self, db, total: int) -> None:
+        OutboxRepository(db).add_tasks([
+            ("send_notification_task", {"user_ids": [index]}, f"test:{index}")
+            for index in range(total)
+        ])
+        db.commit()
+
+    def test_add_tasks_ignores_known_keys(self, db):
+        """A mesma chave de idempotência não gera duas publicações"""
+        repository = OutboxRepository(db)
+        self._add_tasks(db, 3)
+
+        added = repository.add_tasks([
+            ("send_notification_task", {"user_ids": [0]}, "test:0"),
+            ("send_notification_task", {"user_ids": [9]}, "test:9"),
+            ("send_notification_task", {"user_ids": [9]}, "test:9"),
+        ])
+        db.commit()
+
+        assert added == 1
+        assert db.query(OutboxEvent).count() == 4
+
+    def test_publishes_in_chunks_after_commit(self, db, monkeypatch):
+        """Tasks são publicadas em grupos e marcadas só depois da publicação"""
+        from app.core import outbox
+        from app.core.config import settings
+
+        batches = []
+        monkeypatch.setattr(outbox, "publish_task_batch", lambda messages: batches.append(messages))
+        monkeypatch.setattr(settings, "OUTBOX_PUBLISH_CHUNK_SIZE", 2)
+        self._add_tasks(db, 5)
+
+        result = OutboxService(db).process_pending()
+
+        assert result == {"claimed": 5, "processed": 5, "failed": 0}
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        task_name, kwargs, task_id = batches[0][0]
+        assert task_name == "send_notification_task"
+        assert kwargs == {"user_ids": [0]}
+        assert task_id.startswith("outbox-")
+        assert db.query(OutboxEvent).filter(OutboxEvent.status == OutboxEventStatus.DONE).count() == 5
+
+    def test_broker_failure_keeps_tasks_pending(self, db, monkeypatch):
+        """Falha do broker mantém as tasks no outbox e interrompe o lote"""
+        from app.core import outbox
+        from app.core.config import settings
+
+        def broker_down(messages):
+            raise ConnectionError("broker indisponível")
+
+        monkeypatch.setattr(outbox, "publish_task_batch", broker_down)
+        monkeypatch.setattr(settings, "OUTBOX_PUBLISH_CHUNK_SIZE", 2)
+        self._add_tasks(db, 5)
+
+        result = OutboxService(db).process_pending()
+
+        assert result == {"claimed": 5, "processed": 0, "failed": 2}
+        events = db.query(OutboxEvent).order_by(OutboxEvent.id).all()
+        assert all(event.status == OutboxEventStatus.PENDING for event in events)
+        # O grupo que falhou conta a tentativa; o restante volta sem penalidade
+        assert [event.attempts for event in events] == [1, 1, 0, 0, 0]
+        assert "broker" in events[0].last_error
+
+
+class TestScheduledAutomations:
+    """Testes do disparo de automações agendadas pelo outbox"""
+
+    def _run_task(self, db, monkeypatch) -> dict:
+        from app.workers import tasks
+
+        # A task usa a sessão de teste (sem fechá-la ao terminar)
+        monkeypatch.setattr(tasks, "SessionLocal", lambda: db)
+        monkeypatch.setattr(db, "close", lambda: None)
+        return tasks.check_scheduled_automations_task()
+
+    def _scheduled(self, db, board_id: int, next_run_at: datetime) -> Automation:
+        automation = Automation(
+            board_id=board_id,
+            name="Relatório semanal",
+            automation_type="scheduled",
+            schedule_type="recurrent",
+            recurrence_pattern="weekly",
+            next_run_at=next_run_at,
+            actions=[{"type": "send_notification", "params": {}}]
+        )
+        db.add(automation)
+        db.commit()
+        return automation
+
+    def test_due_automations_written_once_per_run_time(self, db, monkeypatch, test_board):
+        """Cada automação vencida vira uma task no outbox por horário agendado"""
+        due = self._scheduled(db, test_board.id, datetime.utcnow() - timedelta(minutes=5))
+        self._scheduled(db, test_board.id, datetime.utcnow() + timedelta(hours=1))
+
+        first = self._run_task(db, monkeypatch)
+        second = self._run_task(db, monkeypatch)
+
+        assert first["success"] is True
+        assert first["executed"] == 1
+        assert second["checked"] == 1
+        assert second["executed"] == 0
+        event = db.query(OutboxEvent).one()
+        assert event.payload == {"task": "execute_automation_task", "kwargs": {"automation_id": due.id}}
+        assert event.idempotency_key == f"automation:{due.id}:{due.next_run_at:%Y%m%d%H%M%S}"
+
+        # Nova data de execução gera uma nova publicação
+        due.next_run_at = datetime.utcnow() - timedelta(minutes=1)
+        db.commit()
+        assert self._run_task(db, monkeypatch)["executed"] == 1
+        assert db.query(OutboxEvent).count() == 2
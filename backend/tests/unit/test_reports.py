@@ -0,0 +1,524 @@
+"""
+Testes unitários para relatórios.
+Testa o cálculo de KPIs do dashboard e relatórios agregados.
+"""
+import pytest
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.board import Board
+from app.models.card import Card
+from app.models.list import List as BoardList
+from app.models.pipeline_daily_snapshot import PipelineDailySnapshot
+from app.models.pipeline_dirty_day import PipelineDirtyDay
+from app.models.user import User
+from app.repositories.pipeline_snapshot_repository import PipelineSnapshotRepository
+from app.services.report_service import ReportService
+from app.schemas.report import PeriodEnum, DashboardKPIsResponse
+
+
+def _legacy_dashboard_kpis(db: Session) -> dict:
+    """
+    Implementação original do dashboard (uma query por contador).
+    Mantida aqui apenas como referência para o teste de regressão.
+    """
+    service = ReportService(db)
+    today = date.today()
+    start_of_week, _ = service._get_date_range(PeriodEnum.THIS_WEEK)
+    start_of_month, _ = service._get_date_range(PeriodEnum.THIS_MONTH)
+    board_ids = [b.id for b in db.query(Board).all()]
+
+    def scalar(expr, *filters, default=0):
+        return db.query(expr).join(
+            BoardList, Card.list_id == BoardList.id
+        ).filter(BoardList.board_id.in_(board_ids), *filters).scalar() or default
+
+    def count(*filters):
+        return scalar(func.count(Card.id), *filters)
+
+    def total(*filters):
+        return scalar(func.sum(Card.value), *filters, default=Decimal(0))
+
+    end_of_week = start_of_week + timedelta(days=6)
+    result = {
+        "total_cards": count(),
+        "new_cards_today": count(func.date(Card.created_at) == today),
+        "new_cards_this_week": count(func.date(Card.created_at) >= start_of_week),
+        "new_cards_this_month": count(func.date(Card.created_at) >= start_of_month),
+        "won_cards_today": count(Card.is_won == 1, func.date(Card.closed_at) == today),
+        "won_cards_this_week": count(Card.is_won == 1, func.date(Card.closed_at) >= start_of_week),
+        "won_cards_this_month": count(Card.is_won == 1, func.date(Card.closed_at) >= start_of_month),
+        "lost_cards_today": count(Card.is_won == -1, func.date(Card.closed_at) == today),
+        "lost_cards_this_week": count(Card.is_won == -1, func.date(Card.closed_at) >= start_of_week),
+        "lost_cards_this_month": count(Card.is_won == -1, func.date(Card.closed_at) >= start_of_month),
+        "overdue_cards": count(Card.due_date < datetime.now(), Card.is_won == 0),
+        "due_today": count(func.date(Card.due_date) == today, Card.is_won == 0),
+        "due_this_week": count(
+            func.date(Card.due_date) >= today,
+            func.date(Card.due_date) <= end_of_week,
+            Card.is_won == 0
+        ),
+        "total_value": total(),
+        "won_value_this_month": total(Card.is_won == 1, func.date(Card.closed_at) >= start_of_month),
+        "pipeline_value": total(Card.is_won == 0),
+    }
+
+    result["conversion_rate_this_month"] = 0.0
+    if result["new_cards_this_month"] > 0:
+        result["conversion_rate_this_month"] = round(
+            (result["won_cards_this_month"] / result["new_cards_this_month"]) * 100, 2
+        )
+
+    avg_time = scalar(
+        func.avg(func.extract('epoch', Card.closed_at - Card.created_at) / 86400),
+        Card.is_won == 1,
+        Card.closed_at.isnot(None),
+        default=None
+    )
+    result["avg_time_to_win_days"] = round(float(avg_time), 2) if avg_time else None
+
+    top_sellers = db.query(
+        User.name, func.count(Card.id), func.sum(Card.value)
+    ).join(Card, Card.assigned_to_id == User.id).join(
+        BoardList, Card.list_id == BoardList.id
+    ).filter(
+        BoardList.board_id.in_(board_ids),
+        Card.is_won == 1,
+        func.date(Card.closed_at) >= start_of_month
+    ).group_by(User.id, User.name).order_by(func.count(Card.id).desc()).limit(5).all()
+    result["top_sellers_this_month"] = [
+        {"name": name, "cards_won": won, "total_value": float(value or 0)}
+        for name, won, value in top_sellers
+    ]
+
+    by_stage = db.query(
+        BoardList.name, func.count(Card.id), func.sum(Card.value)
+    ).join(Card, Card.list_id == BoardList.id).filter(
+        BoardList.board_id.in_(board_ids),
+        Card.is_won == 0
+    ).group_by(BoardList.id, BoardList.name, BoardList.position).order_by(BoardList.position).all()
+    result["cards_by_stage"] = [
+        {"stage_name": name, "card_count": cards, "total_value": float(value or 0)}
+        for name, cards, value in by_stage
+    ]
+
+    result["sales_evolution"] = []
+    for month_start, month_end in service._sales_evolution_months(today):
+        in_month = (
+            func.date(Card.closed_at) >= month_start,
+            func.date(Card.closed_at) <= month_end
+        )
+        result["sales_evolution"].append({
+            "period": month_start.strftime("%b/%y"),
+            "won_count": count(Card.is_won == 1, *in_month),
+            "won_value": float(total(Card.is_won == 1, *in_month)),
+            "lost_count": count(Card.is_won == -1, *in_month)
+        })
+
+    return result
+
+
+@pytest.fixture
+def dashboard_cards(db: Session, test_lists, test_salesperson_user, test_manager_user) -> list:
+    """Cria cards com datas variadas (hoje, semana, mês, meses anteriores)."""
+    now = datetime.now()
+    users = [test_salesperson_user.id, test_manager_user.id, None]
+    offsets = [0, 1, 3, 8, 20, 35, 65, 100, 140, 170, 200]
+
+    cards = []
+    for index, days_ago in enumerate(offsets * 3):
+        created_at = now - timedelta(days=days_ago + 5, hours=index)
+        status = index % 3 - 1  # -1, 0, 1 (perdido, aberto, ganho)
+        card = Card(
+            title=f"Card {index}",
+            list_id=test_lists[index % len(test_lists)].id,
+            assigned_to_id=users[(index // 3) % len(users)],
+            value=Decimal(100 * (index + 1)),
+            position=index,
+            is_won=status,
+            created_at=created_at,
+            closed_at=now - timedelta(days=days_ago, hours=index % 5) if status != 0 else None,
+            due_date=now + timedelta(days=(index % 9) - 4, hours=1),
+        )
+        db.add(card)
+        cards.append(card)
+
+    # Card criado hoje e ainda aberto
+    db.add(Card(
+        title="Card de hoje",
+        list_id=test_lists[0].id,
+        value=Decimal("50.00"),
+        position=999,
+        is_won=0,
+        created_at=now,
+        due_date=now
+    ))
+    db.commit()
+    return cards
+
+
+class TestDashboardKPIs:
+    """Testes do dashboard de KPIs"""
+
+    def test_dashboard_matches_legacy_implementation(self, db: Session, dashboard_cards):
+        """O consolidado deve produzir os mesmos números das queries individuais"""
+        expected = _legacy_dashboard_kpis(db)
+        PipelineSnapshotRepository(db).refresh()
+
+        result = ReportService(db).get_dashboard_kpis().model_dump()
+
+        for key, value in expected.items():
+            assert result[key] == value, key
+
+    def test_dashboard_empty_database(self, db: Session):
+        """Sem cards, todos os contadores devem ser zero"""
+        PipelineSnapshotRepository(db).refresh()
+        result = ReportService(db).get_dashboard_kpis()
+
+        assert result.total_cards == 0
+        assert result.total_value == Decimal(0)
+        assert result.avg_time_to_win_days is None
+        assert len(result.sales_evolution) == 6
+        assert all(item["won_count"] == 0 for item in result.sales_evolution)
+
+    def test_dashboard_uses_few_queries(self, db: Session, dashboard_cards, query_counter):
+        """O dashboard não deve disparar uma query por contador"""
+        PipelineSnapshotRepository(db).refresh()
+
+        with query_counter() as statements:
+            ReportService(db).get_dashboard_kpis()
+
+        assert len(statements) <= 4
+
+
+class TestPipelineSnapshots:
+    """Testes do consolidado diário do pipeline"""
+
+    def test_first_refresh_rebuilds_everything(self, db: Session, dashboard_cards):
+        """Sem consolidado prévio, a primeira execução reconstrói todo o histórico"""
+        result = PipelineSnapshotRepository(db).refresh()
+
+        assert result["mode"] == "full"
+        assert ReportService(db).get_dashboard_kpis().total_cards == len(dashboard_cards) + 1
+
+    def test_incremental_refresh_only_touched_days(self, db: Session, dashboard_cards):
+        """A atualização incremental recalcula apenas os dias dos cards alterados"""
+        repository = PipelineSnapshotRepository(db)
+        repository.refresh()
+
+        # Ganha um card aberto criado há meses
+        card = next(
+            c for c in dashboard_cards
+            if c.is_won == 0 and c.created_at < datetime.now() - timedelta(days=60)
+        )
+        card.is_won = 1
+        card.closed_at = datetime.now()
+        db.commit()
+
+        result = repository.refresh()
+
+        # Dia de criação e dia de fechamento
+        assert result == {"mode": "incremental", "days_refreshed": 2}
+        expected = _legacy_dashboard_kpis(db)
+        result = ReportService(db).get_dashboard_kpis().model_dump()
+        for key, value in expected.items():
+            assert result[key] == value, key
+
+    def _snapshot_rows(self, db: Session) -> list:
+        return sorted(db.query(
+            PipelineDailySnapshot.snapshot_date,
+            PipelineDailySnapshot.list_id,
+            PipelineDailySnapshot.assigned_to_id,
+            PipelineDailySnapshot.created_count,
+            PipelineDailySnapshot.won_count,
+            PipelineDailySnapshot.lost_count,
+            PipelineDailySnapshot.open_count,
+        ).all(), key=str)
+
+    def _closed_card(self, dashboard_cards) -> Card:
+        return next(
+            c for c in dashboard_cards
+            if c.is_won == 1 and c.closed_at < datetime.now() - timedelta(days=30)
+        )
+
+    def test_incremental_refresh_reopened_card(self, db: Session, dashboard_cards):
+        """Card reaberto tem o dia do fechamento antigo recalculado"""
+        repository = PipelineSnapshotRepository(db)
+        repository.refresh()
+
+        card = self._closed_card(dashboard_cards)
+        db.expire(card)
+        card.is_won = 0
+        card.closed_at = None
+        db.commit()
+
+        result = repository.refresh()
+
+        assert result == {"mode": "incremental", "days_refreshed": 2}
+        incremental = self._snapshot_rows(db)
+        repository.refresh(full=True)
+        assert incremental == self._snapshot_rows(db)
+
+    def test_incremental_refresh_deleted_card(self, db: Session, dashboard_cards):
+        """Card excluído tem os dias de criação e fechamento recalculados"""
+        from app.repositories.card_repository import CardRepository
+
+        repository = PipelineSnapshotRepository(db)
+        repository.refresh()
+
+        CardRepository(db).delete(self._closed_card(dashboard_cards))
+
+        result = repository.refresh()
+
+        assert result == {"mode": "incremental", "days_refreshed": 2}
+        assert db.query(PipelineDirtyDay).count() == 0
+        incremental = self._snapshot_rows(db)
+        repository.refresh(full=True)
+        assert incremental == self._snapshot_rows(db)
+
+    def test_incremental_refresh_without_changes(self, db: Session, dashboard_cards):
+        """Sem cards alterados, nenhum dia é recalculado"""
+        repository = PipelineSnapshotRepository(db)
+        repository.refresh()
+
+        assert repository.refresh() == {"mode": "incremental", "days_refreshed": 0}
+
+    def test_sales_report_reads_from_snapshot(
+        self, db: Session, dashboard_cards, test_salesperson_user
+    ):
+        """Relatório de vendas deve refletir os cards ganhos no período"""
+        from app.schemas.report import SalesReportRequest
+
+        PipelineSnapshotRepository(db).refresh()
+
+        report = ReportService(db).get_sales_report(
+            SalesReportRequest(period=PeriodEnum.THIS_YEAR, user_id=test_salesperson_user.id)
+        )
+
+        start = datetime.combine(report.start_date, datetime.min.time())
+        expected_won = sum(
+            1 for c in dashboard_cards
+            if c.assigned_to_id == test_salesperson_user.id and c.is_won == 1 and c.closed_at >= start
+        )
+        assert report.total_won_cards == expected_won
+
+
+class TestReportCache:
+    """Testes do cache de respostas de relatórios"""
+
+    def test_dashboard_is_served_from_cache(self, db: Session, dashboard_cards):
+        """A segunda chamada deve ser um hit, sem consultar o banco"""
+        from app.core.cache import report_cache
+
+        PipelineSnapshotRepository(db).refresh()
+        first = ReportService(db).get_dashboard_kpis()
+        second = ReportService(db).get_dashboard_kpis()
+
+        assert second == first
+        assert report_cache.stats()["hits"] == 1
+        assert report_cache.stats()["misses"] == 1
+
+    def test_card_change_invalidates_board_reports(
+        self, db: Session, test_card, test_lists, test_board
+    ):
+        """Mover um card invalida os relatórios do board e os globais"""
+        from app.core.cache import report_cache
+        from app.repositories.card_repository import CardRepository
+        from app.schemas.report import ConversionReportRequest
+
+        service = ReportService(db)
+        request = ConversionReportRequest(board_id=test_board.id)
+        service.get_conversion_report(request)
+        service.get_dashboard_kpis()
+
+        CardRepository(db).move_to_list(test_card, test_lists[1].id)
+
+        service.get_conversion_report(request)
+        service.get_dashboard_kpis()
+
+        assert report_cache.stats()["hits"] == 0
+        assert report_cache.stats()["misses"] == 4
+
+    def test_other_board_reports_stay_cached(self, db: Session, test_card, test_board):
+        """Alterações em um board não invalidam relatórios de outros boards"""
+        from app.core.cache import report_cache
+        from app.schemas.report import ConversionReportRequest
+
+        other_board = Board(name="Outro Board")
+        db.add(other_board)
+        db.commit()
+
+        service = ReportService(db)
+        request = ConversionReportRequest(board_id=other_board.id)
+        service.get_conversion_report(request)
+
+        report_cache.invalidate_boards([test_board.id])
+        service.get_conversion_report(request)
+
+        assert report_cache.stats()["hits"] == 1
+
+    def test_backend_failure_falls_back_to_compute(self, db: Session):
+        """Falhas do backend não quebram o relatório"""
+        from app.core.cache import ReportCache
+
+        class BrokenBackend:
+            name = "broken"
+
+            def get_versions(self, scopes):
+                raise ConnectionError("indisponível")
+
+            def bump_versions(self, scopes):
+                raise ConnectionError("indisponível")
+
+        cache = ReportCache(BrokenBackend())
+        result = cache.get_or_compute(
+            "dashboard", {}, ReportService(db)._build_dashboard_kpis, DashboardKPIsResponse
+        )
+
+        assert result.total_cards == 0
+        assert cache.stats()["errors"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_cache_stats_endpoint(self, client, salesperson_headers):
+        """Endpoint expõe os contadores do cache"""
+        client.get("/api/v1/reports/dashboard", headers=salesperson_headers)
+        client.get("/api/v1/reports/dashboard", headers=salesperson_headers)
+
+        response = client.get("/api/v1/reports/cache/stats", headers=salesperson_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["backend"] == "memory"
+        assert data["hits"] == 1
+        assert data["misses"] == 1
+        assert data["hit_rate"] == 50.0
+
+
+@pytest.fixture
+def funnel_cards(db: Session, test_lists) -> list:
+    """
+    Cria cards com histórico de movimentação entre as etapas:
+    - A: Leads (2 dias) → Em Contato (3 dias) → Proposta
+    - B: Leads (4 dias) → Em Contato
+    - C: Leads
+    """
+    from app.models.activity import Activity
+
+    now = datetime.utcnow()
+    leads, contact, proposal, _ = test_lists
+
+    def card(title, list_obj, created_days_ago):
+        obj = Card(
+            title=title,
+            list_id=list_obj.id,
+            value=Decimal("100.00"),
+            position=0,
+            created_at=now - timedelta(days=created_days_ago)
+        )
+        db.add(obj)
+        db.flush()
+        return obj
+
+    def move(card_obj, from_list, to_list, days_ago):
+        db.add(Activity(
+            card_id=card_obj.id,
+            activity_type="card_moved",
+            description="Card movido",
+            activity_metadata={"from_list_id": from_list.id, "to_list_id": to_list.id},
+            created_at=now - timedelta(days=days_ago)
+        ))
+
+    card_a = card("A", proposal, 10)
+    move(card_a, leads, contact, 8)
+    move(card_a, contact, proposal, 5)
+
+    card_b = card("B", contact, 10)
+    move(card_b, leads, contact, 6)
+
+    card_c = card("C", leads, 9)
+
+    db.commit()
+    return [card_a, card_b, card_c]
+
+
+class TestConversionFunnel:
+    """Testes do funil de conversão"""
+
+    def _report(self, db: Session, board_id: int):
+        from app.schemas.report import ConversionReportRequest
+
+        PipelineSnapshotRepository(db).refresh()
+        return ReportService(db).get_conversion_report(ConversionReportRequest(
+            board_id=board_id,
+            period=PeriodEnum.CUSTOM,
+            start_date=date.today() - timedelta(days=30),
+            end_date=date.today()
+        ))
+
+    def test_stage_conversion_from_move_events(self, db: Session, test_board, funnel_cards):
+        """Conversão entre etapas = cards que avançaram / cards que entraram"""
+        stages = {stage.list_name: stage for stage in self._report(db, test_board.id).stages}
+
+        assert stages["Leads"].conversion_rate == 66.67
+        assert stages["Em Contato"].conversion_rate == 50.0
+        assert stages["Proposta"].conversion_rate == 0.0
+
+    def test_avg_time_in_stage(self, db: Session, test_board, funnel_cards):
+        """Tempo médio considera apenas passagens encerradas"""
+        stages = {stage.list_name: stage for stage in self._report(db, test_board.id).stages}
+
+        assert stages["Leads"].avg_time_in_stage_days == 3.0
+        assert stages["Em Contato"].avg_time_in_stage_days == 3.0
+        assert stages["Proposta"].avg_time_in_stage_days is None
+
+    def test_stage_counts_by_current_list(self, db: Session, test_board, funnel_cards):
+        """Quantidade por etapa reflete a lista atual dos cards criados no período"""
+        report = self._report(db, test_board.id)
+
+        assert [stage.cards_count for stage in report.stages] == [1, 1, 1, 0]
+        assert report.total_cards == 3
+
+    def test_query_count_independent_of_lists(self, db: Session, test_board, funnel_cards):
+        """O número de consultas não cresce com o número de listas"""
+        from sqlalchemy import event
+
+        for index in range(10):
+            db.add(BoardList(name=f"Extra {index}", position=10 + index, board_id=test_board.id))
+        db.commit()
+        PipelineSnapshotRepository(db).refresh()
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            self._report(db, test_board.id)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+        # refresh incremental (2: cards alterados e dias pendentes) + board, listas,
+        # consolidado e passagens
+        assert len(statements) <= 7
+
+    def test_move_card_records_stage_transition(
+        self, db: Session, test_card, test_lists, test_salesperson_user
+    ):
+        """Mover um card registra o evento usado pelo funil"""
+        from app.models.activity import Activity
+        from app.services.card_service import CardService
+
+        CardService(db).move_card(test_card.id, test_lists[1].id, None, test_salesperson_user)
+
+        activity = db.query(Activity).filter(
+            Activity.card_id == test_card.id,
+            Activity.activity_type == "card_moved"
+        ).one()
+        assert activity.activity_metadata == {
+            "from_list_id": test_lists[0].id,
+            "to_list_id": test_lists[1].id
+        }
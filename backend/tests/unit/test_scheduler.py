@@ -0,0 +1,130 @@
+"""
+Testes unitários do scheduler.
+Testa a reserva distribuída dos jobs e as métricas de execução.
+"""
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.job_locks import JobLocks, MemoryLockBackend, job_locks
+from app.workers.job_runner import job_metrics, run_locked_job
+
+
+def _metrics(job_id: str) -> dict:
+    return next(job for job in job_metrics.snapshot() if job["job_id"] == job_id)
+
+
+class TestJobLocks:
+    """Testes das reservas dos jobs"""
+
+    def test_only_one_holder(self):
+        """Enquanto a reserva vale, ninguém mais reserva o job"""
+        locks = JobLocks(MemoryLockBackend())
+
+        token = locks.acquire("job", 60)
+
+        assert token is not None
+        assert locks.acquire("job", 60) is None
+        locks.release("job", token)
+        assert locks.acquire("job", 60) is not None
+
+    def test_release_by_other_token_is_ignored(self):
+        """Só o dono da reserva pode liberá-la"""
+        locks = JobLocks(MemoryLockBackend())
+        locks.acquire("job", 60)
+
+        locks.release("job", "outro-token")
+
+        assert locks.acquire("job", 60) is None
+
+    def test_lease_expires(self):
+        """Reserva de um processo que morreu expira sozinha"""
+        locks = JobLocks(MemoryLockBackend())
+        locks.acquire("job", 0.01)
+        time.sleep(0.02)
+
+        assert locks.acquire("job", 60) is not None
+
+
+class TestRunLockedJob:
+    """Testes da execução dos jobs com reserva"""
+
+    def test_runs_once_per_cluster(self):
+        """Vários processos disparando no mesmo horário: apenas um executa"""
+        calls = []
+
+        # Cada chamada simula o scheduler de um processo da API
+        for _ in range(4):
+            run_locked_job("daily_job", lambda: calls.append(1), spacing_seconds=60)
+
+        assert len(calls) == 1
+        metrics = _metrics("daily_job")
+        assert metrics["runs"] == 1
+        assert metrics["skipped"] == 3
+
+    def test_skips_job_reserved_elsewhere(self):
+        """Job reservado por outro processo não executa"""
+        calls = []
+        job_locks.acquire("busy_job", 60)
+
+        run_locked_job("busy_job", lambda: calls.append(1), spacing_seconds=0)
+
+        assert calls == []
+        assert _metrics("busy_job")["skipped"] == 1
+
+    def test_releases_after_spacing(self):
+        """Sem intervalo mínimo, a reserva é liberada ao terminar"""
+        calls = []
+
+        run_locked_job("fast_job", lambda: calls.append(1), spacing_seconds=0)
+        run_locked_job("fast_job", lambda: calls.append(1), spacing_seconds=0)
+
+        assert len(calls) == 2
+
+    def test_records_duration_and_failures(self):
+        """Duração e erros ficam nas métricas do job"""
+        def failing_job():
+            time.sleep(0.01)
+            raise RuntimeError("falhou")
+
+        run_locked_job("failing_job", failing_job, spacing_seconds=0)
+
+        metrics = _metrics("failing_job")
+        assert metrics["runs"] == 1
+        assert metrics["failures"] == 1
+        assert metrics["last_error"] == "falhou"
+        assert metrics["running"] is False
+        assert metrics["last_duration_seconds"] >= 0.01
+        assert metrics["avg_duration_seconds"] == metrics["last_duration_seconds"]
+
+    def test_real_job_failure_is_recorded(self, db, monkeypatch):
+        """Um job do scheduler que falha registra a falha nas métricas"""
+        from app.services.notification_service import NotificationService
+        from app.workers import scheduler
+
+        def broken_digest(self, *args, **kwargs):
+            raise RuntimeError("banco indisponível")
+
+        monkeypatch.setattr(scheduler, "SessionLocal", lambda: db)
+        monkeypatch.setattr(db, "close", lambda: None)
+        monkeypatch.setattr(NotificationService, "send_overdue_digests", broken_digest)
+
+        run_locked_job("check_overdue_cards", scheduler.job_check_overdue_cards, spacing_seconds=0)
+
+        metrics = _metrics("check_overdue_cards")
+        assert metrics["failures"] == 1
+        assert metrics["last_error"] == "banco indisponível"
+
+    def test_scheduler_status_endpoint(self, client: TestClient, admin_headers, salesperson_headers):
+        """Admin consulta as métricas; demais perfis não"""
+        run_locked_job("metrics_job", lambda: None, spacing_seconds=0)
+
+        response = client.get("/api/v1/admin/scheduler", headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["lock_backend"] == "memory"
+        assert {"job_id": "metrics_job", "runs": 1}.items() <= next(
+            job for job in data["jobs"] if job["job_id"] == "metrics_job"
+        ).items()
+        assert client.get("/api/v1/admin/scheduler", headers=salesperson_headers).status_code == 403
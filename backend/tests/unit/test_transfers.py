@@ -0,0 +1,373 @@
+"""
+Testes unitários de transferências.
+Testa a transferência de cards em lote, síncrona e assíncrona, e a
+expiração de transferências pendentes e as estatísticas.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.cache import GLOBAL_SCOPE, report_cache
+from app.core.config import settings
+from app.models.card import Card
+from app.models.card_transfer import CardTransfer
+from app.models.list import List
+from app.models.notification import Notification
+from app.models.outbox_event import OutboxEvent
+from app.models.transfer_approval import TransferApproval
+from app.models.transfer_batch import TransferBatchStatus
+from app.repositories.transfer_repository import TransferRepository
+from app.schemas.transfer import APPROVAL_EXPIRATION_HOURS, AsyncBatchTransferCreate, BatchTransferCreate
+from app.services.transfer_service import TransferService
+
+
+def _create_cards(db, list_id: int, user_id: int, total: int) -> list:
+    cards = [
+        Card(title=f"Lead {index}", list_id=list_id, assigned_to_id=user_id, position=index)
+        for index in range(total)
+    ]
+    db.add_all(cards)
+    db.commit()
+    return cards
+
+
+def _create_pending(db, test_lists, from_user, to_user, total: int) -> list:
+    cards = _create_cards(db, test_lists[0].id, from_user.id, total)
+    result = TransferService(db, approval_required=True).create_batch_transfer(
+        BatchTransferCreate(card_ids=[card.id for card in cards], to_user_id=to_user.id, reason="reassignment"),
+        from_user
+    )
+    return result.transfers
+
+
+class TestBatchTransfer:
+    """Testes da transferência em lote"""
+
+    def _batch(self, card_ids, to_user_id: int) -> BatchTransferCreate:
+        return BatchTransferCreate(card_ids=card_ids, to_user_id=to_user_id, reason="reassignment")
+
+    def test_transfers_all_cards(self, db, test_lists, test_board, test_salesperson_user, test_manager_user):
+        """Todos os cards são reatribuídos e ganham nova versão do board"""
+        cards = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 3)
+        old_version = cards[0].change_version
+
+        result = TransferService(db).create_batch_transfer(
+            self._batch([card.id for card in cards], test_manager_user.id),
+            test_salesperson_user
+        )
+
+        assert result.successful == 3
+        assert result.failed == 0
+        assert result.errors is None
+        assert [transfer.card_id for transfer in result.transfers] == [card.id for card in cards]
+        assert result.transfers[0].card_title == "Lead 0"
+        assert result.transfers[0].to_user_name == test_manager_user.name
+        assert all(transfer.batch_id == result.batch_id for transfer in result.transfers)
+        for card in cards:
+            db.refresh(card)
+            assert card.assigned_to_id == test_manager_user.id
+            assert card.change_version > old_version
+        assert db.query(CardTransfer).filter(CardTransfer.status == "completed").count() == 3
+
+    def test_reports_errors_per_card(self, db, test_lists, test_salesperson_user, test_manager_user):
+        """Cards inexistentes ou sem board são informados sem impedir os demais"""
+        card, = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 1)
+        orphan_list = List(board_id=999999, name="Órfã", position=0)
+        db.add(orphan_list)
+        db.commit()
+        orphan, = _create_cards(db, orphan_list.id, test_salesperson_user.id, 1)
+
+        result = TransferService(db).create_batch_transfer(
+            self._batch([card.id, 999999, orphan.id], test_manager_user.id),
+            test_salesperson_user
+        )
+
+        assert result.total_cards == 3
+        assert result.successful == 1
+        assert result.failed == 2
+        assert result.errors == [
+            {"card_id": 999999, "error": "Card não encontrado"},
+            {"card_id": orphan.id, "error": "Board não encontrado"},
+        ]
+        db.refresh(orphan)
+        assert orphan.assigned_to_id == test_salesperson_user.id
+
+    def test_approval_required_keeps_cards(self, db, test_lists, test_salesperson_user, test_manager_user):
+        """Com aprovação, cria uma aprovação pendente por card e não reatribui"""
+        cards = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 2)
+
+        result = TransferService(db, approval_required=True).create_batch_transfer(
+            self._batch([card.id for card in cards], test_manager_user.id),
+            test_salesperson_user
+        )
+
+        assert {transfer.status for transfer in result.transfers} == {"pending_approval"}
+        approvals = db.query(TransferApproval).all()
+        assert sorted(approval.transfer_id for approval in approvals) == sorted(
+            transfer.id for transfer in result.transfers
+        )
+        assert all(approval.status == "pending" and approval.approver_id is None for approval in approvals)
+        db.refresh(cards[0])
+        assert cards[0].assigned_to_id == test_salesperson_user.id
+
+    def test_constant_statement_count(self, db, test_lists, test_salesperson_user,
+                                      test_manager_user, query_counter):
+        """O lote inteiro usa poucos comandos, independente da quantidade de cards"""
+        cards = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 50)
+
+        with query_counter() as queries:
+            result = TransferService(db).create_batch_transfer(
+                self._batch([card.id for card in cards], test_manager_user.id),
+                test_salesperson_user
+            )
+
+        assert result.successful == 50
+        assert len(queries) <= 10
+
+    def test_batch_endpoint_unknown_user(self, client, salesperson_headers, test_card):
+        """Usuário destino inexistente retorna 404"""
+        response = client.post(
+            "/api/v1/transfers/batch",
+            headers=salesperson_headers,
+            json={"card_ids": [test_card.id], "to_user_id": 999999, "reason": "reassignment"}
+        )
+
+        assert response.status_code == 404
+
+
+class TestAsyncBatchTransfer:
+    """Testes da transferência em lote assíncrona"""
+
+    def _start(self, db, user, **data):
+        batch = AsyncBatchTransferCreate(reason="reassignment", **data)
+        return TransferService(db).start_async_batch(batch, user)
+
+    def test_card_ids_processed_in_chunks(self, db, monkeypatch, test_lists,
+                                          test_salesperson_user, test_manager_user):
+        """Cada parte é gravada com o cursor; o lote termina com todos os cards"""
+        monkeypatch.setattr(settings, "TRANSFER_ASYNC_CHUNK_SIZE", 2)
+        cards = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 5)
+        card_ids = [card.id for card in cards] + [999999]
+
+        started = self._start(db, test_manager_user, card_ids=card_ids, to_user_id=test_manager_user.id)
+        assert started.status == TransferBatchStatus.QUEUED
+        assert started.total_cards == 6
+        assert started.progress == 0
+        task = db.query(OutboxEvent).one()
+        assert task.payload["task"] == "process_transfer_batch_task"
+        assert task.payload["kwargs"] == {"batch_id": started.batch_id}
+
+        service = TransferService(db)
+        assert service.process_batch_chunk(started.batch_id) is True
+        partial = service.get_batch_status(started.batch_id, test_manager_user)
+        assert partial.status == TransferBatchStatus.RUNNING
+        assert partial.processed_cards == 2
+        assert partial.progress == pytest.approx(33.3)
+
+        result = service.run_async_batch(started.batch_id)
+
+        assert result.status == TransferBatchStatus.COMPLETED
+        assert result.progress == 100
+        assert result.processed_cards == 6
+        assert result.successful == 5
+        assert result.errors == [{"card_id": 999999, "error": "Card não encontrado"}]
+        assert result.finished_at is not None
+        for card in cards:
+            db.refresh(card)
+            assert card.assigned_to_id == test_manager_user.id
+        transfers = db.query(CardTransfer).filter(CardTransfer.batch_id == started.batch_id).all()
+        assert sorted(transfer.card_id for transfer in transfers) == sorted(card.id for card in cards)
+
+    def test_filter_selects_open_cards(self, db, monkeypatch, test_lists, test_board,
+                                       test_salesperson_user, test_manager_user):
+        """O filtro transfere só os cards abertos do responsável no board"""
+        monkeypatch.setattr(settings, "TRANSFER_ASYNC_CHUNK_SIZE", 2)
+        cards = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 5)
+        cards[0].is_won = 1
+        cards[1].is_won = -1
+        other_board_list = List(board_id=999999, name="Outro board", position=0)
+        db.add(other_board_list)
+        db.commit()
+        other, = _create_cards(db, other_board_list.id, test_salesperson_user.id, 1)
+
+        started = self._start(
+            db, test_manager_user,
+            filter={"from_user_id": test_salesperson_user.id, "board_id": test_board.id},
+            to_user_id=test_manager_user.id
+        )
+        assert started.total_cards == 3
+
+        result = TransferService(db).run_async_batch(started.batch_id)
+
+        assert result.status == TransferBatchStatus.COMPLETED
+        assert result.successful == 3
+        assert {card.assigned_to_id for card in cards[2:]} == {test_manager_user.id}
+        for card in cards[:2] + [other]:
+            db.refresh(card)
+            assert card.assigned_to_id == test_salesperson_user.id
+        transfer = db.query(CardTransfer).filter(CardTransfer.batch_id == started.batch_id).first()
+        assert transfer.from_user_id == test_salesperson_user.id
+
+    def test_failed_batch_keeps_processed_cards(self, db, monkeypatch, test_lists,
+                                                test_salesperson_user, test_manager_user):
+        """Um lote interrompido não é retomado e mantém o que já foi transferido"""
+        monkeypatch.setattr(settings, "TRANSFER_ASYNC_CHUNK_SIZE", 1)
+        cards = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 2)
+        started = self._start(db, test_manager_user, card_ids=[card.id for card in cards],
+                              to_user_id=test_manager_user.id)
+
+        service = TransferService(db)
+        service.process_batch_chunk(started.batch_id)
+        service.fail_async_batch(started.batch_id, "broker indisponível")
+
+        assert service.process_batch_chunk(started.batch_id) is False
+        result = service.get_batch_status(started.batch_id, test_manager_user)
+        assert result.status == TransferBatchStatus.FAILED
+        assert result.last_error == "broker indisponível"
+        assert result.successful == 1
+        db.refresh(cards[1])
+        assert cards[1].assigned_to_id == test_salesperson_user.id
+
+    def test_selection_requires_card_ids_or_filter(self):
+        """Exige exatamente uma forma de seleção"""
+        with pytest.raises(ValidationError):
+            AsyncBatchTransferCreate(to_user_id=1, reason="reassignment")
+        with pytest.raises(ValidationError):
+            AsyncBatchTransferCreate(
+                card_ids=[1], filter={"from_user_id": 2}, to_user_id=1, reason="reassignment"
+            )
+
+    def test_async_endpoints(self, client, manager_headers, salesperson_headers,
+                             test_card, test_manager_user):
+        """Agendamento restrito a admin/gerente; andamento restrito a quem agendou"""
+        payload = {"card_ids": [test_card.id], "to_user_id": test_manager_user.id, "reason": "reassignment"}
+
+        response = client.post("/api/v1/transfers/batch/async", headers=salesperson_headers, json=payload)
+        assert response.status_code == 403
+
+        response = client.post("/api/v1/transfers/batch/async", headers=manager_headers, json=payload)
+        assert response.status_code == 202
+        batch_id = response.json()["batch_id"]
+
+        response = client.get(f"/api/v1/transfers/batch/{batch_id}", headers=manager_headers)
+        assert response.status_code == 200
+        assert response.json()["status"] == "queued"
+        assert response.json()["total_cards"] == 1
+
+        response = client.get(f"/api/v1/transfers/batch/{batch_id}", headers=salesperson_headers)
+        assert response.status_code == 403
+
+        response = client.get("/api/v1/transfers/batch/inexistente", headers=manager_headers)
+        assert response.status_code == 404
+
+
+class TestExpirePendingTransfers:
+    """Testes da expiração de transferências pendentes"""
+
+    def test_expires_transfers_and_notifies(self, db, test_lists, test_salesperson_user,
+                                            test_manager_user, query_counter):
+        """Aprovações vencidas expiram, transferências são rejeitadas e o remetente é avisado"""
+        transfers = _create_pending(db, test_lists, test_salesperson_user, test_manager_user, 20)
+        later = datetime.utcnow() + timedelta(hours=APPROVAL_EXPIRATION_HOURS + 1)
+
+        with query_counter() as queries:
+            expired = TransferService(db).expire_pending_transfers(now=later)
+
+        assert expired == 20
+        assert len(queries) <= 6
+        assert {approval.status for approval in db.query(TransferApproval).all()} == {"expired"}
+        assert {transfer.status for transfer in db.query(CardTransfer).all()} == {"rejected"}
+        notifications = db.query(Notification).filter(Notification.notification_type == "transfer_rejected").all()
+        assert len(notifications) == 20
+        assert {notification.user_id for notification in notifications} == {test_salesperson_user.id}
+        assert sorted(notification.notification_metadata["transfer_id"] for notification in notifications) == sorted(
+            transfer.id for transfer in transfers
+        )
+        assert "Lead 0" in {notification.message.split("'")[1] for notification in notifications}
+
+    def test_idempotent_and_keeps_valid_approvals(self, db, test_lists, test_salesperson_user, test_manager_user):
+        """Aprovações no prazo não mudam e repetir a execução não duplica avisos"""
+        _create_pending(db, test_lists, test_salesperson_user, test_manager_user, 2)
+        service = TransferService(db)
+
+        assert service.expire_pending_transfers() == 0
+        assert {approval.status for approval in db.query(TransferApproval).all()} == {"pending"}
+
+        later = datetime.utcnow() + timedelta(hours=APPROVAL_EXPIRATION_HOURS + 1)
+        assert service.expire_pending_transfers(now=later) == 2
+        assert service.expire_pending_transfers(now=later) == 0
+        assert db.query(Notification).count() == 2
+
+
+class TestTransferStatistics:
+    """Testes das estatísticas de transferências"""
+
+    def _transfer(self, db, card, from_user, to_user, reason="reassignment", status="completed", days_ago=0):
+        created_at = datetime.utcnow() - timedelta(days=days_ago)
+        transfer = CardTransfer(
+            card_id=card.id, from_user_id=from_user.id, to_user_id=to_user.id,
+            reason=reason, status=status, created_at=created_at, updated_at=created_at
+        )
+        db.add(transfer)
+        db.commit()
+        return transfer
+
+    def test_matches_individual_counts_in_one_query(self, db, test_lists, test_salesperson_user,
+                                                    test_manager_user, test_admin_user, query_counter):
+        """O rollup bate com as contagens separadas e usa uma única query"""
+        card, = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 1)
+        self._transfer(db, card, test_salesperson_user, test_manager_user)
+        self._transfer(db, card, test_salesperson_user, test_manager_user, reason="vacation")
+        self._transfer(db, card, test_manager_user, test_admin_user, days_ago=40)
+        self._transfer(db, card, test_salesperson_user, test_admin_user, status="rejected")
+        _create_pending(db, test_lists, test_salesperson_user, test_manager_user, 2)
+        repository = TransferRepository(db)
+
+        with query_counter() as queries:
+            stats = TransferService(db).get_statistics(use_cache=False)
+
+        assert len(queries) == 1
+        now = datetime.utcnow()
+        assert stats.total_transfers == 6
+        assert stats.pending_approvals == 2
+        assert stats.completed_today == repository.count_by_period(
+            now.replace(hour=0, minute=0, second=0, microsecond=0), now, status="completed"
+        ) == 2
+        assert stats.completed_this_month == 2
+        assert stats.by_reason == repository.count_by_reason() == {"reassignment": 5, "vacation": 1}
+        assert stats.top_receivers == repository.get_top_receivers(limit=5)
+        assert stats.top_senders[0] == {
+            "user_id": test_salesperson_user.id, "user_name": test_salesperson_user.name, "count": 5
+        }
+
+    def test_empty_table(self, db):
+        """Sem transferências, todos os números são zero"""
+        stats = TransferService(db).get_statistics(use_cache=False)
+
+        assert stats.total_transfers == 0
+        assert stats.completed_this_week == 0
+        assert stats.by_reason == {}
+        assert stats.top_senders == []
+
+    def test_cached_until_next_transfer(self, db, test_lists, test_salesperson_user,
+                                        test_manager_user, query_counter):
+        """O resultado vem do cache até uma nova transferência invalidá-lo"""
+        card, = _create_cards(db, test_lists[0].id, test_salesperson_user.id, 1)
+        service = TransferService(db, approval_required=True)
+        assert service.get_statistics().total_transfers == 0
+
+        with query_counter() as queries:
+            assert service.get_statistics().total_transfers == 0
+        assert queries == []
+
+        global_version = report_cache.backend.get_versions([GLOBAL_SCOPE])
+        service.create_batch_transfer(
+            BatchTransferCreate(card_ids=[card.id], to_user_id=test_manager_user.id, reason="reassignment"),
+            test_salesperson_user
+        )
+        stats = service.get_statistics()
+        assert stats.total_transfers == 1
+        assert stats.pending_approvals == 1
+        # Os demais relatórios globais (dashboard, ...) continuam em cache
+        assert report_cache.backend.get_versions([GLOBAL_SCOPE]) == global_version